@@ -0,0 +1,128 @@
+"""Compara el perfil normal de Chrome con el perfil ligero.
+
+Para cada tipo de página (listado, película, serie) mide el tiempo hasta que
+el DOM está listo y los bytes transferidos, con el perfil ligero activado y
+desactivado. Uso::
+
+    python -m Scripts.benchmark_browser_profile --repeat 3
+
+Los bytes salen de la Performance API del navegador: los recursos de otros
+dominios sin ``Timing-Allow-Origin`` cuentan como 0, así que el ahorro real
+del perfil ligero (que bloquea sobre todo publicidad externa) es mayor que el
+medido.
+"""
+
+import argparse
+import statistics
+import time
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from .scraper_utils import BASE_URL, setup_logger, create_driver, ensure_logged_in
+except ImportError:  # pragma: no cover
+    from scraper_utils import BASE_URL, setup_logger, create_driver, ensure_logged_in
+
+SCRIPT_NAME = "benchmark_browser_profile"
+logger = setup_logger(SCRIPT_NAME, f"{SCRIPT_NAME}.log")
+
+# Tiempo tras el DOM listo para dejar que terminen las peticiones en curso
+SETTLE_SECONDS = 2.0
+
+_TRANSFER_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+return [bytes, resources.length];
+"""
+
+
+def default_pages(driver):
+    """Páginas de ejemplo: los listados y el primer elemento de cada uno."""
+    pages = {
+        "listado": f"{BASE_URL}/peliculas/imdb_rating/1",
+        "listado_series": f"{BASE_URL}/series/imdb_rating/1",
+    }
+    for page_type, listing in (("pelicula", pages["listado"]), ("serie", pages["listado_series"])):
+        driver.get(listing)
+        href = driver.execute_script(
+            "const a = document.querySelector('div.span-6.inner-6.tt.view a[href]'); return a ? a.href : null;"
+        )
+        if href:
+            pages[page_type] = href
+    return pages
+
+
+def measure(driver, url):
+    """Devuelve ``(segundos hasta DOM listo, bytes transferidos, nº de recursos)``."""
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    except Exception:
+        pass
+    started = time.perf_counter()
+    driver.get(url)
+    WebDriverWait(driver, 60).until(
+        lambda d: d.execute_script("return document.readyState") in ("interactive", "complete")
+    )
+    ready = time.perf_counter() - started
+    time.sleep(SETTLE_SECONDS)
+    transferred, resources = driver.execute_script(_TRANSFER_JS)
+    return ready, transferred, resources
+
+
+def run_profile(lean, pages, repeat):
+    driver = create_driver(headless=True, lean=lean)
+    try:
+        if not ensure_logged_in(driver, logger):
+            raise RuntimeError("No se pudo iniciar sesión")
+        results = {}
+        for page_type, url in pages.items():
+            samples = [measure(driver, url) for _ in range(repeat)]
+            results[page_type] = tuple(statistics.median(values) for values in zip(*samples))
+        return results
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del perfil ligero de Chrome")
+    parser.add_argument("--repeat", type=int, default=3, help="Cargas por página y perfil (se usa la mediana)")
+    parser.add_argument(
+        "--url",
+        action="append",
+        default=[],
+        metavar="TIPO=URL",
+        help="Página adicional a medir (se puede repetir)",
+    )
+    args = parser.parse_args()
+
+    # Las URL de ejemplo se resuelven con el perfil normal
+    probe = create_driver(headless=True, lean=False)
+    try:
+        if not ensure_logged_in(probe, logger):
+            logger.error("No se pudo iniciar sesión. Abortando benchmark.")
+            return
+        pages = default_pages(probe)
+    finally:
+        probe.quit()
+    for item in args.url:
+        page_type, _, url = item.partition("=")
+        if url:
+            pages[page_type] = url
+
+    normal = run_profile(False, pages, args.repeat)
+    lean = run_profile(True, pages, args.repeat)
+
+    header = f"{'Página':<16}{'Perfil':<9}{'DOM listo (s)':>15}{'KB':>10}{'Recursos':>10}"
+    lines = [header, "-" * len(header)]
+    for page_type in pages:
+        for name, results in (("normal", normal), ("ligero", lean)):
+            ready, transferred, resources = results[page_type]
+            lines.append(f"{page_type:<16}{name:<9}{ready:>15.2f}{transferred / 1024:>10.1f}{resources:>10.0f}")
+    print("\n".join(lines))
+    logger.info("Resultados del benchmark:\n" + "\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
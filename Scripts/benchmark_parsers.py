@@ -0,0 +1,407 @@
+"""Benchmark sin conexión de los parsers sobre el corpus de páginas de ejemplo.
+
+El corpus está en ``resources/fixtures``: una página HTML anonimizada por tipo
+(listados, película, serie, temporada y episodio de HDFull; película y
+temporada de Dontorrent, más una página cuyos selectores sólo llevan códigos
+sueltos que :mod:`embed_resolver` no debe convertir en URLs) y
+``expected.json`` con la salida esperada de cada parser. Antes de medir se
+comprueba que cada parser sigue devolviendo lo esperado, y después se informa
+de la latencia (p50/p90/p99) y de las páginas por segundo. Uso::
+
+    python -m Scripts.benchmark_parsers
+    python -m Scripts.benchmark_parsers --check
+    python -m Scripts.benchmark_parsers --save antes.json
+    python -m Scripts.benchmark_parsers --compare antes.json
+
+``--check`` sólo compara con ``expected.json`` y con las referencias
+BeautifulSoup (ver :data:`REFERENCE_VIEWS`) y termina con código 1 si
+alguna salida no coincide. ``--reference`` mide también el análisis con BeautifulSoup que usaban los
+scrapers antes de :mod:`parsers`, y ``--page PARSER=RUTA`` añade páginas
+guardadas a mano (``driver.page_source`` o "Guardar como… solo HTML").
+Cualquier cambio en un parser o en el motor de análisis debería acompañarse
+de las cifras de antes y después.
+"""
+
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import time
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from .scraper_utils import PROJECT_ROOT, setup_logger
+    from .embed_resolver import resolve_embed_urls
+    from .parsers import (
+        HDFULL_BASE_URL,
+        MOVIE_LANGUAGES,
+        parse_embed_selectors,
+        parse_episode,
+        parse_listing,
+        parse_movie,
+        parse_pagination,
+        parse_season,
+        parse_season_list,
+        parse_series,
+    )
+    from . import torrent_dw_films_scraper, torrent_dw_series_scraper
+except ImportError:  # pragma: no cover
+    from scraper_utils import PROJECT_ROOT, setup_logger
+    from embed_resolver import resolve_embed_urls
+    from parsers import (
+        HDFULL_BASE_URL,
+        MOVIE_LANGUAGES,
+        parse_embed_selectors,
+        parse_episode,
+        parse_listing,
+        parse_movie,
+        parse_pagination,
+        parse_season,
+        parse_season_list,
+        parse_series,
+    )
+    import torrent_dw_films_scraper
+    import torrent_dw_series_scraper
+
+SCRIPT_NAME = "benchmark_parsers"
+logger = setup_logger(SCRIPT_NAME, f"{SCRIPT_NAME}.log")
+
+FIXTURES_DIR = os.path.join(PROJECT_ROOT, "resources", "fixtures")
+EXPECTED_FILE = os.path.join(FIXTURES_DIR, "expected.json")
+
+# URL ficticias para los parsers de Dontorrent, que sólo la usan en los avisos
+_TORRENT_MOVIE_URL = "https://dontorrent.example/pelicula/1/ejemplo"
+_TORRENT_SERIES_URL = "https://dontorrent.example/serie/1/1/ejemplo"
+
+
+# -- Referencias BeautifulSoup (código anterior de los scrapers) -------------
+def _soup_listing(html):
+    soup = BeautifulSoup(html, "lxml")
+    for container_selector in ["div.center", "div.container"]:
+        container = soup.select_one(container_selector)
+        if container:
+            divs = container.select("div.span-6.inner-6.tt.view")
+            break
+    else:
+        divs = soup.select("div.span-6.inner-6.tt.view")
+    return [div.find("a", href=True)["href"] for div in divs if div.find("a", href=True)]
+
+
+def _soup_movie(html):
+    soup = BeautifulSoup(html, "lxml")
+    title_tag = soup.find("div", id="summary-title")
+    result = {"title": title_tag.text.strip() if title_tag else None}
+    show_details = soup.find("div", class_="show-details")
+    if show_details:
+        year_tag = show_details.find("a", href=re.compile(r"/buscar/year/"))
+        rating_tag = show_details.find("p", itemprop="aggregateRating")
+        genre_tag = show_details.find("a", href=re.compile(r"/tags-peliculas"))
+        result["year"] = year_tag.text.strip() if year_tag else None
+        result["imdb_rating"] = rating_tag.find("a").text.strip() if rating_tag and rating_tag.find("a") else None
+        result["genre"] = genre_tag.text.strip() if genre_tag else None
+    # Antes cada selector se volvía a analizar a partir de su outerHTML
+    embeds = []
+    for selector in soup.find_all(class_="embed-selector"):
+        embed_soup = BeautifulSoup(str(selector), "lxml")
+        language = next((lang for lang in MOVIE_LANGUAGES if lang in embed_soup.text), None)
+        server_tag = embed_soup.find("b", class_="provider")
+        embeds.append((language, server_tag.text.strip() if server_tag else None))
+    result["embeds"] = embeds
+    return result
+
+
+def _soup_torrent_movie(html):
+    soup = BeautifulSoup(html, "html.parser")
+    title_element = soup.find("h1", class_="position-relative ml-2 descargarTitulo")
+    if not title_element:
+        return None
+    result = {"title": title_element.text.strip()}
+    details_div = soup.find("div", class_="d-inline-block ml-2")
+    if details_div:
+        for p_tag in details_div.find_all("p", class_="m-1"):
+            b_tag = p_tag.find("b")
+            link = p_tag.find("a")
+            if b_tag and link:
+                result[b_tag.text.strip()] = link.text.strip()
+    format_div = soup.select_one('div[style="margin-right: 0%;"].d-inline-block')
+    format_p = format_div.find("p") if format_div else None
+    if format_p and "Formato:" in format_p.text:
+        result["quality"] = format_p.text.replace("Formato:", "").strip()
+    torrent_element = soup.find("a", href=True, id="download_torrent")
+    result["torrent"] = torrent_element["href"] if torrent_element else None
+    return result
+
+
+def _soup_torrent_series(html):
+    soup = BeautifulSoup(html, "html.parser")
+    title_element = soup.find("h2", class_="position-relative ml-2 descargarTitulo")
+    if not title_element:
+        return None
+    quality = None
+    format_div = soup.select_one("div.d-inline-block")
+    format_p = format_div.find("p") if format_div else None
+    if format_p and "Formato:" in format_p.text:
+        quality = format_p.text.replace("Formato:", "").strip()
+    episodes = []
+    table = soup.find("table", class_="table-striped")
+    if table:
+        for row in table.select("tbody tr"):
+            cell = row.select_one("td:nth-child(1)")
+            link = row.select_one("a#download_torrent")
+            if cell and link and "href" in link.attrs:
+                episodes.append((cell.text.strip(), link["href"]))
+    return title_element.text.strip(), quality, episodes
+
+
+# Parser -> (función actual, referencia BeautifulSoup o ``None``)
+PARSERS = {
+    "listing": (lambda html: parse_listing(html, HDFULL_BASE_URL), _soup_listing),
+    "pagination": (parse_pagination, None),
+    "movie": (parse_movie, _soup_movie),
+    "series": (parse_series, None),
+    "season": (lambda html: parse_season(html, HDFULL_BASE_URL), None),
+    "season_list": (lambda html: parse_season_list(html, HDFULL_BASE_URL), None),
+    "episode": (parse_episode, None),
+    "embeds": (parse_embed_selectors, None),
+    "embed_resolver": (resolve_embed_urls, None),
+    "torrent_movie": (
+        lambda html: torrent_dw_films_scraper.parse_movie_page(html, _TORRENT_MOVIE_URL),
+        _soup_torrent_movie,
+    ),
+    "torrent_series": (
+        lambda html: torrent_dw_series_scraper.parse_series_page(html, _TORRENT_SERIES_URL),
+        _soup_torrent_series,
+    ),
+}
+
+# Corpus por defecto: (parser, página de ``resources/fixtures``)
+CORPUS = [
+    ("listing", "hdfull_listing_movies.html"),
+    ("listing", "hdfull_listing_series.html"),
+    ("pagination", "hdfull_listing_movies.html"),
+    ("movie", "hdfull_movie.html"),
+    ("series", "hdfull_series.html"),
+    ("season_list", "hdfull_series.html"),
+    ("season", "hdfull_season.html"),
+    ("episode", "hdfull_episode.html"),
+    ("embeds", "hdfull_episode.html"),
+    ("embed_resolver", "hdfull_movie.html"),
+    ("embed_resolver", "hdfull_episode.html"),
+    ("embed_resolver", "hdfull_embed_codes.html"),
+    ("torrent_movie", "dontorrent_movie.html"),
+    ("torrent_series", "dontorrent_series.html"),
+]
+
+
+def _plain(value):
+    """Convierte los registros de :mod:`records` (dataclasses) en diccionarios."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: _plain(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def _jsonable(value):
+    """Salida de un parser tal y como queda guardada en ``expected.json``."""
+    return json.loads(json.dumps(_plain(value), ensure_ascii=False))
+
+
+def measure(func, html, repeat):
+    """Analiza ``html`` ``repeat`` veces; devuelve p50/p90/p99 (ms) y páginas por segundo."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(html)
+        latencies.append((time.perf_counter() - started) * 1000)
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    total = sum(latencies) / 1000
+    return {
+        "p50": cuts[49],
+        "p90": cuts[89],
+        "p99": cuts[98],
+        "pages_per_second": repeat / total if total else float("inf"),
+    }
+
+
+def _link(url):
+    """Enlace sin esquema, como lo dejaban los scrapers anteriores (``//host/...``)."""
+    return url.split(":", 1)[1] if url and url.startswith(("http:", "https:")) else url
+
+
+def _number_text(value):
+    return None if value is None else str(value)
+
+
+# Parser -> (vista de la salida actual, vista de la referencia BeautifulSoup).
+# Ambas se reducen a lo que la referencia sabía extraer, así que la
+# comparación no depende de ``expected.json``, que sale de los mismos parsers.
+REFERENCE_VIEWS = {
+    "listing": (
+        lambda items: [urlparse(item["url"]).path for item in items],
+        lambda hrefs: hrefs,
+    ),
+    "movie": (
+        lambda movie: (
+            movie["title"], _number_text(movie["year"]), _number_text(movie["imdb_rating"]),
+            movie["genres"][0] if movie["genres"] else None,
+            [(embed["language"], embed["server"]) for embed in movie["embeds"]],
+        ),
+        lambda movie: (movie["title"], movie["year"], movie["imdb_rating"], movie["genre"], movie["embeds"]),
+    ),
+    "torrent_movie": (
+        lambda movie: (
+            movie["title"], _number_text(movie["year"]), movie["genre"], movie["director"],
+            movie["quality"], _link(movie["torrent_link"]),
+        ),
+        lambda movie: (
+            re.sub(r"^Descargar (.*) por Torrent$", r"\1", movie["title"]), movie.get("Año:"),
+            movie.get("Género:"), movie.get("Dirección:"), movie["quality"], movie["torrent"],
+        ),
+    ),
+    "torrent_series": (
+        lambda series: (series[2], [_link(episode.torrent_link) for episode in series[3]]),
+        lambda series: (series[1], [link for _, link in series[2]]),
+    ),
+}
+
+
+def check_reference(pages):
+    """Compara cada parser con su referencia BeautifulSoup; devuelve las claves que difieren."""
+    mismatches = []
+    for key, parser_name, _, html in pages:
+        if parser_name not in REFERENCE_VIEWS:
+            continue
+        func, reference = PARSERS[parser_name]
+        view, reference_view = REFERENCE_VIEWS[parser_name]
+        if view(func(html)) != reference_view(reference(html)):
+            mismatches.append(key)
+    return mismatches
+
+
+def check_expected(pages, update=False):
+    """Compara la salida de cada parser con ``expected.json`` (o lo regenera con ``update``).
+
+    Devuelve las claves cuya salida no coincide.
+    """
+    expected = {}
+    if os.path.exists(EXPECTED_FILE) and not update:
+        with open(EXPECTED_FILE, "r", encoding="utf-8") as fh:
+            expected = json.load(fh)
+    mismatches = []
+    for key, parser_name, _, html in pages:
+        output = _jsonable(PARSERS[parser_name][0](html))
+        if update:
+            expected[key] = output
+        elif key in expected and expected[key] != output:
+            mismatches.append(key)
+    if update:
+        with open(EXPECTED_FILE, "w", encoding="utf-8") as fh:
+            json.dump(expected, fh, indent=2, ensure_ascii=False, sort_keys=True)
+            fh.write("\n")
+        logger.info(f"Salidas esperadas guardadas en {EXPECTED_FILE}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sin conexión de los parsers")
+    parser.add_argument(
+        "--page",
+        action="append",
+        default=[],
+        metavar="PARSER=RUTA",
+        help=f"Página HTML adicional (se puede repetir). Parsers: {', '.join(PARSERS)}",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Sólo comprobar la salida con expected.json (código 1 si no coincide)",
+    )
+    parser.add_argument("--repeat", type=int, default=200, help="Análisis por página y parser")
+    parser.add_argument("--reference", action="store_true", help="Medir también la referencia BeautifulSoup")
+    parser.add_argument("--save", metavar="ARCHIVO", help="Guardar los resultados en JSON")
+    parser.add_argument("--compare", metavar="ARCHIVO", help="Comparar con resultados guardados con --save")
+    parser.add_argument(
+        "--update-expected",
+        action="store_true",
+        help="Regenerar expected.json con la salida actual (tras revisar el cambio a mano)",
+    )
+    args = parser.parse_args()
+
+    # Los parsers de Dontorrent registran cada página; no debe contar en la medida
+    for module in (torrent_dw_films_scraper, torrent_dw_series_scraper):
+        logging.getLogger(module.__name__).setLevel(logging.WARNING)
+
+    pages = []
+    for parser_name, fixture in CORPUS:
+        with open(os.path.join(FIXTURES_DIR, fixture), "rb") as fh:
+            pages.append((f"{parser_name}:{fixture}", parser_name, fixture, fh.read()))
+    for item in args.page:
+        parser_name, _, path = item.partition("=")
+        if parser_name not in PARSERS or not path:
+            parser.error(f"Página no válida: {item}")
+        with open(path, "rb") as fh:
+            pages.append((f"{parser_name}:{path}", parser_name, os.path.basename(path), fh.read()))
+
+    mismatches = check_expected(pages, update=args.update_expected)
+    for key in mismatches:
+        logger.warning(f"La salida de {key} no coincide con expected.json")
+    if args.check:
+        if not mismatches:
+            logger.info(f"Las {len(pages)} salidas coinciden con expected.json")
+        reference_mismatches = check_reference(pages)
+        for key in reference_mismatches:
+            logger.warning(f"La salida de {key} no coincide con la referencia BeautifulSoup")
+        if not reference_mismatches:
+            compared = sum(1 for _, parser_name, _, _ in pages if parser_name in REFERENCE_VIEWS)
+            logger.info(f"Las {compared} salidas con referencia BeautifulSoup coinciden con ella")
+        return 1 if mismatches or reference_mismatches else 0
+
+    previous = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            previous = json.load(fh)
+
+    results = {}
+    header = (
+        f"{'Parser':<16}{'Página':<30}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'pág/s':>10}"
+        f"{'bs4 pág/s':>11}{'Antes':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for key, parser_name, name, html in pages:
+        func, reference = PARSERS[parser_name]
+        stats = measure(func, html, args.repeat)
+        if args.reference and reference is not None:
+            stats["reference_pages_per_second"] = measure(reference, html, args.repeat)["pages_per_second"]
+        results[key] = stats
+
+        reference_rate = stats.get("reference_pages_per_second")
+        reference_text = f"{reference_rate:.0f}" if reference_rate else "-"
+        before = previous.get(key, {}).get("pages_per_second")
+        change_text = f"{stats['pages_per_second'] / before:.2f}x" if before else "-"
+        mark = " *" if key in mismatches else ""
+        lines.append(
+            f"{parser_name:<16}{name[-29:]:<30}{stats['p50']:>9.3f}{stats['p90']:>9.3f}{stats['p99']:>9.3f}"
+            f"{stats['pages_per_second']:>10.0f}{reference_text:>11}{change_text:>10}{mark}"
+        )
+    if mismatches:
+        lines.append("* salida distinta de expected.json")
+    logger.info("Resultados del benchmark:\n" + "\n".join(lines))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        logger.info(f"Resultados guardados en {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Varios workers lógicos compartiendo un mismo Chrome mediante pestañas.
+
+Cada Chrome cuesta cientos de MB, así que en modo pestañas el pool abre hasta
+``TABS_PER_BROWSER`` pestañas por navegador y entrega a cada worker un
+:class:`TabDriver`: un envoltorio del WebDriver que, antes de cada orden,
+toma el cerrojo del navegador y cambia a la ventana de su pestaña.
+
+WebDriver atiende una orden a la vez por sesión, así que lo que se solapa son
+las cargas de página: el navegador se crea con ``pageLoadStrategy=none`` y
+:meth:`TabDriver.get` lanza la navegación y espera a que el documento esté
+listo *sin* retener el cerrojo, de modo que las demás pestañas siguen
+trabajando mientras tanto. Por el mismo motivo la espera implícita se pone a
+0: un ``find_element`` fallido no debe bloquear el resto de pestañas.
+"""
+
+import functools
+import logging
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+
+logger = logging.getLogger(__name__)
+
+# Intervalo de sondeo del estado de carga de una pestaña (segundos)
+POLL_INTERVAL = 0.1
+
+# Tiempo máximo de carga de una página, igual que ``create_driver``
+PAGE_LOAD_TIMEOUT = 60
+
+_NAVIGATE_JS = "window.__tabNavigating = true; window.location.href = arguments[0];"
+_RELOAD_JS = "window.__tabNavigating = true; window.location.reload();"
+_READY_STATE_JS = "return window.__tabNavigating ? 'loading' : document.readyState;"
+
+
+def _unwrap(value):
+    """Sustituye los elementos envueltos por los de Selenium en los argumentos."""
+    if isinstance(value, TabElement):
+        return value._element
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _unwrap(item) for key, item in value.items()}
+    return value
+
+
+class SharedBrowser:
+    """Un Chrome con varias pestañas, cada una usada por un worker."""
+
+    def __init__(self, driver, lean=False, blocked_urls=None):
+        self.driver = driver
+        # Patrones de ``Network.setBlockedURLs``: CDP los aplica por pestaña, así que
+        # cada pestaña nueva los necesita además de la ventana inicial
+        self.blocked_urls = list(blocked_urls or [])
+        self.lock = threading.RLock()
+        self.handles = set()
+        self.retiring = False  # no admite pestañas nuevas; se cierra con la última
+        self.ready_states = ("interactive", "complete") if lean else ("complete",)
+        self._current = driver.current_window_handle
+        driver.implicitly_wait(0)
+
+    @property
+    def tab_count(self):
+        return len(self.handles)
+
+    def activate(self, handle):
+        """Cambia a ``handle`` si no es ya la pestaña activa (con el cerrojo tomado)."""
+        if self._current != handle:
+            self.driver.switch_to.window(handle)
+            self._current = handle
+
+    def open_tab(self):
+        """Abre una pestaña (la primera reutiliza la ventana inicial)."""
+        with self.lock:
+            if self.handles:
+                self.driver.switch_to.new_window("tab")
+            handle = self.driver.current_window_handle
+            self._current = handle
+            if self.handles and self.blocked_urls:
+                self._block_urls()
+            self.handles.add(handle)
+        return TabDriver(self, handle)
+
+    def _block_urls(self):
+        """Activa el bloqueo de recursos en la pestaña activa (con el cerrojo tomado)."""
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+        except Exception as e:
+            logger.warning(f"No se pudo activar el bloqueo de recursos en la pestaña: {e}")
+
+    def close_tab(self, handle):
+        """Cierra la pestaña y, si era la última, el navegador entero."""
+        with self.lock:
+            if handle not in self.handles:
+                return
+            self.handles.discard(handle)
+            if self.handles:
+                try:
+                    self.activate(handle)
+                    self.driver.close()
+                except Exception as e:
+                    logger.debug(f"Error al cerrar la pestaña: {e}")
+                self._current = None
+                return
+            self.retiring = True
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error al cerrar el navegador compartido: {e}")
+
+
+class TabDriver:
+    """WebDriver restringido a una pestaña de un :class:`SharedBrowser`.
+
+    Expone la misma interfaz que el driver de Selenium; los elementos que
+    devuelve también cambian a su pestaña antes de cada orden.
+    """
+
+    def __init__(self, browser, handle):
+        self._browser = browser
+        self._handle = handle
+        self._page_load_timeout = PAGE_LOAD_TIMEOUT
+
+    def _wrap(self, value):
+        if isinstance(value, WebElement):
+            return TabElement(self, value)
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        return value
+
+    def _run(self, method, *args, **kwargs):
+        with self._browser.lock:
+            self._browser.activate(self._handle)
+            return self._wrap(method(*_unwrap(args), **_unwrap(kwargs)))
+
+    def __getattr__(self, name):
+        with self._browser.lock:
+            self._browser.activate(self._handle)
+            value = getattr(self._browser.driver, name)
+            if not callable(value):
+                return self._wrap(value)
+        return functools.partial(self._run, value)
+
+    # -- Navegación sin bloquear el navegador ---------------------------------
+    def _navigate(self, script, *args):
+        with self._browser.lock:
+            self._browser.activate(self._handle)
+            self._browser.driver.execute_script(script, *args)
+        deadline = time.monotonic() + self._page_load_timeout
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            try:
+                with self._browser.lock:
+                    self._browser.activate(self._handle)
+                    state = self._browser.driver.execute_script(_READY_STATE_JS)
+            except WebDriverException:
+                # El documento anterior se está descargando; volver a intentar
+                continue
+            if state in self._browser.ready_states:
+                return
+        raise TimeoutException(f"Timed out loading page in tab after {self._page_load_timeout}s")
+
+    def get(self, url):
+        self._navigate(_NAVIGATE_JS, url)
+
+    def refresh(self):
+        self._navigate(_RELOAD_JS)
+
+    def set_page_load_timeout(self, time_to_wait):
+        self._page_load_timeout = time_to_wait
+
+    def implicitly_wait(self, time_to_wait):
+        # La espera implícita es global al navegador: se mantiene a 0
+        pass
+
+    # -- Cierre ---------------------------------------------------------------
+    def close(self):
+        self._browser.close_tab(self._handle)
+
+    def quit(self):
+        self._browser.close_tab(self._handle)
+
+    def __repr__(self):
+        return f"<TabDriver {self._handle}>"
+
+
+class TabElement:
+    """``WebElement`` que cambia a la pestaña de su driver antes de cada orden."""
+
+    def __init__(self, tab, element):
+        self._tab = tab
+        self._element = element
+
+    def __getattr__(self, name):
+        with self._tab._browser.lock:
+            self._tab._browser.activate(self._tab._handle)
+            value = getattr(self._element, name)
+            if not callable(value):
+                return self._tab._wrap(value)
+        return functools.partial(self._tab._run, value)
+
+    def __eq__(self, other):
+        return self._element == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._element)
+
+    def __repr__(self):
+        return f"<TabElement {self._element!r}>"
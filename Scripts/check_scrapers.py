@@ -0,0 +1,757 @@
+"""Comprobaciones sin conexión de los helpers de los scrapers.
+
+Complementan a ``benchmark_parsers --check`` (salida de los parsers) y a
+:mod:`check_storage` (helpers de la base de datos) con lo que no necesita ni
+red ni un Chrome real; donde hace falta un navegador se usa un driver falso
+que registra las órdenes recibidas:
+
+* :class:`browser_tabs.SharedBrowser`: cada pestaña nueva recibe el bloqueo
+  de recursos de CDP (la ventana inicial ya lo trae de ``create_driver``),
+  cada :class:`browser_tabs.TabDriver` ejecuta sus órdenes en su pestaña y
+  cerrar la última pestaña cierra el navegador.
+* :mod:`page_ready`: los selectores CSS de cada predicado encuentran su
+  elemento en la página de ``resources/fixtures`` del mismo tipo (así la
+  espera termina en cuanto aparece el contenido y no al agotar el tiempo), y
+  con un driver falso :func:`page_ready.wait_for` termina en cuanto el
+  predicado se cumple, devuelve ``False`` al agotar el tiempo o si el
+  script falla y lo anota en las estadísticas.
+* :func:`scraper_utils.setup_logger`: configurar dos veces el mismo logger no
+  acumula handlers y sus mensajes no llegan a los handlers raíz que instalan
+  con ``basicConfig`` los scrapers de Dontorrent, así que el resumen de
+  ``benchmark_parsers`` y de ``reparse`` sale una sola vez.
+* ``load_season`` y ``_season_episode_count_http`` del scraper de series,
+  con la carga y el análisis sustituidos: sólo se memorizan las temporadas
+  analizadas bien, no las páginas sin contenedor ni las que necesitaron
+  reintentos.
+* ``get_available_seasons`` del scraper de series, con las comprobaciones de
+  temporada sustituidas: con las temporadas que enlaza la ficha no se sondea
+  (ni se carga nada si no hacen falta los episodios) y sin ellas se sondea
+  por HTTP, se recurre al driver donde HTTP no sirve y se para tras tres
+  temporadas vacías seguidas.
+* :mod:`records`: los registros son inmutables y sin ``__dict__``, un
+  :class:`records.Link` incompleto o de película y episodio a la vez se
+  rechaza, el ``id`` de :class:`records.Series` no cuenta al comparar y los
+  registros sobreviven a ``pickle`` (así viajan al pool de procesos).
+* :class:`parse_pool.ParsePool`: las páginas de ``resources/fixtures``
+  analizadas en un proceso aparte dan los mismos campos y los mismos
+  iframes deducidos que el análisis en el hilo, sin recurrir al hilo.
+* :func:`hdfull_http.fetch_episode_feed` con un cliente falso: pide los
+  bloques del endpoint AJAX hasta uno incompleto o repetido, renueva las
+  cookies si la sesión caducó y devuelve ``None`` (scroll con el driver) si
+  el modo HTTP está desactivado, el primer bloque no es una lista o su
+  formato no es el esperado.
+* :func:`page_extract.harvest_embeds` y
+  :func:`scraper_utils.harvest_pending_embeds` con un driver falso: sólo se
+  recogen los selectores sin resolver, en tandas que no pasan de
+  ``HARVEST_MAX_SCRIPT_SECONDS``, y el tiempo de espera de scripts del
+  driver se restaura también si el script falla.
+* :class:`torrent_http.AdaptiveRateController`: el ritmo sube de forma
+  aditiva hasta el techo y se reduce a la mitad ante un 429/5xx, un error de
+  conexión o un pico de latencia, como mucho una vez por intervalo y nunca
+  por debajo del mínimo; ``Retry-After`` aplaza el siguiente hueco y, con una
+  sesión falsa, :func:`torrent_http.fetch` reintenta las respuestas limitadas
+  y relanza el último error de red.
+* :class:`http_cache.ResponseCache`: los validadores sólo se envían después
+  de ``commit``, un 304 o un cuerpo idéntico cuentan como sin cambios, la
+  caché desactivada se ignora al leer y al cerrarse se expulsan las entradas
+  menos usadas por encima del límite.
+
+Uso::
+
+    python -m Scripts.check_scrapers
+
+Termina con código 1 si alguna comprobación falla.
+"""
+
+import dataclasses
+import logging
+import os
+import pickle
+import re
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from . import hdfull_http, scraper_utils
+    from .scraper_utils import PROJECT_ROOT, harvest_pending_embeds, resolve_page_embeds, setup_logger
+    from .browser_tabs import SharedBrowser
+    from . import page_ready
+    from .page_extract import HARVEST_MAX_SCRIPT_SECONDS, harvest_embeds, parse_page_source
+    from .parse_pool import ParsePool
+    from .parsers import HDFULL_BASE_URL
+    from .records import Episode, Link, Movie, Series, TorrentFile
+except ImportError:  # pragma: no cover
+    import hdfull_http
+    import scraper_utils
+    from scraper_utils import PROJECT_ROOT, harvest_pending_embeds, resolve_page_embeds, setup_logger
+    from browser_tabs import SharedBrowser
+    import page_ready
+    from page_extract import HARVEST_MAX_SCRIPT_SECONDS, harvest_embeds, parse_page_source
+    from parse_pool import ParsePool
+    from parsers import HDFULL_BASE_URL
+    from records import Episode, Link, Movie, Series, TorrentFile
+
+FIXTURES_DIR = os.path.join(PROJECT_ROOT, "resources", "fixtures")
+
+SCRIPT_NAME = "check_scrapers"
+logger = setup_logger(SCRIPT_NAME, f"{SCRIPT_NAME}.log")
+
+
+def _expect(failures, name, actual, expected):
+    if actual != expected:
+        failures.append(f"{name}: se obtuvo {actual!r}, se esperaba {expected!r}")
+
+
+class _FakeSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver.current_window_handle = handle
+
+    def new_window(self, kind):
+        self._driver.opened += 1
+        self._driver.current_window_handle = f"tab-{self._driver.opened}"
+
+
+class _FakeDriver:
+    """WebDriver mínimo que anota en qué pestaña se ejecuta cada orden."""
+
+    def __init__(self):
+        self.current_window_handle = "tab-0"
+        self.opened = 0
+        self.switch_to = _FakeSwitchTo(self)
+        self.cdp = []
+        self.scripts = []
+        self.closed = []
+        self.quit_called = False
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((self.current_window_handle, command))
+
+    def execute_script(self, script, *args):
+        self.scripts.append((self.current_window_handle, script))
+
+    def close(self):
+        self.closed.append(self.current_window_handle)
+
+    def quit(self):
+        self.quit_called = True
+
+
+def check_shared_browser():
+    """Bloqueo de recursos y órdenes por pestaña en un Chrome compartido."""
+    failures = []
+    driver = _FakeDriver()
+    browser = SharedBrowser(driver, lean=True, blocked_urls=["*.png", "*.woff2"])
+    tabs = [browser.open_tab() for _ in range(3)]
+
+    _expect(failures, "pestañas abiertas", browser.tab_count, 3)
+    expected_cdp = [
+        (handle, command)
+        for handle in ("tab-1", "tab-2")
+        for command in ("Network.enable", "Network.setBlockedURLs")
+    ]
+    _expect(failures, "bloqueo en las pestañas nuevas", driver.cdp, expected_cdp)
+
+    for tab in reversed(tabs):
+        tab.execute_script("return 1;")
+    _expect(failures, "orden en su pestaña", [handle for handle, _ in driver.scripts],
+            ["tab-2", "tab-1", "tab-0"])
+
+    tabs[1].close()
+    _expect(failures, "pestaña cerrada", driver.closed, ["tab-1"])
+    tabs[0].close()
+    _expect(failures, "navegador abierto con una pestaña", driver.quit_called, False)
+    tabs[2].quit()
+    _expect(failures, "navegador cerrado con la última pestaña", driver.quit_called, True)
+
+    plain = _FakeDriver()
+    browser = SharedBrowser(plain)
+    browser.open_tab()
+    browser.open_tab()
+    _expect(failures, "sin bloqueo fuera del modo ligero", plain.cdp, [])
+    return failures
+
+
+# Tipo de página de :mod:`page_ready` -> página de ``resources/fixtures``
+READY_PAGES = {
+    "listing": ["hdfull_listing_movies.html", "hdfull_listing_series.html"],
+    "movie": ["hdfull_movie.html"],
+    "series": ["hdfull_series.html"],
+    "season": ["hdfull_season.html"],
+    "episode": ["hdfull_episode.html"],
+}
+
+_QUERY_SELECTOR_RE = re.compile(r"querySelector\('([^']+)'\)")
+
+
+class _FakeReadyDriver:
+    """Driver cuyo predicado devuelve, por orden, los valores indicados."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.visited = []
+        self.polls = 0
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        self.polls += 1
+        result = self.results.pop(0) if self.results else False
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def check_page_ready():
+    """Predicados de espera de las páginas de HDFull."""
+    failures = []
+    for page_type, fixtures in READY_PAGES.items():
+        expression, _ = page_ready._predicates[page_type]
+        selectors = _QUERY_SELECTOR_RE.findall(expression)
+        if not selectors:
+            failures.append(f"{page_type}: el predicado no comprueba ningún elemento")
+        for fixture in fixtures:
+            with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+                soup = BeautifulSoup(f.read(), "lxml")
+            missing = [selector for selector in selectors if soup.select_one(selector) is None]
+            _expect(failures, f"selectores de '{page_type}' sin elemento en {fixture}", missing, [])
+
+    before = page_ready.get_wait_stats().get("season", {"waits": 0, "timeouts": 0})
+    driver = _FakeReadyDriver([False, False, True])
+    _expect(failures, "predicado cumplido", page_ready.load(driver, "https://hdfull.example/t1", "season"), True)
+    _expect(failures, "página cargada y sondeada", (driver.visited, driver.polls), (["https://hdfull.example/t1"], 3))
+
+    driver = _FakeReadyDriver([RuntimeError("no such window")])
+    _expect(failures, "script fallido", page_ready.wait_for(driver, "season", timeout=0.3), False)
+    _expect(failures, "sondeo tras el fallo", driver.polls > 1, True)
+
+    after = page_ready.get_wait_stats()["season"]
+    _expect(failures, "esperas anotadas", (after["waits"] - before["waits"], after["timeouts"] - before["timeouts"]),
+            (2, 1))
+    return failures
+
+
+class _CountingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def check_setup_logger():
+    """Cada mensaje de un logger de ``setup_logger`` se emite una sola vez."""
+    failures = []
+    name = f"{SCRIPT_NAME}.setup_logger"
+    setup_logger(name, f"{SCRIPT_NAME}.log")
+    check_logger = setup_logger(name, f"{SCRIPT_NAME}.log")
+    _expect(failures, "handlers tras configurar dos veces", len(check_logger.handlers), 2)
+    _expect(failures, "propagación a la raíz", check_logger.propagate, False)
+
+    root_handler = _CountingHandler()
+    own_handler = _CountingHandler()
+    logging.getLogger().addHandler(root_handler)
+    check_logger.addHandler(own_handler)
+    try:
+        check_logger.debug("mensaje de prueba")
+    finally:
+        logging.getLogger().removeHandler(root_handler)
+        check_logger.removeHandler(own_handler)
+        for handler in check_logger.handlers:
+            handler.close()
+        check_logger.handlers = []
+    _expect(failures, "mensajes en el propio logger", own_handler.count, 1)
+    _expect(failures, "mensajes repetidos en la raíz", root_handler.count, 0)
+    return failures
+
+
+def check_season_memo():
+    """Memoria de temporadas del scraper de series por ejecución."""
+    # Importado aquí: el módulo del scraper configura su propio log al importarse
+    try:
+        from . import direct_dw_series_scraper as series
+    except ImportError:
+        import direct_dw_series_scraper as series
+
+    failures = []
+    episodes = [{"number": 1, "title": "Piloto", "url": "https://hdfull.example/episodio-1"}]
+    calls = {"load": 0, "extract": 0}
+    parses = []
+    load_errors = []
+
+    def fake_load(driver, url, page_type):
+        calls["load"] += 1
+        if load_errors:
+            raise load_errors.pop(0)
+
+    def fake_extract(driver, page_type):
+        calls["extract"] += 1
+        return parses.pop(0)
+
+    originals = (series.load, series.extract_page, series.fetch_listing_page, series.parse_season)
+    series.load, series.extract_page = fake_load, fake_extract
+    series.page_memo.clear()
+    try:
+        # Sin contenedor: no se guarda y la siguiente comprobación vuelve a cargar
+        parses[:] = [None, episodes]
+        _expect(failures, "temporada sin contenedor", series.load_season(None, "t1"), None)
+        _expect(failures, "recarga tras no analizar", series.load_season(None, "t1"), episodes)
+        _expect(failures, "temporada memorizada", series.load_season(None, "t1"), episodes)
+        _expect(failures, "cargas de t1", calls["load"], 2)
+
+        # Un intento fallido: el resultado se devuelve pero no se guarda
+        load_errors[:] = [RuntimeError("timeout")]
+        parses[:] = [episodes, episodes]
+        _expect(failures, "temporada con reintento", series.load_season(None, "t2"), episodes)
+        series.load_season(None, "t2")
+        _expect(failures, "análisis de t2 sin memorizar", calls["extract"], 4)
+
+        # Por HTTP: un análisis vacío tampoco se guarda
+        series.fetch_listing_page = lambda url, is_valid=None: "<html></html>"
+        http_parses = [None, episodes]
+        series.parse_season = lambda doc, base_url: http_parses.pop(0)
+        _expect(failures, "HTTP sin episodios", series._season_episode_count_http("t3"), None)
+        _expect(failures, "HTTP con episodios", series._season_episode_count_http("t3"), 1)
+        _expect(failures, "HTTP memorizado", series.page_memo.get("season", "t3"), episodes)
+    finally:
+        series.load, series.extract_page, series.fetch_listing_page, series.parse_season = originals
+        series.page_memo.clear()
+    return failures
+
+
+def check_available_seasons():
+    """Temporadas desde la ficha de la serie y sondeo cuando no las enlaza."""
+    # Importado aquí: el módulo del scraper configura su propio log al importarse
+    try:
+        from . import direct_dw_series_scraper as series
+    except ImportError:
+        import direct_dw_series_scraper as series
+
+    failures = []
+    base = "https://hdfull.example/serie/distrito-sur"
+    # Episodios por temporada por HTTP; ``None`` obliga a comprobarla con el driver
+    http_counts = {1: 5, 2: None, 3: 0}
+    driver_counts = {2: 3}
+    http_calls = []
+    driver_calls = []
+
+    def fake_http(season_url):
+        number = int(season_url.rsplit("-", 1)[1])
+        http_calls.append(number)
+        return http_counts.get(number, 0)
+
+    def fake_check(driver, season_url, worker_id=0):
+        number = int(season_url.rsplit("-", 1)[1])
+        driver_calls.append(number)
+        count = driver_counts.get(number, 0)
+        return count > 0, count
+
+    originals = (series._season_episode_count_http, series.check_season_exists)
+    series._season_episode_count_http, series.check_season_exists = fake_http, fake_check
+    try:
+        seasons = series.get_available_seasons(None, base, season_numbers=(1, 2), count_episodes=False)
+        _expect(failures, "temporadas de la ficha sin cargar",
+                (seasons, http_calls, driver_calls),
+                ([(1, f"{base}/temporada-1", None), (2, f"{base}/temporada-2", None)], [], []))
+
+        driver_counts[1] = 0
+        seasons = series.get_available_seasons(None, base, season_numbers=(1, 2))
+        _expect(failures, "temporadas de la ficha con episodios",
+                (seasons, driver_calls), ([(2, f"{base}/temporada-2", 3)], [1, 2]))
+        del driver_counts[1]
+        driver_calls.clear()
+
+        seasons = series.get_available_seasons(None, base)
+        _expect(failures, "temporadas sondeadas", seasons,
+                [(1, f"{base}/temporada-1", 5), (2, f"{base}/temporada-2", 3)])
+        # Cada bloque se comprueba en paralelo: el orden dentro del bloque no importa
+        _expect(failures, "sondeo por HTTP en bloques", sorted(http_calls),
+                list(range(1, 2 * series.SEASON_PROBE_BATCH + 1)))
+        _expect(failures, "driver sólo donde HTTP no sirve", driver_calls, [2])
+    finally:
+        series._season_episode_count_http, series.check_season_exists = originals
+    return failures
+
+
+def _raises(exception, func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except exception:
+        return True
+    return False
+
+
+def check_records():
+    """Registros inmutables, con ``__slots__`` y validados."""
+    failures = []
+    link = Link("streamtape", "Audio Español", "https://streamtape.com/e/kX7bQ2mNpL", "1080p", movie_id=3)
+    movie = Movie("Marea Baja", 2019, 7.1, "Drama", links=(link,))
+    episode = Episode(1, "Piloto", "https://hdfull.example/episodio-1", (link,))
+
+    _expect(failures, "película inmutable",
+            _raises(dataclasses.FrozenInstanceError, setattr, movie, "title", "Otra"), True)
+    _expect(failures, "sin __dict__",
+            [hasattr(record, "__dict__") for record in (link, movie, episode)], [False, False, False])
+    _expect(failures, "enlace sin URL", _raises(ValueError, Link, "voe", "Audio Español", "", "hdrip"), True)
+    _expect(failures, "enlace de película y episodio",
+            _raises(ValueError, Link, "voe", "Audio Español", "https://voe.sx/e/x", "hdrip", 1, 2), True)
+    _expect(failures, "replace crea otro registro",
+            (dataclasses.replace(movie, year=2020).year, movie.year), (2020, 2019))
+    _expect(failures, "id de serie fuera de la comparación",
+            Series("Distrito Sur", year=2018, id=4) == Series("Distrito Sur", year=2018), True)
+    _expect(failures, "registros en sets", len({link, dataclasses.replace(link)}), 1)
+
+    torrent = TorrentFile(1, "Frontera - 2x1", "https://dontorrent.example/Frontera_2x01.torrent")
+    for record in (movie, episode, torrent):
+        _expect(failures, f"pickle de {type(record).__name__}", pickle.loads(pickle.dumps(record)), record)
+    return failures
+
+
+# (tipo de página, página de ``resources/fixtures``) que se envían al pool
+PARSE_POOL_PAGES = [
+    ("movie", "hdfull_movie.html"),
+    ("episode", "hdfull_episode.html"),
+    ("embeds", "hdfull_episode.html"),
+    ("season", "hdfull_season.html"),
+]
+
+
+def _in_thread(page_source, page_type):
+    """Lo que ``extract_page`` obtiene sin pool, con los iframes ya deducidos."""
+    data = parse_page_source(page_source, page_type, HDFULL_BASE_URL)
+    if isinstance(data, dict) and "embed_source" in data:
+        data = dict(data)
+        data["resolved_urls"] = resolve_page_embeds(data)
+        del data["embed_source"]
+    return data
+
+
+def check_parse_pool():
+    """El pool de procesos devuelve lo mismo que el análisis en el hilo."""
+    failures = []
+    pool = ParsePool(1)
+    try:
+        for page_type, fixture in PARSE_POOL_PAGES:
+            with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+                page_source = f.read()
+            _expect(failures, f"{page_type} ({fixture})",
+                    pool.parse(page_source, page_type, HDFULL_BASE_URL), _in_thread(page_source, page_type))
+        _expect(failures, "páginas analizadas en el pool", pool.stats()["parsed"], len(PARSE_POOL_PAGES))
+        _expect(failures, "análisis en el hilo", pool.stats()["fallbacks"], 0)
+    finally:
+        pool.close()
+    return failures
+
+
+def _feed_item(number):
+    return {"show": {"permalink": "distrito-sur"}, "season": "2", "episode": str(number)}
+
+
+def _feed_url(number):
+    return f"{HDFULL_BASE_URL}/serie/distrito-sur/temporada-2/episodio-{number}"
+
+
+class _FakeFeedClient:
+    """Cliente HTTP que responde al feed con los bloques indicados, en orden."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.starts = []
+        self.cookie_reloads = 0
+        self.http_pages = 0
+        self._lock = threading.Lock()
+
+    def post_json(self, url, data, referer=None, timeout=15):
+        self.starts.append(data["start"])
+        return self.responses.pop(0) if self.responses else ([], False)
+
+    def load_cookies_from_driver(self, driver):
+        self.cookie_reloads += 1
+        return True
+
+
+def check_episode_feed():
+    """Paginación y vuelta al driver del feed de episodios por HTTP."""
+    failures = []
+    original_client, original_enabled = hdfull_http._ready_client, scraper_utils.LISTING_HTTP_ENABLED
+
+    def fetch(responses, **kwargs):
+        client = _FakeFeedClient(responses)
+        hdfull_http._ready_client = lambda driver: client
+        return hdfull_http.fetch_episode_feed("premiere", page_size=2, **kwargs), client
+
+    scraper_utils.LISTING_HTTP_ENABLED = True
+    try:
+        blocks = [([_feed_item(1), _feed_item(2)], False), ([_feed_item(3), _feed_item(4)], False),
+                  ([_feed_item(5)], False)]
+        urls, client = fetch(blocks)
+        _expect(failures, "episodios del feed", urls, [_feed_url(n) for n in range(1, 6)])
+        _expect(failures, "bloques pedidos", client.starts, [0, 2, 4])
+
+        repeated = [([_feed_item(1), _feed_item(2)], False), ([_feed_item(1), _feed_item(2)], False)]
+        urls, client = fetch(repeated + [([_feed_item(9)], False)])
+        _expect(failures, "parada en un bloque repetido", (urls, client.starts),
+                ([_feed_url(1), _feed_url(2)], [0, 2]))
+
+        urls, client = fetch([(None, True), ([_feed_item(1)], False)], driver=object())
+        _expect(failures, "sesión renovada", (urls, client.cookie_reloads), ([_feed_url(1)], 1))
+
+        _expect(failures, "primer bloque no es una lista", fetch([({"error": 1}, False)])[0], None)
+        _expect(failures, "formato desconocido", fetch([([{"id": 1}], False)])[0], None)
+
+        scraper_utils.LISTING_HTTP_ENABLED = False
+        urls, client = fetch(blocks)
+        _expect(failures, "modo HTTP desactivado", (urls, client.starts), (None, []))
+    finally:
+        hdfull_http._ready_client = original_client
+        scraper_utils.LISTING_HTTP_ENABLED = original_enabled
+    return failures
+
+
+class _FakeTimeouts:
+    script = 30
+
+
+class _FakeHarvestDriver:
+    """Driver que responde al script de recogida con un iframe por selector."""
+
+    def __init__(self, fail=False):
+        self.timeouts = _FakeTimeouts()
+        self.script_timeouts = []
+        self.batches = []
+        self.fail = fail
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+
+    def execute_async_script(self, script, indices, timeout_ms):
+        self.batches.append(list(indices))
+        if self.fail:
+            raise RuntimeError("script timeout")
+        return [f"https://voe.sx/e/code{i}" for i in indices]
+
+
+def check_embed_harvest():
+    """Recogida de iframes en el navegador por tandas acotadas."""
+    failures = []
+    driver = _FakeHarvestDriver()
+    indices = list(range(7))
+    urls = harvest_embeds(driver, indices, timeout=5)
+    _expect(failures, "iframes recogidos", urls, [f"https://voe.sx/e/code{i}" for i in indices])
+    _expect(failures, "selectores en orden", [i for batch in driver.batches for i in batch], indices)
+    _expect(failures, "tandas acotadas",
+            all(seconds <= HARVEST_MAX_SCRIPT_SECONDS for seconds in driver.script_timeouts[:-1]), True)
+    _expect(failures, "varias tandas", len(driver.batches) > 1, True)
+    _expect(failures, "tiempo de scripts restaurado", driver.script_timeouts[-1], 30)
+
+    failing = _FakeHarvestDriver(fail=True)
+    _expect(failures, "script fallido", harvest_embeds(failing, [0, 1]), None)
+    _expect(failures, "restaurado tras el fallo", failing.script_timeouts[-1], 30)
+
+    original_enabled = scraper_utils.EMBED_HARVEST_ENABLED
+    try:
+        scraper_utils.EMBED_HARVEST_ENABLED = True
+        driver = _FakeHarvestDriver()
+        resolved = ["https://streamtape.com/e/kX7bQ2mNpL", None, None]
+        urls, harvested = harvest_pending_embeds(driver, 3, resolved)
+        _expect(failures, "sólo los pendientes", (driver.batches, harvested), ([[1, 2]], {1, 2}))
+        _expect(failures, "enlaces combinados", urls,
+                [resolved[0], "https://voe.sx/e/code1", "https://voe.sx/e/code2"])
+
+        urls, harvested = harvest_pending_embeds(_FakeHarvestDriver(fail=True), 2, [])
+        _expect(failures, "clic desde Python si el script falla", (urls, harvested), ([None, None], set()))
+
+        scraper_utils.EMBED_HARVEST_ENABLED = False
+        driver = _FakeHarvestDriver()
+        harvest_pending_embeds(driver, 2, [])
+        _expect(failures, "recogida desactivada", driver.batches, [])
+    finally:
+        scraper_utils.EMBED_HARVEST_ENABLED = original_enabled
+    return failures
+
+
+class _FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class _FakeSession:
+    """Sesión ``requests`` que devuelve (o lanza) las respuestas indicadas, en orden."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, timeout=None, headers=None, **kwargs):
+        self.sent_headers.append(dict(headers or {}))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _import_torrent_http():
+    # Importado aquí: torrent_http y http_cache sólo se importan como parte del paquete
+    try:
+        from . import http_cache, torrent_http
+    except ImportError:  # pragma: no cover
+        import http_cache
+        import torrent_http
+    return http_cache, torrent_http
+
+
+def _fast_controller(torrent_http, url):
+    """Controlador compartido del host de ``url`` sin esperas entre peticiones."""
+    controller = torrent_http.get_rate_controller(url)
+    controller.set_max_rate(1000)
+    controller.rate = 1000
+    return controller
+
+
+def check_rate_controller():
+    """Subida aditiva, recorte multiplicativo y reintentos del ritmo HTTP."""
+    failures = []
+    _, torrent_http = _import_torrent_http()
+    Controller = torrent_http.AdaptiveRateController
+
+    controller = Controller("check.invalid", initial_rate=1.0, max_rate=2.0)
+    for _ in range(5):
+        controller.record(200, 0.1)
+    _expect(failures, "subida aditiva", round(controller.rate, 2), 1.5)
+    for _ in range(20):
+        controller.record(200, 0.1)
+    _expect(failures, "techo del ritmo", controller.rate, 2.0)
+    controller.record(503, 0.1)
+    _expect(failures, "recorte ante un 503", controller.rate, 1.0)
+    controller.record(503, 0.1)
+    _expect(failures, "un solo recorte por intervalo", (controller.rate, controller.throttled), (1.0, 2))
+    controller.set_max_rate(0.5)
+    _expect(failures, "techo reducido", controller.rate, 0.5)
+    controller.set_max_rate(0)
+    _expect(failures, "techo por defecto", controller.max_rate, torrent_http.DEFAULT_MAX_RATE)
+
+    controller = Controller("check.invalid", initial_rate=2.0)
+    controller.record(200, 0.5)
+    controller.record(200, 1.9)
+    _expect(failures, "latencia bajo el mínimo de pico", controller.throttled, 0)
+    controller.record(200, 5.0)
+    _expect(failures, "pico de latencia", (controller.throttled, controller.rate < 2.0), (1, True))
+
+    controller = Controller("check.invalid", initial_rate=0.3, min_rate=0.2)
+    controller.record(None, 0.1)
+    _expect(failures, "ritmo mínimo", controller.rate, 0.2)
+    controller = Controller("check.invalid")
+    controller.record(429, 0.1, retry_after=30)
+    _expect(failures, "Retry-After respetado", controller._next_slot - time.monotonic() > 25, True)
+
+    url = "https://check.invalid/pelicula/1"
+    _fast_controller(torrent_http, url)
+    session = _FakeSession([_FakeResponse(503), _FakeResponse(200, b"ok")])
+    response = torrent_http.fetch(session, url)
+    _expect(failures, "reintento tras un 503", (response.status_code, len(session.sent_headers)), (200, 2))
+
+    _fast_controller(torrent_http, url)
+    session = _FakeSession([_FakeResponse(503)] * 3)
+    response = torrent_http.fetch(session, url)
+    _expect(failures, "último 503 devuelto", (response.status_code, len(session.sent_headers)), (503, 3))
+
+    _fast_controller(torrent_http, url)
+    session = _FakeSession([requests.ConnectionError("sin red")] * 3)
+    _expect(failures, "error de red relanzado", _raises(requests.ConnectionError, torrent_http.fetch, session, url), True)
+    return failures
+
+
+def check_response_cache():
+    """Revalidación condicional y expulsión LRU de la caché HTTP."""
+    failures = []
+    http_cache, torrent_http = _import_torrent_http()
+    url = "https://check.invalid/serie/1"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = http_cache.ResponseCache(cache_dir=cache_dir, max_entries=2)
+        try:
+            first = _FakeResponse(200, b"v1", {"ETag": '"e1"', "Last-Modified": "Sat, 17 Oct 2026 10:00:00 GMT"})
+            _expect(failures, "página nueva", cache.is_unchanged(url, first), False)
+            _expect(failures, "sin confirmar no hay validadores", cache.conditional_headers(url), {})
+            cache.commit(url)
+            _expect(failures, "validadores confirmados", cache.conditional_headers(url),
+                    {"If-None-Match": '"e1"', "If-Modified-Since": "Sat, 17 Oct 2026 10:00:00 GMT"})
+            _expect(failures, "respuesta 304", cache.is_unchanged(url, _FakeResponse(304)), True)
+            _expect(failures, "mismo cuerpo", cache.is_unchanged(url, _FakeResponse(200, b"v1")), True)
+            _expect(failures, "cuerpo cambiado", cache.is_unchanged(url, _FakeResponse(200, b"v2")), False)
+            _expect(failures, "cambio sin confirmar", cache.is_unchanged(url, _FakeResponse(200, b"v1")), True)
+
+            cache.enabled = False
+            _expect(failures, "caché ignorada al leer",
+                    (cache.conditional_headers(url), cache.is_unchanged(url, _FakeResponse(200, b"v1"))), ({}, False))
+            cache.enabled = True
+
+            _fast_controller(torrent_http, url)
+            session = _FakeSession([_FakeResponse(304)])
+            response, unchanged = torrent_http.fetch_cached(session, url, cache)
+            _expect(failures, "GET condicional", (session.sent_headers[0].get("If-None-Match"), unchanged),
+                    ('"e1"', True))
+
+            for number in (2, 3):
+                other = f"https://check.invalid/serie/{number}"
+                time.sleep(0.01)
+                cache.is_unchanged(other, _FakeResponse(200, b"x"))
+                cache.commit(other)
+            time.sleep(0.01)
+            cache.is_unchanged(url, _FakeResponse(304))
+        finally:
+            cache.close()
+
+        cache = http_cache.ResponseCache(cache_dir=cache_dir, max_entries=2)
+        try:
+            kept = [row[0] for row in cache._conn.execute("SELECT url FROM responses ORDER BY url")]
+            _expect(failures, "expulsión de la menos usada", kept,
+                    [url, "https://check.invalid/serie/3"])
+        finally:
+            cache.close()
+    return failures
+
+
+CHECKS = [
+    ("shared_browser", check_shared_browser),
+    ("page_ready", check_page_ready),
+    ("setup_logger", check_setup_logger),
+    ("season_memo", check_season_memo),
+    ("available_seasons", check_available_seasons),
+    ("records", check_records),
+    ("parse_pool", check_parse_pool),
+    ("episode_feed", check_episode_feed),
+    ("embed_harvest", check_embed_harvest),
+    ("rate_controller", check_rate_controller),
+    ("response_cache", check_response_cache),
+]
+
+
+def main():
+    failures = []
+    for name, check in CHECKS:
+        check_failures = check()
+        for failure in check_failures:
+            logger.error(f"{name}: {failure}")
+        if not check_failures:
+            logger.info(f"{name}: correcto")
+        failures.extend(check_failures)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
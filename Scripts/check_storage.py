@@ -0,0 +1,372 @@
+"""Comprobaciones sin conexión de los helpers de la base de datos.
+
+Crea una base directa temporal con :func:`db_setup.create_direct_db` (tablas
+y migraciones reales) y comprueba sobre ella:
+
+* :func:`scraper_utils.insert_link_rows`: los enlaces repetidos, dentro del
+  mismo lote o ya guardados, se omiten y el valor devuelto cuenta sólo las
+  filas nuevas; el mismo enlace en otro episodio sí se guarda.
+* :class:`title_index.TitleIndex`: ``find`` y ``find_title`` no distinguen
+  mayúsculas ASCII, distinguen año y tipo, conservan el primer ``id`` de cada
+  año y ven los títulos añadidos con ``add``; ``movie_exists`` y
+  ``find_series_by_title_year`` consideran duplicados los mismos títulos y
+  usan el índice ``COLLATE NOCASE``.
+* :class:`db_writer.DBWriter` con :func:`direct_dw_films_scraper.write_movie`:
+  ``on_written`` recibe el contexto de cada ``submit`` tras el commit y una
+  película enviada dos veces (con otras mayúsculas) se guarda una sola vez.
+* :func:`scraper_utils.db_connection`: una conexión persistente por hilo,
+  reutilizada al anidar, que deshace lo no confirmado al salir del bloque más
+  externo y que :func:`db_connections.close_db_connections` cierra.
+* :func:`scraper_utils.embed_link_data`, con la que las series y
+  :mod:`reparse` crean sus enlaces: normaliza las URL de powvideo y
+  streamplay, asigna la calidad por servidor y descarta los idiomas que no se
+  guardan y los selectores sin servidor o sin URL.
+* :func:`reparse.reparse_torrent_series`: todas las páginas de una ejecución
+  usan una sola conexión, abierta con
+  :func:`torrent_dw_series_scraper.open_database` (tablas y migraciones de la
+  base torrent), y volver a procesar la misma página no duplica episodios.
+* :func:`scraper_utils.setup_database`: devuelve ``True`` sobre la base
+  completa y también sobre una base a la que le falta una tabla, en la que
+  omite las migraciones en lugar de fallar.
+
+Uso::
+
+    python -m Scripts.check_storage
+
+Termina con código 1 si alguna comprobación falla.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from .scraper_utils import (
+        db_connection, embed_link_data, find_series_by_title_year, insert_link_rows, movie_exists,
+        setup_database, setup_logger,
+    )
+    from .db_connections import close_db_connections
+    from .db_writer import DBWriter
+    from .records import Link, Movie
+    from .db_setup import create_direct_db
+    from .db_migrations import DIRECT_MIGRATIONS, get_version
+    from .title_index import TitleIndex, get_title_index, close_title_indexes
+except ImportError:  # pragma: no cover
+    from scraper_utils import (
+        db_connection, embed_link_data, find_series_by_title_year, insert_link_rows, movie_exists,
+        setup_database, setup_logger,
+    )
+    from db_connections import close_db_connections
+    from db_writer import DBWriter
+    from records import Link, Movie
+    from db_setup import create_direct_db
+    from db_migrations import DIRECT_MIGRATIONS, get_version
+    from title_index import TitleIndex, get_title_index, close_title_indexes
+
+SCRIPT_NAME = "check_storage"
+logger = setup_logger(SCRIPT_NAME, f"{SCRIPT_NAME}.log")
+
+
+def _expect(failures, name, actual, expected):
+    if actual != expected:
+        failures.append(f"{name}: se obtuvo {actual!r}, se esperaba {expected!r}")
+
+
+def _add_media(connection, title, year, media_type="movie"):
+    cursor = connection.execute(
+        "INSERT INTO media_downloads (title, year, type) VALUES (?, ?, ?)", (title, year, media_type)
+    )
+    return cursor.lastrowid
+
+
+def check_link_rows(connection, db_path):
+    """Recuento de filas nuevas de :func:`insert_link_rows` con conflictos."""
+    failures = []
+    movie_id = _add_media(connection, "Ciudad de cristal", 2021)
+    series_id = _add_media(connection, "Distrito Sur", 2018, "serie")
+    server_id = connection.execute("INSERT INTO servers (name) VALUES ('streamtape')").lastrowid
+    quality_id = connection.execute("INSERT INTO qualities (quality) VALUES ('1080p')").lastrowid
+    season_id = connection.execute(
+        "INSERT INTO series_seasons (movie_id, season) VALUES (?, 2)", (series_id,)
+    ).lastrowid
+    episode_ids = [
+        connection.execute(
+            "INSERT INTO series_episodes (season_id, episode, title) VALUES (?, ?, ?)",
+            (season_id, number, f"Episodio {number}"),
+        ).lastrowid
+        for number in (1, 2)
+    ]
+
+    link = "https://streamtape.com/e/kX7bQ2mNpL"
+    movie_rows = [
+        (movie_id, None, server_id, "Audio Español", link, quality_id),
+        (movie_id, None, server_id, "Audio Español", link, quality_id),  # repetido en la página
+        (movie_id, None, server_id, "Subtítulo Español", link, quality_id),
+    ]
+    cursor = connection.cursor()
+    _expect(failures, "enlaces de película nuevos", insert_link_rows(cursor, movie_rows), 2)
+    _expect(failures, "enlaces de película ya guardados", insert_link_rows(cursor, movie_rows), 0)
+    _expect(failures, "lote vacío", insert_link_rows(cursor, []), 0)
+
+    # Los enlaces de episodios llevan también el movie_id de la serie
+    episode_rows = [(series_id, episode_id, server_id, "Audio Español", link, quality_id)
+                    for episode_id in episode_ids]
+    _expect(failures, "mismo enlace en dos episodios", insert_link_rows(cursor, episode_rows), 2)
+    _expect(failures, "enlaces de episodio ya guardados", insert_link_rows(cursor, episode_rows), 0)
+
+    stored = connection.execute("SELECT COUNT(*) FROM links_files_download").fetchone()[0]
+    _expect(failures, "filas en links_files_download", stored, 4)
+    connection.commit()
+    return failures
+
+
+def check_title_index(connection, db_path):
+    """Búsquedas de :class:`TitleIndex` sobre ``media_downloads``."""
+    failures = []
+    first_1999 = _add_media(connection, "The Matrix", 1999)
+    _add_media(connection, "THE MATRIX", 1999)  # mismo título y año: se conserva el primero
+    angel = _add_media(connection, "Ángel", 2005)
+    matrix_2021 = _add_media(connection, "The Matrix", "2021")
+    series_id = _add_media(connection, "The Matrix", 1999, "serie")
+    connection.commit()
+
+    index = TitleIndex().load(connection, "media_downloads")
+    _expect(failures, "find sin distinguir mayúsculas", index.find("movie", "tHe MaTrIx", 1999), first_1999)
+    _expect(failures, "find no colapsa espacios", index.find("movie", "The  Matrix", 1999), None)
+    _expect(failures, "find distingue mayúsculas no ASCII", index.find("movie", "ángel", 2005), None)
+    _expect(failures, "find con título no ASCII", index.find("movie", "ÁNGEL", 2005), angel)
+    _expect(failures, "find con el año como texto", index.find("movie", "The Matrix", "2021"), matrix_2021)
+    _expect(failures, "find con otro año", index.find("movie", "The Matrix", 2003), None)
+    _expect(failures, "find distingue el tipo", index.find("serie", "The Matrix", 1999), series_id)
+    _expect(failures, "find sin el título", index.find("movie", "Matrix", 1999), None)
+    _expect(failures, "find_title sin año", index.find_title("movie", "the matrix"), first_1999)
+    _expect(failures, "find_title sin el título", index.find_title("movie", "Matrix"), None)
+
+    # Las comprobaciones en SQL tienen que ver los mismos duplicados que el índice
+    for title, year in (("tHe MaTrIx", 1999), ("The  Matrix", 1999), ("ángel", 2005), ("ÁNGEL", 2005)):
+        indexed = index.find("movie", title, year)
+        _expect(failures, f"movie_exists({title!r}, {year})",
+                movie_exists(title, year, connection=connection), (indexed is not None, indexed))
+    series = find_series_by_title_year("the matrix", 1999, connection=connection)
+    _expect(failures, "find_series_by_title_year sin distinguir mayúsculas", series and series["id"], series_id)
+    plan = " ".join(str(row[-1]) for row in connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM media_downloads "
+        "WHERE title=? COLLATE NOCASE AND year=? AND type='movie'", ("x", 1999)))
+    _expect(failures, "consulta por título con índice", "idx_media_lookup_nocase" in plan, True)
+
+    index.add(9001, "movie", "Matrix Resurrections", 2021)
+    index.add(9002, "movie", "The Matrix", 1999)  # ya existe: no sustituye al primero
+    _expect(failures, "find tras add", index.find("movie", "matrix resurrections", 2021), 9001)
+    _expect(failures, "add no sustituye", index.find("movie", "The Matrix", 1999), first_1999)
+
+    shared = get_title_index(db_path)
+    try:
+        _expect(failures, "get_title_index carga la base", shared.find("movie", "The Matrix", 2021), matrix_2021)
+        _expect(failures, "get_title_index reutiliza el índice", get_title_index(db_path) is shared, True)
+    finally:
+        close_title_indexes()
+    return failures
+
+
+def check_db_writer(connection, db_path):
+    """Contexto de ``on_written`` y duplicados en el escritor de películas."""
+    # Importado aquí: el módulo del scraper configura su propio log al importarse
+    try:
+        from . import direct_dw_films_scraper
+    except ImportError:
+        import direct_dw_films_scraper
+
+    failures = []
+    written = []
+    writer = DBWriter(
+        db_path,
+        {Movie: direct_dw_films_scraper.write_movie},
+        batch_size=10,
+        max_delay_ms=50,
+        on_written=lambda movie, result, context: written.append((context, result)),
+    )
+    link = Link("mixdrop", "Audio Español", "https://mixdrop.co/e/v9rTz3wq", "1080p")
+    try:
+        writer.submit(Movie("Marea Baja", 2019, links=(link,)), (1, 0, "Marea Baja"))
+        # Listada otra vez antes del commit de la primera
+        writer.submit(Movie("MAREA BAJA", 2019, links=(link,)), (2, 5, "MAREA BAJA"))
+        writer.submit(Movie("Marea Baja", 2020), (2, 6, "Marea Baja"))
+    finally:
+        writer.close()
+
+    _expect(failures, "contextos tras el commit", [context for context, _ in written],
+            [(1, 0, "Marea Baja"), (2, 5, "MAREA BAJA"), (2, 6, "Marea Baja")])
+    if len(written) == 3:
+        first, duplicate, other_year = (result for _, result in written)
+        _expect(failures, "primera película", (first[1], first[2]), (1, True))
+        _expect(failures, "película repetida", duplicate, (first[0], 0, False))
+        _expect(failures, "mismo título con otro año", other_year[2], True)
+    stored = connection.execute(
+        "SELECT COUNT(*) FROM media_downloads WHERE title = 'Marea Baja' COLLATE NOCASE"
+    ).fetchone()[0]
+    _expect(failures, "películas guardadas", stored, 2)
+    return failures
+
+
+def check_db_connection(connection, db_path):
+    """Reutilización, anidamiento y cierre de las conexiones de :func:`db_connection`."""
+    failures = []
+    try:
+        with db_connection(db_path=db_path) as outer:
+            with db_connection(db_path=db_path) as inner:
+                _expect(failures, "conexión anidada", inner is outer, True)
+                inner.execute("INSERT INTO servers (name) VALUES ('sin confirmar')")
+            # Al salir del bloque anidado la transacción sigue abierta
+            _expect(failures, "transacción tras el bloque anidado", outer.in_transaction, True)
+        _expect(failures, "rollback al salir", outer.in_transaction, False)
+        with db_connection(db_path=db_path) as again:
+            _expect(failures, "conexión reutilizada", again is outer, True)
+            pending = again.execute("SELECT COUNT(*) FROM servers WHERE name = 'sin confirmar'").fetchone()[0]
+            _expect(failures, "escritura sin commit deshecha", pending, 0)
+
+        other = []
+
+        def use_connection():
+            with db_connection(db_path=db_path) as thread_connection:
+                other.append(thread_connection)
+
+        thread = threading.Thread(target=use_connection)
+        thread.start()
+        thread.join()
+        _expect(failures, "conexión propia en otro hilo", bool(other) and other[0] is not outer, True)
+    finally:
+        close_db_connections()
+
+    try:
+        outer.execute("SELECT 1")
+        closed = False
+    except sqlite3.ProgrammingError:
+        closed = True
+    _expect(failures, "close_db_connections cierra las conexiones", closed, True)
+    with db_connection(db_path=db_path) as reopened:
+        _expect(failures, "conexión nueva tras cerrar", reopened is not outer, True)
+    close_db_connections()
+    return failures
+
+
+def check_embed_link_data(connection, db_path):
+    """Enlaces de los selectores de episodio listos para guardar."""
+    failures = []
+    cases = [
+        (
+            "powvideo",
+            {"language": "Audio Español", "server": "Powvideo"},
+            "https://powvideo.org/embed-abc123-954x562.html",
+            Link("powvideo", "Audio Español", "https://powvideo.org/abc123", "hdrip", None, 7),
+        ),
+        (
+            "streamtape",
+            {"language": "Audio Latino", "server": "streamtape"},
+            "https://streamtape.com/e/kX7bQ2mNpL",
+            Link("streamtape", "Audio Latino", "https://streamtape.com/e/kX7bQ2mNpL", "1080p", None, 7),
+        ),
+        ("idioma no guardado", {"language": "Subtítulo Ingles", "server": "uqload"}, "https://uqload.com/x", None),
+        ("sin servidor", {"language": "Audio Español", "server": None}, "https://voe.sx/e/x", None),
+        ("sin URL", {"language": "Audio Español", "server": "voe"}, None, None),
+    ]
+    for name, embed_info, url, expected in cases:
+        _expect(failures, name, embed_link_data(embed_info, url, episode_id=7), expected)
+    return failures
+
+
+def check_reparse_torrent_series(connection, db_path):
+    """Una conexión migrada por ejecución al re-analizar series de Dontorrent."""
+    # Importado aquí: los módulos de los scrapers configuran su propio log al importarse
+    try:
+        from . import reparse, torrent_dw_series_scraper
+        from .db_migrations import TORRENT_MIGRATIONS
+        from .scraper_utils import PROJECT_ROOT
+    except ImportError:
+        import reparse
+        import torrent_dw_series_scraper
+        from db_migrations import TORRENT_MIGRATIONS
+        from scraper_utils import PROJECT_ROOT
+
+    failures = []
+    fixture = os.path.join(PROJECT_ROOT, "resources", "fixtures", "dontorrent_series.html")
+    with open(fixture, encoding="utf-8") as f:
+        body = f.read()
+    url = "https://dontorrent.example/serie/1/1/ejemplo"
+
+    original_path = torrent_dw_series_scraper.db_path
+    torrent_dw_series_scraper.db_path = os.path.join(os.path.dirname(db_path), "torrent_dw_db.db")
+    try:
+        episodes = reparse.reparse_torrent_series(None, url, body, False)
+        first = reparse._torrent_series_connection
+        reparse.reparse_torrent_series(None, url, body, False)
+        _expect(failures, "conexión reutilizada", reparse._torrent_series_connection is first, True)
+        _expect(failures, "versión de la base torrent", get_version(first), TORRENT_MIGRATIONS[-1][0])
+        stored = first.execute("SELECT COUNT(*) FROM torrent_files").fetchone()[0]
+        _expect(failures, "episodios guardados una vez", stored, len(episodes or []))
+    finally:
+        reparse.close_torrent_series_connection()
+        torrent_dw_series_scraper.db_path = original_path
+        close_title_indexes()
+    _expect(failures, "conexión cerrada", reparse._torrent_series_connection, None)
+    return failures
+
+
+def check_setup_database(connection, db_path):
+    """``setup_database`` tolera las tablas ausentes y no migra esas bases."""
+    failures = []
+    latest = DIRECT_MIGRATIONS[-1][0]
+    _expect(failures, "base completa", setup_database(logger, db_path), True)
+    _expect(failures, "versión de la base completa", get_version(connection), latest)
+
+    partial_path = os.path.join(os.path.dirname(db_path), "sin_enlaces.db")
+    partial = sqlite3.connect(partial_path)
+    try:
+        partial.execute("CREATE TABLE media_downloads (id INTEGER PRIMARY KEY, title TEXT, year INTEGER)")
+        partial.commit()
+        _expect(failures, "base sin links_files_download", setup_database(logger, partial_path), True)
+        _expect(failures, "versión de la base sin tablas", get_version(partial), 0)
+        columns = {row[1] for row in partial.execute("PRAGMA table_info(media_downloads)")}
+        _expect(failures, "columnas añadidas", {"created_at", "updated_at"} <= columns, True)
+    finally:
+        partial.close()
+    return failures
+
+
+CHECKS = [
+    ("insert_link_rows", check_link_rows),
+    ("title_index", check_title_index),
+    ("db_writer", check_db_writer),
+    ("db_connection", check_db_connection),
+    ("embed_link_data", check_embed_link_data),
+    ("reparse_torrent_series", check_reparse_torrent_series),
+    ("setup_database", check_setup_database),
+]
+
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "direct_dw_db.db")
+        if not create_direct_db(db_path):
+            logger.error("No se pudo crear la base temporal")
+            return 1
+        connection = sqlite3.connect(db_path)
+        # Como connect_db: los helpers de scraper_utils leen las filas por nombre
+        connection.row_factory = sqlite3.Row
+        try:
+            for name, check in CHECKS:
+                check_failures = check(connection, db_path)
+                for failure in check_failures:
+                    logger.error(f"{name}: {failure}")
+                if not check_failures:
+                    logger.info(f"{name}: correcto")
+                failures.extend(check_failures)
+        finally:
+            connection.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
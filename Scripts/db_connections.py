@@ -0,0 +1,109 @@
+"""Conexiones SQLite persistentes por hilo.
+
+Los helpers de :mod:`scraper_utils` que no reciben conexión abrían una
+nueva en cada llamada (ruta absoluta, comprobación de existencia, conexión y
+cuatro PRAGMA) y la cerraban al terminar, perdiendo con ella las sentencias
+ya preparadas. :class:`ConnectionManager` guarda una conexión configurada por
+hilo y por base de datos, con una caché de sentencias grande, y la entrega
+con :meth:`ConnectionManager.connection`.
+
+Al salir del bloque más externo se deshace lo que haya quedado sin
+confirmar, igual que ocurría al cerrar la conexión; los helpers que escriben
+hacen su propio commit. :func:`close_db_connections` cierra todas las
+conexiones al terminar el scraper.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """Una conexión por hilo y ruta, abierta con ``connect(db_path)``."""
+
+    def __init__(self, connect):
+        self._connect = connect
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Todas las conexiones abiertas, para cerrarlas desde cualquier hilo
+        self._connections = []
+        # Cambia al cerrar todo: las conexiones de los hilos quedan invalidadas
+        self._generation = 0
+        self.opened = 0
+        self.reused = 0
+
+    def _entries(self):
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            local.generation = self._generation
+            # ruta -> [conexión, profundidad de anidamiento]
+            local.entries = {}
+        return local.entries
+
+    @contextmanager
+    def connection(self, db_path):
+        """Conexión persistente del hilo actual para ``db_path``."""
+        entries = self._entries()
+        entry = entries.get(db_path)
+        if entry is None:
+            connection = self._connect(db_path)
+            entry = entries[db_path] = [connection, 0]
+            with self._lock:
+                self._connections.append(connection)
+                self.opened += 1
+        else:
+            with self._lock:
+                self.reused += 1
+
+        connection = entry[0]
+        entry[1] += 1
+        try:
+            yield connection
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and connection.in_transaction:
+                connection.rollback()
+
+    def stats(self):
+        with self._lock:
+            return {"open": len(self._connections), "opened": self.opened, "reused": self.reused}
+
+    def close_all(self):
+        """Cierra las conexiones de todos los hilos."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+            opened, reused = self.opened, self.reused
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.debug(f"Error al cerrar una conexión a la base de datos: {e}")
+        if connections:
+            logger.info(
+                f"Conexiones a la BD: {opened} abiertas, {reused} reutilizaciones; "
+                f"{len(connections)} cerradas"
+            )
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_connection_manager(connect):
+    """Devuelve el gestor de conexiones compartido del proceso."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ConnectionManager(connect)
+        return _manager
+
+
+def close_db_connections():
+    """Cierra todas las conexiones persistentes, si hay gestor."""
+    with _manager_lock:
+        manager = _manager
+    if manager is not None:
+        manager.close_all()
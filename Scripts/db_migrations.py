@@ -0,0 +1,192 @@
+"""Migraciones versionadas del esquema de las bases de datos.
+
+Cada base guarda en ``PRAGMA user_version`` la última migración aplicada.
+Las migraciones de :data:`DIRECT_MIGRATIONS` y :data:`TORRENT_MIGRATIONS`
+se aplican en orden y cada una en su propia transacción junto con el cambio
+de versión, así que una base a medio migrar nunca queda con una versión que
+no le corresponde. Se ejecutan al crear o inicializar las bases y sobre las
+bases existentes desde la pestaña de bases de datos de la GUI.
+
+Para añadir una migración basta con añadir una entrada al final de la lista
+con el número siguiente; las ya publicadas no se modifican.
+"""
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# (versión, descripción, sentencias)
+DIRECT_MIGRATIONS = [
+    (
+        1,
+        "Índices de búsqueda de películas, series, temporadas, episodios y enlaces",
+        [
+            # movie_exists / find_series_by_title_year: filtran por tipo, título y año
+            # y leen la valoración y el género, que quedan en el propio índice
+            "CREATE INDEX IF NOT EXISTS idx_media_lookup "
+            "ON media_downloads(type, title, year, imdb_rating, genre)",
+            # season_exists y el recuento de episodios por temporada de una serie
+            "CREATE INDEX IF NOT EXISTS idx_seasons_lookup ON series_seasons(movie_id, season)",
+            # episode_exists (con y sin título)
+            "CREATE INDEX IF NOT EXISTS idx_episodes_lookup ON series_episodes(season_id, episode, title)",
+            # link_exists para películas y para episodios
+            "CREATE INDEX IF NOT EXISTS idx_links_movie_lookup "
+            "ON links_files_download(movie_id, server_id, language, link)",
+            "CREATE INDEX IF NOT EXISTS idx_links_episode_lookup "
+            "ON links_files_download(episode_id, server_id, language, link)",
+            "CREATE INDEX IF NOT EXISTS idx_qualities_quality ON qualities(quality)",
+            # Sustituidos por los anteriores, que empiezan por las mismas columnas
+            "DROP INDEX IF EXISTS idx_media_downloads_title",
+            "DROP INDEX IF EXISTS idx_series_seasons_movie_id",
+            "DROP INDEX IF EXISTS idx_series_episodes_season_id",
+            "DROP INDEX IF EXISTS idx_links_movie_id",
+            "DROP INDEX IF EXISTS idx_links_episode_id",
+        ],
+    ),
+    (
+        2,
+        "Enlaces únicos por película o episodio, servidor, idioma y URL",
+        [
+            # Quitar los duplicados que dejaron las comprobaciones previas a la inserción,
+            # conservando el enlace más antiguo de cada grupo
+            "DELETE FROM links_files_download WHERE episode_id IS NULL AND movie_id IS NOT NULL "
+            "AND id NOT IN (SELECT MIN(id) FROM links_files_download "
+            "WHERE episode_id IS NULL AND movie_id IS NOT NULL "
+            "GROUP BY movie_id, server_id, language, link)",
+            "DELETE FROM links_files_download WHERE episode_id IS NOT NULL "
+            "AND id NOT IN (SELECT MIN(id) FROM links_files_download WHERE episode_id IS NOT NULL "
+            "GROUP BY episode_id, server_id, language, link)",
+            # Los enlaces de episodios del scraper de series llevan también el movie_id
+            # de la serie, así que la clave de película sólo cubre los que no tienen episodio
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_links_movie_unique "
+            "ON links_files_download(movie_id, server_id, language, link) WHERE episode_id IS NULL",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_links_episode_unique "
+            "ON links_files_download(episode_id, server_id, language, link)",
+            # Sustituido por idx_links_episode_unique, con las mismas columnas
+            "DROP INDEX IF EXISTS idx_links_episode_lookup",
+        ],
+    ),
+    (
+        3,
+        "Búsqueda de títulos sin distinguir mayúsculas",
+        [
+            # movie_exists / find_series_by_title_year comparan con title = ? COLLATE NOCASE,
+            # igual que el índice de títulos en memoria; un índice BINARY no les sirve
+            "CREATE INDEX IF NOT EXISTS idx_media_lookup_nocase "
+            "ON media_downloads(type, title COLLATE NOCASE, year, imdb_rating, genre)",
+            "DROP INDEX IF EXISTS idx_media_lookup",
+        ],
+    ),
+]
+
+TORRENT_MIGRATIONS = [
+    (
+        1,
+        "Índices de búsqueda de títulos, temporadas, episodios y archivos torrent",
+        [
+            # find_existing_movie / find_existing_series comparan lower(title)
+            "CREATE INDEX IF NOT EXISTS idx_torrent_downloads_title "
+            "ON torrent_downloads(type, lower(title), year)",
+            # find_existing_season
+            "CREATE INDEX IF NOT EXISTS idx_seasons_lookup ON series_seasons(series_id, season_number)",
+            # get_or_create_episode
+            "CREATE INDEX IF NOT EXISTS idx_episodes_lookup "
+            "ON series_episodes(season_id, episode_number, title)",
+            # evaluate_duplicate_state (películas: episode_id IS NULL)
+            "CREATE INDEX IF NOT EXISTS idx_torrent_files_movie "
+            "ON torrent_files(torrent_id, quality_id, episode_id, torrent_link)",
+            # evaluate_episode_duplicate_state
+            "CREATE INDEX IF NOT EXISTS idx_torrent_files_episode "
+            "ON torrent_files(episode_id, quality_id, torrent_link)",
+        ],
+    ),
+]
+
+
+# Tablas sobre las que actúan las migraciones de cada base
+DIRECT_MIGRATION_TABLES = (
+    "media_downloads",
+    "series_seasons",
+    "series_episodes",
+    "links_files_download",
+    "qualities",
+)
+
+
+def missing_tables(connection, tables):
+    """Devuelve, en orden, las ``tables`` que no existen en ``connection``."""
+    existing = {
+        row[0]
+        for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    return [table for table in tables if table not in existing]
+
+
+def get_version(connection):
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection, migrations, name="base"):
+    """Aplica a ``connection`` las migraciones pendientes y devuelve la versión final.
+
+    Si una migración falla se deshace, se registra y se propaga la excepción;
+    las anteriores ya aplicadas se conservan.
+    """
+    if connection.in_transaction:
+        connection.commit()
+    version = get_version(connection)
+    for number, description, statements in migrations:
+        if number <= version:
+            continue
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for statement in statements:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {int(number)}")
+            connection.commit()
+        except sqlite3.Error as e:
+            connection.rollback()
+            logger.error(f"Error en la migración {number} de la {name} ({description}): {e}")
+            raise
+        logger.info(f"Migración {number} aplicada a la {name}: {description}")
+        version = number
+    return version
+
+
+def migration_status(db_path, migrations):
+    """Estado del esquema de ``db_path`` sin modificarlo.
+
+    Devuelve ``{"exists", "version", "latest", "pending"}`` con ``pending``
+    como lista de descripciones de las migraciones sin aplicar.
+    """
+    latest = migrations[-1][0] if migrations else 0
+    if not db_path or not os.path.exists(db_path):
+        return {"exists": False, "version": 0, "latest": latest, "pending": []}
+    connection = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        version = get_version(connection)
+    finally:
+        connection.close()
+    pending = [description for number, description, _ in migrations if number > version]
+    return {"exists": True, "version": version, "latest": latest, "pending": pending}
+
+
+def migrate_direct_db(db_path):
+    """Abre la base directa, aplica sus migraciones pendientes y devuelve la versión."""
+    connection = sqlite3.connect(db_path)
+    try:
+        return migrate(connection, DIRECT_MIGRATIONS, "base directa")
+    finally:
+        connection.close()
+
+
+def migrate_torrent_db(db_path):
+    """Abre la base torrent, aplica sus migraciones pendientes y devuelve la versión."""
+    connection = sqlite3.connect(db_path)
+    try:
+        return migrate(connection, TORRENT_MIGRATIONS, "base torrent")
+    finally:
+        connection.close()
@@ -9,12 +9,14 @@ try:  # pragma: no cover - fallback cuando se ejecuta como script
         TORRENT_DB_PATH,
         PROJECT_ROOT,
     )
+    from .db_migrations import DIRECT_MIGRATIONS, TORRENT_MIGRATIONS, migrate
 except ImportError:  # pragma: no cover
     from scraper_utils import (
         DB_PATH as DIRECT_DB_PATH,
         TORRENT_DB_PATH,
         PROJECT_ROOT,
     )
+    from db_migrations import DIRECT_MIGRATIONS, TORRENT_MIGRATIONS, migrate
 
 # Asegurar que el directorio de logs existe
 os.makedirs(os.path.join(PROJECT_ROOT, "logs"), exist_ok=True)
@@ -117,6 +119,8 @@ def create_direct_db(db_path=None):
         COMMIT;
         ''')
 
+        # Índices y demás cambios versionados del esquema
+        migrate(conn, DIRECT_MIGRATIONS, "base directa")
         conn.close()
         logger.info(f"Base de datos direct_dw_db.db creada correctamente en: {db_path}")
         return True
@@ -184,6 +188,8 @@ def create_torrent_db(db_path=None):
         COMMIT;
         ''')
 
+        # Índices y demás cambios versionados del esquema
+        migrate(conn, TORRENT_MIGRATIONS, "base torrent")
         conn.close()
         logger.info(f"Base de datos torrent_dw_db.db creada correctamente en: {db_path}")
         return True
@@ -0,0 +1,232 @@
+"""Escritor único de la base de datos con commits agrupados.
+
+Los workers de un scraper no escriben en la BD: entregan cada registro
+(:mod:`records`) a :meth:`DBWriter.submit` y siguen con la página siguiente.
+Un hilo dedicado con una sola conexión aplica los registros según llegan
+dentro de una transacción abierta y hace commit cada ``batch_size``
+registros o a los ``max_delay_ms`` milisegundos del primero pendiente, de
+modo que un fsync cubre muchas películas y los workers no esperan turno en
+un lock ni abren una conexión por registro.
+
+Cada registro se aplica dentro de un ``SAVEPOINT``: si falla se deshace sólo
+ese registro y el resto del lote se guarda. Tras cada commit se llama a
+``on_written(registro, resultado, contexto)`` con lo que devolvió su función
+de escritura y el ``context`` que se pasó a :meth:`DBWriter.submit`, así que
+los contadores y el progreso sólo reflejan lo que ya está en disco sin que
+los workers esperen al commit.
+Si falla la propia transacción (``BEGIN``, ``COMMIT`` o ``ROLLBACK``) se
+descarta el lote pendiente y el hilo sigue atendiendo la cola; si aun así el
+hilo termina, :meth:`DBWriter.submit` y :meth:`DBWriter.flush` lanzan
+``RuntimeError`` en lugar de esperar para siempre.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# Marca de fin para el hilo escritor
+_STOP = object()
+
+
+class DBWriter:
+    """Hilo escritor con commits agrupados sobre una conexión de larga duración.
+
+    ``handlers`` asocia cada tipo de registro con la función
+    ``handler(connection, registro)`` que lo escribe (sin hacer commit).
+    """
+
+    def __init__(self, db_path, handlers, batch_size=50, max_delay_ms=500, on_written=None,
+                 max_queued=1000, name="db_writer"):
+        self.db_path = db_path
+        self.batch_size = max(1, int(batch_size))
+        self.max_delay = max(0, int(max_delay_ms)) / 1000
+        self._handlers = dict(handlers)
+        self._on_written = on_written
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._closed = False
+        # Se abre aquí para que un fallo al abrir la base llegue a quien crea el escritor;
+        # a partir de ahora sólo la usa el hilo escritor
+        self._connection = self._connect()
+        self.written = 0
+        self.failed = 0
+        self.commits = 0
+        self._commit_seconds = 0.0
+        self._max_commit_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, record, context=None):
+        """Encola ``record`` para escribirlo; bloquea si la cola está llena.
+
+        ``context`` se devuelve tal cual a ``on_written`` tras el commit.
+        """
+        if type(record) not in self._handlers:
+            raise TypeError(f"Tipo de registro sin función de escritura: {type(record).__name__}")
+        if self._closed:
+            raise RuntimeError("El escritor de la base de datos ya está cerrado")
+        if not self._thread.is_alive():
+            raise RuntimeError("El hilo escritor de la base de datos ha terminado")
+        self._queue.put((record, context))
+
+    def flush(self):
+        """Espera a que todo lo encolado hasta ahora esté escrito y confirmado."""
+        tasks = self._queue
+        with tasks.all_tasks_done:
+            while tasks.unfinished_tasks:
+                if not self._thread.is_alive():
+                    raise RuntimeError("El hilo escritor de la base de datos ha terminado")
+                tasks.all_tasks_done.wait(0.5)
+
+    def close(self):
+        """Confirma lo pendiente, detiene el hilo escritor y registra sus estadísticas."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+        self._thread.join()
+        stats = self.stats()
+        logger.info(
+            f"Escritor de BD: {stats['written']} registros en {stats['commits']} commits "
+            f"({stats['failed']} fallidos), commit medio {stats['avg_commit_ms']:.1f} ms, "
+            f"máximo {stats['max_commit_ms']:.1f} ms"
+        )
+
+    def stats(self):
+        """Registros en cola, escritos y fallidos, commits y su latencia en ms."""
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "failed": self.failed,
+                "commits": self.commits,
+                "avg_commit_ms": self._commit_seconds * 1000 / self.commits if self.commits else 0.0,
+                "max_commit_ms": self._max_commit_seconds * 1000,
+            }
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        # Transacciones explícitas: las abre y confirma el propio escritor
+        connection.isolation_level = None
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _apply(self, connection, record):
+        connection.execute("SAVEPOINT record")
+        try:
+            result = self._handlers[type(record)](connection, record)
+            connection.execute("RELEASE record")
+            return True, result
+        except Exception as e:
+            connection.execute("ROLLBACK TO record")
+            connection.execute("RELEASE record")
+            logger.error(f"Error al escribir {type(record).__name__} en la base de datos: {e}")
+            logger.debug(traceback.format_exc())
+            return False, None
+
+    def _commit(self, connection, batch, failed):
+        start = time.perf_counter()
+        try:
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.error(f"Error al confirmar {len(batch)} registros en la base de datos: {e}")
+            connection.execute("ROLLBACK")
+            failed += len(batch)
+            batch = []
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.commits += 1
+            self.written += len(batch)
+            self.failed += failed
+            self._commit_seconds += elapsed
+            self._max_commit_seconds = max(self._max_commit_seconds, elapsed)
+        if self._on_written:
+            for record, result, context in batch:
+                try:
+                    self._on_written(record, result, context)
+                except Exception as e:
+                    logger.error(f"Error en la notificación de escritura: {e}")
+
+    def _abort(self, connection, lost):
+        """Descarta la transacción abierta y cuenta sus ``lost`` registros como fallidos."""
+        try:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+        except sqlite3.Error as e:
+            logger.error(f"Error al deshacer la transacción del escritor: {e}")
+        with self._lock:
+            self.failed += lost
+
+    def _run(self):
+        connection = self._connection
+        batch = []  # (registro, resultado, contexto) aplicados y sin confirmar
+        failed = 0
+        received = 0  # elementos sacados de la cola desde el último commit
+        deadline = None
+        try:
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                    received += 1
+                except queue.Empty:
+                    item = None
+                record, context = item if isinstance(item, tuple) else (item, None)
+
+                # Registro recibido que aún no cuenta ni en el lote ni en los fallidos
+                pending = record is not None and record is not _STOP
+                try:
+                    if pending:
+                        if deadline is None:
+                            connection.execute("BEGIN")
+                            deadline = time.monotonic() + self.max_delay
+                        ok, result = self._apply(connection, record)
+                        pending = False
+                        if ok:
+                            batch.append((record, result, context))
+                        else:
+                            failed += 1
+
+                    due = deadline is not None and (
+                        record is None or record is _STOP
+                        or len(batch) + failed >= self.batch_size or time.monotonic() >= deadline
+                    )
+                    if due:
+                        self._commit(connection, batch, failed)
+                        batch, failed, deadline = [], 0, None
+                except Exception as e:
+                    lost = len(batch) + failed + pending
+                    logger.error(f"Error en la transacción del escritor; se descartan {lost} registros: {e}")
+                    logger.debug(traceback.format_exc())
+                    self._abort(connection, lost)
+                    batch, failed, deadline = [], 0, None
+
+                if deadline is None:
+                    for _ in range(received):
+                        self._queue.task_done()
+                    received = 0
+                if record is _STOP:
+                    break
+        finally:
+            connection.close()
+            # Si el hilo termina por un error, nadie más atenderá la cola: liberar a
+            # quien espere en flush() o close()
+            discarded = 0
+            while True:
+                try:
+                    self._queue.get_nowait()
+                    discarded += 1
+                except queue.Empty:
+                    break
+            for _ in range(received + discarded):
+                self._queue.task_done()
+            if discarded:
+                logger.error(f"Escritor de BD detenido con {discarded} registros sin escribir")
@@ -1,5 +1,4 @@
 import time
-import re
 import sqlite3
 import json
 import os
@@ -10,39 +9,70 @@ import concurrent.futures
 from datetime import datetime
 from queue import Queue, Empty
 from threading import Lock
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
-from bs4 import BeautifulSoup
 
 
 try:  # pragma: no cover - compatible al ejecutarse como script o módulo
     from .scraper_utils import (
         PROJECT_ROOT,
         BASE_URL,
-        LOGIN_URL,
         DB_PATH,
         setup_logger,
-        log_link_insertion,
+        insert_link_rows,
         get_shutdown_event,
+        extract_page,
+        build_link_data,
+        resolve_page_embeds,
+        DB_WRITER_BATCH_SIZE,
+        DB_WRITER_MAX_DELAY_MS,
+        db_connection,
     )
+    from .hdfull_http import fetch_listing_page, get_listing_client
+    from .embed_resolver import get_stats as get_embed_stats
+    from .driver_pool import get_driver_pool, close_driver_pool
+    from .page_ready import load, wait_for, current_embed_src, log_wait_stats
+    from .page_extract import get_stats as get_extract_stats
+    from .page_archive import close_page_archive
+    from .parse_pool import close_parse_pool
+    from .db_connections import close_db_connections
+    from .title_index import get_title_index, close_title_indexes
+    from .db_migrations import DIRECT_MIGRATIONS, migrate
+    from .db_writer import DBWriter
+    from .parsers import MOVIE_LANGUAGES, parse_listing, parse_pagination
+    from .records import Movie
 except ImportError:  # pragma: no cover
     from scraper_utils import (
         PROJECT_ROOT,
         BASE_URL,
-        LOGIN_URL,
         DB_PATH,
         setup_logger,
-        log_link_insertion,
+        insert_link_rows,
         get_shutdown_event,
+        extract_page,
+        build_link_data,
+        resolve_page_embeds,
+        DB_WRITER_BATCH_SIZE,
+        DB_WRITER_MAX_DELAY_MS,
+        db_connection,
     )
+    from hdfull_http import fetch_listing_page, get_listing_client
+    from embed_resolver import get_stats as get_embed_stats
+    from driver_pool import get_driver_pool, close_driver_pool
+    from page_ready import load, wait_for, current_embed_src, log_wait_stats
+    from page_extract import get_stats as get_extract_stats
+    from page_archive import close_page_archive
+    from parse_pool import close_parse_pool
+    from db_connections import close_db_connections
+    from title_index import get_title_index, close_title_indexes
+    from db_migrations import DIRECT_MIGRATIONS, migrate
+    from db_writer import DBWriter
+    from parsers import MOVIE_LANGUAGES, parse_listing, parse_pagination
+    from records import Movie
 
 shutdown_event = get_shutdown_event()
-    
-from webdriver_manager.chrome import ChromeDriverManager
 
 
 # Configuración del logger homogéneo
@@ -58,15 +88,9 @@ def handle_exception(exc_type, exc_value, exc_traceback):
 
 sys.excepthook = handle_exception
 
-# Credenciales de inicio de sesión
-username = 'rolankor'
-password = 'Rolankor_09'
-
-# URL de la página de inicio de sesión y de las películas
-login_url = LOGIN_URL
+# URL de las películas
 base_url = BASE_URL
 movies_url = f"{BASE_URL}/peliculas/imdb_rating"
-
 # Directorio para guardar el progreso
 progress_dir = os.path.join(PROJECT_ROOT, "progress")
 if not os.path.exists(progress_dir):
@@ -82,23 +106,18 @@ db_path = DB_PATH
 def get_total_saved_links(content_type):
     """Return number of links_files_download for a given media type."""
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT COUNT(lfd.id)
-            FROM links_files_download lfd
-            JOIN media_downloads md ON lfd.movie_id = md.id
-            WHERE md.type = ?
-            """,
-            (content_type,),
-        )
-        count = cursor.fetchone()[0]
+        with db_connection(db_path=db_path) as conn:
+            count = conn.execute(
+                """
+                SELECT COUNT(lfd.id)
+                FROM links_files_download lfd
+                JOIN media_downloads md ON lfd.movie_id = md.id
+                WHERE md.type = ?
+                """,
+                (content_type,),
+            ).fetchone()[0]
     except Exception:
         count = 0
-    finally:
-        if 'conn' in locals():
-            conn.close()
     return count
 
 # Contador de reinicios del script
@@ -111,6 +130,9 @@ NUM_WORKERS = 4
 # Lock para sincronizar el acceso a la base de datos
 db_lock = Lock()
 
+# Escritor único de la BD: los workers le entregan las películas extraídas
+db_writer = None
+
 # Lock para sincronizar el guardado de progreso
 progress_lock = Lock()
 
@@ -122,24 +144,6 @@ total_saved_lock = Lock()
 movie_queue = Queue()
 
 
-# Función para crear un nuevo driver de Chrome utilizando webdriver-manager
-def create_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
-    try:
-        service = Service(ChromeDriverManager().install())
-    except Exception:
-        service = Service(os.path.join(PROJECT_ROOT, "chromedriver.exe"))
-    driver = webdriver.Chrome(service=service, options=options)
-    driver.set_page_load_timeout(60)
-    driver.implicitly_wait(5)
-    return driver
-
-
 # Función para inicializar la base de datos
 def initialize_db(path=None):
     global db_path
@@ -226,6 +230,7 @@ def initialize_db(path=None):
             ''')
 
             connection.commit()
+            migrate(connection, DIRECT_MIGRATIONS, "base directa")
             logger.info("Base de datos configurada correctamente")
             return True
         except Exception as e:
@@ -236,101 +241,33 @@ def initialize_db(path=None):
                 connection.close()
 
 
-# Función para conectar a la base de datos
-def connect_db():
-    try:
-        logger.debug(f"Conectando a la base de datos en: {db_path}")
-        connection = sqlite3.connect(db_path)
-        connection.row_factory = sqlite3.Row
-        logger.debug("Conexión a la base de datos establecida correctamente")
-        return connection
-    except Exception as e:
-        logger.error(f"Error al conectar a la base de datos: {e}")
-        raise
-
-
-# Función para iniciar sesión
-def login(driver):
-    try:
-        logger.info("Iniciando sesión...")
-        driver.get(login_url)
-        username_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "username")))
-        password_field = driver.find_element(By.NAME, "password")
-        login_button = driver.find_element(By.XPATH, "//a[text()='Ingresar']")
-
-        username_field.send_keys(username)
-        password_field.send_keys(password)
-        login_button.click()
-
-        WebDriverWait(driver, 10).until(EC.url_changes(login_url))
-        logger.info("Sesión iniciada correctamente")
-        return True
-    except Exception as e:
-        logger.error(f"Error al iniciar sesión: {e}")
-        return False
-
-
 # Función para verificar si una película ya existe en la base de datos
-def movie_exists(title, year, imdb_rating, genre):
-    with db_lock:
-        connection = connect_db()
-        cursor = connection.cursor()
-        try:
-            cursor.execute('''
-                SELECT id FROM media_downloads 
-                WHERE title=? AND year=? AND imdb_rating=? AND genre=? AND type='movie'
-            ''', (title, year, imdb_rating, genre))
-            result = cursor.fetchone()
-            exists = result is not None
-            logger.debug(
-                f"Verificación de existencia de película: {title} ({year}) - {'Existe' if exists else 'No existe'}")
-            return exists
-        except Exception as e:
-            logger.error(f"Error al verificar si la película existe: {e}")
-            return False
-        finally:
-            cursor.close()
-            connection.close()
+def movie_exists(title, year):
+    exists = get_title_index(db_path).find('movie', title, year) is not None
+    logger.debug(
+        f"Verificación de existencia de película: {title} ({year}) - {'Existe' if exists else 'No existe'}")
+    return exists
 
 
 # Función para extraer detalles de la película
 def extract_movie_details(driver, movie_url):
     logger.info(f"Extrayendo detalles de la película: {movie_url}")
     try:
-        driver.get(movie_url)
-        time.sleep(2)  # Esperar a que se cargue la página
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "lxml")
-
-        # Extraer el título de la película
-        title_tag = soup.find("div", id="summary-title")
-        title = title_tag.text.strip() if title_tag else "No encontrado"
-        logger.debug(f"Título extraído: {title}")
-
-        # Extraer datos básicos de la película
-        show_details = soup.find("div", class_="show-details")
-        year = None
-        imdb_rating = None
-        genre = None
-
-        if show_details:
-            year_tag = show_details.find("a", href=re.compile(r"/buscar/year/"))
-            if year_tag:
-                year = int(year_tag.text.strip())
-                logger.debug(f"Año extraído: {year}")
-
-            imdb_rating_tag = show_details.find("p", itemprop="aggregateRating")
-            if imdb_rating_tag and imdb_rating_tag.find("a"):
-                imdb_rating = float(imdb_rating_tag.find("a").text.strip())
-                logger.debug(f"IMDB Rating extraído: {imdb_rating}")
-
-            genre_tag = show_details.find("a", href=re.compile(r"/tags-peliculas"))
-            if genre_tag:
-                genre = genre_tag.text.strip()
-                logger.debug(f"Género extraído: {genre}")
+        load(driver, movie_url, "movie")
+        details = extract_page(driver, "movie") or {
+            "title": "No encontrado", "year": None, "imdb_rating": None, "genres": [], "embeds": [],
+            "embed_source": "",
+        }
+
+        # Datos básicos de la película
+        title = details["title"]
+        year = details["year"]
+        imdb_rating = details["imdb_rating"]
+        genre = details["genres"][0] if details["genres"] else None
+        logger.debug(f"Datos extraídos: {title}, año={year}, IMDB={imdb_rating}, género={genre}")
 
         # Verificar si la película ya existe en la base de datos
-        if movie_exists(title, year, imdb_rating, genre):
+        if movie_exists(title, year):
             logger.info(f"La película '{title}' ({year}) ya existe en la base de datos. Saltando...")
             return None
 
@@ -341,10 +278,17 @@ def extract_movie_details(driver, movie_url):
         embed_selectors = driver.find_elements(By.CLASS_NAME, 'embed-selector')
         logger.debug(f"Número de enlaces encontrados: {len(embed_selectors)}")
 
+        # Deducir los iframes desde el HTML; sólo se hace clic en los que no se resuelvan
+        try:
+            resolved_urls = resolve_page_embeds(details) if embed_selectors else []
+        except Exception as e:
+            logger.debug(f"No se pudieron resolver los enlaces sin clic: {e}")
+            resolved_urls = []
+
         for i, embed_selector in enumerate(embed_selectors):
             language = None
             server = None
-            embedded_link = None
+            embedded_link = resolved_urls[i] if i < len(resolved_urls) else None
 
             try:
                 # Refrescar la lista de embed-selectors para evitar StaleElementReferenceException
@@ -355,52 +299,38 @@ def extract_movie_details(driver, movie_url):
                         continue
                     embed_selector = embed_selectors[i]
 
-                # Extraer idioma y servidor antes de hacer clic
-                embed_html = embed_selector.get_attribute('outerHTML')
-                embed_soup = BeautifulSoup(embed_html, "lxml")
-
-                if "Audio Español" in embed_soup.text:
-                    language = "Audio Español"
-                elif "Subtítulo Español" in embed_soup.text:
-                    language = "Subtítulo Español"
-                elif "Audio Latino" in embed_soup.text:
-                    language = "Audio Latino"
-
-                server_tag = embed_soup.find("b", class_="provider")
-                if server_tag:
-                    server = server_tag.text.strip().lower()
-
-                # Hacer clic en el selector
-                embed_selector.click()
-                time.sleep(2)  # Esperar 2 segundos para que el contenido se cargue
-
-                # Obtener el enlace embebido
-                try:
-                    embed_movie = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, 'embed-movie'))
-                    )
-                    iframe = embed_movie.find_element(By.TAG_NAME, 'iframe')
-                    embedded_link = iframe.get_attribute('src')
-                    logger.debug(f"Enlace embebido extraído: {embedded_link}")
-                except (TimeoutException, Exception) as e:
-                    logger.error(f"Error al obtener el enlace embebido: {e}")
-                    continue
-
-                # Modificar el enlace si es powvideo o streamplay
-                if embedded_link and server in ["powvideo", "streamplay"]:
-                    embedded_link = re.sub(r"embed-([^-]+)-\d+x\d+\.html", r"\1", embedded_link)
-
-                # Determinar la calidad en función del servidor
-                quality = '1080p' if server in ['streamtape', 'vidmoly', 'mixdrop'] else 'hdrip'
+                # Idioma y servidor del selector, ya analizados desde el HTML de la página
+                if i < len(details["embeds"]):
+                    embed_info = details["embeds"][i]
+                    if embed_info["language"] in MOVIE_LANGUAGES:
+                        language = embed_info["language"]
+                    if embed_info["server"]:
+                        server = embed_info["server"].lower()
+
+                if embedded_link:
+                    logger.debug(f"Enlace embebido resuelto sin clic: {embedded_link}")
+                else:
+                    # Hacer clic en el selector y esperar a que cambie el iframe
+                    previous_src = current_embed_src(driver)
+                    embed_selector.click()
+                    wait_for(driver, "embed", arg=previous_src)
+
+                    # Obtener el enlace embebido
+                    try:
+                        embed_movie = WebDriverWait(driver, 10).until(
+                            EC.presence_of_element_located((By.CLASS_NAME, 'embed-movie'))
+                        )
+                        iframe = embed_movie.find_element(By.TAG_NAME, 'iframe')
+                        embedded_link = iframe.get_attribute('src')
+                        logger.debug(f"Enlace embebido extraído: {embedded_link}")
+                    except (TimeoutException, Exception) as e:
+                        logger.error(f"Error al obtener el enlace embebido: {e}")
+                        continue
 
                 # Añadir enlace a la lista
-                if server and language and embedded_link:
-                    server_links.append({
-                        "server": server,
-                        "language": language,
-                        "link": embedded_link,
-                        "quality": quality
-                    })
+                link_data = build_link_data(server, language, embedded_link)
+                if link_data:
+                    server_links.append(link_data)
             except StaleElementReferenceException:
                 logger.warning(f"Elemento obsoleto encontrado para el enlace {i + 1}. Refrescando elementos...")
                 time.sleep(1)
@@ -413,13 +343,7 @@ def extract_movie_details(driver, movie_url):
         if server_links:
             logger.debug(
                 f"Detalles de la película extraídos: {title}, {year}, {imdb_rating}, {genre}, {len(server_links)} enlaces")
-            return {
-                "Nombre": title,
-                "Año": year,
-                "IMDB Rating": imdb_rating,
-                "Género": genre,
-                "Enlaces": server_links
-            }
+            return Movie(title, year, imdb_rating, genre, tuple(server_links))
         else:
             logger.warning(f"No se encontraron enlaces para la película: {title}. Saltando...")
             return None
@@ -428,106 +352,115 @@ def extract_movie_details(driver, movie_url):
         raise
 
 
-# Función para insertar datos en la base de datos
-def insert_data_into_db(movie):
-    if not movie:
-        logger.debug("No hay datos de película para insertar (posiblemente ya existe)")
-        return 0
-
-    with db_lock:
-        connection = connect_db()
-        cursor = connection.cursor()
-
-        try:
-            # Iniciar transacción
-            connection.execute("BEGIN TRANSACTION")
-            links_inserted = 0
-
-            # Insertar la película en la base de datos con type='movie'
-            cursor.execute('''
-                INSERT INTO media_downloads (title, year, imdb_rating, genre, type)
-                VALUES (?, ?, ?, ?, 'movie')
-            ''', (movie["Nombre"], movie["Año"], movie["IMDB Rating"], movie["Género"]))
-            movie_id = cursor.lastrowid
-
-            # Verificar que se haya insertado correctamente
-            if not movie_id:
-                logger.error(f"Error al insertar la película: {movie['Nombre']}")
-                connection.rollback()
-                return False
-
-            # Insertar los enlaces de la película
-            for link in movie["Enlaces"]:
-                # Insertar el servidor si no existe
+# Escribe una película y sus enlaces con la conexión del escritor (sin commit);
+# devuelve el ID de la película y cuántos enlaces se añadieron
+def write_movie(connection, movie):
+    """Escribe ``movie`` y sus enlaces; devuelve ``(movie_id, enlaces nuevos, insertada)``."""
+    cursor = connection.cursor()
+    try:
+        # Los workers no esperan al commit, así que una película que aparece dos veces
+        # en el listado (o que otro proceso acaba de guardar) puede no estar aún en el
+        # índice de títulos: se vuelve a comprobar aquí, dentro de la transacción
+        cursor.execute('''
+            SELECT id FROM media_downloads
+            WHERE title=? COLLATE NOCASE AND year IS ? AND type='movie'
+        ''', (movie.title, movie.year))
+        existing = cursor.fetchone()
+        if existing:
+            return existing['id'], 0, False
+
+        # Insertar la película en la base de datos con type='movie'
+        cursor.execute('''
+            INSERT INTO media_downloads (title, year, imdb_rating, genre, type)
+            VALUES (?, ?, ?, ?, 'movie')
+        ''', (movie.title, movie.year, movie.imdb_rating, movie.genre))
+        movie_id = cursor.lastrowid
+
+        # Verificar que se haya insertado correctamente
+        if not movie_id:
+            raise sqlite3.DatabaseError(f"No se pudo insertar la película: {movie.title}")
+
+        # Insertar los enlaces de la película
+        server_ids = {}
+        quality_ids = {}
+        rows = []
+        for link in movie.links:
+            # Insertar el servidor si no existe
+            if link.server not in server_ids:
                 cursor.execute('''
                     INSERT OR IGNORE INTO servers (name) VALUES (?)
-                ''', (link["server"],))
+                ''', (link.server,))
                 cursor.execute('''
                     SELECT id FROM servers WHERE name=?
-                ''', (link["server"],))
-                server_id = cursor.fetchone()['id']
+                ''', (link.server,))
+                server_ids[link.server] = cursor.fetchone()['id']
 
-                # Obtener el ID de la calidad
+            # Obtener el ID de la calidad
+            if link.quality not in quality_ids:
                 cursor.execute('''
                     SELECT quality_id FROM qualities WHERE quality=?
-                ''', (link["quality"],))
+                ''', (link.quality,))
                 quality_result = cursor.fetchone()
 
                 # Si la calidad no existe, insertarla
                 if not quality_result:
                     cursor.execute('''
                         INSERT INTO qualities (quality) VALUES (?)
-                    ''', (link["quality"],))
+                    ''', (link.quality,))
                     cursor.execute('''
                         SELECT quality_id FROM qualities WHERE quality=?
-                    ''', (link["quality"],))
+                    ''', (link.quality,))
                     quality_result = cursor.fetchone()
 
-                quality_id = quality_result['quality_id']
+                quality_ids[link.quality] = quality_result['quality_id']
 
-                # Insertar el enlace en la base de datos
-                cursor.execute('''
-                    INSERT INTO links_files_download (movie_id, server_id, language, link, quality_id)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (movie_id, server_id, link["language"], link["link"], quality_id))
-                log_link_insertion(
-                    logger,
-                    movie_id=movie_id,
-                    server=link["server"],
-                    language=link["language"],
-                )
-                links_inserted += 1
+            rows.append((
+                movie_id, None, server_ids[link.server], link.language, link.url, quality_ids[link.quality],
+            ))
 
-            # Confirmar la transacción solo si todo fue exitoso
-            connection.commit()
-            logger.info(
-                f"Datos insertados en la base de datos para la película: {movie['Nombre']} ({links_inserted} enlaces)"
-            )
-            return links_inserted
-        except Exception as e:
-            logger.error(f"Error al insertar datos en la base de datos: {e}")
-            connection.rollback()
-            return 0
-        finally:
-            cursor.close()
-            connection.close()
+        # Un enlace repetido en la página sólo se guarda una vez
+        links_inserted = insert_link_rows(cursor, rows)
+
+        return movie_id, links_inserted, True
+    finally:
+        cursor.close()
+
+
+# Se llama desde el escritor cuando la película ya está confirmada en la BD;
+# ``position`` es ``(página, índice, título del listado)`` para el progreso
+def on_movie_written(movie, result, position):
+    global total_saved
+    movie_id, links_inserted, inserted = result
+    get_title_index(db_path).add(movie_id, 'movie', movie.title, movie.year)
+    with total_saved_lock:
+        total_saved += links_inserted
+        current_total = total_saved
+    if inserted:
+        logger.info(
+            f"Datos insertados en la base de datos para la película: {movie.title} ({links_inserted} enlaces)"
+        )
+    else:
+        logger.info(f"La película {movie.title} ({movie.year}) ya estaba en la base de datos")
+    if position is not None:
+        page_num, index, title = position
+        save_progress(page_num, title, index, current_total)
 
 
 # Función para contar el número total de páginas de películas
 def count_total_pages(driver):
     try:
         logger.info("Contando el número total de páginas de películas...")
-        driver.get(movies_url)
-        time.sleep(2)  # Esperar a que se cargue la página
-
-        # Buscar el elemento de paginación
-        pagination = driver.find_elements(By.XPATH, "//ul[@class='pagination']/li")
+        page = fetch_listing_page(movies_url, driver, lambda doc: len(parse_pagination(doc)) > 2)
+        if page is not None:
+            pagination = parse_pagination(page)
+        else:
+            load(driver, movies_url, "listing")
+            pagination = extract_page(driver, "pagination")
 
         if pagination and len(pagination) > 2:
             # El último elemento de la paginación suele ser el botón "Siguiente"
             # El penúltimo elemento suele ser el número de la última página
-            last_page_element = pagination[-2]
-            last_page_text = last_page_element.text.strip()
+            last_page_text = pagination[-2].strip()
 
             try:
                 total_pages = int(last_page_text)
@@ -544,64 +477,24 @@ def count_total_pages(driver):
         return None
 
 
-# Función auxiliar para localizar los divs de películas
-def _find_movie_divs(driver):
-    """Devuelve una lista de divs que representan películas en la página actual."""
-    for container_selector in ["div.center", "div.container"]:
-        try:
-            container = driver.find_element(By.CSS_SELECTOR, container_selector)
-            return container.find_elements(By.CSS_SELECTOR, "div.span-6.inner-6.tt.view")
-        except Exception:
-            continue
-    # Fallback: buscar directamente todos los divs de película
-    try:
-        return driver.find_elements(By.CSS_SELECTOR, "div.span-6.inner-6.tt.view")
-    except Exception:
-        return []
-
-
 # Función para extraer URLs de películas de una página
 def extract_movie_urls_from_page(driver, page_url, page_number):
     logger.info(f"Extrayendo URLs de películas de la página: {page_url}")
     try:
-        driver.get(page_url)
-        time.sleep(2)
-
-        movie_divs = _find_movie_divs(driver)
-        total_movies = len(movie_divs)
-        logger.info(f"Encontradas {total_movies} películas en la página {page_number}")
+        # Modo rápido: descargar el listado por HTTP con las cookies del driver
+        page = fetch_listing_page(page_url, driver, lambda doc: bool(parse_listing(doc, page_url)))
+        if page is not None:
+            items = parse_listing(page, page_url)
+            source = "HTTP"
+        else:
+            load(driver, page_url, "listing")
+            items = extract_page(driver, "listing", base_url=page_url)
+            source = "driver"
 
-        if total_movies == 0:
+        movie_urls = [(page_number, idx, item["url"], item["title"]) for idx, item in enumerate(items)]
+        logger.info(f"Encontradas {len(movie_urls)} películas en la página {page_number} ({source})")
+        if not movie_urls:
             logger.info(f"No se encontraron películas en la página {page_number}. Puede ser la última página.")
-            return []
-
-        movie_urls = []
-        for idx, movie_div in enumerate(movie_divs):
-            if not movie_div:
-                continue
-            try:
-                link_tag = movie_div.find_element(By.TAG_NAME, "a")
-                movie_url = link_tag.get_attribute("href")
-                title = link_tag.get_attribute("title") or link_tag.text.strip()
-                movie_urls.append((page_number, idx, movie_url, title))
-            except StaleElementReferenceException:
-                logger.warning(f"Elemento obsoleto encontrado en el índice {idx}. Refrescando página...")
-                driver.refresh()
-                time.sleep(2)
-                movie_divs = _find_movie_divs(driver)
-                if idx < len(movie_divs):
-                    try:
-                        link_tag = movie_divs[idx].find_element(By.TAG_NAME, "a")
-                        movie_url = link_tag.get_attribute("href")
-                        title = link_tag.get_attribute("title") or link_tag.text.strip()
-                        movie_urls.append((page_number, idx, movie_url, title))
-                    except Exception as e:
-                        logger.error(f"Error al obtener la URL después del refresco: {e}")
-                else:
-                    logger.error(f"Índice {idx} fuera de rango después de refrescar")
-            except Exception as e:
-                logger.error(f"Error al obtener la URL de la película en el índice {idx}: {e}")
-
         return movie_urls
     except Exception as e:
         logger.error(f"Error al extraer URLs de películas de la página {page_url}: {e}")
@@ -647,14 +540,11 @@ def load_progress():
 
 # Función worker para procesar películas
 def movie_worker(worker_id):
-    global total_saved
-    # Crear un driver para este worker
-    driver = create_driver()
-
-    # Iniciar sesión con este driver
-    if not login(driver):
-        logger.error(f"Worker {worker_id}: No se pudo iniciar sesión. Abortando...")
-        driver.quit()
+    # Obtener un driver autenticado del pool compartido
+    pool = get_driver_pool()
+    driver = pool.acquire()
+    if driver is None:
+        logger.error(f"Worker {worker_id}: No se pudo obtener un driver con sesión iniciada. Abortando...")
         return
 
     logger.info(f"Worker {worker_id}: Iniciado y listo para procesar películas")
@@ -675,8 +565,17 @@ def movie_worker(worker_id):
             logger.info(f"Worker {worker_id}: Procesando película {index} (página {page_num}): {movie_url}")
             success = False
             movie_details = None
+            submitted = False
 
             try:
+                # Reciclar el driver si ha servido demasiadas páginas o consume demasiada memoria
+                driver = pool.checkpoint(driver)
+                if driver is None:
+                    logger.error(f"Worker {worker_id}: No se pudo reemplazar el driver reciclado.")
+                    driver = pool.acquire()
+                    if driver is None:
+                        break
+
                 for attempt in range(3):
                     try:
                         movie_details = extract_movie_details(driver, movie_url)
@@ -690,9 +589,10 @@ def movie_worker(worker_id):
 
                 if not success:
                     logger.info(f"Worker {worker_id}: Reiniciando el driver después de 3 intentos fallidos...")
-                    driver.quit()
-                    driver = create_driver()
-                    if login(driver):
+                    driver = pool.replace(driver)
+                    if driver is None:
+                        driver = pool.acquire()
+                    if driver is not None:
                         for attempt in range(3):
                             try:
                                 movie_details = extract_movie_details(driver, movie_url)
@@ -709,22 +609,24 @@ def movie_worker(worker_id):
                         logger.error(f"Worker {worker_id}: No se pudo iniciar sesión después de reiniciar el driver.")
 
                 if success and movie_details:
-                    links = insert_data_into_db(movie_details)
-                    if links:
-                        with total_saved_lock:
-                            total_saved += links
+                    # El progreso lo guarda on_movie_written cuando la película está confirmada
+                    db_writer.submit(movie_details, (page_num, index, title))
+                    submitted = True
+                elif success:
+                    logger.debug("No hay datos de película para insertar (posiblemente ya existe)")
 
             except Exception as e:
                 logger.error(f"Worker {worker_id}: Error inesperado al procesar película: {e}")
             finally:
-                with total_saved_lock:
-                    current_total = total_saved
                 movie_queue.task_done()
-                save_progress(page_num, title, index, current_total)
+                if not submitted:
+                    with total_saved_lock:
+                        current_total = total_saved
+                    save_progress(page_num, title, index, current_total)
 
     finally:
-        driver.quit()
-        logger.info(f"Worker {worker_id}: Finalizado y driver cerrado.")
+        pool.release(driver)
+        logger.info(f"Worker {worker_id}: Finalizado y driver devuelto al pool.")
 
 
 # Función principal para extraer todas las páginas de películas
@@ -734,14 +636,28 @@ def extract_all_movies(start_page=None, db_path=None):
     # Inicializar la base de datos
     initialize_db(db_path)
 
-    # Crear un driver principal para la navegación por páginas
-    main_driver = create_driver()
+    # Pool compartido: un driver para la navegación por páginas y uno por worker
+    pool = get_driver_pool(size=NUM_WORKERS + 1)
+    main_driver = pool.acquire()
 
-    if not login(main_driver):
+    if main_driver is None:
         logger.error("No se pudo iniciar sesión con el driver principal. Abortando...")
-        main_driver.quit()
+        close_driver_pool()
         return
 
+    # Las películas se escriben desde un único hilo con commits agrupados
+    global db_writer
+    db_writer = DBWriter(
+        db_path or DB_PATH,
+        {Movie: write_movie},
+        batch_size=DB_WRITER_BATCH_SIZE,
+        max_delay_ms=DB_WRITER_MAX_DELAY_MS,
+        on_written=on_movie_written,
+    )
+
+    # Las comprobaciones de existencia se hacen contra el índice de títulos en memoria
+    get_title_index(db_path or DB_PATH)
+
     # Contar el número total de páginas
     total_pages = count_total_pages(main_driver)
     if total_pages:
@@ -775,6 +691,11 @@ def extract_all_movies(start_page=None, db_path=None):
                 page_url = f"{movies_url}/{page_number}"
                 logger.info(f"Extrayendo URLs de películas de la página: {page_url}")
 
+                main_driver = pool.checkpoint(main_driver)
+                if main_driver is None:
+                    logger.error("No se pudo reemplazar el driver principal. Finalizando.")
+                    break
+
                 movie_urls = extract_movie_urls_from_page(main_driver, page_url, page_number)
 
                 if not movie_urls:
@@ -793,6 +714,11 @@ def extract_all_movies(start_page=None, db_path=None):
                 with total_saved_lock:
                     current_total = total_saved
                 save_progress(page_number, None, -1, current_total)
+                writer_stats = db_writer.stats()
+                logger.info(
+                    f"Escritor de BD: {writer_stats['queued']} películas en cola, "
+                    f"commit medio {writer_stats['avg_commit_ms']:.1f} ms"
+                )
 
                 for data in movie_urls:
                     if shutdown_event.is_set():
@@ -833,12 +759,35 @@ def extract_all_movies(start_page=None, db_path=None):
     except Exception as e:
         logger.critical(f"Error crítico en el proceso principal: {e}")
     finally:
-        # Cerrar el driver principal
-        main_driver.quit()
-        logger.info("Driver principal cerrado.")
+        # Devolver el driver principal y cerrar el pool
+        pool.release(main_driver)
+        close_driver_pool()
+        logger.info("Drivers cerrados.")
+        get_listing_client().log_stats()
+        embed_stats = get_embed_stats()
+        logger.info(
+            f"Enlaces resueltos sin clic: {embed_stats['resolved']}, con clic: {embed_stats['unresolved']}"
+        )
+        extract_stats = get_extract_stats()
+        logger.info(
+            f"Páginas extraídas en el navegador: {extract_stats['browser']}, "
+            f"con page_source: {extract_stats['page_source']} ({extract_stats['fallbacks']} fallos del extractor)"
+        )
+        if extract_stats['harvested'] or extract_stats['harvest_failures']:
+            logger.info(
+                f"Recogidas de enlaces en el navegador: {extract_stats['harvested']} "
+                f"({extract_stats['harvest_failures']} fallos)"
+            )
+        close_page_archive()
+        close_parse_pool()
+        log_wait_stats(logger)
+        # Confirmar las películas que queden en la cola del escritor antes del último progreso
+        db_writer.close()
         with total_saved_lock:
             current_total = total_saved
         save_progress(page_number, None, -1, current_total)
+        close_db_connections()
+        close_title_indexes()
         logger.info(f"Proceso finalizado. Total enlaces guardados: {current_total}")
 
 
@@ -1,14 +1,14 @@
 import time
-import re
 import concurrent.futures
 import argparse
 import os
 import traceback
 import json
 import threading
+from dataclasses import replace
 from datetime import datetime
 from queue import Queue, Empty
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -19,9 +19,7 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 try:
     from .scraper_utils import (
         setup_logger,
-        create_driver,
         connect_db,
-        login,
         setup_database,
         save_progress,
         load_progress,
@@ -37,15 +35,29 @@ try:
         MAX_WORKERS,
         MAX_RETRIES,
         PROJECT_ROOT,
-        log_link_insertion,
+        insert_link_rows,
+        db_connection,
         get_shutdown_event,
+        extract_page,
+        harvest_pending_embeds,
+        resolve_page_embeds,
+        embed_link_data,
     )
+    from .hdfull_http import fetch_listing_page
+    from .driver_pool import get_driver_pool, close_driver_pool
+    from .page_ready import load, wait_for, current_embed_src, log_wait_stats
+    from .page_extract import get_stats as get_extract_stats
+    from .page_archive import close_page_archive
+    from .parse_pool import close_parse_pool
+    from .db_connections import close_db_connections
+    from .title_index import get_title_index, close_title_indexes
+    from .parsers import parse_listing, parse_season, count_season_episodes
+    from .page_memo import PageMemo, MISSING
+    from .records import Episode, Season, Series
 except ImportError:  # pragma: no cover - fallback when executed directly
     from scraper_utils import (
         setup_logger,
-        create_driver,
         connect_db,
-        login,
         setup_database,
         save_progress,
         load_progress,
@@ -61,9 +73,25 @@ except ImportError:  # pragma: no cover - fallback when executed directly
         MAX_WORKERS,
         MAX_RETRIES,
         PROJECT_ROOT,
-        log_link_insertion,
+        insert_link_rows,
+        db_connection,
         get_shutdown_event,
+        extract_page,
+        harvest_pending_embeds,
+        resolve_page_embeds,
+        embed_link_data,
     )
+    from hdfull_http import fetch_listing_page
+    from driver_pool import get_driver_pool, close_driver_pool
+    from page_ready import load, wait_for, current_embed_src, log_wait_stats
+    from page_extract import get_stats as get_extract_stats
+    from page_archive import close_page_archive
+    from parse_pool import close_parse_pool
+    from db_connections import close_db_connections
+    from title_index import get_title_index, close_title_indexes
+    from parsers import parse_listing, parse_season, count_season_episodes
+    from page_memo import PageMemo, MISSING
+    from records import Episode, Season, Series
 
 shutdown_event = get_shutdown_event()
 
@@ -73,6 +101,12 @@ LOG_FILE = f"{SCRIPT_NAME}.log"
 PROGRESS_FILE = os.path.join(PROJECT_ROOT, "progress", "series_direct_progress.json")
 SERIES_BASE_URL = f"{BASE_URL}/series/imdb_rating"
 
+# Temporadas que se sondean a la vez cuando la ficha de la serie no las enlaza
+SEASON_PROBE_BATCH = 4
+
+# Páginas ya analizadas en esta ejecución (se vacía al empezar cada una)
+page_memo = PageMemo(max_entries=512)
+
 
 def _reset_progress_from_page(progress_data, start_page):
     """Elimina el progreso de páginas iguales o posteriores a start_page."""
@@ -115,23 +149,18 @@ def _reset_progress_from_page(progress_data, start_page):
 # Obtener total de enlaces guardados para un tipo de media
 def get_total_saved_links(content_type):
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT COUNT(lfd.id)
-            FROM links_files_download lfd
-            JOIN media_downloads md ON lfd.movie_id = md.id
-            WHERE md.type = ?
-            """,
-            (content_type,),
-        )
-        count = cursor.fetchone()[0]
+        with db_connection() as conn:
+            count = conn.execute(
+                """
+                SELECT COUNT(lfd.id)
+                FROM links_files_download lfd
+                JOIN media_downloads md ON lfd.movie_id = md.id
+                WHERE md.type = ?
+                """,
+                (content_type,),
+            ).fetchone()[0]
     except Exception:
         count = 0
-    finally:
-        if 'conn' in locals():
-            conn.close()
     return count
 
 # Configurar logger
@@ -178,6 +207,9 @@ db_lock = threading.Lock()
 progress_lock = threading.Lock()
 total_saved_lock = threading.Lock()
 
+# Índice en memoria de los títulos de la BD (se carga en process_all_series)
+title_index = None
+
 total_saved = 0
 
 
@@ -225,6 +257,12 @@ def worker1_url_extractor(driver, progress_data, start_page=1, max_pages=None):
 
             # Obtener URLs de series de la página actual
             logger.info(f"Worker 1: Procesando página {current_page}")
+            # Reciclar el driver si ha servido demasiadas páginas o consume demasiada memoria
+            driver = get_driver_pool().checkpoint(driver)
+            if driver is None:
+                logger.error("Worker 1: No se pudo reemplazar el driver reciclado. Finalizando.")
+                break
+
             page_series_urls = get_series_urls_from_page(driver, current_page)
 
             # Actualizar estadísticas
@@ -337,6 +375,12 @@ def worker4_url_extractor(driver, progress_data, start_page=2, max_pages=None):
 
             # Obtener URLs de series de la página actual
             logger.info(f"Worker 4: Procesando página {current_page}")
+            # Reciclar el driver si ha servido demasiadas páginas o consume demasiada memoria
+            driver = get_driver_pool().checkpoint(driver)
+            if driver is None:
+                logger.error("Worker 4: No se pudo reemplazar el driver reciclado. Finalizando.")
+                break
+
             page_series_urls = get_series_urls_from_page(driver, current_page)
 
             # Actualizar estadísticas
@@ -447,44 +491,24 @@ def get_series_urls_from_page(driver, page_number):
     logger.info(f"Obteniendo series de la página {page_number}: {page_url}")
 
     try:
-        driver.get(page_url)
-        time.sleep(2)  # Esperar a que se cargue la página
-
-        # Esperar a que aparezca el contenedor de series
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".span-6.inner-6.tt.view"))
-            )
-        except TimeoutException:
-            logger.warning(f"Timeout esperando el contenedor de series en la página {page_number}")
-            return []
-
-        # Obtener el HTML de la página
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
+        # Modo rápido: descargar el listado por HTTP con las cookies del driver
+        page = fetch_listing_page(page_url, driver, lambda doc: bool(parse_listing(doc, BASE_URL)))
+        if page is not None:
+            items = parse_listing(page, BASE_URL)
+        else:
+            # Esperar a que aparezca el contenedor de series
+            if not load(driver, page_url, "listing"):
+                logger.warning(f"Timeout esperando el contenedor de series en la página {page_number}")
+                return []
 
-        # Buscar todos los divs de series
-        series_divs = soup.find_all("div", class_="span-6 inner-6 tt view")
-        logger.info(f"Encontrados {len(series_divs)} series en la página {page_number}")
+            items = extract_page(driver, "listing")
 
-        if not series_divs:
+        # Extraer las URLs de las series
+        series_urls = [item["url"] for item in items]
+        if not series_urls:
             logger.warning(f"No se encontraron series en la página {page_number}")
             return []
 
-        # Extraer las URLs de las series
-        series_urls = []
-        for div in series_divs:
-            try:
-                # Buscar el enlace principal de la serie
-                link_tag = div.find("a", class_="spec-border-ie")
-                if link_tag and 'href' in link_tag.attrs:
-                    series_href = link_tag['href']
-                    series_url = BASE_URL + series_href if not series_href.startswith('http') else series_href
-                    series_urls.append(series_url)
-            except Exception as e:
-                logger.error(f"Error al procesar un div de serie: {e}")
-                continue
-
         logger.info(f"Se extrajeron {len(series_urls)} URLs de series de la página {page_number}")
         return series_urls
 
@@ -513,6 +537,10 @@ def worker2_series_extractor(driver, db_path, progress_data, worker_id=0):
             basic_info = None
             try:
                 logger.info(f"Worker 2 (ID {worker_id}): Procesando serie: {series_url}")
+                driver = get_driver_pool().checkpoint(driver)
+                if driver is None:
+                    logger.error(f"Worker 2 (ID {worker_id}): No se pudo reemplazar el driver reciclado. Finalizando.")
+                    break
                 basic_info = extract_basic_series_info(driver, series_url, worker_id)
 
                 if not basic_info:
@@ -524,10 +552,12 @@ def worker2_series_extractor(driver, db_path, progress_data, worker_id=0):
 
                 if series_exists_flag:
                     logger.info(
-                        f"Worker 2 (ID {worker_id}): Serie '{basic_info['title']}' ya existe en la BD con ID {series_id}")
-                    need_update = check_if_series_needs_update(driver, series_url, series_id, worker_id)
+                        f"Worker 2 (ID {worker_id}): Serie '{basic_info.title}' ya existe en la BD con ID {series_id}")
+                    need_update = check_if_series_needs_update(
+                        driver, series_url, series_id, worker_id, basic_info.season_numbers
+                    )
                     if not need_update:
-                        logger.info(f"Worker 2 (ID {worker_id}): Serie '{basic_info['title']}' está actualizada. Saltando.")
+                        logger.info(f"Worker 2 (ID {worker_id}): Serie '{basic_info.title}' está actualizada. Saltando.")
                         with stats_lock:
                             stats['skipped_series'] += 1
                         continue
@@ -537,7 +567,7 @@ def worker2_series_extractor(driver, db_path, progress_data, worker_id=0):
 
                 if series_data:
                     if series_exists_flag:
-                        series_data["id"] = series_id
+                        series_data = replace(series_data, id=series_id)
 
                     series_data_queue_odd.put({
                         "series_url": series_url,
@@ -557,7 +587,7 @@ def worker2_series_extractor(driver, db_path, progress_data, worker_id=0):
                 with progress_lock:
                     progress_data['last_series_url'] = series_url
                     if basic_info:
-                        progress_data['last_series_title'] = basic_info.get('title')
+                        progress_data['last_series_title'] = basic_info.title
                     save_progress(PROGRESS_FILE, progress_data)
 
         except Exception:
@@ -586,6 +616,10 @@ def worker5_series_extractor(driver, db_path, progress_data, worker_id=0):
             basic_info = None
             try:
                 logger.info(f"Worker 5 (ID {worker_id}): Procesando serie: {series_url}")
+                driver = get_driver_pool().checkpoint(driver)
+                if driver is None:
+                    logger.error(f"Worker 5 (ID {worker_id}): No se pudo reemplazar el driver reciclado. Finalizando.")
+                    break
                 basic_info = extract_basic_series_info(driver, series_url, worker_id)
 
                 if not basic_info:
@@ -597,10 +631,12 @@ def worker5_series_extractor(driver, db_path, progress_data, worker_id=0):
 
                 if series_exists_flag:
                     logger.info(
-                        f"Worker 5 (ID {worker_id}): Serie '{basic_info['title']}' ya existe en la BD con ID {series_id}")
-                    need_update = check_if_series_needs_update(driver, series_url, series_id, worker_id)
+                        f"Worker 5 (ID {worker_id}): Serie '{basic_info.title}' ya existe en la BD con ID {series_id}")
+                    need_update = check_if_series_needs_update(
+                        driver, series_url, series_id, worker_id, basic_info.season_numbers
+                    )
                     if not need_update:
-                        logger.info(f"Worker 5 (ID {worker_id}): Serie '{basic_info['title']}' está actualizada. Saltando.")
+                        logger.info(f"Worker 5 (ID {worker_id}): Serie '{basic_info.title}' está actualizada. Saltando.")
                         with stats_lock:
                             stats['skipped_series'] += 1
                         continue
@@ -610,7 +646,7 @@ def worker5_series_extractor(driver, db_path, progress_data, worker_id=0):
 
                 if series_data:
                     if series_exists_flag:
-                        series_data["id"] = series_id
+                        series_data = replace(series_data, id=series_id)
 
                     series_data_queue_even.put({
                         "series_url": series_url,
@@ -630,7 +666,7 @@ def worker5_series_extractor(driver, db_path, progress_data, worker_id=0):
                 with progress_lock:
                     progress_data['last_series_url'] = series_url
                     if basic_info:
-                        progress_data['last_series_title'] = basic_info.get('title')
+                        progress_data['last_series_title'] = basic_info.title
                     save_progress(PROGRESS_FILE, progress_data)
 
         except Exception:
@@ -646,133 +682,44 @@ def extract_basic_series_info(driver, series_url, worker_id=0):
     logger.info(f"[Worker {worker_id}] Extrayendo información básica de la serie: {series_url}")
 
     try:
-        driver.get(series_url)
-        time.sleep(2)  # Esperar a que se cargue la página
-
         # Esperar a que aparezca la información de la serie
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "summary-title"))
-            )
-        except TimeoutException:
+        if not load(driver, series_url, "series"):
             logger.error(f"[Worker {worker_id}] Timeout esperando información de la serie en {series_url}")
             return None
 
-        # Obtener el HTML de la página
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Extraer título de la serie
-        title_div = soup.find("div", id="summary-title")
-        if not title_div:
+        # Extraer los datos de la página
+        details = extract_page(driver, "series")
+        if not details:
             logger.error(f"[Worker {worker_id}] No se pudo encontrar el título de la serie en {series_url}")
             return None
 
-        series_title = title_div.text.strip()
-
-        # Extraer información adicional de la serie desde show-details
-        show_details = soup.find("div", class_="show-details")
-
-        # Buscar el contenedor de información detallada
-        summary_overview = soup.find("div", id="summary-overview-wrapper")
-
-        series_year = None
-        imdb_rating = None
-        genre = None
-        status = None
-        director = None
+        series_title = details["title"]
+        series_year = details["year"]
+        imdb_rating = details["imdb_rating"]
+        genre = details["genre"]
+        status = details["status"]
+        director = details["director"]
 
-        # Extraer información del contenedor principal
-        if summary_overview:
-            info_div = summary_overview.find("div")
-            if info_div:
-                # Extraer estado
-                status_p = info_div.find("p", string=lambda s: s and "Estado:" in s if s else False)
-                if status_p and status_p.find("a"):
-                    status = status_p.find("a").text.strip()
-
-                # Extraer año
-                year_p = info_div.find("p", string=lambda s: s and "Año:" in s if s else False)
-                if year_p and year_p.find("a"):
-                    try:
-                        series_year = int(year_p.find("a").text.strip())
-                    except ValueError:
-                        logger.warning(f"[Worker {worker_id}] No se pudo convertir el año a entero")
-
-                # Extraer IMDB rating
-                imdb_p = info_div.find("p", string=lambda s: s and "IMDB Rating:" in s if s else False)
-                if imdb_p and imdb_p.find("a"):
-                    rating_text = imdb_p.find("a").text.strip().split()[0]
-                    try:
-                        imdb_rating = float(rating_text)
-                    except ValueError:
-                        logger.warning(f"[Worker {worker_id}] No se pudo convertir el rating a float: {rating_text}")
-
-                # Extraer género
-                genre_p = info_div.find("p", string=lambda s: s and "Género:" in s if s else False)
-                if genre_p:
-                    genre_tags = genre_p.find_all("a")
-                    genre = ", ".join([tag.text.strip() for tag in genre_tags]) if genre_tags else None
-
-                # Extraer director
-                director_p = info_div.find("p", string=lambda s: s and "Director:" in s if s else False)
-                if director_p:
-                    director_tags = director_p.find_all("a")
-                    director = ", ".join([tag.text.strip() for tag in director_tags]) if director_tags else None
-
-        # Si no se encontró información en el contenedor principal, intentar con show-details
-        if show_details and (series_year is None or imdb_rating is None or genre is None or status is None):
-            # Extraer estado
-            if status is None:
-                status_p = show_details.find("p", string=lambda s: s and "Estado:" in s if s else False)
-                if status_p and status_p.find("a"):
-                    status = status_p.find("a").text.strip()
-
-            # Extraer año
-            if series_year is None:
-                year_p = show_details.find("p", string=lambda s: s and "Año:" in s if s else False)
-                if year_p and year_p.find("a"):
-                    try:
-                        series_year = int(year_p.find("a").text.strip())
-                    except ValueError:
-                        logger.warning(f"[Worker {worker_id}] No se pudo convertir el año a entero")
-
-            # Extraer IMDB rating
-            if imdb_rating is None:
-                imdb_p = show_details.find("p", string=lambda s: s and "IMDB Rating:" in s if s else False)
-                if imdb_p and imdb_p.find("a"):
-                    rating_text = imdb_p.find("a").text.strip().split()[0]
-                    try:
-                        imdb_rating = float(rating_text)
-                    except ValueError:
-                        logger.warning(f"[Worker {worker_id}] No se pudo convertir el rating a float: {rating_text}")
-
-            # Extraer género
-            if genre is None:
-                genre_p = show_details.find("p", string=lambda s: s and "Género:" in s if s else False)
-                if genre_p:
-                    genre_tags = genre_p.find_all("a")
-                    genre = ", ".join([tag.text.strip() for tag in genre_tags]) if genre_tags else None
-
-            # Extraer director
-            if director is None:
-                director_p = show_details.find("p", string=lambda s: s and "Director:" in s if s else False)
-                if director_p:
-                    director_tags = director_p.find_all("a")
-                    director = ", ".join([tag.text.strip() for tag in director_tags]) if director_tags else None
+        # Temporadas enlazadas desde la propia ficha (``None`` si no las lista)
+        series_path = urlparse(series_url).path.rstrip("/")
+        season_numbers = tuple(
+            season["number"] for season in extract_page(driver, "season_list")
+            if urlparse(season["url"]).path.startswith(f"{series_path}/temporada-")
+        ) or None
 
         logger.info(f"[Worker {worker_id}] Información básica extraída: Título={series_title}, Año={series_year}, "
                     f"IMDB={imdb_rating}, Género={genre}, Estado={status}, Director={director}")
 
-        return {
-            "title": series_title,
-            "url": series_url,
-            "year": series_year,
-            "imdb_rating": imdb_rating,
-            "genre": genre,
-            "status": status,
-            "director": director
-        }
+        return Series(
+            title=series_title,
+            url=series_url,
+            year=series_year,
+            imdb_rating=imdb_rating,
+            genre=genre,
+            status=status,
+            director=director,
+            season_numbers=season_numbers,
+        )
 
     except Exception as e:
         logger.error(f"[Worker {worker_id}] Error al extraer información básica de la serie {series_url}: {e}")
@@ -786,104 +733,81 @@ def check_series_in_db(series_info, worker_id=0):
     if not series_info:
         return False, None
 
-    with db_lock:
-        connection = connect_db()
-        cursor = connection.cursor()
-        try:
-            # Primero intentamos buscar por título exacto y año
-            if series_info["year"]:
-                cursor.execute('''
-                    SELECT id FROM media_downloads 
-                    WHERE title=? AND year=? AND type='serie'
-                ''', (series_info["title"], series_info["year"]))
-                result = cursor.fetchone()
-                if result:
-                    logger.info(
-                        f"[Worker {worker_id}] Serie encontrada por título y año: {series_info['title']} ({series_info['year']})")
-                    return True, result['id']
-
-            # Si no se encuentra, intentamos buscar solo por título
-            cursor.execute('''
-                SELECT id FROM media_downloads 
-                WHERE title=? AND type='serie'
-            ''', (series_info["title"],))
-            result = cursor.fetchone()
-
-            exists = result is not None
-            logger.debug(
-                f"[Worker {worker_id}] Verificación de existencia de serie: {series_info['title']} - {'Existe' if exists else 'No existe'}")
-            return exists, result['id'] if exists else None
+    # Primero intentamos buscar por título y año
+    if series_info.year:
+        series_id = title_index.find('serie', series_info.title, series_info.year)
+        if series_id is not None:
+            logger.info(
+                f"[Worker {worker_id}] Serie encontrada por título y año: {series_info.title} ({series_info.year})")
+            return True, series_id
 
-        except Exception as e:
-            logger.error(f"[Worker {worker_id}] Error al verificar si la serie existe en la BD: {e}")
-            return False, None
-        finally:
-            cursor.close()
-            connection.close()
+    # Si no se encuentra, intentamos buscar solo por título
+    series_id = title_index.find_title('serie', series_info.title)
+    exists = series_id is not None
+    logger.debug(
+        f"[Worker {worker_id}] Verificación de existencia de serie: {series_info.title} - {'Existe' if exists else 'No existe'}")
+    return exists, series_id
 
 
 # Función para verificar si una serie necesita actualización
-def check_if_series_needs_update(driver, series_url, series_id, worker_id=0):
-    """Verifica si una serie necesita actualización (nuevas temporadas o episodios)."""
+def check_if_series_needs_update(driver, series_url, series_id, worker_id=0, season_numbers=None):
+    """Verifica si una serie necesita actualización (nuevas temporadas o episodios).
+
+    ``season_numbers`` son las temporadas que enlaza la ficha de la serie
+    (ver :func:`extract_basic_series_info`). Las temporadas nuevas se detectan
+    sin cargar ninguna página; sólo se cuentan los episodios de las que ya
+    están en la BD, empezando por la más reciente.
+    """
     logger.info(f"[Worker {worker_id}] Verificando si la serie con ID {series_id} necesita actualización")
 
     try:
         # Obtener las temporadas disponibles en la web
-        available_seasons = get_available_seasons(driver, series_url, worker_id)
+        available_seasons = get_available_seasons(
+            driver, series_url, worker_id, season_numbers, count_episodes=False
+        )
 
         if not available_seasons:
             logger.warning(f"[Worker {worker_id}] No se encontraron temporadas para la serie con ID {series_id}")
             return False
 
-        # Verificar las temporadas en la BD
-        with db_lock:
-            connection = connect_db()
+        # Temporadas de la BD con su número de episodios, en una sola consulta
+        with db_connection() as connection:
             cursor = connection.cursor()
 
             try:
-                # Obtener las temporadas existentes en la BD
                 cursor.execute('''
-                    SELECT season FROM series_seasons 
-                    WHERE movie_id=?
+                    SELECT ss.season, COUNT(se.id) as episode_count
+                    FROM series_seasons ss
+                    LEFT JOIN series_episodes se ON ss.id = se.season_id
+                    WHERE ss.movie_id=?
+                    GROUP BY ss.id
                 ''', (series_id,))
-
-                existing_seasons = [row['season'] for row in cursor.fetchall()]
-
-                # Verificar si hay nuevas temporadas
-                for season_number, season_url, episode_count in available_seasons:
-                    if season_number not in existing_seasons:
-                        logger.info(
-                            f"[Worker {worker_id}] Se encontró una nueva temporada {season_number} para la serie con ID {series_id}")
-                        return True
-
-                    # Si la temporada existe, verificar si hay nuevos episodios
-                    cursor.execute('''
-                        SELECT ss.id, COUNT(se.id) as episode_count
-                        FROM series_seasons ss
-                        LEFT JOIN series_episodes se ON ss.id = se.season_id
-                        WHERE ss.movie_id=? AND ss.season=?
-                        GROUP BY ss.id
-                    ''', (series_id, season_number))
-
-                    result = cursor.fetchone()
-                    if result:
-                        season_id = result['id']
-                        db_episode_count = result['episode_count']
-
-                        if episode_count > db_episode_count:
-                            logger.info(
-                                f"[Worker {worker_id}] Se encontraron nuevos episodios en temporada {season_number} para la serie con ID {series_id} (Web: {episode_count}, BD: {db_episode_count})")
-                            return True
-
-                logger.info(f"[Worker {worker_id}] La serie con ID {series_id} está actualizada")
-                return False
-
+                db_episode_counts = {row['season']: row['episode_count'] for row in cursor.fetchall()}
             except Exception as e:
                 logger.error(f"[Worker {worker_id}] Error al verificar si la serie necesita actualización: {e}")
                 return True  # En caso de error, asumimos que necesita actualización
             finally:
                 cursor.close()
-                connection.close()
+
+        # Verificar si hay nuevas temporadas
+        for season_number, season_url, episode_count in available_seasons:
+            if season_number not in db_episode_counts:
+                logger.info(
+                    f"[Worker {worker_id}] Se encontró una nueva temporada {season_number} para la serie con ID {series_id}")
+                return True
+
+        # Si las temporadas existen, verificar si hay nuevos episodios
+        for season_number, season_url, episode_count in reversed(available_seasons):
+            if episode_count is None:
+                _, episode_count = check_season_exists(driver, season_url, worker_id)
+            db_episode_count = db_episode_counts[season_number]
+            if episode_count > db_episode_count:
+                logger.info(
+                    f"[Worker {worker_id}] Se encontraron nuevos episodios en temporada {season_number} para la serie con ID {series_id} (Web: {episode_count}, BD: {db_episode_count})")
+                return True
+
+        logger.info(f"[Worker {worker_id}] La serie con ID {series_id} está actualizada")
+        return False
 
     except Exception as e:
         logger.error(f"[Worker {worker_id}] Error al verificar si la serie necesita actualización: {e}")
@@ -891,73 +815,143 @@ def check_if_series_needs_update(driver, series_url, series_id, worker_id=0):
 
 
 # Función para obtener las temporadas disponibles
-def get_available_seasons(driver, series_url, worker_id=0):
-    """Obtiene las temporadas disponibles para una serie."""
+def get_available_seasons(driver, series_url, worker_id=0, season_numbers=None, count_episodes=True):
+    """Obtiene las temporadas disponibles para una serie como ``(número, url, episodios)``.
+
+    Con ``season_numbers`` (las temporadas que enlaza la ficha de la serie) no
+    hay que sondear URL a URL; si además ``count_episodes`` es falso no se
+    carga ninguna página y el número de episodios es ``None``. Sin la lista se
+    sondean las temporadas en paralelo con :func:`probe_seasons`.
+    """
     logger.info(f"[Worker {worker_id}] Obteniendo temporadas disponibles para: {series_url}")
 
-    seasons = []
-    season_number = 1
-    max_empty_seasons = 3  # Máximo número de temporadas vacías consecutivas antes de parar
-    empty_seasons_count = 0
+    if not season_numbers:
+        return probe_seasons(driver, series_url, worker_id)
 
-    while empty_seasons_count < max_empty_seasons and not shutdown_event.is_set():
+    seasons = []
+    for season_number in season_numbers:
+        if shutdown_event.is_set():
+            break
         season_url = f"{series_url}/temporada-{season_number}"
-        logger.info(f"[Worker {worker_id}] Verificando temporada {season_number}: {season_url}")
+        if not count_episodes:
+            seasons.append((season_number, season_url, None))
+            continue
 
-        # Verificar si la temporada existe y tiene episodios
         season_exists, episode_count = check_season_exists(driver, season_url, worker_id)
-
         if season_exists and episode_count > 0:
             seasons.append((season_number, season_url, episode_count))
-            logger.info(f"[Worker {worker_id}] Temporada {season_number} encontrada con {episode_count} episodios")
-            empty_seasons_count = 0  # Reiniciar contador de temporadas vacías
         else:
-            empty_seasons_count += 1
-            logger.info(
-                f"[Worker {worker_id}] Temporada {season_number} no encontrada o sin episodios. Contador: {empty_seasons_count}/{max_empty_seasons}")
+            logger.info(f"[Worker {worker_id}] Temporada {season_number} enlazada pero sin episodios")
+
+    logger.info(f"[Worker {worker_id}] Temporadas enlazadas desde la ficha: {[season[0] for season in seasons]}")
+    return seasons
 
-        season_number += 1
 
-        # Evitar bucles infinitos si hay demasiadas temporadas
-        if season_number > 100:  # Límite arbitrario para evitar bucles infinitos
-            logger.warning(f"[Worker {worker_id}] Se alcanzó el límite de 100 temporadas. Finalizando búsqueda.")
-            break
+def _season_episode_count_http(season_url):
+    """Episodios de una temporada descargada por HTTP, o ``None`` si hay que usar el driver."""
+    episodes = page_memo.get("season", season_url)
+    if episodes is MISSING:
+        doc = fetch_listing_page(season_url, is_valid=lambda page: count_season_episodes(page) is not None)
+        if doc is None:
+            return None
+        episodes = parse_season(doc, BASE_URL)
+        if episodes is None:
+            return None
+        page_memo.put("season", season_url, episodes)
+    return len(episodes)
+
+
+# Función para sondear las temporadas cuando la ficha no las enlaza
+def probe_seasons(driver, series_url, worker_id=0):
+    """Sondea ``/temporada-1``, ``/temporada-2``... hasta encontrar tres vacías seguidas.
+
+    Las temporadas se piden por HTTP en bloques de ``SEASON_PROBE_BATCH`` a la
+    vez; las que no se puedan comprobar así se cargan con el driver.
+    """
+    seasons = []
+    season_number = 1
+    max_empty_seasons = 3  # Máximo número de temporadas vacías consecutivas antes de parar
+    empty_seasons_count = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SEASON_PROBE_BATCH) as executor:
+        while empty_seasons_count < max_empty_seasons and not shutdown_event.is_set():
+            # Evitar bucles infinitos si hay demasiadas temporadas
+            if season_number > 100:  # Límite arbitrario para evitar bucles infinitos
+                logger.warning(f"[Worker {worker_id}] Se alcanzó el límite de 100 temporadas. Finalizando búsqueda.")
+                break
+
+            numbers = list(range(season_number, season_number + SEASON_PROBE_BATCH))
+            season_urls = [f"{series_url}/temporada-{number}" for number in numbers]
+            logger.info(f"[Worker {worker_id}] Verificando temporadas {numbers[0]}-{numbers[-1]} de {series_url}")
+            counts = list(executor.map(_season_episode_count_http, season_urls))
+
+            for number, season_url, episode_count in zip(numbers, season_urls, counts):
+                if episode_count is None:
+                    # Verificar con el driver si la temporada existe y tiene episodios
+                    _, episode_count = check_season_exists(driver, season_url, worker_id)
+
+                if episode_count > 0:
+                    seasons.append((number, season_url, episode_count))
+                    logger.info(f"[Worker {worker_id}] Temporada {number} encontrada con {episode_count} episodios")
+                    empty_seasons_count = 0  # Reiniciar contador de temporadas vacías
+                else:
+                    empty_seasons_count += 1
+                    logger.info(
+                        f"[Worker {worker_id}] Temporada {number} no encontrada o sin episodios. Contador: {empty_seasons_count}/{max_empty_seasons}")
+                    if empty_seasons_count >= max_empty_seasons:
+                        break
+
+            season_number += SEASON_PROBE_BATCH
 
     return seasons
 
 
+# Función para cargar y analizar una temporada una sola vez por ejecución
+def load_season(driver, season_url, worker_id=0):
+    """Episodios de una temporada (``[{"number", "title", "url"}]``) o ``None`` sin contenedor.
+
+    Los análisis correctos se guardan en ``page_memo``, así que cada temporada
+    se carga como mucho una vez por ejecución aunque la comprueben varias
+    funciones. Una página sin contenedor o que necesitó reintentos no se
+    guarda: la siguiente comprobación vuelve a cargarla.
+    """
+    episodes = page_memo.get("season", season_url)
+    if episodes is not MISSING:
+        logger.debug(f"[Worker {worker_id}] Temporada ya analizada en esta ejecución: {season_url}")
+        return episodes
+
+    # Usar un enfoque más robusto para cargar la página
+    load_failed = False
+    for attempt in range(3):  # Intentar hasta 3 veces
+        try:
+            load(driver, season_url, "season")
+            break
+        except Exception as e:
+            load_failed = True
+            if attempt < 2:  # Si no es el último intento
+                logger.warning(f"[Worker {worker_id}] Error al cargar la temporada, reintentando: {e}")
+                time.sleep(2)
+            else:
+                raise  # Si es el último intento, propagar la excepción
+
+    # Analizar los episodios antes de navegar a ninguno de ellos
+    episodes = extract_page(driver, "season")
+    if episodes is not None and not load_failed:
+        page_memo.put("season", season_url, episodes)
+    return episodes
+
+
 # Función para verificar si una temporada existe comprobando si tiene episodios
 def check_season_exists(driver, season_url, worker_id=0):
     """Verifica si una temporada existe comprobando si tiene episodios."""
     logger.info(f"[Worker {worker_id}] Verificando si la temporada existe: {season_url}")
 
     try:
-        # Usar un enfoque más robusto para cargar la página
-        for attempt in range(3):  # Intentar hasta 3 veces
-            try:
-                driver.get(season_url)
-                time.sleep(2)  # Esperar a que cargue la página
-                break
-            except Exception as e:
-                if attempt < 2:  # Si no es el último intento
-                    logger.warning(f"[Worker {worker_id}] Error al cargar la temporada, reintentando: {e}")
-                    time.sleep(2)
-                else:
-                    raise  # Si es el último intento, propagar la excepción
-
-        # Usar BeautifulSoup para analizar la página en lugar de interactuar directamente con el DOM
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Buscar el contenedor de episodios
-        season_episodes_div = soup.find("div", id="season-episodes")
-        if not season_episodes_div:
+        episodes = load_season(driver, season_url, worker_id)
+        if episodes is None:
             logger.info(f"[Worker {worker_id}] No se encontró el contenedor de episodios en {season_url}")
             return False, 0
-
-        # Contar los episodios
-        episode_divs = season_episodes_div.find_all("div", class_="span-6 tt view show-view")
-        episode_count = len(episode_divs)
+        episode_count = len(episodes)
 
         logger.info(f"[Worker {worker_id}] Temporada tiene {episode_count} episodios")
 
@@ -970,69 +964,25 @@ def check_season_exists(driver, season_url, worker_id=0):
         return False, 0
 
 
-# Función para procesar episodios usando BeautifulSoup
-def process_episodes_with_soup(driver, season_url, worker_id=0):
-    """Procesa los episodios de una temporada usando BeautifulSoup para evitar errores de elementos obsoletos."""
-    logger.info(f"[Worker {worker_id}] Procesando episodios con BeautifulSoup: {season_url}")
+# Función para procesar episodios a partir del HTML de la temporada
+def process_season_episodes(driver, season_url, worker_id=0):
+    """Procesa los episodios de una temporada analizando su HTML para evitar errores de elementos obsoletos."""
+    logger.info(f"[Worker {worker_id}] Procesando episodios de la temporada: {season_url}")
 
     episodes_data = []
 
     try:
-        # Usar un enfoque más robusto para cargar la página
-        for attempt in range(3):  # Intentar hasta 3 veces
-            try:
-                driver.get(season_url)
-                time.sleep(2)  # Esperar a que cargue la página
-                break
-            except Exception as e:
-                if attempt < 2:  # Si no es el último intento
-                    logger.warning(f"[Worker {worker_id}] Error al cargar la temporada, reintentando: {e}")
-                    time.sleep(2)
-                else:
-                    raise  # Si es el último intento, propagar la excepción
-
-        # Obtener el HTML de la página
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Buscar el contenedor de episodios
-        season_episodes_div = soup.find("div", id="season-episodes")
-        if not season_episodes_div:
+        episodes = load_season(driver, season_url, worker_id)
+        if episodes is None:
             logger.warning(f"[Worker {worker_id}] No se encontró el contenedor de episodios en {season_url}")
             return episodes_data
+        logger.info(f"[Worker {worker_id}] Encontrados {len(episodes)} episodios en {season_url}")
 
-        # Encontrar todos los episodios
-        episode_divs = season_episodes_div.find_all("div", class_="span-6 tt view show-view")
-        logger.info(f"[Worker {worker_id}] Encontrados {len(episode_divs)} episodios en {season_url}")
-
-        for episode_div in episode_divs:
+        for episode in episodes:
             try:
-                # Extraer número de episodio
-                rating_div = episode_div.find("div", class_="rating")
-                if not rating_div:
-                    logger.warning(f"[Worker {worker_id}] No se encontró el div de rating para un episodio")
-                    continue
-
-                episode_text = rating_div.text.strip()
-                episode_match = re.search(r'(\d+)x(\d+)', episode_text)
-
-                if not episode_match:
-                    logger.warning(f"[Worker {worker_id}] No se pudo extraer el número de episodio: {episode_text}")
-                    continue
-
-                episode_number = int(episode_match.group(2))
-
-                # Extraer título del episodio
-                title_elem = episode_div.find("a", class_="link title-ellipsis")
-                if not title_elem:
-                    logger.warning(f"[Worker {worker_id}] No se encontró el título para el episodio {episode_number}")
-                    continue
-
-                episode_title = title_elem.get("title", "").split(" - ")[-1]
-                episode_url = title_elem.get("href", "")
-
-                if not episode_url.startswith("http"):
-                    episode_url = BASE_URL + episode_url
+                episode_number = episode["number"]
+                episode_title = episode["title"]
+                episode_url = episode["url"]
 
                 logger.info(
                     f"[Worker {worker_id}] Procesando episodio {episode_number}: {episode_title} - {episode_url}")
@@ -1040,11 +990,7 @@ def process_episodes_with_soup(driver, season_url, worker_id=0):
                 # Extraer enlaces del episodio
                 episode_links = extract_episode_links(driver, episode_url, worker_id)
 
-                episodes_data.append({
-                    "number": episode_number,
-                    "title": episode_title,
-                    "links": episode_links
-                })
+                episodes_data.append(Episode(episode_number, episode_title, episode_url, tuple(episode_links)))
 
             except Exception as e:
                 logger.error(f"[Worker {worker_id}] Error al procesar episodio: {e}")
@@ -1054,7 +1000,7 @@ def process_episodes_with_soup(driver, season_url, worker_id=0):
         return episodes_data
 
     except Exception as e:
-        logger.error(f"[Worker {worker_id}] Error al procesar episodios con BeautifulSoup: {e}")
+        logger.error(f"[Worker {worker_id}] Error al procesar episodios de la temporada: {e}")
         logger.debug(traceback.format_exc())
         return episodes_data
 
@@ -1066,47 +1012,33 @@ def extract_series_details(driver, series_url, basic_info, worker_id=0):
 
     try:
         # Usar la información básica que ya tenemos
-        series_title = basic_info["title"]
-        series_year = basic_info["year"]
-        imdb_rating = basic_info["imdb_rating"]
-        genre = basic_info["genre"]
-        status = basic_info["status"]
-        director = basic_info.get("director")
+        series_title = basic_info.title
 
         # Extraer temporadas
         seasons_data = []
 
-        # Obtener todas las temporadas disponibles
-        seasons = get_available_seasons(driver, series_url, worker_id)
+        # Obtener todas las temporadas disponibles (cada una se carga una sola vez, al procesarla)
+        seasons = get_available_seasons(
+            driver, series_url, worker_id, basic_info.season_numbers, count_episodes=False
+        )
 
         if not seasons:
             logger.warning(f"[Worker {worker_id}] No se encontraron temporadas para la serie: {series_title}")
             # Devolver la información básica sin temporadas
-            return {
-                "title": series_title,
-                "url": series_url,
-                "year": series_year,
-                "imdb_rating": imdb_rating,
-                "genre": genre,
-                "status": status,
-                "director": director,
-                "seasons": []
-            }
+            return basic_info
 
         # Procesar cada temporada encontrada
         for season_number, season_url, episode_count in seasons:
             logger.info(
-                f"[Worker {worker_id}] Procesando temporada {season_number}: {season_url} con {episode_count} episodios")
+                f"[Worker {worker_id}] Procesando temporada {season_number}: {season_url}"
+                + (f" con {episode_count} episodios" if episode_count is not None else ""))
 
             try:
-                # Usar BeautifulSoup para procesar los episodios y evitar errores de elementos obsoletos
-                episodes_data = process_episodes_with_soup(driver, season_url, worker_id)
+                # Analizar el HTML de la temporada para evitar errores de elementos obsoletos
+                episodes_data = process_season_episodes(driver, season_url, worker_id)
 
                 if episodes_data:
-                    seasons_data.append({
-                        "number": season_number,
-                        "episodes": episodes_data
-                    })
+                    seasons_data.append(Season(season_number, tuple(episodes_data)))
                 else:
                     logger.warning(
                         f"[Worker {worker_id}] No se encontraron episodios para la temporada {season_number}")
@@ -1116,16 +1048,7 @@ def extract_series_details(driver, series_url, basic_info, worker_id=0):
                 logger.debug(traceback.format_exc())
                 continue
 
-        return {
-            "title": series_title,
-            "url": series_url,
-            "year": series_year,
-            "imdb_rating": imdb_rating,
-            "genre": genre,
-            "status": status,
-            "director": director,
-            "seasons": seasons_data
-        }
+        return replace(basic_info, seasons=tuple(seasons_data))
 
     except Exception as e:
         logger.error(f"[Worker {worker_id}] Error al extraer detalles de la serie {series_url}: {e}")
@@ -1145,8 +1068,7 @@ def extract_episode_links(driver, episode_url, worker_id=0):
         # Implementar reintentos para cargar la página
         for attempt in range(max_retries):
             try:
-                driver.get(episode_url)
-                time.sleep(2)  # Esperar a que cargue la página
+                load(driver, episode_url, "episode")
 
                 # Esperar a que aparezca la lista de enlaces
                 WebDriverWait(driver, 10).until(
@@ -1170,132 +1092,74 @@ def extract_episode_links(driver, episode_url, worker_id=0):
                         f"[Worker {worker_id}] Error al cargar la página después de {max_retries} intentos: {e}")
                     return links
 
-        # Obtener el HTML de la página para analizar con BeautifulSoup
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Buscar todos los selectores de enlaces
-        embed_selectors = soup.find_all("div", class_="embed-selector")
+        # Extraer la página una sola vez
+        page = extract_page(driver, "embeds")
+        embed_selectors = page["embeds"]
         logger.info(f"[Worker {worker_id}] Encontrados {len(embed_selectors)} enlaces en episodio {episode_url}")
 
+        # Deducir los iframes desde el HTML; sólo se hace clic en los que no se resuelvan
+        try:
+            resolved_urls = resolve_page_embeds(page)
+        except Exception as e:
+            logger.debug(f"[Worker {worker_id}] No se pudieron resolver los enlaces sin clic: {e}")
+            resolved_urls = []
+
+        # Los que falten se recogen, si está activado, con un único script en el navegador
+        resolved_urls, harvested = harvest_pending_embeds(driver, len(embed_selectors), resolved_urls)
+
         # Procesar cada selector de enlace
-        for i, selector_soup in enumerate(embed_selectors):
+        for i, embed_info in enumerate(embed_selectors):
             try:
-                # Extraer información del enlace
-                # Buscar el idioma en el elemento h5 con clase "left"
-                h5_left = selector_soup.find("h5", class_="left")
-                language = "Desconocido"
-
-                if h5_left:
-                    # Buscar el elemento b con clase "key" que contiene "Idioma:"
-                    idioma_key = h5_left.find("b", class_="key", string=lambda s: s and "Idioma:" in s if s else False)
-                    if idioma_key:
-                        # El idioma está en el texto que sigue al elemento b
-                        idioma_text = idioma_key.next_sibling
-                        if idioma_text:
-                            language = idioma_text.strip()
-
-                # Si no se encontró el idioma con el método anterior, usar el método alternativo
-                if language == "Desconocido":
-                    if "Audio Español" in selector_soup.text:
-                        language = "Audio Español"
-                    elif "Subtítulo Español" in selector_soup.text:
-                        language = "Subtítulo Español"
-                    elif "Audio Latino" in selector_soup.text:
-                        language = "Audio Latino"
-                    elif "Audio Original" in selector_soup.text:
-                        language = "Audio Original"
-
-                # Extraer servidor
-                server_elem = selector_soup.find("b", class_="provider")
-                server = server_elem.text.strip() if server_elem else "Desconocido"
-
-                # Extraer calidad
-                quality = "HD1080"  # Valor por defecto
-                if "HD1080" in selector_soup.text:
-                    quality = "HD1080"
-                elif "HD720" in selector_soup.text:
-                    quality = "HD720"
-                elif "SD" in selector_soup.text:
-                    quality = "SD"
-
                 logger.debug(
-                    f"[Worker {worker_id}] Enlace {i + 1}: Idioma={language}, Servidor={server}, Calidad={quality}")
+                    f"[Worker {worker_id}] Enlace {i + 1}: Idioma={embed_info['language']}, "
+                    f"Servidor={embed_info['server']}")
 
-                # Ahora necesitamos hacer clic en el selector para mostrar el enlace
-                # Para esto, necesitamos usar Selenium
-                try:
-                    # Crear un nuevo driver para cada enlace para evitar problemas de conexión
-                    temp_driver = None
-                    try:
-                        # Usar el driver existente primero
-                        # Encontrar el selector en la página actual usando un identificador único
-                        selector_elements = driver.find_elements(By.CLASS_NAME, "embed-selector")
-
-                        if i < len(selector_elements):
-                            # Hacer clic en el selector
-                            try:
-                                selector_elements[i].click()
-                                time.sleep(1)  # Esperar a que se muestre el enlace
-                            except Exception as click_error:
-                                logger.warning(
-                                    f"[Worker {worker_id}] Error al hacer clic en el selector {i + 1}: {click_error}")
-                                # Si falla el clic, intentar con JavaScript
-                                driver.execute_script("arguments[0].click();", selector_elements[i])
-                                time.sleep(1)
-
-                            # Buscar el iframe con el enlace
-                            try:
-                                embed_movie = WebDriverWait(driver, 5).until(
-                                    EC.presence_of_element_located((By.CLASS_NAME, "embed-movie"))
-                                )
-                                iframe = embed_movie.find_element(By.TAG_NAME, "iframe")
-                                link_url = iframe.get_attribute("src")
-
-                                # Añadir el enlace a la lista
-                                links.append({
-                                    "language": language,
-                                    "server": server,
-                                    "quality": quality,
-                                    "url": link_url
-                                })
-
-                                logger.info(f"[Worker {worker_id}] Enlace extraído: {link_url}")
-                            except (TimeoutException, NoSuchElementException, StaleElementReferenceException) as e:
-                                logger.error(f"[Worker {worker_id}] Error al obtener iframe: {e}")
-                                # Intentar extraer el enlace directamente del HTML
-                                try:
-                                    updated_page_source = driver.page_source
-                                    updated_soup = BeautifulSoup(updated_page_source, "html.parser")
-                                    embed_movie_div = updated_soup.find("div", class_="embed-movie")
-                                    if embed_movie_div:
-                                        iframe_tag = embed_movie_div.find("iframe")
-                                        if iframe_tag and 'src' in iframe_tag.attrs:
-                                            link_url = iframe_tag['src']
-                                            links.append({
-                                                "language": language,
-                                                "server": server,
-                                                "quality": quality,
-                                                "url": link_url
-                                            })
-                                            logger.info(f"[Worker {worker_id}] Enlace extraído desde HTML: {link_url}")
-                                except Exception as html_error:
-                                    logger.error(
-                                        f"[Worker {worker_id}] Error al extraer enlace desde HTML: {html_error}")
-                        else:
-                            logger.warning(
-                                f"[Worker {worker_id}] No se pudo encontrar el selector {i + 1} en la página")
-
-                    except Exception as e:
-                        logger.error(f"[Worker {worker_id}] Error al hacer clic en el selector {i + 1}: {e}")
+                if i in harvested and not resolved_urls[i]:
+                    # El script ya hizo clic y el iframe no cambió
+                    logger.debug(f"[Worker {worker_id}] Sin enlace para el selector {i + 1} tras el clic en el navegador")
+                    continue
+
+                link_url = resolved_urls[i]
+                if link_url:
+                    logger.info(f"[Worker {worker_id}] Enlace resuelto sin clic: {link_url}")
+                else:
+                    # Hacer clic en el selector para mostrar el enlace
+                    selector_elements = driver.find_elements(By.CLASS_NAME, "embed-selector")
+                    if i >= len(selector_elements):
+                        logger.warning(f"[Worker {worker_id}] No se pudo encontrar el selector {i + 1} en la página")
                         continue
-                    finally:
-                        if temp_driver:
-                            temp_driver.quit()
 
-                except Exception as e:
-                    logger.error(f"[Worker {worker_id}] Error al procesar selector {i + 1}: {e}")
-                    continue
+                    # Hacer clic en el selector y esperar a que cambie el iframe
+                    previous_src = current_embed_src(driver)
+                    try:
+                        selector_elements[i].click()
+                    except Exception as click_error:
+                        logger.warning(
+                            f"[Worker {worker_id}] Error al hacer clic en el selector {i + 1}: {click_error}")
+                        # Si falla el clic, intentar con JavaScript
+                        driver.execute_script("arguments[0].click();", selector_elements[i])
+                    wait_for(driver, "embed", arg=previous_src)
+
+                    # Buscar el iframe con el enlace
+                    try:
+                        embed_movie = WebDriverWait(driver, 5).until(
+                            EC.presence_of_element_located((By.CLASS_NAME, "embed-movie"))
+                        )
+                        link_url = embed_movie.find_element(By.TAG_NAME, "iframe").get_attribute("src")
+                        logger.info(f"[Worker {worker_id}] Enlace extraído: {link_url}")
+                    except (TimeoutException, NoSuchElementException, StaleElementReferenceException) as e:
+                        logger.error(f"[Worker {worker_id}] Error al obtener iframe: {e}")
+                        # Intentar extraer el enlace directamente del HTML
+                        link_url = current_embed_src(driver)
+                        if link_url:
+                            logger.info(f"[Worker {worker_id}] Enlace extraído desde HTML: {link_url}")
+
+                # Los identificadores los pone el procesador de la BD al guardar el episodio
+                link_data = embed_link_data(embed_info, link_url)
+                if link_data:
+                    links.append(link_data)
+                else:
+                    logger.debug(f"[Worker {worker_id}] Enlace {i + 1} descartado: falta idioma, servidor o URL")
 
             except Exception as e:
                 logger.error(f"[Worker {worker_id}] Error al procesar selector {i + 1}: {e}")
@@ -1369,7 +1233,7 @@ def worker3_db_processor(db_path, progress_data, worker_id=0):
                 series_data_queue_odd.task_done()
                 with progress_lock:
                     progress_data['last_series_url'] = series_url
-                    progress_data['last_series_title'] = series_data.get('title')
+                    progress_data['last_series_title'] = series_data.title
                     save_progress(PROGRESS_FILE, progress_data)
 
         except Exception:
@@ -1438,7 +1302,7 @@ def worker6_db_processor(db_path, progress_data, worker_id=0):
                 series_data_queue_even.task_done()
                 with progress_lock:
                     progress_data['last_series_url'] = series_url
-                    progress_data['last_series_title'] = series_data.get('title')
+                    progress_data['last_series_title'] = series_data.title
                     save_progress(PROGRESS_FILE, progress_data)
 
         except Exception:
@@ -1449,7 +1313,7 @@ def worker6_db_processor(db_path, progress_data, worker_id=0):
 
 # Función para guardar una serie en la base de datos
 def save_series_to_db(series_data, series_exists=False, db_path=None, progress_data=None):
-    """Guarda una serie y sus temporadas/episodios en la base de datos."""
+    """Guarda una serie (:class:`records.Series`) y sus temporadas/episodios en la base de datos."""
     if not series_data:
         return False
 
@@ -1461,22 +1325,22 @@ def save_series_to_db(series_data, series_exists=False, db_path=None, progress_d
     try:
         # Si la serie ya existe, usar el ID existente
         if series_exists:
-            series_id = series_data.get("id")
-            logger.info(f"Usando serie existente con ID {series_id}: {series_data['title']}")
+            series_id = series_data.id
+            logger.info(f"Usando serie existente con ID {series_id}: {series_data.title}")
 
             # Actualizar información de la serie si es necesario
             cursor.execute('''
                 UPDATE media_downloads
                 SET year=?, imdb_rating=?, genre=?, updated_at=datetime('now')
                 WHERE id=?
-            ''', (series_data["year"], series_data["imdb_rating"], series_data["genre"], series_id))
+            ''', (series_data.year, series_data.imdb_rating, series_data.genre, series_id))
         else:
             # Insertar nueva serie
-            logger.info(f"Insertando nueva serie: {series_data['title']} ({series_data['year']})")
+            logger.info(f"Insertando nueva serie: {series_data.title} ({series_data.year})")
             cursor.execute('''
                 INSERT INTO media_downloads (title, year, imdb_rating, genre, type)
                 VALUES (?, ?, ?, ?, 'serie')
-            ''', (series_data["title"], series_data["year"], series_data["imdb_rating"], series_data["genre"]))
+            ''', (series_data.title, series_data.year, series_data.imdb_rating, series_data.genre))
             series_id = cursor.lastrowid
             if not series_id:
                 logger.error(f"Error al insertar la serie. Abortando.")
@@ -1485,9 +1349,13 @@ def save_series_to_db(series_data, series_exists=False, db_path=None, progress_d
             with stats_lock:
                 stats['new_series'] += 1
 
+        # IDs de servidores y calidades ya resueltos para esta serie
+        server_ids = {}
+        quality_ids = {}
+
         # Procesar temporadas y episodios
-        for season_data in series_data["seasons"]:
-            season_number = season_data["number"]
+        for season_data in series_data.seasons:
+            season_number = season_data.number
 
             # Verificar si la temporada existe
             season_exists_flag, season_id = season_exists(series_id, season_number, connection, db_path)
@@ -1512,9 +1380,9 @@ def save_series_to_db(series_data, series_exists=False, db_path=None, progress_d
                     stats['skipped_seasons'] += 1
 
             # Procesar episodios
-            for episode_data in season_data["episodes"]:
-                episode_number = episode_data["number"]
-                episode_title = episode_data["title"]
+            for episode_data in season_data.episodes:
+                episode_number = episode_data.number
+                episode_title = episode_data.title
 
                 # Verificar si el episodio existe
                 episode_exists_flag, episode_id = episode_exists(season_id, episode_number, episode_title)
@@ -1539,62 +1407,51 @@ def save_series_to_db(series_data, series_exists=False, db_path=None, progress_d
                         stats['skipped_episodes'] += 1
 
                 # Procesar enlaces del episodio
-                if "links" in episode_data and episode_data["links"]:
-                    for link_data in episode_data["links"]:
+                if episode_data.links:
+                    rows = []
+                    for link_data in episode_data.links:
                         # Insertar servidor si no existe
-                        cursor.execute("SELECT id FROM servers WHERE name = ?", (link_data["server"],))
-                        server_result = cursor.fetchone()
-                        if server_result:
-                            server_id = server_result[0]
-                        else:
-                            cursor.execute("INSERT INTO servers (name) VALUES (?)", (link_data["server"],))
-                            server_id = cursor.lastrowid
+                        if link_data.server not in server_ids:
+                            cursor.execute("SELECT id FROM servers WHERE name = ?", (link_data.server,))
+                            server_result = cursor.fetchone()
+                            if server_result:
+                                server_ids[link_data.server] = server_result[0]
+                            else:
+                                cursor.execute("INSERT INTO servers (name) VALUES (?)", (link_data.server,))
+                                server_ids[link_data.server] = cursor.lastrowid
 
                         # Insertar calidad si no existe
-                        cursor.execute("SELECT quality_id FROM qualities WHERE quality = ?", (link_data["quality"],))
-                        quality_result = cursor.fetchone()
-                        if quality_result:
-                            quality_id = quality_result[0]
-                        else:
-                            cursor.execute("INSERT INTO qualities (quality) VALUES (?)", (link_data["quality"],))
-                            quality_id = cursor.lastrowid
-
-                        # Verificar si el enlace ya existe
-                        cursor.execute(
-                            "SELECT id FROM links_files_download WHERE episode_id = ? AND server_id = ? AND link = ?",
-                            (episode_id, server_id, link_data["url"])
-                        )
-                        link_exists = cursor.fetchone()
-
-                        if not link_exists:
-                            # Insertar el enlace
-                            cursor.execute(
-                                """
-                                INSERT INTO links_files_download 
-                                (movie_id, server_id, language, link, quality_id, episode_id) 
-                                VALUES (?, ?, ?, ?, ?, ?)
-                                """,
-                                (series_id, server_id, link_data["language"], link_data["url"], quality_id, episode_id)
-                            )
-                            log_link_insertion(
-                                logger,
-                                episode_id=episode_id,
-                                server=link_data['server'],
-                                language=link_data['language'],
-                            )
-                            with stats_lock:
-                                stats['new_links'] += 1
-                            with total_saved_lock:
-                                total_saved += 1
-                            if progress_data is not None:
-                                with progress_lock:
-                                    progress_data['total_saved'] = total_saved
-                        else:
-                            logger.debug(
-                                f"Enlace ya existe: episode_id={episode_id}, server={link_data['server']}, language={link_data['language']}"
-                            )
+                        if link_data.quality not in quality_ids:
+                            cursor.execute("SELECT quality_id FROM qualities WHERE quality = ?", (link_data.quality,))
+                            quality_result = cursor.fetchone()
+                            if quality_result:
+                                quality_ids[link_data.quality] = quality_result[0]
+                            else:
+                                cursor.execute("INSERT INTO qualities (quality) VALUES (?)", (link_data.quality,))
+                                quality_ids[link_data.quality] = cursor.lastrowid
+
+                        rows.append((
+                            series_id, episode_id, server_ids[link_data.server], link_data.language,
+                            link_data.url, quality_ids[link_data.quality],
+                        ))
+
+                    # Los enlaces que ya existen los descarta la BD
+                    new_links = insert_link_rows(cursor, rows)
+                    logger.debug(
+                        f"Episodio {episode_number}: {new_links} enlaces nuevos de {len(rows)} (episode_id={episode_id})"
+                    )
+                    if new_links:
+                        with stats_lock:
+                            stats['new_links'] += new_links
+                        with total_saved_lock:
+                            total_saved += new_links
+                        if progress_data is not None:
+                            with progress_lock:
+                                progress_data['total_saved'] = total_saved
 
         connection.commit()
+        if not series_exists:
+            title_index.add(series_id, 'serie', series_data.title, series_data.year)
         return True
 
     except Exception as e:
@@ -1658,6 +1515,10 @@ def process_all_series(start_page=None, max_pages=None, db_path=None, max_worker
         )
         return
 
+    # Las comprobaciones de existencia se hacen contra el índice de títulos en memoria
+    global title_index
+    title_index = get_title_index(db_path)
+
     # Usar el número de workers especificado o el valor por defecto
     if max_workers is None:
         max_workers = MAX_WORKERS
@@ -1682,6 +1543,7 @@ def process_all_series(start_page=None, max_pages=None, db_path=None, max_worker
 
         # Limpiar caché antes de comenzar
         clear_cache()
+        page_memo.clear()
 
         # Cargar progreso anterior y sincronizar total de enlaces
         progress_data = load_progress(PROGRESS_FILE, {})
@@ -1696,43 +1558,15 @@ def process_all_series(start_page=None, max_pages=None, db_path=None, max_worker
         total_saved = progress_data['total_saved']
         logger.info(f"Enlaces guardados previamente: {total_saved}")
 
-        # Crear drivers para los workers
-        driver_odd = create_driver()  # Para Worker 1 (páginas impares)
-        driver_even = create_driver()  # Para Worker 4 (páginas pares)
-        driver_worker2 = create_driver()  # Para Worker 2 (procesa series de páginas impares)
-        driver_worker5 = create_driver()  # Para Worker 5 (procesa series de páginas pares)
-
-        # Iniciar sesión con todos los drivers
-        if not login(driver_odd, logger):
-            logger.error("No se pudo iniciar sesión con driver_odd. Abortando procesamiento de series.")
-            driver_odd.quit()
-            driver_even.quit()
-            driver_worker2.quit()
-            driver_worker5.quit()
-            return
+        # Obtener drivers autenticados del pool compartido
+        pool = get_driver_pool(size=4)
+        driver_odd = pool.acquire()  # Para Worker 1 (páginas impares)
+        driver_even = pool.acquire()  # Para Worker 4 (páginas pares)
+        driver_worker2 = pool.acquire()  # Para Worker 2 (procesa series de páginas impares)
+        driver_worker5 = pool.acquire()  # Para Worker 5 (procesa series de páginas pares)
 
-        if not login(driver_even, logger):
-            logger.error("No se pudo iniciar sesión con driver_even. Abortando procesamiento de series.")
-            driver_odd.quit()
-            driver_even.quit()
-            driver_worker2.quit()
-            driver_worker5.quit()
-            return
-
-        if not login(driver_worker2, logger):
-            logger.error("No se pudo iniciar sesión con driver_worker2. Abortando procesamiento de series.")
-            driver_odd.quit()
-            driver_even.quit()
-            driver_worker2.quit()
-            driver_worker5.quit()
-            return
-
-        if not login(driver_worker5, logger):
-            logger.error("No se pudo iniciar sesión con driver_worker5. Abortando procesamiento de series.")
-            driver_odd.quit()
-            driver_even.quit()
-            driver_worker2.quit()
-            driver_worker5.quit()
+        if None in (driver_odd, driver_even, driver_worker2, driver_worker5):
+            logger.error("No se pudo iniciar sesión con todos los drivers. Abortando procesamiento de series.")
             return
 
         # Iniciar todos los workers en paralelo
@@ -1798,12 +1632,6 @@ def process_all_series(start_page=None, max_pages=None, db_path=None, max_worker
         for thread in threads:
             thread.join()
 
-        # Cerrar todos los drivers
-        driver_odd.quit()
-        driver_even.quit()
-        driver_worker2.quit()
-        driver_worker5.quit()
-
         # Guardar progreso final
         save_progress(PROGRESS_FILE, progress_data)
         with total_saved_lock:
@@ -1826,18 +1654,28 @@ def process_all_series(start_page=None, max_pages=None, db_path=None, max_worker
             save_progress(PROGRESS_FILE, progress_data)
         except Exception:
             pass
-        # Asegurarse de que todos los drivers se cierren
-        try:
-            if 'driver_odd' in locals() and driver_odd:
-                driver_odd.quit()
-            if 'driver_even' in locals() and driver_even:
-                driver_even.quit()
-            if 'driver_worker2' in locals() and driver_worker2:
-                driver_worker2.quit()
-            if 'driver_worker5' in locals() and driver_worker5:
-                driver_worker5.quit()
-        except Exception:
-            pass
+        # Cerrar todos los drivers (incluidos los reciclados por los workers)
+        close_driver_pool()
+        extract_stats = get_extract_stats()
+        logger.info(
+            f"Páginas extraídas en el navegador: {extract_stats['browser']}, "
+            f"con page_source: {extract_stats['page_source']} ({extract_stats['fallbacks']} fallos del extractor)"
+        )
+        memo_stats = page_memo.stats()
+        logger.info(
+            f"Páginas reutilizadas en la ejecución: {memo_stats['hits']} aciertos, "
+            f"{memo_stats['misses']} fallos ({memo_stats['entries']} guardadas)"
+        )
+        if extract_stats['harvested'] or extract_stats['harvest_failures']:
+            logger.info(
+                f"Recogidas de enlaces en el navegador: {extract_stats['harvested']} "
+                f"({extract_stats['harvest_failures']} fallos)"
+            )
+        close_page_archive()
+        close_parse_pool()
+        close_db_connections()
+        close_title_indexes()
+        log_wait_stats(logger)
 
 
 # Punto de entrada principal
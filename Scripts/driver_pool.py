@@ -0,0 +1,301 @@
+"""Pool compartido de drivers de Selenium autenticados.
+
+Todos los scrapers de HDFull obtienen sus navegadores de aquí en lugar de
+crearlos e iniciar sesión por su cuenta. El pool:
+
+* crea los drivers bajo demanda (hasta ``size``) reutilizando la sesión
+  guardada y sólo hace login completo si ha caducado;
+* comprueba que el driver sigue vivo antes de prestarlo;
+* recicla un driver tras ``max_pages`` páginas o si su árbol de procesos
+  supera ``max_rss_mb`` (requiere ``psutil``, opcional);
+* deja de prestar y cierra todos los drivers cuando se activa
+  ``shutdown_event``.
+
+Con ``tabs_per_browser`` > 1 cada driver prestado es una pestaña de un Chrome
+compartido (ver :mod:`browser_tabs`): el mismo número de workers necesita
+muchos menos navegadores.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:  # pragma: no cover - dependencia opcional para medir memoria
+    import psutil  # type: ignore
+except Exception:  # pragma: no cover
+    psutil = None
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from . import scraper_utils
+    from .browser_tabs import SharedBrowser
+except ImportError:  # pragma: no cover
+    import scraper_utils
+    from browser_tabs import SharedBrowser
+
+logger = logging.getLogger(__name__)
+
+shutdown_event = scraper_utils.get_shutdown_event()
+
+# Cada cuántas páginas se mide la memoria de un driver
+RSS_CHECK_EVERY = 20
+
+
+def _driver_rss_mb(driver):
+    """Memoria residente (MB) de chromedriver y sus navegadores hijos."""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def is_alive(driver):
+    """Comprobación barata de que el navegador responde."""
+    try:
+        driver.execute_script("return 1;")
+        return True
+    except Exception:
+        return False
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.debug(f"Error al cerrar el driver: {e}")
+
+
+class DriverPool:
+    """Pool de drivers autenticados con comprobación de salud y reciclado."""
+
+    def __init__(self, size=None, headless=True, max_pages=None, max_rss_mb=None, tabs_per_browser=None):
+        self.size = max(1, int(size or scraper_utils.MAX_WORKERS))
+        self.headless = headless
+        self.tabs_per_browser = max(1, int(tabs_per_browser or scraper_utils.TABS_PER_BROWSER))
+        self.max_pages = max_pages or scraper_utils.DRIVER_MAX_PAGES
+        self.max_rss_mb = scraper_utils.DRIVER_MAX_RSS_MB if max_rss_mb is None else max_rss_mb
+        self.created = 0
+        self.recycled = 0
+        self._idle = deque()
+        self._pages = {}  # id(driver) -> páginas servidas
+        self._leased = {}  # id(driver) -> driver prestado
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._browsers = []  # navegadores compartidos en modo pestañas
+        self._browsers_lock = threading.Lock()
+        self._closed = False
+
+    # -- Creación y reciclado -------------------------------------------------
+    def _new_tab(self):
+        """Abre una pestaña en un navegador con hueco o en uno nuevo."""
+        with self._browsers_lock:
+            self._browsers = [b for b in self._browsers if b.tab_count or not b.retiring]
+            for browser in self._browsers:
+                if not browser.retiring and browser.tab_count < self.tabs_per_browser:
+                    try:
+                        return browser.open_tab()
+                    except Exception as e:
+                        logger.warning(f"No se pudo abrir una pestaña; se retira el navegador: {e}")
+                        browser.retiring = True
+            try:
+                lean = scraper_utils.LEAN_BROWSER_ENABLED
+                browser = SharedBrowser(
+                    scraper_utils.create_driver(headless=self.headless, page_load_strategy="none"),
+                    lean=lean,
+                    blocked_urls=scraper_utils.LEAN_BLOCKED_URLS if lean else None,
+                )
+            except Exception as e:
+                logger.error(f"No se pudo crear el navegador compartido: {e}")
+                return None
+            driver = browser.open_tab()
+            if not scraper_utils.ensure_logged_in(driver, logger):
+                logger.error("No se pudo iniciar sesión con el nuevo navegador")
+                quit_driver(driver)
+                return None
+            self._browsers.append(browser)
+            logger.debug(f"Navegador compartido creado ({len(self._browsers)} en uso)")
+            return driver
+
+    def _new_driver(self):
+        """Crea un driver con la sesión iniciada; devuelve ``None`` si falla."""
+        if self.tabs_per_browser > 1:
+            driver = self._new_tab()
+            if driver is None:
+                return None
+        else:
+            try:
+                driver = scraper_utils.create_driver(headless=self.headless)
+            except Exception as e:
+                logger.error(f"No se pudo crear el driver: {e}")
+                return None
+            if not scraper_utils.ensure_logged_in(driver, logger):
+                logger.error("No se pudo iniciar sesión con el nuevo driver")
+                quit_driver(driver)
+                return None
+        with self._lock:
+            self.created += 1
+            self._pages[id(driver)] = 0
+        logger.debug(f"Driver creado y autenticado ({self.created} en total)")
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._leased.pop(id(driver), None)
+        quit_driver(driver)
+
+    def _needs_recycle(self, driver):
+        pages = self._pages.get(id(driver), 0)
+        if pages >= self.max_pages:
+            logger.info(f"Reciclando driver tras {pages} páginas")
+            return True
+        if self.max_rss_mb and pages and pages % RSS_CHECK_EVERY == 0:
+            rss = _driver_rss_mb(driver)
+            if rss is not None and rss > self.max_rss_mb:
+                logger.info(f"Reciclando driver por memoria: {rss:.0f} MB > {self.max_rss_mb} MB")
+                browser = getattr(driver, "_browser", None)
+                if browser is not None:
+                    # La memoria es del navegador entero: no admite más pestañas
+                    # y se cierra cuando sus workers lo vayan soltando
+                    browser.retiring = True
+                return True
+        return False
+
+    # -- Préstamo -------------------------------------------------------------
+    def acquire(self, timeout=None):
+        """Presta un driver autenticado y vivo.
+
+        Espera a que haya hueco libre en el pool. Devuelve ``None`` si se
+        solicita la parada, se agota ``timeout`` o no se puede crear el driver.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._slots.acquire(timeout=1):
+            if self._closed or shutdown_event.is_set():
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+        if self._closed or shutdown_event.is_set():
+            self._slots.release()
+            return None
+
+        driver = None
+        while driver is None:
+            with self._lock:
+                candidate = self._idle.popleft() if self._idle else None
+            if candidate is None:
+                driver = self._new_driver()
+                break
+            if is_alive(candidate):
+                driver = candidate
+            else:
+                logger.warning("Driver inactivo descartado del pool")
+                self._discard(candidate)
+
+        if driver is None:
+            self._slots.release()
+            return None
+        with self._lock:
+            self._leased[id(driver)] = driver
+        return driver
+
+    def release(self, driver, discard=False):
+        """Devuelve un driver al pool (o lo cierra si está roto o debe reciclarse)."""
+        if driver is None:
+            return
+        with self._lock:
+            if id(driver) not in self._leased:
+                return
+            self._leased.pop(id(driver), None)
+        if discard or self._closed or shutdown_event.is_set() or self._needs_recycle(driver):
+            self._discard(driver)
+            if not discard:
+                self.recycled += 1
+        else:
+            with self._lock:
+                self._idle.append(driver)
+        self._slots.release()
+
+    def checkpoint(self, driver):
+        """Registra una página servida por ``driver`` y lo recicla si toca.
+
+        Pensado para workers que retienen el driver durante toda la ejecución.
+        Devuelve el driver a seguir usando (el mismo u otro nuevo) o ``None``
+        si no se pudo reemplazar.
+        """
+        with self._lock:
+            if id(driver) in self._pages:
+                self._pages[id(driver)] += 1
+        if not self._needs_recycle(driver):
+            return driver
+        self.recycled += 1
+        return self.replace(driver)
+
+    def replace(self, driver):
+        """Cierra ``driver`` y presta uno nuevo en su lugar, conservando el hueco."""
+        self._discard(driver)
+        if self._closed or shutdown_event.is_set():
+            self._slots.release()
+            return None
+        new_driver = self._new_driver()
+        if new_driver is None:
+            self._slots.release()
+            return None
+        with self._lock:
+            self._leased[id(new_driver)] = new_driver
+        return new_driver
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """``with pool.lease() as driver:`` presta un driver y lo devuelve al salir."""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    # -- Cierre ---------------------------------------------------------------
+    def close(self):
+        """Cierra todos los drivers, libres y prestados."""
+        with self._lock:
+            self._closed = True
+            drivers = list(self._idle) + list(self._leased.values())
+            self._idle.clear()
+            self._leased.clear()
+            self._pages.clear()
+        for driver in drivers:
+            quit_driver(driver)
+        with self._browsers_lock:
+            self._browsers.clear()
+        logger.info(
+            f"Pool de drivers cerrado: {self.created} drivers creados, {self.recycled} reciclados"
+        )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool(size=None, headless=True):
+    """Devuelve el pool de drivers compartido del proceso.
+
+    ``size`` sólo se tiene en cuenta al crear el pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = DriverPool(size=size, headless=headless)
+        return _pool
+
+
+def close_driver_pool():
+    """Cierra el pool compartido, si existe."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
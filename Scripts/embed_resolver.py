@@ -0,0 +1,223 @@
+"""Resolución de enlaces embebidos sin hacer clic.
+
+Cada ``.embed-selector`` de HDFull acaba mostrando un ``iframe`` dentro de
+``.embed-movie``. En lugar de pulsar cada selector y esperar al iframe, este
+módulo intenta deducir su ``src`` a partir de lo que la página ya contiene:
+
+1. URLs que aparecen tal cual en los atributos del propio selector
+   (``data-*``, ``href`` u ``onclick``).
+2. Datos inline (JSON en ``<script>``) con la URL de cada enlace.
+3. El JSON codificado en base64 que la web asigna a una variable con el
+   proveedor y el código de cada enlace: es lo que usa su propio reproductor,
+   así que sólo de ahí se construyen URLs a partir de un código.
+
+Un código suelto en un atributo o en los argumentos de ``onclick`` no basta:
+puede ser un id interno de la web y la URL construida no existiría. Los
+selectores que no se puedan resolver se devuelven con ``url=None`` para que
+el llamador recurra al clic.
+"""
+
+import base64
+import binascii
+import json
+import logging
+import re
+import threading
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Plantillas de URL de inserción por servidor; ``{code}`` es el id del vídeo
+EMBED_URL_TEMPLATES = {
+    "streamtape": "https://streamtape.com/e/{code}",
+    "mixdrop": "https://mixdrop.co/e/{code}",
+    "vidmoly": "https://vidmoly.to/embed-{code}.html",
+    "powvideo": "https://powvideo.org/embed-{code}-954x562.html",
+    "streamplay": "https://streamplay.to/embed-{code}-640x360.html",
+    "doodstream": "https://dood.to/e/{code}",
+    "voe": "https://voe.sx/e/{code}",
+    "uqload": "https://uqload.com/embed-{code}.html",
+    "upstream": "https://upstream.to/embed-{code}.html",
+    "streamwish": "https://streamwish.to/e/{code}",
+    "filemoon": "https://filemoon.sx/e/{code}",
+}
+
+# Atributos del selector que pueden llevar directamente la URL del iframe
+URL_ATTRIBUTES = ("data-src", "data-url", "data-link", "data-embed", "data-iframe", "href")
+
+# Longitud mínima de un código de vídeo (descarta índices sueltos)
+MIN_CODE_LENGTH = 4
+
+# Claves habituales en los datos inline de cada enlace
+CODE_KEYS = ("code", "embed_code", "video", "id")
+URL_KEYS = ("url", "embed", "embed_url", "link", "src", "iframe")
+PROVIDER_KEYS = ("provider", "server", "host")
+
+_URL_RE = re.compile(r"""(?:https?:)?//[^\s'"<>()]+""")
+_JSON_LIST_RE = re.compile(r"\[\s*\{.*?\}\s*\]", re.S)
+_BASE64_VAR_RE = re.compile(r"""var\s+\w+\s*=\s*['"]([A-Za-z0-9+/=]{40,})['"]""")
+
+# Extensiones que nunca son un reproductor (carátulas, iconos, hojas de estilo...)
+_ASSET_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".css", ".js")
+
+_stats_lock = threading.Lock()
+_stats = {"resolved": 0, "unresolved": 0}
+
+
+def _normalize_url(url):
+    url = url.strip()
+    if url.startswith("//"):
+        return "https:" + url
+    return url
+
+
+def _embed_url(value):
+    """Devuelve ``value`` normalizada si parece la URL de un reproductor externo."""
+    if not value or not _URL_RE.match(value.strip()):
+        return None
+    url = _normalize_url(value)
+    parsed = urlparse(url)
+    if "hdfull" in parsed.netloc or parsed.path.lower().endswith(_ASSET_EXTENSIONS):
+        return None
+    return url
+
+
+def _server_name(selector):
+    tag = selector.find("b", class_="provider")
+    return tag.get_text().strip().lower() if tag else None
+
+
+def url_from_template(server, code):
+    """Construye la URL de inserción de ``server`` para ``code``, si se conoce."""
+    code = str(code).strip() if code else ""
+    if not server or len(code) < MIN_CODE_LENGTH:
+        return None
+    template = EMBED_URL_TEMPLATES.get(server.strip().lower())
+    return template.format(code=code) if template else None
+
+
+def _resolve_from_attributes(selector):
+    """Busca una URL de reproductor escrita tal cual en los atributos del selector."""
+    for node in [selector] + selector.find_all(True):
+        for attr in URL_ATTRIBUTES:
+            url = _embed_url(node.get(attr))
+            if url:
+                return url
+        onclick = node.get("onclick")
+        if onclick:
+            match = _URL_RE.search(onclick)
+            url = _embed_url(match.group(0)) if match else None
+            if url:
+                return url
+    return None
+
+
+def _decode_base64_json(value):
+    try:
+        decoded = base64.b64decode(value, validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    try:
+        return json.loads(decoded)
+    except ValueError:
+        return None
+
+
+def _entry_from_dict(item, allow_code):
+    """Normaliza un registro de enlace de los datos inline a ``(servidor, url)``.
+
+    Sólo con ``allow_code`` (datos decodificados del reproductor) se construye
+    la URL a partir del código del vídeo.
+    """
+    if not isinstance(item, dict):
+        return None
+    provider = next((str(item[k]) for k in PROVIDER_KEYS if item.get(k)), None)
+    url = next((_embed_url(item[k]) for k in URL_KEYS if isinstance(item.get(k), str) and _embed_url(item[k])), None)
+    if url:
+        return provider, url
+    code = next((str(item[k]) for k in CODE_KEYS if item.get(k)), None)
+    if allow_code and code and provider:
+        return provider, url_from_template(provider, code)
+    return None
+
+
+def extract_inline_entries(soup):
+    """Devuelve los enlaces ``(servidor, url)`` descritos en los scripts de la página."""
+    entries = []
+    for script in soup.find_all("script"):
+        text = script.string or script.get_text()
+        if not text or "{" not in text and "var" not in text:
+            continue
+        candidates = []
+        for match in _JSON_LIST_RE.finditer(text):
+            try:
+                candidates.append((json.loads(match.group(0)), False))
+            except ValueError:
+                continue
+        for match in _BASE64_VAR_RE.finditer(text):
+            data = _decode_base64_json(match.group(1))
+            if data is not None:
+                candidates.append((data, True))
+        for data, allow_code in candidates:
+            if isinstance(data, dict):
+                data = list(data.values())
+            if not isinstance(data, list):
+                continue
+            parsed = [_entry_from_dict(item, allow_code) for item in data]
+            parsed = [entry for entry in parsed if entry is not None]
+            if parsed:
+                entries.append(parsed)
+    # Nos quedamos con la lista más larga: suele ser la de todos los enlaces
+    return max(entries, key=len) if entries else []
+
+
+def resolve_embed_urls(page_source):
+    """Deduce la URL del iframe de cada ``.embed-selector`` sin interactuar.
+
+    ``page_source`` puede ser HTML o un ``BeautifulSoup``. Devuelve una lista
+    con una URL (o ``None`` si no se pudo deducir) por selector y en el mismo
+    orden en que aparecen en la página.
+    """
+    soup = page_source if isinstance(page_source, BeautifulSoup) else BeautifulSoup(page_source, "html.parser")
+    selectors = soup.find_all("div", class_="embed-selector")
+    if not selectors:
+        return []
+
+    servers = [_server_name(selector) for selector in selectors]
+    urls = [_resolve_from_attributes(selector) for selector in selectors]
+
+    if None in urls:
+        inline = extract_inline_entries(soup)
+        if len(inline) == len(selectors) and all(
+            not server or not provider or provider.lower() == server
+            for server, (provider, _) in zip(servers, inline)
+        ):
+            # Mismo número de registros que de selectores y servidores coherentes:
+            # se corresponden por posición
+            urls = [url or entry[1] for url, entry in zip(urls, inline)]
+        elif inline:
+            # Emparejar por servidor en orden de aparición
+            pending = list(inline)
+            for i, url in enumerate(urls):
+                if url or not servers[i]:
+                    continue
+                for j, (provider, entry_url) in enumerate(pending):
+                    if provider and provider.lower() == servers[i] and entry_url:
+                        urls[i] = entry_url
+                        del pending[j]
+                        break
+
+    resolved = sum(1 for url in urls if url)
+    with _stats_lock:
+        _stats["resolved"] += resolved
+        _stats["unresolved"] += len(urls) - resolved
+    logger.debug(f"Enlaces resueltos sin clic: {resolved}/{len(urls)}")
+    return urls
+
+
+def get_stats():
+    """Devuelve cuántos enlaces se resolvieron sin clic y cuántos necesitaron clic."""
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,250 @@
+"""Descarga de listados de HDFull sin navegador.
+
+Tras iniciar sesión con Selenium se exportan las cookies del driver (o las
+de la última sesión guardada en disco) a una sesión ``requests`` compartida. Las páginas de listado (enlaces estáticos) se
+descargan por HTTP y se analizan con :mod:`parsers`; si la respuesta no contiene lo esperado (sesión
+caducada, contenido generado por JS, fragmentos ``#tab``) el llamador vuelve a
+usar el driver.
+
+Los listados de episodios con scroll infinito (``/episodios#premiere`` y
+``#updated``) se piden directamente al endpoint AJAX que usa la página para
+"cargar más" (:func:`fetch_episode_feed`), por páginas y como JSON.
+"""
+
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from . import scraper_utils
+    from .parsers import parse_document, is_login_page, parse_episode_feed
+except ImportError:  # pragma: no cover
+    import scraper_utils
+    from parsers import parse_document, is_login_page, parse_episode_feed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "es-ES,es;q=0.9,en;q=0.5",
+    "Connection": "keep-alive",
+}
+
+# Endpoint del que la página de episodios carga cada bloque del scroll infinito
+EPISODES_FEED_URL = f"{scraper_utils.BASE_URL}/a/episodes"
+EPISODES_FEED_PAGE_SIZE = 24
+
+
+class ListingClient:
+    """Sesión HTTP autenticada con las cookies de un driver de Selenium."""
+
+    def __init__(self, pool_maxsize=16):
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(max_retries=retries, pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.has_cookies = False
+        self.http_pages = 0
+        self.driver_fallbacks = 0
+        self._lock = threading.Lock()
+
+    def load_cookies_from_driver(self, driver):
+        """Copia las cookies y el User-Agent de un driver ya autenticado."""
+        try:
+            cookies = driver.get_cookies()
+            user_agent = driver.execute_script("return navigator.userAgent;")
+        except Exception as e:
+            logger.warning(f"No se pudieron exportar las cookies del driver: {e}")
+            return False
+
+        with self._lock:
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain"),
+                    path=cookie.get("path", "/"),
+                )
+            if user_agent:
+                self.session.headers["User-Agent"] = user_agent.replace("HeadlessChrome", "Chrome")
+            self.has_cookies = bool(cookies)
+        logger.debug(f"Exportadas {len(cookies)} cookies del driver a la sesión HTTP")
+        return self.has_cookies
+
+    def load_saved_cookies(self):
+        """Carga las cookies de la última sesión guardada en disco."""
+        cookies = scraper_utils.load_session_cookies()
+        with self._lock:
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie.get("domain"),
+                    path=cookie.get("path", "/"),
+                )
+            self.has_cookies = bool(cookies)
+        return self.has_cookies
+
+    def get_page(self, url, is_valid=None, timeout=15):
+        """Descarga y analiza ``url``.
+
+        Devuelve ``(documento, sesion_caducada)``; el documento (lxml) es
+        ``None`` si hay que usar el driver.
+        """
+        try:
+            response = self.session.get(url, timeout=timeout)
+        except requests.RequestException as e:
+            logger.debug(f"Fallo HTTP en {url}: {e}")
+            return None, False
+        if "/login" in response.url:
+            logger.debug(f"Redirigido al login al descargar {url}")
+            return None, True
+        if response.status_code != 200:
+            logger.debug(f"Respuesta no válida para {url}: {response.status_code}")
+            return None, False
+
+        doc = parse_document(response.content)
+        if is_login_page(doc):
+            logger.debug(f"La sesión HTTP no está autenticada en {url}")
+            return None, True
+        if is_valid is not None and not is_valid(doc):
+            return None, False
+        scraper_utils.archive_page(url, response.content, "listing", "http")
+        return doc, False
+
+    def post_json(self, url, data, referer=None, timeout=15):
+        """Envía ``data`` por POST como lo haría el JS de la página.
+
+        Devuelve ``(json, sesion_caducada)``; el JSON es ``None`` si la
+        respuesta no lo es.
+        """
+        headers = {"X-Requested-With": "XMLHttpRequest", "Accept": "application/json, text/javascript, */*"}
+        if referer:
+            headers["Referer"] = referer
+        try:
+            response = self.session.post(url, data=data, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            logger.debug(f"Fallo HTTP en {url}: {e}")
+            return None, False
+        if "/login" in response.url:
+            logger.debug(f"Redirigido al login al pedir {url}")
+            return None, True
+        if response.status_code != 200:
+            logger.debug(f"Respuesta no válida para {url}: {response.status_code}")
+            return None, False
+        try:
+            return response.json(), False
+        except ValueError:
+            logger.debug(f"La respuesta de {url} no es JSON")
+            return None, False
+
+    def log_stats(self):
+        logger.info(
+            f"Listados descargados por HTTP: {self.http_pages}, recurriendo al driver: {self.driver_fallbacks}"
+        )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_listing_client():
+    """Devuelve el cliente de listados compartido del proceso."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ListingClient()
+        return _client
+
+
+def _ready_client(driver):
+    """Cliente compartido con cookies cargadas, o ``None`` si no hay sesión que usar."""
+    client = get_listing_client()
+    if not client.has_cookies:
+        loaded = driver is not None and client.load_cookies_from_driver(driver)
+        if not loaded and not client.load_saved_cookies():
+            return None
+    return client
+
+
+def fetch_episode_feed(action, driver=None, max_pages=65, page_size=EPISODES_FEED_PAGE_SIZE):
+    """URLs de episodios de un listado con scroll infinito, sin navegador.
+
+    ``action`` es la pestaña de ``/episodios`` (``"premiere"``, ``"updated"``,
+    ...). Se piden los bloques de ``page_size`` episodios del endpoint AJAX
+    hasta que uno llega incompleto, no aporta nada nuevo o se alcanza
+    ``max_pages``. Devuelve ``None`` si el modo HTTP está desactivado o el
+    primer bloque no se pudo obtener; en ese caso el llamador hace scroll con
+    el driver.
+    """
+    if not scraper_utils.LISTING_HTTP_ENABLED:
+        return None
+    client = _ready_client(driver)
+    if client is None:
+        return None
+
+    referer = f"{scraper_utils.BASE_URL}/episodios#{action}"
+    urls = []
+    seen = set()
+    for page in range(max_pages):
+        data = {"action": action, "start": page * page_size, "limit": page_size, "elang": "ALL"}
+        items, session_expired = client.post_json(EPISODES_FEED_URL, data, referer)
+        if session_expired and driver is not None and client.load_cookies_from_driver(driver):
+            items, _ = client.post_json(EPISODES_FEED_URL, data, referer)
+        if not isinstance(items, list):
+            if page == 0:
+                logger.debug(f"El feed de episodios '{action}' no está disponible por HTTP; se usará el driver")
+                return None
+            logger.warning(f"Feed de episodios '{action}' interrumpido en el bloque {page + 1}")
+            break
+
+        new_urls = [url for url in parse_episode_feed(items) if url not in seen]
+        seen.update(new_urls)
+        urls.extend(new_urls)
+        if page == 0 and items and not new_urls:
+            # El formato no es el esperado: mejor el driver que un listado vacío
+            logger.warning(f"Formato desconocido en el feed de episodios '{action}'; se usará el driver")
+            return None
+        if len(items) < page_size or not new_urls:
+            break
+
+    with client._lock:
+        client.http_pages += 1
+    logger.info(f"Feed de episodios '{action}': {len(urls)} episodios por HTTP")
+    return urls
+
+
+def fetch_listing_page(url, driver=None, is_valid=None):
+    """Intenta obtener un listado por HTTP con las cookies del driver.
+
+    Devuelve el documento lxml de la página (ver :mod:`parsers`) o ``None`` si el modo rápido
+    está desactivado o la respuesta no sirve; en ese caso el llamador debe
+    cargar la página con el driver.
+    """
+    if not scraper_utils.LISTING_HTTP_ENABLED or "#" in url:
+        # Los fragmentos (#premiere, #updated) los resuelve el JS de la página
+        return None
+
+    client = _ready_client(driver)
+    if client is None:
+        return None
+
+    doc, session_expired = client.get_page(url, is_valid)
+    if session_expired and driver is not None:
+        # Puede que la sesión se haya renovado en el driver: refrescar y reintentar una vez
+        if client.load_cookies_from_driver(driver):
+            doc, _ = client.get_page(url, is_valid)
+
+    with client._lock:
+        if doc is None:
+            client.driver_fallbacks += 1
+        else:
+            client.http_pages += 1
+    if doc is None:
+        logger.debug(f"Listado {url} no disponible por HTTP; se usará el driver")
+    return doc
@@ -0,0 +1,216 @@
+"""Caché HTTP persistente con revalidación condicional.
+
+Guarda por URL los validadores ``ETag``/``Last-Modified`` y un hash del
+cuerpo de la última respuesta procesada. En ejecuciones posteriores se envían
+peticiones condicionales y, si el servidor responde 304 o el cuerpo es
+idéntico, el scraper puede saltarse el análisis y las escrituras en BD.
+
+Las entradas sólo se confirman con :meth:`ResponseCache.commit` después de
+procesar la página correctamente, de modo que un fallo a mitad de camino no
+marca la página como vista.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from . import scraper_utils
+
+logger = logging.getLogger(__name__)
+
+# Cada cuántas escrituras se comprueba el límite de entradas
+EVICT_EVERY = 500
+
+# Respuestas pendientes de confirmar que se mantienen en memoria
+MAX_PENDING = 1024
+
+
+class ResponseCache:
+    """Índice SQLite de validadores HTTP con expulsión LRU por número de entradas."""
+
+    def __init__(self, cache_dir=None, max_entries=None, enabled=True):
+        self.cache_dir = cache_dir or scraper_utils.HTTP_CACHE_DIR
+        self.max_entries = max_entries or scraper_utils.HTTP_CACHE_MAX_ENTRIES
+        # ``enabled=False`` ignora la caché al leer pero sigue actualizándola
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(self.cache_dir, "index.db"), check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def body_hash(content):
+        return hashlib.sha1(content).hexdigest()
+
+    def _lookup(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, body_hash FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+    def conditional_headers(self, url):
+        """Cabeceras ``If-None-Match``/``If-Modified-Since`` para una URL conocida."""
+        if not self.enabled:
+            return {}
+        row = self._lookup(url)
+        if not row:
+            return {}
+        etag, last_modified, _ = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def is_unchanged(self, url, response):
+        """Indica si la respuesta coincide con la última versión procesada.
+
+        Si la página ha cambiado, sus validadores quedan pendientes hasta que
+        el llamador invoque :meth:`commit` tras procesarla.
+        """
+        body_hash = self.body_hash(response.content) if response.status_code == 200 else None
+        row = self._lookup(url) if self.enabled else None
+        unchanged = bool(row) and (response.status_code == 304 or body_hash == row[2])
+        if unchanged:
+            self.hits += 1
+            self._touch(url)
+            return True
+
+        self.misses += 1
+        if body_hash is not None:
+            with self._lock:
+                self._pending[url] = (
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    body_hash,
+                )
+                self._pending.move_to_end(url)
+                while len(self._pending) > MAX_PENDING:
+                    self._pending.popitem(last=False)
+        return False
+
+    def _touch(self, url):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._conn.commit()
+
+    def commit(self, url):
+        """Confirma la última respuesta de ``url`` como versión ya procesada."""
+        now = time.time()
+        with self._lock:
+            pending = self._pending.pop(url, None)
+            if pending is None:
+                return
+            etag, last_modified, body_hash = pending
+            self._conn.execute(
+                """
+                INSERT INTO responses (url, etag, last_modified, body_hash, stored_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    body_hash = excluded.body_hash,
+                    stored_at = excluded.stored_at,
+                    accessed_at = excluded.accessed_at
+                """,
+                (url, etag, last_modified, body_hash, now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        """Elimina las entradas menos usadas por encima del límite (requiere el lock)."""
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            """
+            DELETE FROM responses WHERE url IN (
+                SELECT url FROM responses ORDER BY accessed_at ASC LIMIT ?
+            )
+            """,
+            (excess,),
+        )
+        self._conn.commit()
+        logger.info(f"Caché HTTP: expulsadas {excess} entradas (límite {self.max_entries})")
+
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._pending.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        """Devuelve aciertos, fallos y número de entradas."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
+        logger.info(
+            f"Caché HTTP: {self.hits} páginas sin cambios, {self.misses} descargadas de nuevo"
+        )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache(enabled=None):
+    """Devuelve la caché HTTP compartida del proceso."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                enabled=scraper_utils.HTTP_CACHE_ENABLED if enabled is None else enabled
+            )
+        elif enabled is not None:
+            _cache.enabled = enabled
+        return _cache
+
+
+def close_response_cache():
+    """Cierra la caché HTTP compartida, si está abierta."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
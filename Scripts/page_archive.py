@@ -0,0 +1,166 @@
+"""Archivo de páginas descargadas, direccionado por contenido.
+
+Con el archivo activado se guarda el cuerpo de cada página obtenida (por
+HTTP o con ``driver.page_source``) comprimido con gzip y nombrado por su
+hash, de modo que una misma página sin cambios ocupa una sola vez. Un índice
+SQLite registra la URL, el tipo de página, el origen y la fecha de cada
+captura.
+
+Cuando un selector se rompe o se añade un campo, ``python -m Scripts.reparse``
+vuelve a pasar los parsers y las escrituras en BD sobre el archivo, sin red
+ni navegador.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PageArchive:
+    """Cuerpos comprimidos en ``objects/`` más un índice SQLite de capturas."""
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.objects_dir = os.path.join(archive_dir, "objects")
+        self.stored = 0
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(archive_dir, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                page_type TEXT NOT NULL,
+                source TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                UNIQUE (url, body_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_type ON pages(page_type, fetched_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def body_hash(body):
+        return hashlib.sha1(body).hexdigest()
+
+    def _object_path(self, body_hash):
+        return os.path.join(self.objects_dir, body_hash[:2], f"{body_hash}.html.gz")
+
+    def store(self, url, body, page_type, source):
+        """Guarda ``body`` (``str`` o ``bytes``) como captura de ``url``.
+
+        Si la URL ya tenía ese mismo cuerpo sólo se actualiza la fecha; el
+        tipo de página de la primera captura se conserva.
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        body_hash = self.body_hash(body)
+        path = self._object_path(body_hash)
+        if os.path.exists(path):
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escritura atómica: un objeto a medias nunca queda con el nombre final
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb", compresslevel=6) as fh:
+                fh.write(body)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO pages (url, page_type, source, body_hash, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url, body_hash) DO UPDATE SET fetched_at = excluded.fetched_at
+                """,
+                (url, page_type, source, body_hash, time.time()),
+            )
+            self._conn.commit()
+            self.stored += 1
+        return body_hash
+
+    def load(self, body_hash):
+        """Cuerpo (``bytes``) de un objeto del archivo."""
+        with gzip.open(self._object_path(body_hash), "rb") as fh:
+            return fh.read()
+
+    def iter_pages(self, page_types=None, url_contains=None, latest_only=True):
+        """Recorre las capturas como ``(url, page_type, fetched_at, body)``.
+
+        Con ``latest_only`` sólo se devuelve la captura más reciente de cada
+        URL. Las capturas cuyo objeto falte o esté dañado se omiten.
+        """
+        query = "SELECT url, page_type, fetched_at, body_hash FROM pages"
+        conditions = []
+        params = []
+        if latest_only:
+            conditions.append("fetched_at = (SELECT MAX(p.fetched_at) FROM pages p WHERE p.url = pages.url)")
+        if page_types:
+            conditions.append(f"page_type IN ({', '.join('?' for _ in page_types)})")
+            params.extend(page_types)
+        if url_contains:
+            conditions.append("url LIKE ?")
+            params.append(f"%{url_contains}%")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY fetched_at"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for url, page_type, fetched_at, body_hash in rows:
+            try:
+                body = self.load(body_hash)
+            except (OSError, EOFError) as e:
+                logger.warning(f"Captura ilegible de {url} ({body_hash}): {e}")
+                continue
+            yield url, page_type, fetched_at, body
+
+    def stats(self):
+        """Capturas, URLs distintas y objetos guardados en el archivo."""
+        with self._lock:
+            captures, urls, objects = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT url), COUNT(DISTINCT body_hash) FROM pages"
+            ).fetchone()
+        return {"captures": captures, "urls": urls, "objects": objects}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        if self.stored:
+            logger.info(
+                f"Archivo de páginas: {self.stored} capturas guardadas ({self.deduplicated} sin cambios)"
+            )
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_page_archive(archive_dir):
+    """Devuelve el archivo de páginas compartido del proceso."""
+    global _archive
+    with _archive_lock:
+        if _archive is None or _archive.archive_dir != archive_dir:
+            if _archive is not None:
+                _archive.close()
+            _archive = PageArchive(archive_dir)
+        return _archive
+
+
+def close_page_archive():
+    """Cierra el archivo de páginas compartido, si está abierto."""
+    global _archive
+    with _archive_lock:
+        if _archive is not None:
+            _archive.close()
+            _archive = None
@@ -0,0 +1,397 @@
+"""Extracción de datos de las páginas de HDFull dentro del navegador.
+
+Por defecto los scrapers piden ``driver.page_source`` (todo el HTML por el
+protocolo de WebDriver) y lo analizan con :mod:`parsers`. Con la extracción
+en el navegador se inyecta un pequeño extractor JavaScript por tipo de página
+que devuelve sólo los campos necesarios en un único objeto JSON: una ida y
+vuelta por página y ningún análisis de HTML en Python.
+
+Los extractores devuelven exactamente lo mismo que su función de
+:mod:`parsers`, así que los llamadores no distinguen el modo. Si el script
+falla se recurre a ``page_source`` y al parser de Python.
+
+Las páginas con enlaces (``movie``, ``episode`` y ``embeds``) incluyen además
+``embed_source``: el HTML del que :func:`embed_resolver.resolve_embed_urls`
+deduce los iframes. En el navegador son sólo los selectores y los scripts
+inline de la página, no el documento entero.
+
+Los enlaces que sólo aparecen tras hacer clic se pueden recoger con
+:func:`harvest_embeds`: un script asíncrono hace clic en cada selector dentro
+de la página y espera con un ``MutationObserver`` a que cambie el iframe, de
+modo que todos los clics cuestan una sola llamada de WebDriver.
+"""
+
+import json
+import logging
+import threading
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from .parsers import (
+        HDFULL_BASE_URL,
+        KNOWN_LANGUAGES,
+        KNOWN_QUALITIES,
+        count_season_episodes,
+        listing_has_more,
+        parse_embed_selectors,
+        parse_episode,
+        parse_listing,
+        parse_movie,
+        parse_pagination,
+        parse_season,
+        parse_season_list,
+        parse_series,
+    )
+except ImportError:  # pragma: no cover
+    from parsers import (
+        HDFULL_BASE_URL,
+        KNOWN_LANGUAGES,
+        KNOWN_QUALITIES,
+        count_season_episodes,
+        listing_has_more,
+        parse_embed_selectors,
+        parse_episode,
+        parse_listing,
+        parse_movie,
+        parse_pagination,
+        parse_season,
+        parse_season_list,
+        parse_series,
+    )
+
+logger = logging.getLogger(__name__)
+
+# Funciones comunes a todos los extractores. ``arguments[0]`` es la URL base
+# para resolver enlaces relativos.
+_PRELUDE = """
+const BASE = arguments[0];
+const LANGUAGES = %(languages)s;
+const QUALITIES = %(qualities)s;
+const text = el => el ? (el.textContent || '').trim() : '';
+const toInt = s => /^\\s*[-+]?\\d+\\s*$/.test(s || '') ? parseInt(s, 10) : null;
+const toFloat = s => /^\\s*[-+]?(\\d+\\.?\\d*|\\.\\d+)([eE][-+]?\\d+)?\\s*$/.test(s || '') ? parseFloat(s) : null;
+const absolute = href => { try { return new URL(href || '', BASE).href; } catch (e) { return href || ''; } };
+const classIs = (el, value) => (el.getAttribute('class') || '').trim().split(/\\s+/).join(' ') === value;
+
+const embeds = () => Array.from(document.querySelectorAll('div.embed-selector'), sel => {
+  const content = sel.textContent || '';
+  let language = null;
+  const key = Array.from(sel.querySelectorAll('h5.left b.key')).find(b => (b.textContent || '').includes('Idioma:'));
+  const tail = key && key.nextSibling && key.nextSibling.nodeType === Node.TEXT_NODE ? key.nextSibling.nodeValue.trim() : '';
+  if (tail) language = tail;
+  if (language === null) language = LANGUAGES.find(label => content.includes(label)) || null;
+  let server = text(sel.querySelector('b.provider'));
+  if (!server) {
+    const match = /Servidor:\\s*([^\\n]+)/.exec(content);
+    server = match ? match[1].trim() : null;
+  }
+  return {language: language, server: server || null, quality: QUALITIES.find(q => content.includes(q)) || null};
+});
+
+const embedSource = () => {
+  const selectors = document.querySelectorAll('div.embed-selector');
+  if (!selectors.length) return '';
+  const scripts = Array.from(document.querySelectorAll('script:not([src])'), s => '<script>' + s.textContent + '</script>');
+  return Array.from(selectors, s => s.outerHTML).join('') + scripts.join('');
+};
+
+const labelled = (container, labels) => {
+  const values = {};
+  if (!container) return values;
+  for (const p of container.querySelectorAll('p')) {
+    const content = p.textContent || '';
+    for (const label of labels) {
+      if (!(label in values) && content.includes(label)) values[label] = Array.from(p.querySelectorAll('a'), text);
+    }
+  }
+  return values;
+};
+
+const seriesFields = (container, fields) => {
+  fields = Object.assign({}, fields || {});
+  const values = labelled(container, ['Estado:', 'Año:', 'IMDB Rating:', 'Género:', 'Director:']);
+  const first = label => values[label] && values[label].length ? values[label][0] : null;
+  const joined = label => values[label] && values[label].length ? values[label].join(', ') : null;
+  const rating = first('IMDB Rating:');
+  const words = rating ? rating.split(/\\s+/).filter(Boolean) : [];
+  const candidates = {
+    status: first('Estado:'),
+    year: toInt(first('Año:')),
+    imdb_rating: words.length ? toFloat(words[0]) : null,
+    genre: joined('Género:'),
+    director: joined('Director:'),
+  };
+  for (const key in candidates) {
+    if (fields[key] === undefined || fields[key] === null) fields[key] = candidates[key];
+  }
+  return fields;
+};
+
+const seasonItems = () => {
+  const container = document.getElementById('season-episodes');
+  if (!container) return null;
+  return Array.from(container.querySelectorAll('div')).filter(el => classIs(el, 'span-6 tt view show-view'));
+};
+""" % {"languages": json.dumps(KNOWN_LANGUAGES), "qualities": json.dumps(KNOWN_QUALITIES)}
+
+# Cuerpo de cada extractor: devuelve el mismo valor que su parser
+_EXTRACTORS_JS = {
+    "listing": """
+let scope = document.querySelector('div.center') || document.querySelector('div.container') || document;
+const items = [];
+for (const item of scope.querySelectorAll('div.span-6.inner-6.tt.view')) {
+  const link = item.querySelector('a.spec-border-ie[href]') || item.querySelector('a[href]');
+  if (!link) continue;
+  items.push({url: absolute(link.getAttribute('href')), title: link.getAttribute('title') || text(link)});
+}
+return items;
+""",
+    "pagination": """
+return Array.from(document.querySelectorAll('ul[class="pagination"] > li'), text);
+""",
+    "has_more": """
+return !!document.querySelector('a.current ~ a')
+  || !!document.querySelector('div[class*="tt view"], span[class*="tt view"]');
+""",
+    "movie": """
+const title = document.getElementById('summary-title');
+if (!title) return null;
+const details = document.querySelector('div.show-details');
+return {
+  title: text(title),
+  year: details ? toInt(text(details.querySelector('a[href*="/buscar/year/"]'))) : null,
+  imdb_rating: details ? toFloat(text(details.querySelector('p[itemprop="aggregateRating"] a'))) : null,
+  genres: details ? Array.from(details.querySelectorAll('a[href*="/tags-peliculas"]'), text) : [],
+  embeds: embeds(),
+  embed_source: embedSource(),
+};
+""",
+    "series": """
+const title = document.getElementById('summary-title');
+if (!title) return null;
+let fields = seriesFields(document.querySelector('#summary-overview-wrapper div'));
+fields = seriesFields(document.querySelector('div.show-details'), fields);
+fields.title = text(title);
+return fields;
+""",
+    "season": """
+const items = seasonItems();
+if (items === null) return null;
+const episodes = [];
+for (const item of items) {
+  const match = /(\\d+)x(\\d+)/.exec(text(item.querySelector('div.rating')));
+  const link = Array.from(item.querySelectorAll('a')).find(a => classIs(a, 'link title-ellipsis'));
+  if (!match || !link) continue;
+  episodes.push({
+    number: parseInt(match[2], 10),
+    title: (link.getAttribute('title') || '').split(' - ').pop(),
+    url: absolute(link.getAttribute('href')),
+  });
+}
+return episodes;
+""",
+    "season_count": """
+const items = seasonItems();
+return items === null ? null : items.length;
+""",
+    "season_list": """
+const seasons = new Map();
+for (const link of document.querySelectorAll('a[href*="/temporada-"]')) {
+  const href = link.getAttribute('href');
+  const match = /\\/temporada-(\\d+)\\/?(?:[?#].*)?$/.exec(href);
+  const number = match ? parseInt(match[1], 10) : null;
+  if (number !== null && !seasons.has(number)) seasons.set(number, absolute(href.split('#')[0].split('?')[0]));
+}
+return Array.from(seasons.keys()).sort((a, b) => a - b).map(number => ({number: number, url: seasons.get(number)}));
+""",
+    "episode": """
+let seriesTitle = null, season = null, episode = null, episodeTitle = null;
+const wrapper = document.querySelector('div.summary-title-wrapper');
+const title = wrapper ? wrapper.querySelector('#summary-title') : null;
+if (title) {
+  seriesTitle = text(title);
+  const match = /^(\\d+)\\s*x\\s*(\\d+)\\s*([\\s\\S]*)/.exec(text(wrapper.querySelector('span.subtitle')));
+  if (match) {
+    season = parseInt(match[1], 10);
+    episode = parseInt(match[2], 10);
+    episodeTitle = match[3].trim();
+    if (!episodeTitle) {
+      const names = Array.from(document.querySelectorAll('meta[itemprop="name"]'), m => m.getAttribute('content'));
+      const name = names.find(n => n && n !== seriesTitle);
+      episodeTitle = name ? name.trim() : null;
+    }
+  }
+}
+const fields = seriesFields(document.querySelector('div.show-details'));
+return {
+  series_title: seriesTitle,
+  season: season,
+  episode: episode,
+  episode_title: episodeTitle,
+  year: fields.year,
+  imdb_rating: fields.imdb_rating,
+  genre: fields.genre,
+  embeds: embeds(),
+  embed_source: embedSource(),
+};
+""",
+    "embeds": """
+return {embeds: embeds(), embed_source: embedSource()};
+""",
+}
+
+
+def _with_source(parser):
+    def parse(page_source, base_url):
+        data = parser(page_source)
+        if data is not None:
+            data["embed_source"] = page_source
+        return data
+    return parse
+
+
+# Equivalente en Python de cada extractor sobre ``driver.page_source``
+_PARSERS = {
+    "listing": lambda page_source, base_url: parse_listing(page_source, base_url),
+    "pagination": lambda page_source, base_url: parse_pagination(page_source),
+    "has_more": lambda page_source, base_url: listing_has_more(page_source),
+    "movie": _with_source(parse_movie),
+    "series": lambda page_source, base_url: parse_series(page_source),
+    "season": lambda page_source, base_url: parse_season(page_source, base_url),
+    "season_count": lambda page_source, base_url: count_season_episodes(page_source),
+    "season_list": lambda page_source, base_url: parse_season_list(page_source, base_url),
+    "episode": _with_source(parse_episode),
+    "embeds": lambda page_source, base_url: {
+        "embeds": parse_embed_selectors(page_source),
+        "embed_source": page_source,
+    },
+}
+
+_SCRIPTS = {page_type: _PRELUDE + body for page_type, body in _EXTRACTORS_JS.items()}
+
+# Hace clic en los selectores ``arguments[0]`` (índices) uno tras otro y espera
+# a que el iframe de reproducción cambie de ``src``. Devuelve un ``src`` (o
+# ``null`` si no cambió en ``arguments[1]`` ms) por índice.
+_HARVEST_JS = """
+const indices = arguments[0];
+const timeout = arguments[1];
+const done = arguments[arguments.length - 1];
+const selectors = document.querySelectorAll('div.embed-selector');
+const currentSrc = () => {
+  const f = document.querySelector('.embed-movie iframe');
+  return f && f.src && f.src !== 'about:blank' ? f.src : null;
+};
+const changed = prev => new Promise(resolve => {
+  const check = () => { const src = currentSrc(); return src && src !== prev ? src : null; };
+  const src = check();
+  if (src) return resolve(src);
+  const observer = new MutationObserver(() => {
+    const src = check();
+    if (src) { clearTimeout(timer); observer.disconnect(); resolve(src); }
+  });
+  const timer = setTimeout(() => { observer.disconnect(); resolve(null); }, timeout);
+  observer.observe(document.body, {subtree: true, childList: true, attributes: true, attributeFilter: ['src']});
+});
+(async () => {
+  const urls = [];
+  for (const i of indices) {
+    const selector = selectors[i];
+    if (!selector) { urls.push(null); continue; }
+    const prev = currentSrc();
+    try { selector.click(); } catch (e) { urls.push(null); continue; }
+    urls.push(await changed(prev));
+  }
+  return urls;
+})().then(done, e => done({error: String(e)}));
+"""
+
+# Tiempo máximo de una sola llamada a ``_HARVEST_JS`` (segundos). Con más
+# selectores se reparten en varias llamadas: en modo pestañas cada llamada
+# retiene el navegador compartido mientras dura
+HARVEST_MAX_SCRIPT_SECONDS = 20
+
+# Margen sobre la espera de los clics para la propia llamada de WebDriver
+_HARVEST_SCRIPT_MARGIN = 5
+
+# Tiempo de espera de scripts por defecto de WebDriver, por si no se puede leer
+_DEFAULT_SCRIPT_TIMEOUT = 30
+
+_stats_lock = threading.Lock()
+_stats = {"browser": 0, "page_source": 0, "fallbacks": 0, "harvested": 0, "harvest_failures": 0}
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def parse_page_source(page_source, page_type, base_url=HDFULL_BASE_URL):
+    """Lo mismo que :func:`extract`, pero sobre un HTML ya obtenido."""
+    _count("page_source")
+    return _PARSERS[page_type](page_source, base_url)
+
+
+def extract(driver, page_type, in_browser=False, base_url=HDFULL_BASE_URL):
+    """Datos de la página cargada en ``driver`` según ``page_type``.
+
+    Con ``in_browser`` los datos se obtienen con el extractor JavaScript en
+    una sola llamada; si falla, o sin ``in_browser``, se analiza
+    ``driver.page_source`` con el parser equivalente.
+    """
+    if in_browser:
+        try:
+            data = driver.execute_script(_SCRIPTS[page_type], base_url)
+            _count("browser")
+            return data
+        except Exception as e:
+            logger.debug(f"Extractor '{page_type}' falló en el navegador, se analiza el HTML: {e}")
+            _count("fallbacks")
+    return parse_page_source(driver.page_source, page_type, base_url)
+
+
+def harvest_embeds(driver, indices, timeout=5):
+    """Hace clic en los selectores ``indices`` dentro de la página y recoge sus iframes.
+
+    Devuelve un ``src`` (o ``None`` si el iframe no cambió en ``timeout``
+    segundos) por índice, en el mismo orden, o ``None`` si el script no se
+    pudo ejecutar y hay que hacer clic desde Python.
+
+    Los índices se recogen en tandas de como mucho
+    ``HARVEST_MAX_SCRIPT_SECONDS`` por llamada, y al terminar se restaura el
+    tiempo de espera de scripts que tuviera el driver.
+    """
+    if not indices:
+        return []
+    indices = list(indices)
+    chunk = max(1, int((HARVEST_MAX_SCRIPT_SECONDS - _HARVEST_SCRIPT_MARGIN) // timeout))
+    try:
+        previous_timeout = driver.timeouts.script
+    except Exception:
+        previous_timeout = _DEFAULT_SCRIPT_TIMEOUT
+    urls = []
+    try:
+        for start in range(0, len(indices), chunk):
+            batch = indices[start:start + chunk]
+            driver.set_script_timeout(timeout * len(batch) + _HARVEST_SCRIPT_MARGIN)
+            batch_urls = driver.execute_async_script(_HARVEST_JS, batch, int(timeout * 1000))
+            if not isinstance(batch_urls, list) or len(batch_urls) != len(batch):
+                logger.debug(f"Respuesta inesperada al recoger los enlaces en el navegador: {batch_urls!r}")
+                _count("harvest_failures")
+                return None
+            urls.extend(batch_urls)
+    except Exception as e:
+        logger.debug(f"No se pudieron recoger los enlaces en el navegador: {e}")
+        _count("harvest_failures")
+        return None
+    finally:
+        try:
+            driver.set_script_timeout(previous_timeout)
+        except Exception as e:
+            logger.debug(f"No se pudo restaurar el tiempo de espera de scripts: {e}")
+    _count("harvested")
+    return urls
+
+
+def get_stats():
+    """Páginas extraídas en el navegador, con ``page_source``, fallos del extractor y recogidas de enlaces."""
+    with _stats_lock:
+        return dict(_stats)
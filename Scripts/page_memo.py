@@ -0,0 +1,54 @@
+"""Memoria por ejecución de las páginas ya analizadas.
+
+En una misma ejecución un scraper puede necesitar varias veces la misma
+página (contar los episodios de una temporada y después procesarlos, o
+volver a una temporada que ya se comprobó). :class:`PageMemo` guarda el
+resultado analizado de cada página por ``(tipo, URL)`` con un tamaño máximo
+y expulsión LRU, y cuenta aciertos y fallos para el resumen final.
+"""
+
+import threading
+from collections import OrderedDict
+
+# Valor devuelto por :meth:`PageMemo.get` cuando la página no está guardada
+MISSING = object()
+
+
+class PageMemo:
+    """Resultados de páginas analizadas, compartidos entre los hilos de una ejecución."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, page_type, url):
+        """Resultado guardado para ``url`` o :data:`MISSING`."""
+        key = (page_type, url)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, page_type, url, value):
+        with self._lock:
+            self._entries[(page_type, url)] = value
+            self._entries.move_to_end((page_type, url))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vacía la memoria y reinicia los contadores (al empezar una ejecución)."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -0,0 +1,150 @@
+"""Esperas por condición para las páginas de HDFull.
+
+Sustituye los ``time.sleep`` fijos tras ``driver.get`` o ``click()`` por un
+predicado por tipo de página: la espera termina en cuanto se cumple y nunca
+dura más que su tiempo máximo. El tiempo total esperado se acumula por tipo
+para poder medir el ahorro frente a las pausas fijas.
+
+Los predicados son expresiones JavaScript que se evalúan en el navegador
+(sin esperas implícitas de Selenium); ``arg`` es el argumento opcional que
+se pasa a :func:`wait_for`.
+"""
+
+import logging
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# Intervalo de sondeo de los predicados (segundos)
+POLL_INTERVAL = 0.1
+
+# Tiempo máximo por defecto de cada espera (segundos)
+DEFAULT_TIMEOUT = 10
+
+# La página terminó de cargar y no quedan peticiones AJAX de jQuery en curso
+_SETTLED = (
+    "(document.readyState === 'complete'"
+    " && (!window.jQuery || window.jQuery.active === 0))"
+)
+
+# Predicados registrados: tipo de página -> (expresión JS, tiempo máximo)
+_predicates = {}
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def register_predicate(page_type, expression, timeout=DEFAULT_TIMEOUT):
+    """Registra (o reemplaza) el predicado de un tipo de página."""
+    _predicates[page_type] = (expression, timeout)
+
+
+register_predicate(
+    "listing",
+    "!!document.querySelector('div.span-6.inner-6.tt.view') || " + _SETTLED,
+)
+register_predicate(
+    "movie",
+    "!!document.querySelector('#summary-title')"
+    " && (!!document.querySelector('.embed-selector') || " + _SETTLED + ")",
+)
+register_predicate(
+    "series",
+    "!!document.querySelector('#summary-title')",
+)
+register_predicate(
+    "season",
+    "!!document.querySelector('#season-episodes .show-view') || " + _SETTLED,
+)
+register_predicate(
+    "episode",
+    "!!document.querySelector('#embed-list .embed-selector')"
+    " || (!!document.querySelector('.show-details') && " + _SETTLED + ")",
+)
+# ``arg`` es el ``src`` del iframe antes del clic: esperamos a que cambie
+register_predicate(
+    "embed",
+    "(function(prev) {"
+    " const f = document.querySelector('.embed-movie iframe');"
+    " return !!(f && f.src && f.src !== 'about:blank' && f.src !== prev);"
+    " })(arg)",
+    timeout=5,
+)
+
+
+def _evaluate(driver, expression, arg):
+    try:
+        return bool(driver.execute_script(
+            f"const arg = arguments[0]; try {{ return {expression}; }} catch (e) {{ return false; }}",
+            arg,
+        ))
+    except Exception:
+        return False
+
+
+def wait_for(driver, page_type, timeout=None, arg=None):
+    """Espera a que la página actual cumpla el predicado de ``page_type``.
+
+    Devuelve ``True`` si se cumplió y ``False`` si se agotó el tiempo; en
+    ese caso el llamador continúa igual que con la pausa fija de antes.
+    """
+    expression, default_timeout = _predicates[page_type]
+    timeout = default_timeout if timeout is None else timeout
+    started = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+            lambda d: _evaluate(d, expression, arg)
+        )
+        ready = True
+    except TimeoutException:
+        ready = False
+        logger.debug(f"Tiempo agotado esperando página '{page_type}' ({timeout}s)")
+    elapsed = time.monotonic() - started
+
+    with _stats_lock:
+        entry = _stats.setdefault(page_type, {"waits": 0, "seconds": 0.0, "timeouts": 0})
+        entry["waits"] += 1
+        entry["seconds"] += elapsed
+        if not ready:
+            entry["timeouts"] += 1
+    return ready
+
+
+def load(driver, url, page_type, timeout=None):
+    """``driver.get(url)`` seguido de la espera de ``page_type``."""
+    driver.get(url)
+    return wait_for(driver, page_type, timeout)
+
+
+def current_embed_src(driver):
+    """``src`` del iframe de reproducción visible (o ``None``), para esperar a que cambie."""
+    try:
+        return driver.execute_script(
+            "const f = document.querySelector('.embed-movie iframe'); return f ? f.src : null;"
+        )
+    except Exception:
+        return None
+
+
+def get_wait_stats():
+    """Devuelve por tipo de página el número de esperas, segundos totales y timeouts."""
+    with _stats_lock:
+        return {page_type: dict(entry) for page_type, entry in _stats.items()}
+
+
+def log_wait_stats(log=None):
+    """Registra el resumen de esperas acumuladas."""
+    log = log or logger
+    stats = get_wait_stats()
+    if not stats:
+        return
+    total = sum(entry["seconds"] for entry in stats.values())
+    lines = [
+        f"  {page_type}: {entry['waits']} esperas, {entry['seconds']:.1f}s "
+        f"(media {entry['seconds'] / entry['waits']:.2f}s, {entry['timeouts']} timeouts)"
+        for page_type, entry in sorted(stats.items())
+    ]
+    log.info(f"Tiempo total esperando páginas: {total:.1f}s\n" + "\n".join(lines))
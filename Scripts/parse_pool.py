@@ -0,0 +1,111 @@
+"""Análisis de páginas en procesos aparte.
+
+Analizar el HTML de una temporada o de una página de enlaces (lxml más
+BeautifulSoup para deducir los iframes) ocupa la CPU con el GIL tomado, y
+mientras tanto los demás workers no atienden su WebDriver. Con
+``PARSE_PROCESSES`` mayor que cero, :func:`scraper_utils.extract_page` envía
+el HTML de los tipos de página pesados a un ``ProcessPoolExecutor`` y recibe
+sólo los campos extraídos.
+
+En las páginas con enlaces el proceso también resuelve los iframes y
+devuelve ``resolved_urls`` en lugar de ``embed_source``, de modo que el HTML
+nunca vuelve al proceso principal. Si el pool falla se analiza en el hilo
+que lo pidió. Los enlaces resueltos en el pool no suman en las estadísticas
+de :mod:`embed_resolver` del proceso principal.
+"""
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from .embed_resolver import resolve_embed_urls
+    from .page_extract import parse_page_source
+except ImportError:  # pragma: no cover
+    from embed_resolver import resolve_embed_urls
+    from page_extract import parse_page_source
+
+logger = logging.getLogger(__name__)
+
+# Tipos de página cuyo análisis compensa el envío del HTML a otro proceso
+OFFLOAD_TYPES = frozenset({"movie", "episode", "embeds", "season"})
+
+
+def parse_compact(page_source, page_type, base_url):
+    """Resultado de :func:`page_extract.parse_page_source` sin el HTML de la página.
+
+    Se ejecuta en los procesos del pool; ``embed_source`` se sustituye por
+    ``resolved_urls`` (ver :func:`scraper_utils.resolve_page_embeds`).
+    """
+    data = parse_page_source(page_source, page_type, base_url)
+    if isinstance(data, dict) and "embed_source" in data:
+        embed_source = data.pop("embed_source")
+        try:
+            data["resolved_urls"] = resolve_embed_urls(embed_source) if data["embeds"] else []
+        except Exception:
+            # Como en el hilo: si no se pueden deducir, se hace clic en todos
+            data["resolved_urls"] = []
+    return data
+
+
+class ParsePool:
+    """``ProcessPoolExecutor`` de parsers compartido por los hilos de un scraper."""
+
+    def __init__(self, processes):
+        self.processes = processes
+        self.parsed = 0
+        self.fallbacks = 0
+        self._executor = ProcessPoolExecutor(max_workers=processes)
+        self._lock = threading.Lock()
+
+    def parse(self, page_source, page_type, base_url):
+        """Analiza la página en el pool o, si el pool falla, en el hilo actual."""
+        try:
+            data = self._executor.submit(parse_compact, page_source, page_type, base_url).result()
+            with self._lock:
+                self.parsed += 1
+            return data
+        except BrokenProcessPool as e:
+            logger.warning(f"El pool de análisis dejó de funcionar, se analiza en el hilo: {e}")
+        except Exception as e:
+            logger.debug(f"Fallo al analizar '{page_type}' en el pool, se analiza en el hilo: {e}")
+        with self._lock:
+            self.fallbacks += 1
+        return parse_compact(page_source, page_type, base_url)
+
+    def stats(self):
+        with self._lock:
+            return {"processes": self.processes, "parsed": self.parsed, "fallbacks": self.fallbacks}
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self.parsed or self.fallbacks:
+            logger.info(
+                f"Pool de análisis: {self.parsed} páginas analizadas en {self.processes} procesos "
+                f"({self.fallbacks} en el hilo)"
+            )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool(processes):
+    """Devuelve el pool de análisis compartido del proceso."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.processes != processes:
+            if _pool is not None:
+                _pool.close()
+            _pool = ParsePool(processes)
+        return _pool
+
+
+def close_parse_pool():
+    """Cierra el pool de análisis compartido, si está abierto."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,477 @@
+"""Análisis del HTML de HDFull y Dontorrent con lxml.
+
+Una función pura por tipo de página: reciben el HTML (``str``/``bytes``) o un
+documento ya analizado con :func:`parse_document` y devuelven diccionarios y
+listas simples, sin registrar nada ni tocar la red o la base de datos. Las
+consultas XPath y expresiones regulares se compilan una sola vez al importar
+el módulo.
+
+Los valores se devuelven tal y como aparecen en la página (sin normalizar la
+calidad ni el enlace del torrent, sin pasar el servidor a minúsculas); cada
+scraper aplica sus propias reglas sobre ellos.
+"""
+
+import re
+from urllib.parse import urljoin
+
+from lxml import etree, html as lxml_html
+
+HDFULL_BASE_URL = "https://hdfull.love"
+
+# Idiomas que se reconocen en el texto de un selector de enlace, por prioridad
+KNOWN_LANGUAGES = ("Audio Español", "Subtítulo Español", "Audio Latino", "Audio Original", "Subtítulo Ingles")
+
+# Idiomas de los enlaces de película que se guardan en la base de datos
+MOVIE_LANGUAGES = KNOWN_LANGUAGES[:3]
+
+# Calidades que se reconocen en el texto de un selector de enlace, por prioridad
+KNOWN_QUALITIES = ("HD1080", "HD720", "SD")
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _class_is(value):
+    return f"normalize-space(@class)='{value}'"
+
+
+# -- Consultas precompiladas --------------------------------------------------
+_TEXT = etree.XPath("string(.)")
+
+# Listados de HDFull
+_LISTING_CONTAINERS = (
+    etree.XPath(f"(//div[{_has_class('center')}])[1]"),
+    etree.XPath(f"(//div[{_has_class('container')}])[1]"),
+)
+_LISTING_ITEMS = etree.XPath(
+    f".//div[{_has_class('span-6')}][{_has_class('inner-6')}][{_has_class('tt')}][{_has_class('view')}]"
+)
+_LISTING_MAIN_LINK = etree.XPath(f".//a[{_has_class('spec-border-ie')}][@href]")
+_LISTING_ANY_LINK = etree.XPath(".//a[@href]")
+_PAGINATION_ITEMS = etree.XPath("//ul[@class='pagination']/li")
+_NEXT_PAGE_LINK = etree.XPath(f"//a[{_has_class('current')}]/following-sibling::a")
+_TT_VIEW_ITEMS = etree.XPath("//div[contains(@class, 'tt view')] | //span[contains(@class, 'tt view')]")
+_LOGIN_FORM = etree.XPath("//input[@name='username'] | //input[@name='password']")
+
+# Fichas de película, serie y episodio de HDFull
+_SUMMARY_TITLE = etree.XPath("//div[@id='summary-title']")
+_SHOW_DETAILS = etree.XPath(f"(//div[{_has_class('show-details')}])[1]")
+_SUMMARY_OVERVIEW = etree.XPath("((//div[@id='summary-overview-wrapper'])[1]//div)[1]")
+_YEAR_LINK = etree.XPath(".//a[contains(@href, '/buscar/year/')]")
+_RATING_LINK = etree.XPath(".//p[@itemprop='aggregateRating']//a")
+_MOVIE_GENRE_LINKS = etree.XPath(".//a[contains(@href, '/tags-peliculas')]")
+_PARAGRAPHS = etree.XPath(".//p")
+_LINKS = etree.XPath(".//a")
+_TITLE_WRAPPER = etree.XPath(f"(//div[{_has_class('summary-title-wrapper')}])[1]")
+_WRAPPER_TITLE = etree.XPath(".//div[@id='summary-title']")
+_SUBTITLE = etree.XPath(f".//span[{_has_class('subtitle')}]")
+_META_NAMES = etree.XPath("//meta[@itemprop='name']/@content")
+
+# Temporadas de HDFull
+_SEASON_CONTAINER = etree.XPath("(//div[@id='season-episodes'])[1]")
+_SEASON_EPISODES = etree.XPath(f".//div[{_class_is('span-6 tt view show-view')}]")
+_EPISODE_RATING = etree.XPath(f".//div[{_has_class('rating')}]")
+_EPISODE_TITLE_LINK = etree.XPath(f".//a[{_class_is('link title-ellipsis')}]")
+_SEASON_LINKS = etree.XPath("//a[contains(@href, '/temporada-')]/@href")
+
+# Selectores de enlaces embebidos
+_EMBED_SELECTORS = etree.XPath(f"//div[{_has_class('embed-selector')}]")
+_PROVIDER = etree.XPath(f".//b[{_has_class('provider')}]")
+_LANGUAGE_KEY = etree.XPath(
+    f".//h5[{_has_class('left')}]//b[{_has_class('key')}][contains(., 'Idioma:')]"
+)
+
+# Fichas de Dontorrent
+_TORRENT_MOVIE_TITLE = etree.XPath(f"//h1[{_class_is('position-relative ml-2 descargarTitulo')}]")
+_TORRENT_SERIES_TITLE = etree.XPath(f"//h2[{_class_is('position-relative ml-2 descargarTitulo')}]")
+_TORRENT_DETAILS = etree.XPath(f"(//div[{_class_is('d-inline-block ml-2')}])[1]//p[{_has_class('m-1')}]")
+_TORRENT_MOVIE_FORMAT = etree.XPath(
+    f"((//div[@style='margin-right: 0%;'][{_has_class('d-inline-block')}])[1]//p)[1]"
+)
+_TORRENT_SERIES_FORMAT = etree.XPath(f"((//div[{_has_class('d-inline-block')}])[1]//p)[1]")
+_ALL_PARAGRAPHS = etree.XPath("//p")
+_BOLD = etree.XPath(".//b")
+_TORRENT_LINK = etree.XPath("//a[@id='download_torrent'][@href]/@href")
+_TORRENT_TABLE_ROWS = etree.XPath(f"(//table[{_has_class('table-striped')}])[1]//tbody//tr")
+_ROW_EPISODE_CELL = etree.XPath("./td[1]")
+_ROW_TORRENT_LINK = etree.XPath(".//a[@id='download_torrent']/@href")
+_TORRENT_TABLE = etree.XPath(f"//table[{_has_class('table-striped')}]")
+
+_EPISODE_NUMBER_RE = re.compile(r"(\d+)x(\d+)")
+_SUBTITLE_RE = re.compile(r"(\d+)\s*x\s*(\d+)\s*(.*)", re.S)
+_SERVER_TEXT_RE = re.compile(r"Servidor:\s*([^\n]+)")
+_SEASON_HREF_RE = re.compile(r"/temporada-(\d+)/?(?:[?#].*)?$")
+
+
+# -- Utilidades ---------------------------------------------------------------
+def parse_document(page):
+    """Devuelve el documento lxml de ``page`` (HTML en texto/bytes o ya analizado)."""
+    if isinstance(page, etree._Element):
+        return page
+    if isinstance(page, bytes):
+        # lxml supone latin-1 si la página no declara su codificación
+        try:
+            page = page.decode("utf-8")
+        except UnicodeDecodeError:
+            page = page.decode("cp1252", errors="replace")
+    return lxml_html.document_fromstring(page or "<html></html>")
+
+
+def _text(node):
+    return _TEXT(node).strip() if node is not None else ""
+
+
+def _first(nodes):
+    return nodes[0] if nodes else None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _labelled_values(container, labels):
+    """Devuelve ``{etiqueta: [textos de sus enlaces]}`` de los ``<p>`` etiquetados."""
+    values = {}
+    if container is None:
+        return values
+    for paragraph in _PARAGRAPHS(container):
+        text = _TEXT(paragraph)
+        for label in labels:
+            if label not in values and label in text:
+                values[label] = [_text(link) for link in _LINKS(paragraph)]
+    return values
+
+
+# -- HDFull -------------------------------------------------------------------
+def is_login_page(page):
+    """``True`` si la página es el formulario de login (sesión no iniciada)."""
+    names = {node.get("name") for node in _LOGIN_FORM(parse_document(page))}
+    return {"username", "password"} <= names
+
+
+def parse_listing(page, base_url=HDFULL_BASE_URL):
+    """Elementos de un listado: ``[{"url", "title"}]`` en orden de aparición.
+
+    Se buscan dentro del contenedor principal (``div.center`` o
+    ``div.container``) para no recoger las recomendaciones laterales.
+    """
+    doc = parse_document(page)
+    scope = doc
+    for container_query in _LISTING_CONTAINERS:
+        container = _first(container_query(doc))
+        if container is not None:
+            scope = container
+            break
+    items = []
+    for item in _LISTING_ITEMS(scope):
+        link = _first(_LISTING_MAIN_LINK(item))
+        if link is None:
+            link = _first(_LISTING_ANY_LINK(item))
+        if link is None:
+            continue
+        items.append({
+            "url": urljoin(base_url, link.get("href")),
+            "title": link.get("title") or _text(link),
+        })
+    return items
+
+
+def parse_pagination(page):
+    """Textos de los elementos de la paginación de un listado."""
+    return [_text(item) for item in _PAGINATION_ITEMS(parse_document(page))]
+
+
+def listing_has_more(page):
+    """``True`` si el listado tiene página siguiente o al menos un elemento."""
+    doc = parse_document(page)
+    return bool(_NEXT_PAGE_LINK(doc)) or bool(_TT_VIEW_ITEMS(doc))
+
+
+def parse_embed_selectors(page):
+    """Idioma, servidor y calidad de cada ``.embed-selector``, en orden.
+
+    Cualquiera de los tres vale ``None`` si no aparece en el selector.
+    """
+    embeds = []
+    for selector in _EMBED_SELECTORS(parse_document(page)):
+        text = _TEXT(selector)
+        language = None
+        key = _first(_LANGUAGE_KEY(selector))
+        if key is not None and key.tail and key.tail.strip():
+            language = key.tail.strip()
+        if language is None:
+            language = next((label for label in KNOWN_LANGUAGES if label in text), None)
+        server = _text(_first(_PROVIDER(selector)))
+        if not server:
+            match = _SERVER_TEXT_RE.search(text)
+            server = match.group(1).strip() if match else None
+        embeds.append({
+            "language": language,
+            "server": server or None,
+            "quality": next((label for label in KNOWN_QUALITIES if label in text), None),
+        })
+    return embeds
+
+
+def parse_movie(page):
+    """Ficha de película: título, año, rating de IMDB, géneros y selectores de enlace.
+
+    Devuelve ``None`` si la página no tiene título.
+    """
+    doc = parse_document(page)
+    title = _first(_SUMMARY_TITLE(doc))
+    if title is None:
+        return None
+    year = imdb_rating = None
+    genres = []
+    details = _first(_SHOW_DETAILS(doc))
+    if details is not None:
+        year = _to_int(_text(_first(_YEAR_LINK(details))))
+        imdb_rating = _to_float(_text(_first(_RATING_LINK(details))))
+        genres = [_text(link) for link in _MOVIE_GENRE_LINKS(details)]
+    return {
+        "title": _text(title),
+        "year": year,
+        "imdb_rating": imdb_rating,
+        "genres": genres,
+        "embeds": parse_embed_selectors(doc),
+    }
+
+
+_SERIES_LABELS = ("Estado:", "Año:", "IMDB Rating:", "Género:", "Director:")
+
+
+def _series_fields(container, fields=None):
+    """Completa ``fields`` con los datos etiquetados de ``container`` que falten."""
+    fields = dict(fields or {})
+    values = _labelled_values(container, _SERIES_LABELS)
+
+    def first(label):
+        links = values.get(label)
+        return links[0] if links else None
+
+    def joined(label):
+        links = values.get(label)
+        return ", ".join(links) if links else None
+
+    rating = first("IMDB Rating:")
+    candidates = {
+        "status": first("Estado:"),
+        "year": _to_int(first("Año:")),
+        "imdb_rating": _to_float(rating.split()[0]) if rating and rating.split() else None,
+        "genre": joined("Género:"),
+        "director": joined("Director:"),
+    }
+    for key, value in candidates.items():
+        if fields.get(key) is None:
+            fields[key] = value
+    return fields
+
+
+def parse_series(page):
+    """Ficha de serie: título, año, rating, géneros, estado y director.
+
+    Los datos se buscan primero en el resumen y después en ``show-details``.
+    Devuelve ``None`` si la página no tiene título.
+    """
+    doc = parse_document(page)
+    title = _first(_SUMMARY_TITLE(doc))
+    if title is None:
+        return None
+    fields = _series_fields(_first(_SUMMARY_OVERVIEW(doc)))
+    fields = _series_fields(_first(_SHOW_DETAILS(doc)), fields)
+    fields["title"] = _text(title)
+    return fields
+
+
+def parse_season(page, base_url=HDFULL_BASE_URL):
+    """Episodios de una temporada: ``[{"number", "title", "url"}]``.
+
+    Devuelve ``None`` si la página no tiene el contenedor de episodios. Los
+    episodios sin número o sin enlace se omiten.
+    """
+    doc = parse_document(page)
+    container = _first(_SEASON_CONTAINER(doc))
+    if container is None:
+        return None
+    episodes = []
+    for item in _SEASON_EPISODES(container):
+        match = _EPISODE_NUMBER_RE.search(_text(_first(_EPISODE_RATING(item))))
+        link = _first(_EPISODE_TITLE_LINK(item))
+        if not match or link is None:
+            continue
+        episodes.append({
+            "number": int(match.group(2)),
+            "title": (link.get("title") or "").split(" - ")[-1],
+            "url": urljoin(base_url, link.get("href") or ""),
+        })
+    return episodes
+
+
+def parse_season_list(page, base_url=HDFULL_BASE_URL):
+    """Temporadas enlazadas desde la ficha de una serie: ``[{"number", "url"}]``.
+
+    Se ordenan por número y sin repetir; los enlaces a episodios
+    (``/temporada-N/episodio-M``) no cuentan.
+    """
+    seasons = {}
+    for href in _SEASON_LINKS(parse_document(page)):
+        match = _SEASON_HREF_RE.search(href)
+        if match:
+            seasons.setdefault(int(match.group(1)), urljoin(base_url, href.split("#")[0].split("?")[0]))
+    return [{"number": number, "url": seasons[number]} for number in sorted(seasons)]
+
+
+def count_season_episodes(page):
+    """Número de episodios listados en una temporada (``None`` sin contenedor)."""
+    container = _first(_SEASON_CONTAINER(parse_document(page)))
+    return None if container is None else len(_SEASON_EPISODES(container))
+
+
+def parse_episode(page):
+    """Ficha de episodio: serie, temporada, número, título, datos de la serie y enlaces.
+
+    ``series_title``, ``season`` y ``episode`` valen ``None`` si la cabecera
+    del episodio no está en la página.
+    """
+    doc = parse_document(page)
+    series_title = season = episode = episode_title = None
+    wrapper = _first(_TITLE_WRAPPER(doc))
+    title = _first(_WRAPPER_TITLE(wrapper)) if wrapper is not None else None
+    if title is not None:
+        series_title = _text(title)
+        match = _SUBTITLE_RE.match(_text(_first(_SUBTITLE(wrapper))))
+        if match:
+            season = int(match.group(1))
+            episode = int(match.group(2))
+            episode_title = match.group(3).strip()
+            if not episode_title:
+                episode_title = next(
+                    (name.strip() for name in _META_NAMES(doc) if name and name != series_title), None
+                )
+    fields = _series_fields(_first(_SHOW_DETAILS(doc)))
+    return {
+        "series_title": series_title,
+        "season": season,
+        "episode": episode,
+        "episode_title": episode_title,
+        "year": fields["year"],
+        "imdb_rating": fields["imdb_rating"],
+        "genre": fields["genre"],
+        "embeds": parse_embed_selectors(doc),
+    }
+
+
+def parse_episode_feed(items, base_url=HDFULL_BASE_URL):
+    """URLs de episodio de una página del feed JSON de ``/a/episodes``.
+
+    Cada elemento trae el ``permalink`` de la serie (en la raíz o dentro de
+    ``show``), la temporada y el número de episodio. Los elementos
+    incompletos se omiten.
+    """
+    urls = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        show = item.get("show") if isinstance(item.get("show"), dict) else {}
+        permalink = item.get("permalink") or show.get("permalink")
+        season = _to_int(item.get("season"))
+        episode = _to_int(item.get("episode"))
+        if not permalink or season is None or episode is None:
+            continue
+        urls.append(urljoin(base_url, f"/serie/{permalink}/temporada-{season}/episodio-{episode}"))
+    return urls
+
+
+# -- Dontorrent ---------------------------------------------------------------
+def _format_label(paragraph):
+    text = _TEXT(paragraph)
+    return text.replace("Formato:", "").strip() if "Formato:" in text else None
+
+
+def _torrent_quality(doc, format_query):
+    """Texto del formato del torrent: el bloque específico o cualquier ``<p>`` con ``<b>``."""
+    paragraph = _first(format_query(doc))
+    quality = _format_label(paragraph) if paragraph is not None else None
+    if quality is None:
+        for paragraph in _ALL_PARAGRAPHS(doc):
+            if _BOLD(paragraph) and "Formato:" in _TEXT(paragraph):
+                quality = _format_label(paragraph)
+                break
+    return quality
+
+
+def parse_torrent_movie(page):
+    """Ficha de película de Dontorrent.
+
+    Devuelve ``None`` si falta el título o el enlace del torrent. ``year``,
+    ``genre`` y ``director`` valen ``None`` si no aparecen.
+    """
+    doc = parse_document(page)
+    title = _first(_TORRENT_MOVIE_TITLE(doc))
+    torrent_href = _first(_TORRENT_LINK(doc))
+    if title is None or torrent_href is None:
+        return None
+    fields = {"Año:": None, "Género:": None, "Dirección:": None}
+    for paragraph in _TORRENT_DETAILS(doc):
+        bold = _first(_BOLD(paragraph))
+        if bold is None:
+            continue
+        for label in fields:
+            if label in _TEXT(bold):
+                link = _first(_LINKS(paragraph))
+                fields[label] = _text(link) if link is not None else None
+                break
+    return {
+        "title": _text(title).replace("Descargar", "").replace("por Torrent", "").strip(),
+        "year": _to_int(fields["Año:"]),
+        "genre": fields["Género:"],
+        "director": fields["Dirección:"],
+        "quality": _torrent_quality(doc, _TORRENT_MOVIE_FORMAT),
+        "torrent_href": torrent_href,
+    }
+
+
+def parse_torrent_series(page):
+    """Ficha de temporada de Dontorrent.
+
+    Devuelve ``None`` sin título; si no, ``{"full_title", "quality",
+    "episodes_count", "has_table", "episodes"}`` con ``episodes`` como lista
+    de ``(texto del episodio, href del torrent)``.
+    """
+    doc = parse_document(page)
+    title = _first(_TORRENT_SERIES_TITLE(doc))
+    if title is None:
+        return None
+    episodes_count = 0
+    for paragraph in _ALL_PARAGRAPHS(doc):
+        text = _TEXT(paragraph)
+        if "Episodios:" in text:
+            count = _to_int(text.split(":")[-1].strip())
+            if count is not None:
+                episodes_count = count
+                break
+    episodes = []
+    for row in _TORRENT_TABLE_ROWS(doc):
+        cell = _first(_ROW_EPISODE_CELL(row))
+        href = _first(_ROW_TORRENT_LINK(row))
+        if cell is not None and href:
+            episodes.append((_text(cell), href))
+    return {
+        "full_title": _text(title),
+        "quality": _torrent_quality(doc, _TORRENT_SERIES_FORMAT),
+        "episodes_count": episodes_count,
+        "has_table": bool(_TORRENT_TABLE(doc)),
+        "episodes": episodes,
+    }
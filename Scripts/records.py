@@ -0,0 +1,79 @@
+"""Registros tipados de los datos extraídos.
+
+Los scrapers se pasan películas, series, temporadas, episodios y enlaces
+entre los parsers, las colas de los workers y las escrituras en BD. Estas
+clases inmutables con ``__slots__`` sustituyen a los diccionarios con claves
+sueltas (y a las tuplas de los torrents): ocupan menos memoria por elemento
+en cola y todas las funciones de escritura reciben la misma forma.
+
+Para "modificar" un registro se usa :func:`dataclasses.replace`.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True, slots=True)
+class Link:
+    """Enlace de streaming de una película o de un episodio."""
+
+    server: str
+    language: str
+    url: str
+    quality: str
+    movie_id: int = None
+    episode_id: int = None
+
+    def __post_init__(self):
+        if not (self.server and self.language and self.url):
+            raise ValueError(f"Enlace incompleto: {self.server!r}, {self.language!r}, {self.url!r}")
+        if self.movie_id and self.episode_id:
+            raise ValueError("Un enlace no puede ser a la vez de una película y de un episodio")
+
+
+@dataclass(frozen=True, slots=True)
+class Movie:
+    title: str
+    year: int = None
+    imdb_rating: float = None
+    genre: str = None
+    links: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Episode:
+    number: int
+    title: str
+    url: str = None
+    links: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Season:
+    number: int
+    episodes: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Series:
+    """Serie de HDFull; ``id`` sólo se rellena si ya está en la BD."""
+
+    title: str
+    url: str = None
+    year: int = None
+    imdb_rating: float = None
+    genre: str = None
+    status: str = None
+    director: str = None
+    # Temporadas enlazadas desde la ficha (``None`` si la ficha no las lista)
+    season_numbers: tuple = None
+    seasons: tuple = ()
+    id: int = field(default=None, compare=False)
+
+
+@dataclass(frozen=True, slots=True)
+class TorrentFile:
+    """Enlace .torrent de un episodio (o rango de episodios) de Dontorrent."""
+
+    episode_number: int
+    title: str
+    torrent_link: str
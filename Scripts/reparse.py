@@ -0,0 +1,271 @@
+"""Vuelve a analizar las páginas del archivo y a escribirlas en la base de datos.
+
+Recorre la captura más reciente de cada URL guardada por el archivo de
+páginas (:mod:`page_archive`), le pasa el parser de su tipo y repite las
+escrituras en BD de los scrapers, sin red ni navegador. Sirve para recuperar
+campos tras corregir un selector o añadir uno nuevo. Uso::
+
+    python -m Scripts.reparse
+    python -m Scripts.reparse --type movie --type episode --dry-run
+    python -m Scripts.reparse --url-contains /serie/ --limit 100
+
+Sólo se recuperan los enlaces que :mod:`embed_resolver` puede deducir del
+HTML; los que en el scraping necesitaron un clic no están en la página
+archivada. Los listados y las temporadas de HDFull no generan registros y se
+omiten.
+"""
+
+import argparse
+import logging
+import time
+from collections import Counter
+
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from . import scraper_utils
+    from .scraper_utils import (
+        connect_db,
+        embed_link_data,
+        episode_exists,
+        find_series_by_title_year,
+        insert_episode,
+        insert_links_batch,
+        insert_or_update_movie,
+        insert_season,
+        insert_series,
+        movie_exists,
+        season_exists,
+        setup_logger,
+    )
+    from .embed_resolver import resolve_embed_urls
+    from .page_archive import get_page_archive, close_page_archive
+    from .parsers import parse_episode, parse_movie, parse_series
+    from . import torrent_dw_films_scraper, torrent_dw_series_scraper
+except ImportError:  # pragma: no cover
+    import scraper_utils
+    from scraper_utils import (
+        connect_db,
+        embed_link_data,
+        episode_exists,
+        find_series_by_title_year,
+        insert_episode,
+        insert_links_batch,
+        insert_or_update_movie,
+        insert_season,
+        insert_series,
+        movie_exists,
+        season_exists,
+        setup_logger,
+    )
+    from embed_resolver import resolve_embed_urls
+    from page_archive import get_page_archive, close_page_archive
+    from parsers import parse_episode, parse_movie, parse_series
+    import torrent_dw_films_scraper
+    import torrent_dw_series_scraper
+
+SCRIPT_NAME = "reparse"
+logger = setup_logger(SCRIPT_NAME, f"{SCRIPT_NAME}.log")
+
+
+def _links(body, embeds, movie_id=None, episode_id=None):
+    """Enlaces de la página deducibles sin clic, listos para ``insert_links_batch``."""
+    urls = resolve_embed_urls(body) if embeds else []
+    links = []
+    for info, url in zip(embeds, urls):
+        link_data = embed_link_data(info, url, movie_id, episode_id)
+        if link_data:
+            links.append(link_data)
+    return links
+
+
+def reparse_movie(connection, url, body, dry_run):
+    details = parse_movie(body)
+    if not details:
+        logger.warning(f"Sin título de película en {url}")
+        return None
+    genre = ", ".join(details["genres"]) if details["genres"] else None
+    if dry_run:
+        return _links(body, details["embeds"])
+
+    exists, movie_id = movie_exists(
+        details["title"], details["year"], details["imdb_rating"], genre, connection
+    )
+    if not exists:
+        movie_id, _ = insert_or_update_movie({
+            "title": details["title"],
+            "year": details["year"],
+            "imdb_rating": details["imdb_rating"],
+            "genre": genre,
+            "type": "movie",
+            "existing_id": movie_id,
+        }, connection)
+        if not movie_id:
+            logger.error(f"No se pudo guardar la película '{details['title']}' de {url}")
+            return None
+    links = _links(body, details["embeds"], movie_id=movie_id)
+    if links:
+        insert_links_batch(links, logger, connection)
+    return links
+
+
+def reparse_episode(connection, url, body, dry_run):
+    details = parse_episode(body)
+    if details is None or details["series_title"] is None or details["episode"] is None:
+        logger.warning(f"Sin datos de episodio en {url}")
+        return None
+    episode_title = details["episode_title"] or f"Episodio {details['episode']}"
+    if dry_run:
+        return _links(body, details["embeds"])
+
+    series = find_series_by_title_year(details["series_title"], details["year"], connection)
+    if series:
+        series_id = series["id"]
+    else:
+        series_id = insert_series(
+            details["series_title"], details["year"], details["imdb_rating"], details["genre"], connection
+        )
+    if not series_id:
+        logger.error(f"No se pudo guardar la serie '{details['series_title']}' de {url}")
+        return None
+
+    found, season_id = season_exists(series_id, details["season"], connection)
+    if not found:
+        season_id = insert_season(series_id, details["season"], connection)
+    if not season_id:
+        logger.error(f"No se pudo guardar la temporada {details['season']} de {url}")
+        return None
+
+    found, episode_id = episode_exists(season_id, details["episode"], episode_title, connection)
+    if not found:
+        episode_id = insert_episode(season_id, details["episode"], episode_title, connection)
+    if not episode_id:
+        logger.error(f"No se pudo guardar el episodio {details['episode']} de {url}")
+        return None
+
+    links = _links(body, details["embeds"], episode_id=episode_id)
+    if links:
+        insert_links_batch(links, logger, connection)
+    return links
+
+
+def reparse_embeds(connection, url, body, dry_run):
+    # Una página de enlaces es de un episodio si tiene su cabecera; si no, de una película
+    details = parse_episode(body)
+    if details is not None and details["series_title"] is not None and details["episode"] is not None:
+        return reparse_episode(connection, url, body, dry_run)
+    return reparse_movie(connection, url, body, dry_run)
+
+
+def reparse_series(connection, url, body, dry_run):
+    details = parse_series(body)
+    if not details:
+        logger.warning(f"Sin título de serie en {url}")
+        return None
+    if not dry_run and not find_series_by_title_year(details["title"], details["year"], connection):
+        insert_series(details["title"], details["year"], details["imdb_rating"], details["genre"], connection)
+    return []
+
+
+def reparse_torrent_movie(connection, url, body, dry_run):
+    movie_data = torrent_dw_films_scraper.parse_movie_page(body, url)
+    if movie_data is None:
+        return None
+    if not dry_run:
+        torrent_dw_films_scraper.save_to_db(movie_data)
+    return [movie_data["torrent_link"]]
+
+
+# Conexión a la base torrent de series, abierta con la primera página y usada
+# hasta el final de la ejecución
+_torrent_series_connection = None
+
+
+def reparse_torrent_series(connection, url, body, dry_run):
+    global _torrent_series_connection
+    series_title, season_number, quality, episodes = torrent_dw_series_scraper.parse_series_page(body, url)
+    if not series_title:
+        return None
+    if not dry_run:
+        if _torrent_series_connection is None:
+            _torrent_series_connection = torrent_dw_series_scraper.open_database()
+        torrent_dw_series_scraper.insert_data(
+            _torrent_series_connection, series_title, season_number, quality, episodes
+        )
+    return episodes
+
+
+def close_torrent_series_connection():
+    global _torrent_series_connection
+    if _torrent_series_connection is not None:
+        _torrent_series_connection.close()
+        _torrent_series_connection = None
+
+
+# Tipo de página archivada -> función que la analiza y la guarda
+HANDLERS = {
+    "movie": reparse_movie,
+    "episode": reparse_episode,
+    "embeds": reparse_embeds,
+    "series": reparse_series,
+    "torrent_movie": reparse_torrent_movie,
+    "torrent_series": reparse_torrent_series,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-analizar sin conexión las páginas archivadas")
+    parser.add_argument(
+        "--type",
+        action="append",
+        choices=sorted(HANDLERS),
+        help="Tipo de página a procesar (se puede repetir; por defecto todos)",
+    )
+    parser.add_argument("--url-contains", metavar="TEXTO", help="Sólo las URL que contengan TEXTO")
+    parser.add_argument("--limit", type=int, default=0, help="Máximo de páginas a procesar")
+    parser.add_argument("--dry-run", action="store_true", help="Analizar sin escribir en la base de datos")
+    args = parser.parse_args()
+
+    # Los scrapers de Dontorrent registran cada página; basta con el resumen
+    for module in (torrent_dw_films_scraper, torrent_dw_series_scraper):
+        logging.getLogger(module.__name__).setLevel(logging.WARNING)
+
+    archive = get_page_archive(scraper_utils.PAGE_ARCHIVE_DIR)
+    logger.info(f"Archivo de páginas en {scraper_utils.PAGE_ARCHIVE_DIR}: {archive.stats()}")
+
+    connection = None if args.dry_run else connect_db()
+    processed = Counter()
+    failed = Counter()
+    links = 0
+    start = time.perf_counter()
+    try:
+        for url, page_type, _, body in archive.iter_pages(args.type or list(HANDLERS), args.url_contains):
+            try:
+                result = HANDLERS[page_type](connection, url, body, args.dry_run)
+            except Exception as e:
+                logger.error(f"Error al re-analizar {url}: {e}")
+                result = None
+            if result is None:
+                failed[page_type] += 1
+            else:
+                processed[page_type] += 1
+                links += len(result)
+            if args.limit and sum(processed.values()) + sum(failed.values()) >= args.limit:
+                break
+    finally:
+        if connection is not None:
+            connection.close()
+        close_torrent_series_connection()
+        close_page_archive()
+
+    elapsed = time.perf_counter() - start
+    total = sum(processed.values()) + sum(failed.values())
+    for page_type in sorted(set(processed) | set(failed)):
+        logger.info(f"{page_type}: {processed[page_type]} páginas, {failed[page_type]} sin datos")
+    rate = total / elapsed if elapsed else 0.0
+    logger.info(
+        f"{total} páginas re-analizadas en {elapsed:.1f}s ({rate:.0f} páginas/s), {links} enlaces"
+        + (" (sin escribir en la BD)" if args.dry_run else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
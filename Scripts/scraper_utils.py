@@ -8,6 +8,7 @@ import smtplib
 import traceback
 import threading
 import signal
+from contextlib import contextmanager
 
 try:  # pragma: no cover - dependencias opcionales para escuchar teclas
     import msvcrt  # type: ignore
@@ -28,9 +29,29 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
-from bs4 import BeautifulSoup
 from webdriver_manager.chrome import ChromeDriverManager
 
+try:  # pragma: no cover - compatible al ejecutarse como script o módulo
+    from .embed_resolver import resolve_embed_urls
+    from .page_ready import load, wait_for, current_embed_src
+    from .parsers import MOVIE_LANGUAGES
+    from .page_extract import extract as _extract, parse_page_source, harvest_embeds
+    from .page_archive import get_page_archive
+    from .parse_pool import OFFLOAD_TYPES, get_parse_pool
+    from .db_migrations import DIRECT_MIGRATIONS, DIRECT_MIGRATION_TABLES, migrate, missing_tables
+    from .db_connections import get_connection_manager
+    from .records import Link
+except ImportError:  # pragma: no cover
+    from embed_resolver import resolve_embed_urls
+    from page_ready import load, wait_for, current_embed_src
+    from parsers import MOVIE_LANGUAGES
+    from page_extract import extract as _extract, parse_page_source, harvest_embeds
+    from page_archive import get_page_archive
+    from parse_pool import OFFLOAD_TYPES, get_parse_pool
+    from db_migrations import DIRECT_MIGRATIONS, DIRECT_MIGRATION_TABLES, migrate, missing_tables
+    from db_connections import get_connection_manager
+    from records import Link
+
 # Configuración global
 BASE_URL = "https://hdfull.love"
 LOGIN_URL = f"{BASE_URL}/login"
@@ -48,6 +69,42 @@ TORRENT_SERIES_MAX_FAILURES = 10
 # Configuración de caché
 CACHE_ENABLED = True
 
+# Caché HTTP en disco (revalidación condicional de páginas torrent)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_MAX_ENTRIES = 200000
+
+# Descarga de listados de HDFull por HTTP con las cookies del driver
+LISTING_HTTP_ENABLED = True
+
+# Perfil "ligero" de Chrome: carga eager y bloqueo de recursos innecesarios
+LEAN_BROWSER_ENABLED = False
+
+# Reciclado de drivers del pool (páginas servidas y memoria RSS en MB)
+DRIVER_MAX_PAGES = 200
+DRIVER_MAX_RSS_MB = 1500
+
+# Pestañas por navegador compartido (1 = un Chrome por worker)
+TABS_PER_BROWSER = 1
+
+# Extraer los datos con JavaScript en el navegador en lugar de analizar page_source
+BROWSER_EXTRACTION_ENABLED = False
+
+# Hacer los clics en los selectores de enlaces con un único script en el navegador
+EMBED_HARVEST_ENABLED = False
+
+# Guardar cada página descargada en el archivo para poder reanalizarla sin red
+PAGE_ARCHIVE_ENABLED = False
+
+# Procesos para analizar el HTML de las páginas pesadas (0 = en el hilo del worker)
+PARSE_PROCESSES = 0
+
+# Sentencias preparadas que guarda cada conexión persistente por hilo
+STATEMENT_CACHE_SIZE = 512
+
+# Escritor único de la BD directa: commit cada N registros o a los T milisegundos
+DB_WRITER_BATCH_SIZE = 50
+DB_WRITER_MAX_DELAY_MS = 500
+
 # Ruta del proyecto
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -60,6 +117,15 @@ STOP_SIGNAL_FILE = os.path.join(PROGRESS_DIR, "stop.flag")
 DB_PATH = os.path.join(PROJECT_ROOT, "Scripts", "direct_dw_db.db")
 TORRENT_DB_PATH = os.path.join(PROJECT_ROOT, "Scripts", "torrent_dw_db.db")
 
+# Directorio de la caché HTTP
+HTTP_CACHE_DIR = os.path.join(PROJECT_ROOT, "cache", "http")
+
+# Directorio del archivo de páginas descargadas
+PAGE_ARCHIVE_DIR = os.path.join(PROJECT_ROOT, "cache", "archive")
+
+# Cookies de la última sesión iniciada en HDFull
+SESSION_COOKIES_FILE = os.path.join(PROJECT_ROOT, "cache", "session_cookies.json")
+
 # Archivo de configuración para persistir las rutas de las bases de datos
 CONFIG_FILE = os.path.join(PROJECT_ROOT, "db_config.json")
 
@@ -73,6 +139,20 @@ if os.path.exists(CONFIG_FILE):
         MAX_WORKERS = data.get('max_workers', MAX_WORKERS)
         MAX_RETRIES = data.get('max_retries', MAX_RETRIES)
         CACHE_ENABLED = data.get('cache_enabled', CACHE_ENABLED)
+        HTTP_CACHE_ENABLED = data.get('http_cache_enabled', HTTP_CACHE_ENABLED)
+        HTTP_CACHE_MAX_ENTRIES = data.get('http_cache_max_entries', HTTP_CACHE_MAX_ENTRIES)
+        LISTING_HTTP_ENABLED = data.get('listing_http_enabled', LISTING_HTTP_ENABLED)
+        DRIVER_MAX_PAGES = data.get('driver_max_pages', DRIVER_MAX_PAGES)
+        LEAN_BROWSER_ENABLED = data.get('lean_browser_enabled', LEAN_BROWSER_ENABLED)
+        DRIVER_MAX_RSS_MB = data.get('driver_max_rss_mb', DRIVER_MAX_RSS_MB)
+        TABS_PER_BROWSER = data.get('tabs_per_browser', TABS_PER_BROWSER)
+        BROWSER_EXTRACTION_ENABLED = data.get('browser_extraction_enabled', BROWSER_EXTRACTION_ENABLED)
+        EMBED_HARVEST_ENABLED = data.get('embed_harvest_enabled', EMBED_HARVEST_ENABLED)
+        PAGE_ARCHIVE_ENABLED = data.get('page_archive_enabled', PAGE_ARCHIVE_ENABLED)
+        PAGE_ARCHIVE_DIR = data.get('page_archive_dir', PAGE_ARCHIVE_DIR)
+        PARSE_PROCESSES = data.get('parse_processes', PARSE_PROCESSES)
+        DB_WRITER_BATCH_SIZE = data.get('db_writer_batch_size', DB_WRITER_BATCH_SIZE)
+        DB_WRITER_MAX_DELAY_MS = data.get('db_writer_max_delay_ms', DB_WRITER_MAX_DELAY_MS)
         TORRENT_MOVIES_MAX_FAILURES = data.get(
             'torrent_movies_max_failures', TORRENT_MOVIES_MAX_FAILURES
         )
@@ -235,6 +315,110 @@ def set_cache_enabled(value):
     _update_config(cache_enabled=CACHE_ENABLED)
 
 
+def set_http_cache_enabled(value):
+    """Activa o desactiva la lectura de la caché HTTP en disco y lo persiste."""
+    global HTTP_CACHE_ENABLED
+    HTTP_CACHE_ENABLED = bool(value)
+    logging.getLogger(__name__).debug(f"HTTP_CACHE_ENABLED ahora es {HTTP_CACHE_ENABLED}")
+    _update_config(http_cache_enabled=HTTP_CACHE_ENABLED)
+
+
+def set_http_cache_max_entries(value):
+    """Actualiza el número máximo de entradas de la caché HTTP."""
+    global HTTP_CACHE_MAX_ENTRIES
+    HTTP_CACHE_MAX_ENTRIES = max(1, int(value))
+    logging.getLogger(__name__).debug(f"HTTP_CACHE_MAX_ENTRIES establecido en {HTTP_CACHE_MAX_ENTRIES}")
+    _update_config(http_cache_max_entries=HTTP_CACHE_MAX_ENTRIES)
+
+
+def set_listing_http_enabled(value):
+    """Activa o desactiva la descarga de listados sin navegador y lo persiste."""
+    global LISTING_HTTP_ENABLED
+    LISTING_HTTP_ENABLED = bool(value)
+    logging.getLogger(__name__).debug(f"LISTING_HTTP_ENABLED ahora es {LISTING_HTTP_ENABLED}")
+    _update_config(listing_http_enabled=LISTING_HTTP_ENABLED)
+
+
+def set_lean_browser_enabled(value):
+    """Activa o desactiva el perfil ligero de Chrome y lo persiste."""
+    global LEAN_BROWSER_ENABLED
+    LEAN_BROWSER_ENABLED = bool(value)
+    logging.getLogger(__name__).debug(f"LEAN_BROWSER_ENABLED ahora es {LEAN_BROWSER_ENABLED}")
+    _update_config(lean_browser_enabled=LEAN_BROWSER_ENABLED)
+
+
+def set_driver_max_pages(value):
+    """Actualiza el número de páginas tras el que se recicla un driver."""
+    global DRIVER_MAX_PAGES
+    DRIVER_MAX_PAGES = max(1, int(value))
+    logging.getLogger(__name__).debug(f"DRIVER_MAX_PAGES establecido en {DRIVER_MAX_PAGES}")
+    _update_config(driver_max_pages=DRIVER_MAX_PAGES)
+
+
+def set_driver_max_rss_mb(value):
+    """Actualiza la memoria (MB) a partir de la cual se recicla un driver."""
+    global DRIVER_MAX_RSS_MB
+    DRIVER_MAX_RSS_MB = max(0, int(value))
+    logging.getLogger(__name__).debug(f"DRIVER_MAX_RSS_MB establecido en {DRIVER_MAX_RSS_MB}")
+    _update_config(driver_max_rss_mb=DRIVER_MAX_RSS_MB)
+
+
+def set_tabs_per_browser(value):
+    """Actualiza cuántos workers comparten un mismo Chrome mediante pestañas."""
+    global TABS_PER_BROWSER
+    TABS_PER_BROWSER = max(1, int(value))
+    logging.getLogger(__name__).debug(f"TABS_PER_BROWSER establecido en {TABS_PER_BROWSER}")
+    _update_config(tabs_per_browser=TABS_PER_BROWSER)
+
+
+def set_browser_extraction_enabled(value):
+    """Activa o desactiva la extracción de datos en el navegador y la persiste."""
+    global BROWSER_EXTRACTION_ENABLED
+    BROWSER_EXTRACTION_ENABLED = bool(value)
+    logging.getLogger(__name__).debug(f"BROWSER_EXTRACTION_ENABLED ahora es {BROWSER_EXTRACTION_ENABLED}")
+    _update_config(browser_extraction_enabled=BROWSER_EXTRACTION_ENABLED)
+
+
+def set_embed_harvest_enabled(value):
+    """Activa o desactiva la recogida de enlaces en el navegador y la persiste."""
+    global EMBED_HARVEST_ENABLED
+    EMBED_HARVEST_ENABLED = bool(value)
+    logging.getLogger(__name__).debug(f"EMBED_HARVEST_ENABLED ahora es {EMBED_HARVEST_ENABLED}")
+    _update_config(embed_harvest_enabled=EMBED_HARVEST_ENABLED)
+
+
+def set_page_archive_enabled(value):
+    """Activa o desactiva el archivo de páginas descargadas y lo persiste."""
+    global PAGE_ARCHIVE_ENABLED
+    PAGE_ARCHIVE_ENABLED = bool(value)
+    logging.getLogger(__name__).debug(f"PAGE_ARCHIVE_ENABLED ahora es {PAGE_ARCHIVE_ENABLED}")
+    _update_config(page_archive_enabled=PAGE_ARCHIVE_ENABLED)
+
+
+def set_parse_processes(value):
+    """Actualiza cuántos procesos analizan el HTML de las páginas (0 = ninguno)."""
+    global PARSE_PROCESSES
+    PARSE_PROCESSES = max(0, int(value))
+    logging.getLogger(__name__).debug(f"PARSE_PROCESSES establecido en {PARSE_PROCESSES}")
+    _update_config(parse_processes=PARSE_PROCESSES)
+
+
+def set_db_writer_batch_size(value):
+    """Actualiza cada cuántos registros confirma el escritor de la BD."""
+    global DB_WRITER_BATCH_SIZE
+    DB_WRITER_BATCH_SIZE = max(1, int(value))
+    logging.getLogger(__name__).debug(f"DB_WRITER_BATCH_SIZE establecido en {DB_WRITER_BATCH_SIZE}")
+    _update_config(db_writer_batch_size=DB_WRITER_BATCH_SIZE)
+
+
+def set_db_writer_max_delay_ms(value):
+    """Actualiza cuántos milisegundos puede esperar un registro a ser confirmado."""
+    global DB_WRITER_MAX_DELAY_MS
+    DB_WRITER_MAX_DELAY_MS = max(0, int(value))
+    logging.getLogger(__name__).debug(f"DB_WRITER_MAX_DELAY_MS establecido en {DB_WRITER_MAX_DELAY_MS}")
+    _update_config(db_writer_max_delay_ms=DB_WRITER_MAX_DELAY_MS)
+
+
 def set_torrent_movies_max_failures(value):
     """Actualiza el máximo de fallos consecutivos para películas torrent."""
     global TORRENT_MOVIES_MAX_FAILURES
@@ -283,13 +467,61 @@ def setup_logger(name, log_file, level=logging.INFO):
     logger.handlers = []
     logger.addHandler(console_handler)
     logger.addHandler(file_handler)
+    # Ya tiene su propia consola: si además llegara a los handlers raíz (los que
+    # crean los basicConfig de otros módulos) cada mensaje saldría repetido
+    logger.propagate = False
 
     return logger
 
 
 # Función para crear un driver de Selenium con configuración optimizada
-def create_driver(headless=True):
-    """Crea y devuelve un driver de Selenium con configuración optimizada."""
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def _get_chromedriver_path():
+    """Resuelve una sola vez por proceso la ruta del chromedriver."""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            try:
+                _chromedriver_path = ChromeDriverManager().install()
+            except Exception as e:
+                # Fallback a la ruta local si webdriver-manager falla
+                logging.getLogger(__name__).warning(f"webdriver-manager no disponible ({e}); usando chromedriver local")
+                _chromedriver_path = os.path.join(PROJECT_ROOT, "chromedriver.exe")
+        return _chromedriver_path
+
+
+# Recursos que el perfil ligero bloquea vía CDP (imágenes, multimedia, fuentes y publicidad)
+LEAN_BLOCKED_URLS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*googlesyndication.com*", "*doubleclick.net*", "*google-analytics.com*",
+    "*googletagmanager.com*", "*adservice.google.*", "*facebook.net*",
+    "*popads.net*", "*popcash.net*", "*propellerads.com*", "*adsterra.com*",
+    "*onclickads.net*", "*histats.com*", "*cloudflareinsights.com*",
+]
+
+# Funciones de Chrome que no necesitamos para leer el DOM
+LEAN_DISABLED_FEATURES = [
+    "Translate", "MediaRouter", "OptimizationHints", "AutofillServerCommunication",
+    "InterestFeedContentSuggestions", "CalculateNativeWinOcclusion", "BackForwardCache",
+]
+
+
+def create_driver(headless=True, lean=None, page_load_strategy=None):
+    """Crea y devuelve un driver de Selenium con configuración optimizada.
+
+    Con ``lean`` (por defecto ``LEAN_BROWSER_ENABLED``) la página se da por
+    cargada en DOMContentLoaded y se bloquean imágenes, multimedia, fuentes y
+    dominios de publicidad, ya que sólo leemos texto del DOM y ``src`` de iframes.
+    ``page_load_strategy`` fuerza la estrategia de carga (p. ej. ``"none"`` para
+    los navegadores compartidos por pestañas).
+    """
+    if lean is None:
+        lean = LEAN_BROWSER_ENABLED
     options = webdriver.ChromeOptions()
 
     if headless:
@@ -310,14 +542,34 @@ def create_driver(headless=True):
     options.add_argument("--disable-infobars")
     options.add_argument("--disable-blink-features=AutomationControlled")
 
-    # Usar webdriver-manager para gestionar el chromedriver automáticamente
-    try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-    except Exception as e:
-        # Fallback a la ruta local si webdriver-manager falla
-        service = Service(os.path.join(PROJECT_ROOT, "chromedriver.exe"))
-        driver = webdriver.Chrome(service=service, options=options)
+    if lean:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument(f"--disable-features={','.join(LEAN_DISABLED_FEATURES)}")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-sync")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--mute-audio")
+        options.add_argument("--no-first-run")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+        })
+
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+
+    # Usar webdriver-manager para gestionar el chromedriver (resuelto una vez por proceso)
+    service = Service(_get_chromedriver_path())
+    driver = webdriver.Chrome(service=service, options=options)
+
+    if lean:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"No se pudo activar el bloqueo de recursos por CDP: {e}")
 
     # Configurar timeouts
     # Aumentamos el tiempo máximo de carga de página para evitar
@@ -329,7 +581,7 @@ def create_driver(headless=True):
 
 
 # Función para conectar a la base de datos con optimizaciones
-def connect_db(db_path=None):
+def connect_db(db_path=None, check_same_thread=True, cached_statements=128):
     """Conecta a la base de datos SQLite con configuración optimizada."""
     if db_path is None:
         db_path = DB_PATH
@@ -343,7 +595,9 @@ def connect_db(db_path=None):
 
     try:
         logging.getLogger(__name__).debug(f"Conectando a la base de datos en: {db_path}")
-        connection = sqlite3.connect(db_path, timeout=30)
+        connection = sqlite3.connect(
+            db_path, timeout=30, check_same_thread=check_same_thread, cached_statements=cached_statements
+        )
         connection.row_factory = sqlite3.Row
 
         # Optimizaciones para SQLite
@@ -357,6 +611,24 @@ def connect_db(db_path=None):
         raise Exception(f"Error al conectar a la base de datos: {e}")
 
 
+def _connect_persistent(db_path):
+    # Las cierra close_db_connections desde el hilo que termina el scraper
+    return connect_db(db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+
+
+@contextmanager
+def db_connection(connection=None, db_path=None):
+    """Conexión para un helper: la recibida o la persistente del hilo actual.
+
+    Ver :mod:`db_connections`; la conexión persistente no se cierra al salir.
+    """
+    if connection is not None:
+        yield connection
+        return
+    with get_connection_manager(_connect_persistent).connection(db_path or DB_PATH) as managed:
+        yield managed
+
+
 def execute_sql_script(script_path, db_path=None, logger=None):
     """Ejecuta un script SQL en la base de datos especificada."""
     if db_path is None:
@@ -453,6 +725,105 @@ def login(driver, logger):
         return False
 
 
+# Reutilización de la sesión iniciada entre drivers y ejecuciones
+_session_lock = threading.Lock()
+
+# Claves que acepta ``driver.add_cookie``
+_COOKIE_KEYS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+def _session_cookies_mtime():
+    try:
+        return os.path.getmtime(SESSION_COOKIES_FILE)
+    except OSError:
+        return None
+
+
+def load_session_cookies():
+    """Devuelve las cookies guardadas que aún no han caducado."""
+    try:
+        with open(SESSION_COOKIES_FILE, 'r', encoding='utf-8') as f:
+            cookies = json.load(f)
+    except (OSError, ValueError):
+        return []
+    now = time.time()
+    return [c for c in cookies if not c.get("expiry") or c["expiry"] > now]
+
+
+def save_session_cookies(driver):
+    """Guarda las cookies del driver tras un inicio de sesión correcto."""
+    try:
+        cookies = driver.get_cookies()
+        os.makedirs(os.path.dirname(SESSION_COOKIES_FILE), exist_ok=True)
+        tmp_path = f"{SESSION_COOKIES_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cookies, f)
+        os.replace(tmp_path, SESSION_COOKIES_FILE)
+        return True
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"No se pudieron guardar las cookies de sesión: {e}")
+        return False
+
+
+def is_logged_in(driver):
+    """Comprueba sin esperas implícitas si la página actual tiene la sesión iniciada."""
+    try:
+        if "/login" in driver.current_url:
+            return False
+        return bool(driver.execute_script(
+            "return !!document.querySelector('.user-menu, .username, .nav-profile-name');"
+        ))
+    except Exception:
+        return False
+
+
+def restore_session(driver, logger, cookies=None):
+    """Inyecta las cookies guardadas en el driver y comprueba que la sesión sigue activa."""
+    cookies = load_session_cookies() if cookies is None else cookies
+    if not cookies:
+        return False
+    try:
+        # Hay que estar en el dominio para poder añadir sus cookies
+        driver.get(BASE_URL)
+        driver.delete_all_cookies()
+        for cookie in cookies:
+            cookie = {k: v for k, v in cookie.items() if k in _COOKIE_KEYS}
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                logger.debug(f"Cookie {cookie.get('name')} descartada: {e}")
+        driver.get(BASE_URL)
+    except Exception as e:
+        logger.warning(f"No se pudo restaurar la sesión guardada: {e}")
+        return False
+    if is_logged_in(driver):
+        logger.info("Sesión restaurada desde las cookies guardadas")
+        return True
+    logger.info("Las cookies guardadas ya no son válidas")
+    return False
+
+
+def ensure_logged_in(driver, logger):
+    """Deja el driver autenticado reutilizando la sesión guardada si es posible.
+
+    Sólo se hace el login completo cuando la sesión ha caducado; tras él se
+    guardan las cookies para el resto de drivers y ejecuciones.
+    """
+    seen_mtime = _session_cookies_mtime()
+    if restore_session(driver, logger):
+        return True
+    with _session_lock:
+        # Otro driver puede haber renovado la sesión mientras esperábamos
+        if _session_cookies_mtime() != seen_mtime and restore_session(driver, logger):
+            return True
+        if not login(driver, logger):
+            return False
+        save_session_cookies(driver)
+        return True
+
+
 # Función para verificar y crear tablas necesarias
 def setup_database(logger, db_path=None):
     """Configura la base de datos, creando tablas si no existen y añadiendo columnas necesarias."""
@@ -523,14 +894,15 @@ def setup_database(logger, db_path=None):
         else:
             logger.warning("Tabla links_files_download no existe; omitiendo cambios de columnas")
 
-        # Crear índices para mejorar el rendimiento de las consultas
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_media_downloads_title ON media_downloads(title, type)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_series_seasons_movie_id ON series_seasons(movie_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_series_episodes_season_id ON series_episodes(season_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_links_movie_id ON links_files_download(movie_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_links_episode_id ON links_files_download(episode_id)")
-
         connection.commit()
+
+        # Índices de búsqueda y demás cambios versionados del esquema; sólo si
+        # existen todas las tablas a las que afectan
+        absent = missing_tables(connection, DIRECT_MIGRATION_TABLES)
+        if absent:
+            logger.warning(f"Faltan tablas ({', '.join(absent)}); omitiendo migraciones del esquema")
+        else:
+            migrate(connection, DIRECT_MIGRATIONS, "base directa")
         logger.info("Base de datos configurada correctamente")
         return True
     except Exception as e:
@@ -595,35 +967,29 @@ def get_or_create_server(server_name, connection=None, db_path=None):
     if CACHE_ENABLED and server_name in CACHE['servers']:
         return CACHE['servers'][server_name]
 
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
-
-    cursor = connection.cursor()
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
 
-    try:
-        # Intentar obtener el servidor
-        cursor.execute('SELECT id FROM servers WHERE name=?', (server_name,))
-        result = cursor.fetchone()
+        try:
+            # Intentar obtener el servidor
+            cursor.execute('SELECT id FROM servers WHERE name=?', (server_name,))
+            result = cursor.fetchone()
 
-        if result:
-            server_id = result['id']
-        else:
-            # Crear el servidor si no existe
-            cursor.execute('INSERT INTO servers (name) VALUES (?)', (server_name,))
-            connection.commit()
-            server_id = cursor.lastrowid
+            if result:
+                server_id = result['id']
+            else:
+                # Crear el servidor si no existe
+                cursor.execute('INSERT INTO servers (name) VALUES (?)', (server_name,))
+                connection.commit()
+                server_id = cursor.lastrowid
 
-        # Guardar en caché
-        if CACHE_ENABLED:
-            CACHE['servers'][server_name] = server_id
+            # Guardar en caché
+            if CACHE_ENABLED:
+                CACHE['servers'][server_name] = server_id
 
-        return server_id
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+            return server_id
+        finally:
+            cursor.close()
 
 
 # Función para obtener o crear una calidad en la base de datos
@@ -633,71 +999,80 @@ def get_or_create_quality(quality_name, connection=None, db_path=None):
     if CACHE_ENABLED and quality_name in CACHE['qualities']:
         return CACHE['qualities'][quality_name]
 
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
 
-    cursor = connection.cursor()
-
-    try:
-        # Intentar obtener la calidad
-        cursor.execute('SELECT quality_id FROM qualities WHERE quality=?', (quality_name,))
-        result = cursor.fetchone()
+        try:
+            # Intentar obtener la calidad
+            cursor.execute('SELECT quality_id FROM qualities WHERE quality=?', (quality_name,))
+            result = cursor.fetchone()
 
-        if result:
-            quality_id = result['quality_id']
-        else:
-            # Crear la calidad si no existe
-            cursor.execute('INSERT INTO qualities (quality) VALUES (?)', (quality_name,))
-            connection.commit()
-            quality_id = cursor.lastrowid
+            if result:
+                quality_id = result['quality_id']
+            else:
+                # Crear la calidad si no existe
+                cursor.execute('INSERT INTO qualities (quality) VALUES (?)', (quality_name,))
+                connection.commit()
+                quality_id = cursor.lastrowid
 
-        # Guardar en caché
-        if CACHE_ENABLED:
-            CACHE['qualities'][quality_name] = quality_id
+            # Guardar en caché
+            if CACHE_ENABLED:
+                CACHE['qualities'][quality_name] = quality_id
 
-        return quality_id
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+            return quality_id
+        finally:
+            cursor.close()
 
 
 # Función para verificar si un enlace ya existe
 def link_exists(movie_id=None, episode_id=None, server_id=None, language=None, link=None, connection=None,
                 db_path=None):
     """Verifica si un enlace ya existe en la base de datos."""
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
 
-    cursor = connection.cursor()
+        try:
+            if movie_id:
+                cursor.execute('''
+                    SELECT id FROM links_files_download 
+                    WHERE movie_id=? AND episode_id IS NULL AND server_id=? AND language=? AND link=?
+                ''', (movie_id, server_id, language, link))
+            elif episode_id:
+                cursor.execute('''
+                    SELECT id FROM links_files_download 
+                    WHERE episode_id=? AND server_id=? AND language=? AND link=?
+                ''', (episode_id, server_id, language, link))
+            else:
+                return False
 
-    try:
-        if movie_id:
-            cursor.execute('''
-                SELECT id FROM links_files_download 
-                WHERE movie_id=? AND server_id=? AND language=? AND link=?
-            ''', (movie_id, server_id, language, link))
-        elif episode_id:
-            cursor.execute('''
-                SELECT id FROM links_files_download 
-                WHERE episode_id=? AND server_id=? AND language=? AND link=?
-            ''', (episode_id, server_id, language, link))
-        else:
-            return False
+            result = cursor.fetchone()
+            return result is not None
+        finally:
+            cursor.close()
 
-        result = cursor.fetchone()
-        return result is not None
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+
+# Las filas que ya existen las descartan los índices únicos de la migración 2
+INSERT_LINK_SQL = '''
+    INSERT INTO links_files_download
+    (movie_id, episode_id, server_id, language, link, quality_id, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, datetime('now'))
+    ON CONFLICT DO NOTHING
+'''
+
+
+def insert_link_rows(cursor, rows):
+    """Inserta filas ``(movie_id, episode_id, server_id, language, link, quality_id)``.
+
+    Se hace un único ``executemany`` y se omiten los enlaces que ya están en
+    la BD con la misma película o episodio, servidor, idioma y URL. Devuelve
+    cuántas filas se añadieron realmente.
+    """
+    if not rows:
+        return 0
+    cursor.executemany(INSERT_LINK_SQL, rows)
+    return max(cursor.rowcount, 0)
 
 
-# Función de utilidad para registrar inserciones en la base de datos
 def log_link_insertion(logger, *, movie_id=None, episode_id=None, server=None, language=None):
     """Registra un mensaje estandarizado al insertar un enlace."""
     if movie_id is not None:
@@ -711,80 +1086,137 @@ def log_link_insertion(logger, *, movie_id=None, episode_id=None, server=None, l
 
 # Función para insertar enlaces en lote
 def insert_links_batch(links, logger, connection=None, db_path=None):
-    """Inserta múltiples enlaces en la base de datos de forma eficiente."""
+    """Inserta múltiples enlaces (:class:`records.Link`) en la base de datos de forma eficiente."""
     if not links:
         return 0
 
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
+        inserted_count = 0
 
-    cursor = connection.cursor()
-    inserted_count = 0
+        try:
+            # Preparar todos los servidores y calidades de una vez
+            servers = {}
+            qualities = {}
+
+            for link in links:
+                if link.server not in servers:
+                    servers[link.server] = get_or_create_server(link.server, connection, db_path)
+
+                if link.quality not in qualities:
+                    qualities[link.quality] = get_or_create_quality(link.quality, connection, db_path)
+
+            # Insertar enlaces en lote; los repetidos se descartan en la propia BD
+            rows = [
+                (link.movie_id, link.episode_id, servers[link.server], link.language, link.url, qualities[link.quality])
+                for link in links
+                if link.movie_id or link.episode_id
+            ]
+            inserted_count = insert_link_rows(cursor, rows)
+            logger.debug(f"Enlaces en lote: {inserted_count} nuevos de {len(rows)}")
 
-    try:
-        # Preparar todos los servidores y calidades de una vez
-        servers = {}
-        qualities = {}
-
-        for link in links:
-            if link["server"] not in servers:
-                servers[link["server"]] = get_or_create_server(link["server"], connection, db_path)
-
-            if link["quality"] not in qualities:
-                qualities[link["quality"]] = get_or_create_quality(link["quality"], connection, db_path)
-
-        # Insertar enlaces en lote
-        for link in links:
-            server_id = servers[link["server"]]
-            quality_id = qualities[link["quality"]]
-
-            # Verificar si el enlace ya existe
-            exists = False
-            if "movie_id" in link and link["movie_id"]:
-                exists = link_exists(movie_id=link["movie_id"], server_id=server_id,
-                                     language=link["language"], link=link["link"], connection=connection,
-                                     db_path=db_path)
-            elif "episode_id" in link and link["episode_id"]:
-                exists = link_exists(episode_id=link["episode_id"], server_id=server_id,
-                                     language=link["language"], link=link["link"], connection=connection,
-                                     db_path=db_path)
-
-            if not exists:
-                if "movie_id" in link and link["movie_id"]:
-                    cursor.execute('''
-                        INSERT INTO links_files_download
-                        (movie_id, server_id, language, link, quality_id, created_at)
-                        VALUES (?, ?, ?, ?, ?, datetime('now'))
-                    ''', (link["movie_id"], server_id, link["language"], link["link"], quality_id))
-                elif "episode_id" in link and link["episode_id"]:
-                    cursor.execute('''
-                        INSERT INTO links_files_download
-                        (episode_id, server_id, language, link, quality_id, created_at)
-                        VALUES (?, ?, ?, ?, ?, datetime('now'))
-                    ''', (link["episode_id"], server_id, link["language"], link["link"], quality_id))
-
-                log_link_insertion(
-                    logger,
-                    movie_id=link.get("movie_id"),
-                    episode_id=link.get("episode_id"),
-                    server=link["server"],
-                    language=link["language"],
-                )
-                inserted_count += 1
+            connection.commit()
+            return inserted_count
+        except Exception as e:
+            logger.error(f"Error al insertar enlaces en lote: {e}")
+            logger.debug(traceback.format_exc())
+            connection.rollback()
+            return 0
+        finally:
+            cursor.close()
 
-        connection.commit()
-        return inserted_count
+
+def archive_page(url, body, page_type, source):
+    """Guarda una página descargada en el archivo si ``PAGE_ARCHIVE_ENABLED``.
+
+    ``source`` indica cómo se obtuvo (``"http"`` o ``"driver"``). Un fallo al
+    archivar nunca interrumpe el scraping.
+    """
+    if not PAGE_ARCHIVE_ENABLED or not body:
+        return
+    try:
+        get_page_archive(PAGE_ARCHIVE_DIR).store(url, body, page_type, source)
     except Exception as e:
-        logger.error(f"Error al insertar enlaces en lote: {e}")
-        logger.debug(traceback.format_exc())
-        connection.rollback()
-        return 0
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+        logging.getLogger(__name__).warning(f"No se pudo archivar {url}: {e}")
+
+
+def extract_page(driver, page_type, base_url=BASE_URL):
+    """Datos de la página cargada en ``driver`` (ver :mod:`page_extract`).
+
+    Con ``BROWSER_EXTRACTION_ENABLED`` se extraen con JavaScript en una sola
+    llamada; si no, se analiza ``driver.page_source``. Con el archivo de
+    páginas activado siempre se obtiene ``page_source`` para guardarlo.
+
+    Con ``PARSE_PROCESSES`` el HTML de las páginas pesadas se analiza en el
+    pool de :mod:`parse_pool`; las páginas con enlaces llegan entonces con
+    ``resolved_urls`` en lugar de ``embed_source`` (ver
+    :func:`resolve_page_embeds`).
+    """
+    offload = PARSE_PROCESSES > 0 and page_type in OFFLOAD_TYPES
+    if PAGE_ARCHIVE_ENABLED or (offload and not BROWSER_EXTRACTION_ENABLED):
+        page_source = driver.page_source
+        if PAGE_ARCHIVE_ENABLED:
+            archive_page(driver.current_url, page_source, page_type, "driver")
+        if offload:
+            return get_parse_pool(PARSE_PROCESSES).parse(page_source, page_type, base_url)
+        return parse_page_source(page_source, page_type, base_url)
+    return _extract(driver, page_type, in_browser=BROWSER_EXTRACTION_ENABLED, base_url=base_url)
+
+
+def resolve_page_embeds(page):
+    """URL deducida sin clic (o ``None``) para cada selector de una página de :func:`extract_page`."""
+    if "resolved_urls" in page:
+        return page["resolved_urls"]
+    return resolve_embed_urls(page["embed_source"]) if page["embeds"] else []
+
+
+def harvest_pending_embeds(driver, count, resolved_urls=()):
+    """Recoge en el navegador los iframes de los selectores que no estén en ``resolved_urls``.
+
+    Con ``EMBED_HARVEST_ENABLED`` un solo script hace clic en los ``count``
+    selectores pendientes. Devuelve ``(urls, harvested)``: un enlace (o
+    ``None``) por selector y los índices en los que ya se hizo clic, que no
+    hay que repetir desde Python. Si está desactivado o el script falla,
+    ``harvested`` está vacío.
+    """
+    urls = list(resolved_urls)[:count] + [None] * max(0, count - len(resolved_urls))
+    if not EMBED_HARVEST_ENABLED:
+        return urls, set()
+    pending = [i for i, url in enumerate(urls) if not url]
+    harvested = harvest_embeds(driver, pending)
+    if harvested is None:
+        return urls, set()
+    for i, url in zip(pending, harvested):
+        urls[i] = url
+    return urls, set(pending)
+
+
+def build_link_data(server, language, embedded_link, movie_id=None, episode_id=None):
+    """:class:`records.Link` para :func:`insert_links_batch` o ``None`` si falta algún dato."""
+    if not (server and language and embedded_link):
+        return None
+
+    # Modificar el enlace si es powvideo o streamplay
+    if server in ["powvideo", "streamplay"]:
+        embedded_link = re.sub(r"embed-([^-]+)-\d+x\d+\.html", r"\1", embedded_link)
+
+    # Determinar la calidad en función del servidor
+    quality = '1080p' if server in ['streamtape', 'vidmoly', 'mixdrop'] else 'hdrip'
+
+    # Si se indican los dos, el enlace es de la película
+    if movie_id:
+        episode_id = None
+    return Link(server, language, embedded_link, quality, movie_id or None, episode_id or None)
+
+
+def embed_link_data(embed_info, embedded_link, movie_id=None, episode_id=None):
+    """:func:`build_link_data` para un selector de :func:`parsers.parse_embed_selectors`.
+
+    Sólo se guardan los idiomas de ``MOVIE_LANGUAGES``; el servidor se pasa a minúsculas.
+    """
+    language = embed_info["language"] if embed_info["language"] in MOVIE_LANGUAGES else None
+    server = embed_info["server"].lower() if embed_info["server"] else None
+    return build_link_data(server, language, embedded_link, movie_id, episode_id)
 
 
 # Función para extraer enlaces de una página
@@ -798,81 +1230,74 @@ def extract_links(driver, movie_id=None, episode_id=None, logger=None):
         if logger:
             logger.debug(f"Número de enlaces encontrados: {len(embed_selectors)}")
 
+        # Extraer la página una sola vez: idioma y servidor de cada selector y,
+        # si se pueden deducir, los iframes (sólo se hace clic en los que no)
+        page = extract_page(driver, "embeds") if embed_selectors else {"embeds": [], "embed_source": ""}
+        embeds_info = page["embeds"]
+        try:
+            resolved_urls = resolve_page_embeds(page) if embed_selectors else []
+        except Exception as e:
+            if logger:
+                logger.debug(f"No se pudieron resolver los enlaces sin clic: {e}")
+            resolved_urls = []
+
+        # Los que falten se recogen, si está activado, con un único script
+        resolved_urls, harvested = harvest_pending_embeds(driver, len(embed_selectors), resolved_urls)
+
         for i, embed_selector in enumerate(embed_selectors):
             language = None
             server = None
-            embedded_link = None
+            embedded_link = resolved_urls[i]
+            if not embedded_link and i in harvested:
+                # El script ya hizo clic y el iframe no cambió
+                continue
 
             try:
-                # Extraer idioma y servidor antes de hacer clic
-                embed_html = embed_selector.get_attribute('outerHTML')
-                embed_soup = BeautifulSoup(embed_html, "html.parser")
-
-                if "Audio Español" in embed_soup.text:
-                    language = "Audio Español"
-                elif "Subtítulo Español" in embed_soup.text:
-                    language = "Subtítulo Español"
-                elif "Audio Latino" in embed_soup.text:
-                    language = "Audio Latino"
-
-                server_tag = embed_soup.find("b", class_="provider")
-                if server_tag:
-                    server = server_tag.text.strip().lower()
-
-                # Hacer clic en el selector
-                try:
-                    embed_selector.click()
-                    time.sleep(1)  # Esperar a que se cargue el contenido
-                except StaleElementReferenceException:
-                    # Si el elemento está obsoleto, refrescar y volver a intentar
-                    if logger:
-                        logger.warning(
-                            f"Elemento obsoleto al hacer clic en el enlace {i + 1}. Refrescando elementos...")
-                    embed_selectors = driver.find_elements(By.CLASS_NAME, 'embed-selector')
-                    if i < len(embed_selectors):
-                        embed_selector = embed_selectors[i]
+                if i < len(embeds_info):
+                    if embeds_info[i]["language"] in MOVIE_LANGUAGES:
+                        language = embeds_info[i]["language"]
+                    if embeds_info[i]["server"]:
+                        server = embeds_info[i]["server"].lower()
+
+                # Hacer clic en el selector sólo si no se resolvió desde el HTML
+                if not embedded_link:
+                    previous_src = current_embed_src(driver)
+                    try:
                         embed_selector.click()
-                        time.sleep(1)
-                    else:
-                        continue
+                        wait_for(driver, "embed", arg=previous_src)  # Esperar a que cambie el iframe
+                    except StaleElementReferenceException:
+                        # Si el elemento está obsoleto, refrescar y volver a intentar
+                        if logger:
+                            logger.warning(
+                                f"Elemento obsoleto al hacer clic en el enlace {i + 1}. Refrescando elementos...")
+                        embed_selectors = driver.find_elements(By.CLASS_NAME, 'embed-selector')
+                        if i < len(embed_selectors):
+                            embed_selector = embed_selectors[i]
+                            embed_selector.click()
+                            wait_for(driver, "embed", arg=previous_src)
+                        else:
+                            continue
             except Exception as e:
                 if logger:
                     logger.error(f"Error al hacer clic en el embed-selector {i + 1}: {e}")
                 continue
 
-            try:
-                # Esperar a que aparezca el iframe
-                embed_movie = WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, 'embed-movie'))
-                )
-                iframe = embed_movie.find_element(By.TAG_NAME, 'iframe')
-                embedded_link = iframe.get_attribute('src')
-            except Exception as e:
-                if logger:
-                    logger.error(f"Error al obtener el enlace embebido {i + 1}: {e}")
-                continue
-
-            # Modificar el enlace si es powvideo o streamplay
-            if embedded_link and server in ["powvideo", "streamplay"]:
-                embedded_link = re.sub(r"embed-([^-]+)-\d+x\d+\.html", r"\1", embedded_link)
-
-            # Determinar la calidad en función del servidor
-            quality = '1080p' if server in ['streamtape', 'vidmoly', 'mixdrop'] else 'hdrip'
+            if not embedded_link:
+                try:
+                    # Esperar a que aparezca el iframe
+                    embed_movie = WebDriverWait(driver, 5).until(
+                        EC.presence_of_element_located((By.CLASS_NAME, 'embed-movie'))
+                    )
+                    iframe = embed_movie.find_element(By.TAG_NAME, 'iframe')
+                    embedded_link = iframe.get_attribute('src')
+                except Exception as e:
+                    if logger:
+                        logger.error(f"Error al obtener el enlace embebido {i + 1}: {e}")
+                    continue
 
             # Añadir enlace a la lista
-            if server and language and embedded_link:
-                link_data = {
-                    "server": server,
-                    "language": language,
-                    "link": embedded_link,
-                    "quality": quality
-                }
-
-                if movie_id:
-                    link_data["movie_id"] = movie_id
-                elif episode_id:
-                    link_data["episode_id"] = episode_id
-
+            link_data = build_link_data(server, language, embedded_link, movie_id, episode_id)
+            if link_data:
                 server_links.append(link_data)
 
         return server_links
@@ -898,19 +1323,9 @@ def clear_cache():
 def has_next_page(page_url, driver):
     """Verifica si hay una siguiente página de resultados."""
     try:
-        driver.get(page_url)
-        time.sleep(2)  # Esperar a que se cargue la página
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Buscar el botón de siguiente página
-        next_button = soup.find("a", class_="current")
-        if next_button and next_button.find_next_sibling("a"):
-            return True
-
-        # Verificar si hay elementos en la página actual
-        items = soup.find_all(["div", "span"], class_=lambda c: c and ("tt view" in c))
-        return len(items) > 0
+        load(driver, page_url, "listing")
+        # Botón de página siguiente o, al menos, elementos en la página actual
+        return extract_page(driver, "has_more")
     except Exception:
         return False
 
@@ -923,44 +1338,38 @@ def find_series_by_title_year(title, year=None, connection=None, db_path=None):
     if CACHE_ENABLED and cache_key in CACHE['movies']:
         return CACHE['movies'][cache_key]
 
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
-
-    cursor = connection.cursor()
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
 
-    try:
-        if year:
-            cursor.execute('''
-                SELECT id, title, year, imdb_rating, genre FROM media_downloads 
-                WHERE title=? AND year=? AND type='serie'
-            ''', (title, year))
-        else:
-            cursor.execute('''
-                SELECT id, title, year, imdb_rating, genre FROM media_downloads 
-                WHERE title=? AND type='serie'
-            ''', (title,))
+        try:
+            if year:
+                cursor.execute('''
+                    SELECT id, title, year, imdb_rating, genre FROM media_downloads 
+                    WHERE title=? COLLATE NOCASE AND year=? AND type='serie'
+                ''', (title, year))
+            else:
+                cursor.execute('''
+                    SELECT id, title, year, imdb_rating, genre FROM media_downloads 
+                    WHERE title=? COLLATE NOCASE AND type='serie'
+                ''', (title,))
 
-        results = cursor.fetchall()
+            results = cursor.fetchall()
 
-        if not results:
-            return None
+            if not results:
+                return None
 
-        # Convertir a diccionario
-        result_dict = dict(results[0])
+            # Convertir a diccionario
+            result_dict = dict(results[0])
 
-        # Guardar en caché
-        if CACHE_ENABLED:
-            CACHE['movies'][cache_key] = result_dict
+            # Guardar en caché
+            if CACHE_ENABLED:
+                CACHE['movies'][cache_key] = result_dict
 
-        return result_dict
-    except Exception as e:
-        return None
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+            return result_dict
+        except Exception as e:
+            return None
+        finally:
+            cursor.close()
 
 
 # Función para verificar si una temporada existe
@@ -971,35 +1380,29 @@ def season_exists(series_id, season_number, connection=None, db_path=None):
     if CACHE_ENABLED and cache_key in CACHE['seasons']:
         return True, CACHE['seasons'][cache_key]
 
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
 
-    cursor = connection.cursor()
-
-    try:
-        cursor.execute('''
-            SELECT id FROM series_seasons 
-            WHERE movie_id=? AND season=?
-        ''', (series_id, season_number))
-        result = cursor.fetchone()
-        exists = result is not None
-
-        if exists:
-            season_id = result['id']
-            # Guardar en caché
-            if CACHE_ENABLED:
-                CACHE['seasons'][cache_key] = season_id
-            return True, season_id
-        else:
+        try:
+            cursor.execute('''
+                SELECT id FROM series_seasons 
+                WHERE movie_id=? AND season=?
+            ''', (series_id, season_number))
+            result = cursor.fetchone()
+            exists = result is not None
+
+            if exists:
+                season_id = result['id']
+                # Guardar en caché
+                if CACHE_ENABLED:
+                    CACHE['seasons'][cache_key] = season_id
+                return True, season_id
+            else:
+                return False, None
+        except Exception as e:
             return False, None
-    except Exception as e:
-        return False, None
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+        finally:
+            cursor.close()
 
 
 # Función para verificar si un episodio existe
@@ -1010,265 +1413,247 @@ def episode_exists(season_id, episode_number, title=None, connection=None, db_pa
     if CACHE_ENABLED and cache_key in CACHE['episodes']:
         return True, CACHE['episodes'][cache_key]
 
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
-
-    cursor = connection.cursor()
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
 
-    try:
-        if title:
-            cursor.execute('''
-                SELECT id FROM series_episodes 
-                WHERE season_id=? AND episode=? AND title=?
-            ''', (season_id, episode_number, title))
-        else:
-            cursor.execute('''
-                SELECT id FROM series_episodes 
-                WHERE season_id=? AND episode=?
-            ''', (season_id, episode_number))
-
-        result = cursor.fetchone()
-        exists = result is not None
-
-        if exists:
-            episode_id = result['id']
-            # Guardar en caché
-            if CACHE_ENABLED:
-                CACHE['episodes'][cache_key] = episode_id
-            return True, episode_id
-        else:
+        try:
+            if title:
+                cursor.execute('''
+                    SELECT id FROM series_episodes 
+                    WHERE season_id=? AND episode=? AND title=?
+                ''', (season_id, episode_number, title))
+            else:
+                cursor.execute('''
+                    SELECT id FROM series_episodes 
+                    WHERE season_id=? AND episode=?
+                ''', (season_id, episode_number))
+
+            result = cursor.fetchone()
+            exists = result is not None
+
+            if exists:
+                episode_id = result['id']
+                # Guardar en caché
+                if CACHE_ENABLED:
+                    CACHE['episodes'][cache_key] = episode_id
+                return True, episode_id
+            else:
+                return False, None
+        except Exception as e:
             return False, None
-    except Exception as e:
-        return False, None
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+        finally:
+            cursor.close()
 
 
 # Función para insertar una nueva serie
 def insert_series(title, year, imdb_rating=None, genre=None, connection=None, db_path=None):
     """Inserta una nueva serie en la base de datos."""
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
-    cursor = connection.cursor()
-    series_id = None
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
+        series_id = None
 
-    try:
-        cursor.execute('''
-            INSERT INTO media_downloads (title, year, imdb_rating, genre, type, created_at, updated_at)
-            VALUES (?, ?, ?, ?, 'serie', datetime('now'), datetime('now'))
-        ''', (title, year, imdb_rating, genre))
-        series_id = cursor.lastrowid
-        connection.commit()
+        try:
+            cursor.execute('''
+                INSERT INTO media_downloads (title, year, imdb_rating, genre, type, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 'serie', datetime('now'), datetime('now'))
+            ''', (title, year, imdb_rating, genre))
+            series_id = cursor.lastrowid
+            connection.commit()
 
-        # Actualizar caché
-        if CACHE_ENABLED:
-            cache_key = f"{title}_{year}"
-            CACHE['movies'][cache_key] = {
-                'id': series_id,
-                'title': title,
-                'year': year,
-                'imdb_rating': imdb_rating,
-                'genre': genre
-            }
-
-        return series_id
-    except Exception as e:
-        connection.rollback()
-        return None
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+            # Actualizar caché
+            if CACHE_ENABLED:
+                cache_key = f"{title}_{year}"
+                CACHE['movies'][cache_key] = {
+                    'id': series_id,
+                    'title': title,
+                    'year': year,
+                    'imdb_rating': imdb_rating,
+                    'genre': genre
+                }
+
+            return series_id
+        except Exception as e:
+            connection.rollback()
+            return None
+        finally:
+            cursor.close()
 
 
 # Función para insertar una nueva temporada
 def insert_season(series_id, season_number, connection=None, db_path=None):
     """Inserta una nueva temporada en la base de datos."""
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
-
-    cursor = connection.cursor()
-    season_id = None
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
+        season_id = None
 
-    try:
-        cursor.execute('''
-            INSERT INTO series_seasons (movie_id, season)
-            VALUES (?, ?)
-        ''', (series_id, season_number))
-        season_id = cursor.lastrowid
-        connection.commit()
+        try:
+            cursor.execute('''
+                INSERT INTO series_seasons (movie_id, season)
+                VALUES (?, ?)
+            ''', (series_id, season_number))
+            season_id = cursor.lastrowid
+            connection.commit()
 
-        # Actualizar caché
-        if CACHE_ENABLED:
-            cache_key = f"{series_id}_{season_number}"
-            CACHE['seasons'][cache_key] = season_id
+            # Actualizar caché
+            if CACHE_ENABLED:
+                cache_key = f"{series_id}_{season_number}"
+                CACHE['seasons'][cache_key] = season_id
 
-        return season_id
-    except Exception as e:
-        connection.rollback()
-        return None
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+            return season_id
+        except Exception as e:
+            connection.rollback()
+            return None
+        finally:
+            cursor.close()
 
 
 # Función para insertar un nuevo episodio
 def insert_episode(season_id, episode_number, title, connection=None, db_path=None):
     """Inserta un nuevo episodio en la base de datos evitando duplicados."""
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
-
-    # Comprobar si el episodio ya existe
-    exists, existing_id = episode_exists(
-        season_id,
-        episode_number,
-        title,
-        connection=connection,
-        db_path=db_path,
-    )
-    if exists:
-        return existing_id
+    with db_connection(connection, db_path) as connection:
+        # Comprobar si el episodio ya existe
+        exists, existing_id = episode_exists(
+            season_id,
+            episode_number,
+            title,
+            connection=connection,
+            db_path=db_path,
+        )
+        if exists:
+            return existing_id
 
-    cursor = connection.cursor()
-    episode_id = None
+        cursor = connection.cursor()
+        episode_id = None
 
-    try:
-        cursor.execute(
-            '''
-            INSERT INTO series_episodes (season_id, episode, title)
-            VALUES (?, ?, ?)
-            ''',
-            (season_id, episode_number, title),
-        )
-        episode_id = cursor.lastrowid
-        connection.commit()
+        try:
+            cursor.execute(
+                '''
+                INSERT INTO series_episodes (season_id, episode, title)
+                VALUES (?, ?, ?)
+                ''',
+                (season_id, episode_number, title),
+            )
+            episode_id = cursor.lastrowid
+            connection.commit()
 
-        # Actualizar caché
-        if CACHE_ENABLED:
-            cache_key = f"{season_id}_{episode_number}"
-            CACHE['episodes'][cache_key] = episode_id
+            # Actualizar caché
+            if CACHE_ENABLED:
+                cache_key = f"{season_id}_{episode_number}"
+                CACHE['episodes'][cache_key] = episode_id
 
-        return episode_id
-    except Exception as e:
-        connection.rollback()
-        return None
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+            return episode_id
+        except Exception as e:
+            connection.rollback()
+            return None
+        finally:
+            cursor.close()
 
 
 # Función para verificar si una película ya existe en la base de datos
 def movie_exists(title, year=None, imdb_rating=None, genre=None, connection=None, db_path=None):
     """Verifica si una película ya existe en la base de datos."""
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
-
-    cursor = connection.cursor()
-
-    try:
-        # Buscar primero por título y año (si está disponible)
-        if year:
-            cursor.execute('''
-                SELECT id, title, year, imdb_rating, genre FROM media_downloads 
-                WHERE title=? AND year=? AND type='movie'
-            ''', (title, year))
-        else:
-            cursor.execute('''
-                SELECT id, title, year, imdb_rating, genre FROM media_downloads 
-                WHERE title=? AND type='movie'
-            ''', (title,))
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
 
-        results = cursor.fetchall()
-
-        if not results:
+        try:
+            # Buscar primero por título y año (si está disponible)
+            if year:
+                cursor.execute('''
+                    SELECT id, title, year, imdb_rating, genre FROM media_downloads 
+                    WHERE title=? COLLATE NOCASE AND year=? AND type='movie'
+                ''', (title, year))
+            else:
+                cursor.execute('''
+                    SELECT id, title, year, imdb_rating, genre FROM media_downloads 
+                    WHERE title=? COLLATE NOCASE AND type='movie'
+                ''', (title,))
+
+            results = cursor.fetchall()
+
+            if not results:
+                return False, None
+
+            # Si hay resultados, verificar si alguno coincide completamente
+            for result in results:
+                result_dict = dict(result)
+                # Comparar todos los campos relevantes que no sean None
+                if (year is None or result_dict['year'] == year) and \
+                        (imdb_rating is None or result_dict['imdb_rating'] == imdb_rating) and \
+                        (genre is None or result_dict['genre'] == genre):
+                    return True, result_dict['id']
+
+            # Si llegamos aquí, el título existe pero otros datos no coinciden
+            return False, results[0]['id']  # Devolver el ID del primer resultado para posible actualización
+        except Exception as e:
             return False, None
-
-        # Si hay resultados, verificar si alguno coincide completamente
-        for result in results:
-            result_dict = dict(result)
-            # Comparar todos los campos relevantes que no sean None
-            if (year is None or result_dict['year'] == year) and \
-                    (imdb_rating is None or result_dict['imdb_rating'] == imdb_rating) and \
-                    (genre is None or result_dict['genre'] == genre):
-                return True, result_dict['id']
-
-        # Si llegamos aquí, el título existe pero otros datos no coinciden
-        return False, results[0]['id']  # Devolver el ID del primer resultado para posible actualización
-    except Exception as e:
-        return False, None
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+        finally:
+            cursor.close()
 
 
 # Función para insertar o actualizar una película en la base de datos
 def insert_or_update_movie(movie_data, connection=None, db_path=None):
     """Inserta o actualiza una película en la base de datos."""
-    close_connection = False
-    if connection is None:
-        connection = connect_db(db_path)
-        close_connection = True
-
-    cursor = connection.cursor()
-    movie_id = None
+    with db_connection(connection, db_path) as connection:
+        cursor = connection.cursor()
+        movie_id = None
 
-    try:
-        if movie_data.get("existing_id"):
-            # Actualizar película existente
-            cursor.execute('''
-                UPDATE media_downloads 
-                SET year=?, imdb_rating=?, genre=?, updated_at=datetime('now')
-                WHERE id=?
-            ''', (movie_data["year"], movie_data["imdb_rating"], movie_data["genre"], movie_data["existing_id"]))
-            movie_id = movie_data["existing_id"]
-            is_new = False
-        else:
-            # Insertar nueva película
-            cursor.execute('''
-                INSERT INTO media_downloads (title, year, imdb_rating, genre, type, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-            ''', (movie_data["title"], movie_data["year"], movie_data["imdb_rating"], movie_data["genre"],
-                  movie_data["type"]))
-            movie_id = cursor.lastrowid
-            is_new = True
+        try:
+            if movie_data.get("existing_id"):
+                # Actualizar película existente
+                cursor.execute('''
+                    UPDATE media_downloads 
+                    SET year=?, imdb_rating=?, genre=?, updated_at=datetime('now')
+                    WHERE id=?
+                ''', (movie_data["year"], movie_data["imdb_rating"], movie_data["genre"], movie_data["existing_id"]))
+                movie_id = movie_data["existing_id"]
+                is_new = False
+            else:
+                # Insertar nueva película
+                cursor.execute('''
+                    INSERT INTO media_downloads (title, year, imdb_rating, genre, type, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, datetime('now'), datetime('now'))
+                ''', (movie_data["title"], movie_data["year"], movie_data["imdb_rating"], movie_data["genre"],
+                      movie_data["type"]))
+                movie_id = cursor.lastrowid
+                is_new = True
 
-        connection.commit()
-        return movie_id, is_new
-    except Exception as e:
-        connection.rollback()
-        return None, False
-    finally:
-        cursor.close()
-        if close_connection:
-            connection.close()
+            connection.commit()
+            return movie_id, is_new
+        except Exception as e:
+            connection.rollback()
+            return None, False
+        finally:
+            cursor.close()
+
+
+# Devuelve sólo los enlaces de episodio que no se habían devuelto antes en esta
+# página (el conjunto de vistos vive en ``window``) y el total de elementos
+_NEW_EPISODE_HREFS_JS = """
+const seen = window.__scraperSeenEpisodes || (window.__scraperSeenEpisodes = new Set());
+const items = document.querySelectorAll('#episodes-content .span-6.tt.view.show-view');
+const fresh = [];
+for (const item of items) {
+  const link = item.querySelector('a');
+  const href = link ? link.href : null;
+  if (href && !seen.has(href)) { seen.add(href); fresh.push(href); }
+}
+return {hrefs: fresh, count: items.length};
+"""
 
 
 # Función para obtener episodios con scroll infinito
-def get_all_episodes_with_infinite_scroll(driver, logger, max_scroll_attempts=10):
-    """Obtiene todos los episodios de una página con scroll infinito."""
+def get_all_episodes_with_infinite_scroll(driver, logger, max_scroll_attempts=10, max_no_new_results=3):
+    """Obtiene todos los episodios de una página con scroll infinito.
+
+    En cada pasada un solo script devuelve los enlaces nuevos, sin volver a
+    leer los ya vistos, y tras el scroll se espera a que aparezcan más
+    elementos en lugar de dormir un tiempo fijo.
+    """
     logger.info("Obteniendo episodios con scroll infinito...")
 
     # Lista para almacenar los URLs de episodios
     episode_urls = []
 
-    # Conjunto para evitar duplicados
-    seen_urls = set()
-
     # Contador para el número de intentos de scroll sin nuevos resultados
     no_new_results_count = 0
 
@@ -1277,43 +1662,37 @@ def get_all_episodes_with_infinite_scroll(driver, logger, max_scroll_attempts=10
         WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.ID, "episodes-content"))
         )
+        driver.execute_script("window.__scraperSeenEpisodes = new Set();")
 
         # Bucle para hacer scroll y obtener más episodios
         for scroll_attempt in range(max_scroll_attempts):
-            # Obtener los episodios actuales
-            episode_divs = driver.find_elements(By.CSS_SELECTOR, "#episodes-content .span-6.tt.view.show-view")
-            current_count = len(episode_urls)
-
-            # Procesar los episodios visibles actualmente
-            for div in episode_divs:
-                try:
-                    link_tag = div.find_element(By.TAG_NAME, "a")
-                    episode_href = link_tag.get_attribute("href")
-
-                    # Añadir solo si no lo hemos visto antes
-                    if episode_href and episode_href not in seen_urls:
-                        episode_urls.append(episode_href)
-                        seen_urls.add(episode_href)
-                except Exception as e:
-                    logger.warning(f"Error al procesar un div de episodio: {e}")
+            batch = driver.execute_script(_NEW_EPISODE_HREFS_JS)
+            episode_urls.extend(batch["hrefs"])
 
             # Verificar si se encontraron nuevos episodios
-            if len(episode_urls) == current_count:
+            if not batch["hrefs"]:
                 no_new_results_count += 1
-                if no_new_results_count >= 3:  # Si no hay nuevos resultados después de 3 intentos, terminar
+                if no_new_results_count >= max_no_new_results:
                     logger.info(
                         f"No se encontraron nuevos episodios después de {no_new_results_count} intentos. Terminando scroll.")
                     break
             else:
                 no_new_results_count = 0  # Reiniciar contador si se encontraron nuevos episodios
 
-            # Hacer scroll hacia abajo
+            # Hacer scroll hacia abajo y esperar a que se carguen más elementos
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             logger.debug(
                 f"Scroll {scroll_attempt + 1}/{max_scroll_attempts}: {len(episode_urls)} episodios encontrados")
-
-            # Esperar a que se carguen más contenidos
-            time.sleep(2)
+            try:
+                WebDriverWait(driver, 2, poll_frequency=0.1).until(
+                    lambda d: d.execute_script(
+                        "return document.querySelectorAll('#episodes-content .span-6.tt.view.show-view').length;"
+                    ) > batch["count"]
+                )
+            except TimeoutException:
+                pass
+        else:
+            logger.info(f"Se alcanzó el límite de {max_scroll_attempts} scrolls, finalizando.")
 
         logger.info(f"Total de episodios encontrados: {len(episode_urls)}")
         return episode_urls
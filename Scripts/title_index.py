@@ -0,0 +1,162 @@
+"""Índice en memoria de los títulos de una base de datos.
+
+Antes de insertar, cada título extraído se buscaba en ``media_downloads`` o
+``torrent_downloads`` con una consulta. :class:`TitleIndex` carga al empezar
+el scraper ``(tipo, título normalizado, año) -> id`` de toda la tabla y las
+comprobaciones de existencia pasan a ser una búsqueda en un diccionario. Los
+scrapers añaden al índice cada título que insertan, de modo que sigue al día
+durante la ejecución.
+
+Los títulos se comparan con :func:`normalize_title`, igual que las consultas
+``title = ? COLLATE NOCASE`` de :mod:`scraper_utils` y ``lower(title)`` de
+los scrapers de torrents: sin distinguir mayúsculas ASCII y sin más cambios.
+Cada título ocupa una sola entrada: una clave internada con el tipo y el
+título y una tupla plana ``(año, id, ...)``, con los años compartidos entre
+entradas. Para cada año se conserva el primer ``id`` de la tabla, como
+devolvían las consultas sin ``ORDER BY``.
+
+El índice se carga una vez por proceso y sólo ve lo que insertan los hilos de
+ese proceso: lo que otro scraper escriba a la vez en la misma base no aparece
+hasta la siguiente ejecución. El escritor de películas
+(:func:`direct_dw_films_scraper.write_movie`) vuelve a comprobarlo en SQL
+dentro de su transacción; el resto de scrapers no deben escribir a la vez en
+la misma tabla.
+"""
+
+import logging
+import os
+import sqlite3
+import string
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Como ``COLLATE NOCASE`` y ``lower()`` de SQLite: sólo las mayúsculas ASCII
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def normalize_title(title):
+    """Título para comparar: sin distinguir mayúsculas ASCII, como ``COLLATE NOCASE``."""
+    return str(title).translate(_ASCII_LOWER)
+
+
+def _normalize_year(year):
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return None
+
+
+class TitleIndex:
+    """``(tipo, título, año) -> id`` de una tabla de títulos."""
+
+    def __init__(self):
+        # "tipo\x1ftítulo normalizado" (internado) -> (año, id, año, id, ...) en orden de id
+        self._entries = {}
+        # Un único objeto por año para no repetirlo en cada entrada
+        self._years = {}
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.load_seconds = 0.0
+
+    @staticmethod
+    def _key(media_type, title):
+        return f"{media_type}\x1f{normalize_title(title)}"
+
+    def load(self, connection, table):
+        """Carga todas las filas ``(id, type, title, year)`` de ``table``."""
+        start = time.perf_counter()
+        cursor = connection.execute(f"SELECT id, type, title, year FROM {table} ORDER BY id")
+        with self._lock:
+            for row_id, media_type, title, year in cursor:
+                if title:
+                    self._add(row_id, media_type or "", title, year)
+        self.load_seconds = time.perf_counter() - start
+        return self
+
+    def _add(self, row_id, media_type, title, year):
+        key = sys.intern(self._key(media_type, title))
+        year = _normalize_year(year)
+        year = self._years.setdefault(year, year)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = (year, row_id)
+        elif year not in entry[::2]:
+            # Se conserva el primer id de cada año, como las consultas sin ORDER BY
+            self._entries[key] = entry + (year, row_id)
+        else:
+            return
+        self.rows += 1
+
+    def add(self, row_id, media_type, title, year):
+        """Registra un título recién insertado."""
+        if not title:
+            return
+        with self._lock:
+            self._add(row_id, media_type, title, year)
+
+    def find(self, media_type, title, year):
+        """``id`` del título con ese año o ``None``."""
+        entry = self._entries.get(self._key(media_type, title))
+        if entry:
+            year = _normalize_year(year)
+            for i in range(0, len(entry), 2):
+                if entry[i] == year:
+                    return entry[i + 1]
+        return None
+
+    def find_title(self, media_type, title):
+        """``id`` de la primera fila con ese título, sea cual sea el año, o ``None``."""
+        entry = self._entries.get(self._key(media_type, title))
+        return entry[1] if entry else None
+
+    def memory_bytes(self):
+        """Tamaño aproximado del índice en memoria (diccionario, claves, años e ids)."""
+        with self._lock:
+            total = sys.getsizeof(self._entries) + sys.getsizeof(self._years)
+            total += sum(sys.getsizeof(year) for year in self._years)
+            for key, entry in self._entries.items():
+                total += sys.getsizeof(key) + sys.getsizeof(entry)
+                total += sum(sys.getsizeof(row_id) for row_id in entry[1::2])
+        return total
+
+    def stats(self):
+        return {
+            "entries": self.rows,
+            "titles": len(self._entries),
+            "bytes": self.memory_bytes(),
+            "load_ms": self.load_seconds * 1000,
+        }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_title_index(db_path, table="media_downloads"):
+    """Índice de ``table`` en ``db_path``, cargado la primera vez que se pide."""
+    key = (os.path.abspath(db_path), table)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            connection = sqlite3.connect(db_path)
+            try:
+                index = TitleIndex().load(connection, table)
+            finally:
+                connection.close()
+            stats = index.stats()
+            logger.info(
+                f"Índice de títulos de {table}: {stats['entries']} entradas cargadas en "
+                f"{stats['load_ms']:.0f} ms (~{stats['bytes'] / (1024 * 1024):.1f} MB)"
+            )
+            _indexes[key] = index
+        return index
+
+
+def close_title_indexes():
+    """Libera los índices cargados (al terminar el scraper)."""
+    with _indexes_lock:
+        _indexes.clear()
@@ -1,14 +1,11 @@
 import argparse
+import asyncio
 import os
 import json
-import requests
-from bs4 import BeautifulSoup
 import time
 import sqlite3
 import logging
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import urllib3
+from concurrent.futures import ThreadPoolExecutor
 
 #ver:1.05
 # Obtener la ruta del proyecto desde las utilidades compartidas
@@ -18,7 +15,14 @@ from .scraper_utils import (
     TORRENT_DB_PATH,
     is_stop_requested,
     clear_stop_request,
+    archive_page,
 )
+from .torrent_http import HEADERS as headers, create_session, fetch_cached, get_rate_controller
+from .http_cache import get_response_cache, close_response_cache
+from .page_archive import close_page_archive
+from .parsers import parse_torrent_movie
+from .db_migrations import TORRENT_MIGRATIONS, migrate
+from .title_index import get_title_index, close_title_indexes
 
 shutdown_event = get_shutdown_event()
 
@@ -46,6 +50,13 @@ BASE_URL = "https://dontorrent.lighting/pelicula/"
 # Path to the database (shared configuration)
 db_path = TORRENT_DB_PATH
 
+# Resultado de load_movie cuando la página no ha cambiado desde la última ejecución
+NOT_MODIFIED = "not_modified"
+
+# Valores por defecto del modo asíncrono
+DEFAULT_ASYNC_CONCURRENCY = 8  # peticiones simultáneas en vuelo
+DEFAULT_HOST_RATE = 4.0  # techo de peticiones por segundo y host
+
 # Count existing torrent files for a given type
 def get_total_saved_count(content_type):
     """Return number of torrent_files records for a given content type."""
@@ -68,22 +79,8 @@ def get_total_saved_count(content_type):
         if 'conn' in locals():
             conn.close()
     return count
-# Headers (para evitar ser bloqueado)
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-    "Cache-Control": "max-age=0"
-}
-
-# Create a session with retry mechanism
-session = requests.Session()
-session.verify = False  # Disable SSL verification for self-signed certificates
-retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-session.mount('https://', HTTPAdapter(max_retries=retries))
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Sesión HTTP compartida; el ritmo lo regula el controlador adaptativo de torrent_http
+session = create_session()
 
 
 def initialize_database():
@@ -138,8 +135,11 @@ def initialize_database():
     ''')
 
     conn.commit()
+    migrate(conn, TORRENT_MIGRATIONS, "base torrent")
     conn.close()
     logger.info("Base de datos inicializada correctamente")
+    # Las comprobaciones de duplicados se hacen contra el índice de títulos en memoria
+    get_title_index(db_path, "torrent_downloads")
 
 
 def load_progress():
@@ -213,28 +213,18 @@ def normalize_torrent_link(link):
 
 
 def find_existing_movie(conn, title, year):
-    """Busca una película existente priorizando coincidencias exactas de año."""
-    cursor = conn.cursor()
+    """Busca una película existente priorizando coincidencias exactas de año.
 
-    cursor.execute(
-        """
-        SELECT id, year
-        FROM torrent_downloads
-        WHERE type = 'movie' AND lower(title) = lower(?)
-    """,
-        (title,),
-    )
+    Consulta el índice de títulos en memoria; ``conn`` se conserva por compatibilidad.
+    """
+    index = get_title_index(db_path, "torrent_downloads")
 
-    matches = cursor.fetchall()
-    if not matches:
-        return None, False
-
-    for movie_id, stored_year in matches:
-        if stored_year == year:
-            return movie_id, True
+    movie_id = index.find('movie', title, year)
+    if movie_id is not None:
+        return movie_id, True
 
     # Si no hay coincidencia exacta de año, usar la primera coincidencia por título
-    return matches[0][0], False
+    return index.find_title('movie', title), False
 
 
 def evaluate_duplicate_state(conn, torrent_id, quality_id, torrent_link):
@@ -262,81 +252,62 @@ def evaluate_duplicate_state(conn, torrent_id, quality_id, torrent_link):
     return "quality_match"
 
 
-def get_movie_data(movie_url):
-    """ Extrae los datos de una película específica. """
+def fetch_movie_page(movie_url, cache=None):
+    """Descarga el HTML de una película.
+
+    Devuelve el contenido, ``NOT_MODIFIED`` si coincide con la versión ya
+    procesada según ``cache``, o ``None`` si la respuesta no es válida.
+    """
     try:
-        response = session.get(movie_url, headers=headers, timeout=10)
-        if response.status_code != 200:
-            logger.warning(f"Error al acceder a {movie_url}: Código {response.status_code}")
-            return None
+        response, unchanged = fetch_cached(session, movie_url, cache, headers=headers, timeout=10)
+    except Exception as e:
+        logger.error(f"Error al procesar {movie_url}: {str(e)}")
+        return None
+    if response is None:
+        return None
+    if unchanged:
+        return NOT_MODIFIED
+    if response.status_code != 200:
+        logger.warning(f"Error al acceder a {movie_url}: Código {response.status_code}")
+        return None
+    archive_page(movie_url, response.content, "torrent_movie", "http")
+    return response.content
 
-        soup = BeautifulSoup(response.content, 'html.parser')
 
-        title_element = soup.find('h1', class_='position-relative ml-2 descargarTitulo')
-        if not title_element:
-            logger.warning(f"No se encontró título en {movie_url}")
-            return None
+def load_movie(movie_url, cache=None):
+    """Descarga y analiza una película; devuelve sus datos, ``NOT_MODIFIED`` o ``None``."""
+    content = fetch_movie_page(movie_url, cache)
+    if content is None or content is NOT_MODIFIED:
+        return content
+    return parse_movie_page(content, movie_url)
 
-        title = title_element.text.strip().replace("Descargar", "").replace("por Torrent", "").strip()
-
-        year = genre = director = "Desconocido"
-        quality = "Unknown"  # Valor por defecto
-
-        details_div = soup.find('div', class_='d-inline-block ml-2')
-        if details_div:
-            for p_tag in details_div.find_all('p', class_='m-1'):
-                b_tag = p_tag.find('b')
-                if not b_tag:
-                    continue
-                if 'Año:' in b_tag.text:
-                    year_element = p_tag.find('a')
-                    year = year_element.text.strip() if year_element else "Desconocido"
-                elif 'Género:' in b_tag.text:
-                    genre_element = p_tag.find('a')
-                    genre = genre_element.text.strip() if genre_element else "Desconocido"
-                elif 'Dirección:' in b_tag.text:
-                    director_element = p_tag.find('a')
-                    director = director_element.text.strip() if director_element else "Desconocido"
-
-        # Buscar el formato (calidad) en el div específico
-        format_div = soup.select_one('div[style="margin-right: 0%;"].d-inline-block')
-        if format_div:
-            format_p = format_div.find('p')
-            if format_p and 'Formato:' in format_p.text:
-                quality = format_p.text.replace('Formato:', '').strip()
-                logger.info(f"Calidad encontrada: {quality}")
-
-        # Si no se encontró en el div específico, buscar en cualquier parte
-        if quality == "Unknown":
-            for p_tag in soup.find_all('p'):
-                if p_tag.find('b') and 'Formato:' in p_tag.text:
-                    quality = p_tag.text.replace('Formato:', '').strip()
-                    logger.info(f"Calidad encontrada (búsqueda alternativa): {quality}")
-                    break
-
-        torrent_element = soup.find('a', href=True, id="download_torrent")
-        if not torrent_element:
-            logger.warning(f"No se encontró enlace de torrent en {movie_url}")
-            return None
 
-        torrent_link = "https:" + torrent_element['href'] if torrent_element else "No disponible"
+def get_movie_data(movie_url):
+    """ Extrae los datos de una película específica. """
+    movie_data = load_movie(movie_url)
+    return movie_data if movie_data is not NOT_MODIFIED else None
 
-        quality = normalize_quality_label(quality)
-        torrent_link = normalize_torrent_link(torrent_link)
 
-        # Convertir el año a entero si es posible
-        try:
-            year = int(year)
-        except ValueError:
-            year = 0
+def parse_movie_page(content, movie_url):
+    """Analiza el HTML de una película y devuelve sus datos o ``None`` si está incompleto."""
+    try:
+        page = parse_torrent_movie(content)
+        if page is None:
+            logger.warning(f"No se encontró título o enlace de torrent en {movie_url}")
+            return None
+
+        quality = page["quality"] or "Unknown"
+        if page["quality"]:
+            logger.info(f"Calidad encontrada: {quality}")
 
         return {
-            'title': title,
-            'year': year,
-            'genre': genre,
-            'director': director,
-            'quality': quality,
-            'torrent_link': torrent_link
+            'title': page["title"],
+            # Año 0 cuando falta o no es un número
+            'year': page["year"] or 0,
+            'genre': page["genre"] or "Desconocido",
+            'director': page["director"] or "Desconocido",
+            'quality': normalize_quality_label(quality),
+            'torrent_link': normalize_torrent_link("https:" + page["torrent_href"]),
         }
     except Exception as e:
         logger.error(f"Error al procesar {movie_url}: {str(e)}")
@@ -409,6 +380,9 @@ def save_to_db(movie_data):
                 (movie_id, quality_id, movie_data['torrent_link'])
             )
             conn.commit()
+            get_title_index(db_path, "torrent_downloads").add(
+                movie_id, 'movie', movie_data['title'], movie_data['year']
+            )
             logger.info(f"Nueva película añadida: '{movie_data['title']}' con calidad {movie_data['quality']}")
 
         conn.close()
@@ -417,13 +391,11 @@ def save_to_db(movie_data):
         logger.error(f"Error al guardar en la base de datos: {str(e)}")
         if conn:
             conn.close()
-        return False
+        return None
 
 
-def scrape_movies(start_id=None, end_id=35000, max_consecutive_failures=100, resume=True):
-    """Itera sobre los IDs de las películas y extrae los datos."""
-    clear_stop_request()
-
+def _resolve_start(start_id, resume):
+    """Calcula el ID inicial y el total guardado a partir del progreso o del ID indicado."""
     if resume:
         progress_data = load_progress()
     else:
@@ -445,7 +417,16 @@ def scrape_movies(start_id=None, end_id=35000, max_consecutive_failures=100, res
             current_id = 1
 
     total_saved = progress_data.get("total_saved", get_total_saved_count("movie"))
+    return current_id, total_saved
+
+
+def scrape_movies(start_id=None, end_id=35000, max_consecutive_failures=100, resume=True):
+    """Itera sobre los IDs de las películas y extrae los datos."""
+    clear_stop_request()
+
+    current_id, total_saved = _resolve_start(start_id, resume)
     next_id = current_id
+    cache = get_response_cache()
 
     logger.info(
         "Iniciando scraping desde ID: %s, archivos guardados anteriormente: %s (reanudar=%s)",
@@ -468,9 +449,12 @@ def scrape_movies(start_id=None, end_id=35000, max_consecutive_failures=100, res
             logger.info(f"Extrayendo: {movie_url}")
 
             try:
-                movie_data = get_movie_data(movie_url)
-                if movie_data:
-                    if save_to_db(movie_data):
+                movie_data = load_movie(movie_url, cache)
+                if movie_data is NOT_MODIFIED:
+                    logger.info(f"Sin cambios desde la última ejecución: {movie_url}")
+                elif movie_data:
+                    saved = save_to_db(movie_data)
+                    if saved:
                         logger.info(
                             f"Guardado: {movie_data['title']} ({movie_data['year']}) - Calidad: {movie_data['quality']}")
                         total_saved += 1
@@ -478,6 +462,9 @@ def scrape_movies(start_id=None, end_id=35000, max_consecutive_failures=100, res
                     else:
                         logger.info(
                             f"No guardado (posible duplicado): {movie_data['title']} - Calidad: {movie_data['quality']}")
+                    if saved is not None:
+                        # Sólo se marca como procesada si la escritura no falló
+                        cache.commit(movie_url)
                 else:
                     consecutive_failures += 1
                     logger.warning(
@@ -499,9 +486,6 @@ def scrape_movies(start_id=None, end_id=35000, max_consecutive_failures=100, res
                 logger.info("Solicitud de parada recibida. Se detendrá antes de continuar con el siguiente ID.")
                 break
 
-            sleep_time = 1 + (movie_id % 2)
-            time.sleep(sleep_time)
-
     except KeyboardInterrupt:
         logger.info("Script interrumpido por el usuario")
         shutdown_event.set()
@@ -511,6 +495,9 @@ def scrape_movies(start_id=None, end_id=35000, max_consecutive_failures=100, res
     finally:
         # Guardar progreso final
         save_progress(next_id, total_saved)
+        close_response_cache()
+        close_page_archive()
+        close_title_indexes()
         if stop_requested:
             logger.info(
                 "Proceso detenido por solicitud del usuario. Último ID procesado: %s",
@@ -523,6 +510,184 @@ def scrape_movies(start_id=None, end_id=35000, max_consecutive_failures=100, res
         clear_stop_request()
 
 
+class ProgressWatermark:
+    """Marca de agua contigua: todos los IDs por debajo de ``next_id`` están terminados.
+
+    Los IDs pueden terminar en cualquier orden; sólo se avanza cuando el hueco
+    más bajo se completa. Los fallos consecutivos se cuentan en orden de ID
+    sobre ese prefijo contiguo, igual que en el modo secuencial.
+    """
+
+    SAVED = "saved"
+    SKIPPED = "skipped"
+    MISSING = "missing"
+
+    def __init__(self, start_id):
+        self.next_id = start_id
+        self.consecutive_failures = 0
+        self._pending = {}
+
+    def mark(self, movie_id, outcome):
+        """Registra el resultado de un ID y devuelve ``True`` si la marca avanzó."""
+        self._pending[movie_id] = outcome
+        advanced = False
+        while self.next_id in self._pending:
+            result = self._pending.pop(self.next_id)
+            if result == self.SAVED:
+                self.consecutive_failures = 0
+            elif result == self.MISSING:
+                self.consecutive_failures += 1
+            self.next_id += 1
+            advanced = True
+        return advanced
+
+
+async def _scrape_movies_async(current_id, end_id, max_consecutive_failures, concurrency, total_saved):
+    """Motor asíncrono: descarga y analiza en paralelo y guarda en un único hilo de BD.
+
+    El ritmo por host lo impone el controlador adaptativo de ``torrent_http``
+    dentro de cada descarga.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    watermark = ProgressWatermark(current_id)
+    cache = get_response_cache()
+    state = {"total_saved": total_saved, "stop_requested": False, "failure_limit": False}
+
+    # Las descargas y el análisis HTML se ejecutan en el pool de red; SQLite en un único hilo
+    fetch_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="torrent-fetch")
+    db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="torrent-db")
+
+    def should_stop():
+        if is_stop_requested() or shutdown_event.is_set():
+            state["stop_requested"] = True
+            return True
+        if watermark.consecutive_failures >= max_consecutive_failures:
+            if not state["failure_limit"]:
+                logger.error(
+                    f"Se alcanzó el límite de {max_consecutive_failures} fallos consecutivos. Finalizando el script.")
+            state["failure_limit"] = True
+            return True
+        return False
+
+    async def process(movie_id):
+        movie_url = f"{BASE_URL}{movie_id}/"
+        outcome = ProgressWatermark.SKIPPED
+        try:
+            logger.info(f"Extrayendo: {movie_url}")
+            movie_data = await loop.run_in_executor(fetch_pool, load_movie, movie_url, cache)
+            if movie_data is NOT_MODIFIED:
+                logger.info(f"Sin cambios desde la última ejecución: {movie_url}")
+            elif movie_data:
+                saved = await loop.run_in_executor(db_pool, save_to_db, movie_data)
+                if saved:
+                    logger.info(
+                        f"Guardado: {movie_data['title']} ({movie_data['year']}) - Calidad: {movie_data['quality']}")
+                    state["total_saved"] += 1
+                    outcome = ProgressWatermark.SAVED
+                else:
+                    logger.info(
+                        f"No guardado (posible duplicado): {movie_data['title']} - Calidad: {movie_data['quality']}")
+                if saved is not None:
+                    cache.commit(movie_url)
+            else:
+                outcome = ProgressWatermark.MISSING
+                logger.warning(f"Película no encontrada o datos incompletos para ID: {movie_id}")
+        except Exception as e:
+            logger.error(f"Error al procesar película ID {movie_id}: {e}")
+        finally:
+            semaphore.release()
+            if watermark.mark(movie_id, outcome):
+                save_progress(watermark.next_id, state["total_saved"])
+
+    tasks = set()
+    try:
+        for movie_id in range(current_id, end_id + 1):
+            if should_stop():
+                break
+            await semaphore.acquire()
+            if should_stop():
+                semaphore.release()
+                break
+            task = asyncio.create_task(process(movie_id))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if state["stop_requested"]:
+            logger.info("Señal de parada detectada. Esperando a que terminen %s peticiones en curso.", len(tasks))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        fetch_pool.shutdown(wait=True)
+        db_pool.shutdown(wait=True)
+
+    return watermark.next_id, state["total_saved"], state["stop_requested"]
+
+
+def scrape_movies_async(start_id=None, end_id=35000, max_consecutive_failures=100, resume=True,
+                        concurrency=DEFAULT_ASYNC_CONCURRENCY, rate=DEFAULT_HOST_RATE):
+    """Variante concurrente de :func:`scrape_movies` con peticiones limitadas y ritmo por host.
+
+    El progreso guardado sigue siendo una marca de agua: todos los IDs por
+    debajo de ``current_id`` se han procesado aunque terminen desordenados.
+    ``rate`` es el techo del controlador de ritmo del host, en peticiones/s.
+    """
+    global session
+    clear_stop_request()
+
+    concurrency = max(1, int(concurrency))
+    current_id, total_saved = _resolve_start(start_id, resume)
+    next_id = current_id
+    stop_requested = False
+
+    # Ajustar el pool de conexiones al número de peticiones simultáneas
+    session = create_session(pool_maxsize=max(10, concurrency))
+    get_rate_controller(BASE_URL).set_max_rate(rate)
+
+    logger.info(
+        "Iniciando scraping asíncrono desde ID: %s, archivos guardados anteriormente: %s "
+        "(reanudar=%s, concurrencia=%s, ritmo máximo=%s peticiones/s)",
+        current_id,
+        total_saved,
+        resume,
+        concurrency,
+        get_rate_controller(BASE_URL).max_rate,
+    )
+
+    try:
+        next_id, total_saved, stop_requested = asyncio.run(
+            _scrape_movies_async(current_id, end_id, max_consecutive_failures, concurrency, total_saved)
+        )
+    except KeyboardInterrupt:
+        logger.info("Script interrumpido por el usuario")
+        shutdown_event.set()
+        stop_requested = True
+        # Conservar la última marca de agua escrita por el motor
+        progress = load_progress()
+        next_id = progress.get("current_id", next_id)
+        total_saved = progress.get("total_saved", total_saved)
+    except Exception as e:
+        logger.critical(f"Error crítico: {str(e)}")
+        progress = load_progress()
+        next_id = progress.get("current_id", next_id)
+        total_saved = progress.get("total_saved", total_saved)
+    finally:
+        save_progress(next_id, total_saved)
+        close_response_cache()
+        close_page_archive()
+        close_title_indexes()
+        if stop_requested:
+            logger.info(
+                "Proceso detenido por solicitud del usuario. Todos los IDs anteriores a %s están procesados.",
+                next_id,
+            )
+        else:
+            logger.info(
+                f"Proceso completado o interrumpido. Se guardaron {total_saved} archivos de torrent en la base de datos."
+            )
+        clear_stop_request()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Scraper de películas torrent")
     parser.add_argument(
@@ -552,6 +717,29 @@ if __name__ == "__main__":
         default=10,
         help="Número máximo de fallos consecutivos permitidos",
     )
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="Usar el motor asíncrono con varias peticiones simultáneas",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_ASYNC_CONCURRENCY,
+        help="Peticiones simultáneas en modo asíncrono",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_HOST_RATE,
+        help="Máximo de peticiones por segundo y host en modo asíncrono; el ritmo real lo ajusta el controlador adaptativo",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignorar la caché HTTP y volver a procesar todas las páginas",
+    )
 
     args = parser.parse_args()
 
@@ -562,18 +750,32 @@ if __name__ == "__main__":
 
         initialize_database()
 
+        if args.no_cache:
+            get_response_cache(enabled=False)
+            logger.info("Caché HTTP desactivada para esta ejecución.")
+
         resume = True
         if args.reset_progress or args.start_page is not None:
             resume = False
         elif args.resume:
             resume = True
 
-        scrape_movies(
-            start_id=args.start_page,
-            end_id=args.end_page,
-            max_consecutive_failures=args.max_failures,
-            resume=resume,
-        )
+        if args.async_mode:
+            scrape_movies_async(
+                start_id=args.start_page,
+                end_id=args.end_page,
+                max_consecutive_failures=args.max_failures,
+                resume=resume,
+                concurrency=args.concurrency,
+                rate=args.rate,
+            )
+        else:
+            scrape_movies(
+                start_id=args.start_page,
+                end_id=args.end_page,
+                max_consecutive_failures=args.max_failures,
+                resume=resume,
+            )
 
     except KeyboardInterrupt:
         logger.info("Script interrumpido por el usuario")
@@ -1,17 +1,12 @@
 import argparse
-import requests
-from bs4 import BeautifulSoup
 import sqlite3
 import logging
 import re
 import time
-import random
 import os
 import json
+from dataclasses import replace
 from requests.exceptions import RequestException, HTTPError
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import urllib3
 
 #ver:1.05
 # Obtener la ruta del proyecto desde las utilidades compartidas
@@ -21,7 +16,15 @@ from .scraper_utils import (
     TORRENT_DB_PATH,
     is_stop_requested,
     clear_stop_request,
+    archive_page,
 )
+from .torrent_http import HEADERS as headers, create_session, fetch_cached
+from .http_cache import get_response_cache, close_response_cache
+from .page_archive import close_page_archive
+from .parsers import parse_torrent_series
+from .db_migrations import TORRENT_MIGRATIONS, migrate
+from .records import TorrentFile
+from .title_index import get_title_index, close_title_indexes
 
 shutdown_event = get_shutdown_event()
 
@@ -49,6 +52,9 @@ BASE_URL = "https://dontorrent.lighting/serie/"
 # Path to the database (shared configuration)
 db_path = TORRENT_DB_PATH
 
+# Resultado de scrape_series_details cuando la página no ha cambiado desde la última ejecución
+NOT_MODIFIED = "not_modified"
+
 # Count existing torrent files for a given type
 def get_total_saved_count(content_type):
     """Return number of torrent_files records for a given content type."""
@@ -71,22 +77,8 @@ def get_total_saved_count(content_type):
         if 'conn' in locals():
             conn.close()
     return count
-# Headers (para evitar ser bloqueado)
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-    "Cache-Control": "max-age=0"
-}
-
-# Create a session with retry mechanism
-session = requests.Session()
-session.verify = False  # Disable SSL verification for self-signed certificates
-retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-session.mount('https://', HTTPAdapter(max_retries=retries))
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Sesión HTTP compartida; el ritmo lo regula el controlador adaptativo de torrent_http
+session = create_session()
 
 
 def initialize_database():
@@ -141,8 +133,17 @@ def initialize_database():
     ''')
 
     conn.commit()
+    migrate(conn, TORRENT_MIGRATIONS, "base torrent")
     conn.close()
     logger.info("Base de datos inicializada correctamente")
+    # Las comprobaciones de duplicados se hacen contra el índice de títulos en memoria
+    get_title_index(db_path, "torrent_downloads")
+
+
+def open_database():
+    """Inicializa la base de datos y devuelve la conexión que usa toda la ejecución."""
+    initialize_database()
+    return sqlite3.connect(db_path)
 
 
 def load_progress():
@@ -216,20 +217,11 @@ def normalize_torrent_link(link):
 
 
 def find_existing_series(conn, title):
-    """Busca una serie existente por nombre (ignorando mayúsculas/minúsculas)."""
-    cursor = conn.cursor()
-
-    cursor.execute(
-        """
-        SELECT id
-        FROM torrent_downloads
-        WHERE type = 'series' AND lower(title) = lower(?)
-    """,
-        (title,),
-    )
+    """Busca una serie existente por nombre (ignorando mayúsculas/minúsculas).
 
-    result = cursor.fetchone()
-    return result[0] if result else None
+    Consulta el índice de títulos en memoria; ``conn`` se conserva por compatibilidad.
+    """
+    return get_title_index(db_path, "torrent_downloads").find_title('series', title)
 
 
 def find_existing_season(conn, series_id, season_number):
@@ -306,17 +298,24 @@ def evaluate_episode_duplicate_state(conn, episode_id, quality_id, torrent_link)
     return "quality_match"
 
 
-def get_soup(url, retries=3):
-    """Obtiene el contenido HTML de una URL y lo convierte en un objeto BeautifulSoup."""
-    for attempt in range(retries):
-        try:
-            logger.debug(f"Solicitando URL: {url} (intento {attempt + 1}/{retries})")
-            response = session.get(url, timeout=10, headers=headers)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except (RequestException, HTTPError) as e:
-            logger.error(f"Error al solicitar URL: {e}. Reintentando...")
-            time.sleep(2 + attempt * 2)  # Incrementar tiempo de espera en cada intento
+def get_page(url, retries=3, cache=None):
+    """Descarga el HTML de una URL.
+
+    Los reintentos y la espera entre ellos los gestiona el controlador de ritmo.
+    Devuelve ``NOT_MODIFIED`` si ``cache`` indica que la página no ha cambiado.
+    """
+    try:
+        logger.debug(f"Solicitando URL: {url}")
+        response, unchanged = fetch_cached(session, url, cache, retries=retries, timeout=10, headers=headers)
+        if response is None:
+            return None
+        if unchanged:
+            return NOT_MODIFIED
+        response.raise_for_status()
+        archive_page(url, response.content, "torrent_series", "http")
+        return response.content
+    except (RequestException, HTTPError) as e:
+        logger.error(f"Error al solicitar URL: {e}")
     return None
 
 
@@ -366,90 +365,63 @@ def parse_episode_range(episode_text):
     return 0, episode_text
 
 
-def scrape_series_details(url):
-    """Extrae los detalles de una serie desde su URL."""
+def scrape_series_details(url, cache=None):
+    """Extrae los detalles de una serie desde su URL.
+
+    Devuelve ``NOT_MODIFIED`` si la página coincide con la versión ya procesada.
+    """
     logger.info(f"Extrayendo detalles de la serie en URL: {url}")
-    soup = get_soup(url)
-    if not soup:
+    content = get_page(url, cache=cache)
+    if content is NOT_MODIFIED:
+        return NOT_MODIFIED
+    if not content:
         logger.warning(f"No se pudo obtener contenido de {url}")
         return None, None, None, []
+    return parse_series_page(content, url)
+
 
-    # Buscar el título completo (incluye nombre de la serie y temporada)
-    title_element = soup.find('h2', class_='position-relative ml-2 descargarTitulo')
-    if not title_element:
+def parse_series_page(content, url):
+    """Analiza el HTML de una temporada y devuelve ``(serie, temporada, calidad, episodios)``.
+
+    Los episodios son registros :class:`records.TorrentFile`.
+    """
+    # Título completo (incluye nombre de la serie y temporada), calidad y filas de episodios
+    page = parse_torrent_series(content)
+    if page is None:
         logger.warning(f"No se encontró título en {url}")
         return None, None, None, []
 
-    full_title = title_element.text.strip()
-
     # Extraer el título de la serie y el número de temporada
-    series_title, season_number = extract_series_info(full_title)
+    series_title, season_number = extract_series_info(page["full_title"])
 
     logger.info(f"Serie: '{series_title}', Temporada: {season_number}")
 
-    # Buscar la calidad en el div específico
-    quality = "Unknown"
-    format_div = soup.select_one('div.d-inline-block')
-    if format_div:
-        format_p = format_div.find('p')
-        if format_p and 'Formato:' in format_p.text:
-            quality = format_p.text.replace('Formato:', '').strip()
-            logger.info(f"Calidad encontrada: {quality}")
-
-    # Si no se encontró en el div específico, buscar en cualquier parte
-    if quality == "Unknown":
-        for p_tag in soup.find_all('p'):
-            if p_tag.find('b') and 'Formato:' in p_tag.text:
-                quality = p_tag.text.replace('Formato:', '').strip()
-                logger.info(f"Calidad encontrada (búsqueda alternativa): {quality}")
-                break
-
+    quality = page["quality"] or "Unknown"
+    if page["quality"]:
+        logger.info(f"Calidad encontrada: {quality}")
     quality = normalize_quality_label(quality)
 
-    # Buscar el número total de episodios
-    episodes_count = 0
-    for p_tag in soup.find_all('p'):
-        if 'Episodios:' in p_tag.text:
-            try:
-                episodes_count = int(p_tag.text.split(':')[-1].strip())
-                logger.info(f"Número de episodios: {episodes_count}")
-                break
-            except ValueError:
-                pass
+    if page["episodes_count"]:
+        logger.info(f"Número de episodios: {page['episodes_count']}")
 
-    # Buscar enlaces de torrent en la tabla
-    episodes = []
-    table = soup.find('table', class_='table-striped')
-    if not table:
+    # Enlaces de torrent de la tabla
+    if not page["has_table"]:
         logger.warning(f"No se encontró tabla de episodios en {url}")
         return series_title, season_number, quality, []
 
-    for row in table.select('tbody tr'):
-        try:
-            # Obtener el texto del episodio (puede ser un rango)
-            episode_text = row.select_one('td:nth-child(1)').text.strip()
-
-            # Parsear el número o rango de episodios
-            episode_number, episode_display = parse_episode_range(episode_text)
-
-            # Obtener el enlace del torrent
-            torrent_link = row.select_one('a#download_torrent')
-            if torrent_link and 'href' in torrent_link.attrs:
-                full_torrent_link = f"https:{torrent_link['href']}" if torrent_link['href'].startswith("//") else \
-                torrent_link['href']
-
-                # Crear el título completo del episodio
-                episode_title = f"{series_title} - {season_number}ª Temporada [{quality}] - {episode_display}"
-
-                episodes.append(
-                    (
-                        episode_number,
-                        episode_title,
-                        normalize_torrent_link(full_torrent_link),
-                    )
-                )
-        except (AttributeError, IndexError) as e:
-            logger.error(f"Error al procesar fila de episodio: {e}")
+    episodes = []
+    for episode_text, torrent_href in page["episodes"]:
+        # Parsear el número o rango de episodios
+        episode_number, episode_display = parse_episode_range(episode_text)
+
+        full_torrent_link = f"https:{torrent_href}" if torrent_href.startswith("//") else torrent_href
+
+        # Crear el título completo del episodio
+        episode_title = f"{series_title} - {season_number}ª Temporada [{quality}] - {episode_display}"
+
+        episodes.append(
+            TorrentFile(episode_number, episode_title, normalize_torrent_link(full_torrent_link))
+        )
 
     logger.info(f"Se extrajeron {len(episodes)} enlaces de torrent para la serie '{series_title}'.")
     return series_title, season_number, quality, episodes
@@ -464,14 +436,14 @@ def insert_data(db_conn, series_title, season_number, quality, episodes):
     # Normalizar datos antes de guardarlos
     normalized_quality = normalize_quality_label(quality)
     normalized_episodes = []
-    for episode_number, episode_title, torrent_link in episodes:
-        normalized_link = normalize_torrent_link(torrent_link)
+    for episode in episodes:
+        normalized_link = normalize_torrent_link(episode.torrent_link)
         if not normalized_link:
             logger.debug(
-                f"Episodio '{episode_title}' omitido por no tener enlace de torrent válido."
+                f"Episodio '{episode.title}' omitido por no tener enlace de torrent válido."
             )
             continue
-        normalized_episodes.append((episode_number, episode_title, normalized_link))
+        normalized_episodes.append(replace(episode, torrent_link=normalized_link))
 
     if not normalized_episodes:
         logger.warning(
@@ -484,6 +456,7 @@ def insert_data(db_conn, series_title, season_number, quality, episodes):
 
         # Verificar si la serie ya existe
         series_id = find_existing_series(db_conn, series_title)
+        new_series = not series_id
 
         if series_id:
             logger.info(
@@ -519,43 +492,45 @@ def insert_data(db_conn, series_title, season_number, quality, episodes):
         episodes_added = 0
 
         # Insertar episodios y enlaces
-        for episode_number, episode_title, torrent_link in normalized_episodes:
+        for episode in normalized_episodes:
             episode_id, created = get_or_create_episode(
-                db_conn, season_id, episode_number, episode_title
+                db_conn, season_id, episode.episode_number, episode.title
             )
 
             if created:
                 logger.info(
-                    f"Episodio creado: {episode_title} (Temporada {season_number}, Episodio {episode_number})."
+                    f"Episodio creado: {episode.title} (Temporada {season_number}, Episodio {episode.episode_number})."
                 )
 
             duplicate_state = evaluate_episode_duplicate_state(
-                db_conn, episode_id, quality_id, torrent_link
+                db_conn, episode_id, quality_id, episode.torrent_link
             )
 
             if duplicate_state == "exact_duplicate":
                 logger.info(
-                    f"El episodio '{episode_title}' ya tiene la calidad {normalized_quality} con el mismo enlace .torrent."
+                    f"El episodio '{episode.title}' ya tiene la calidad {normalized_quality} con el mismo enlace .torrent."
                 )
                 continue
 
             if duplicate_state == "quality_match":
                 logger.info(
-                    f"El episodio '{episode_title}' coincide en serie y calidad {normalized_quality} "
+                    f"El episodio '{episode.title}' coincide en serie y calidad {normalized_quality} "
                     "pero el enlace es nuevo. Se guardará como fuente adicional."
                 )
             else:
                 logger.info(
-                    f"El episodio '{episode_title}' no tenía la calidad {normalized_quality}. Se añadirá el nuevo enlace."
+                    f"El episodio '{episode.title}' no tenía la calidad {normalized_quality}. Se añadirá el nuevo enlace."
                 )
 
             cursor.execute(
                 "INSERT INTO torrent_files (torrent_id, episode_id, quality_id, torrent_link) VALUES (?, ?, ?, ?)",
-                (series_id, episode_id, quality_id, torrent_link),
+                (series_id, episode_id, quality_id, episode.torrent_link),
             )
             episodes_added += 1
 
         db_conn.commit()
+        if new_series:
+            get_title_index(db_path, "torrent_downloads").add(series_id, 'series', series_title, 0)
         logger.info(
             f"Se añadieron {episodes_added} enlaces para la serie '{series_title}' con calidad {normalized_quality}."
         )
@@ -563,7 +538,7 @@ def insert_data(db_conn, series_title, season_number, quality, episodes):
     except Exception as e:
         db_conn.rollback()
         logger.error(f"Error al insertar datos: {e}")
-        return 0
+        return None
 
 
 def scrape_series(start_id=None, max_consecutive_failures=100, resume=True):
@@ -600,7 +575,8 @@ def scrape_series(start_id=None, max_consecutive_failures=100, resume=True):
         resume,
     )
 
-    conn = sqlite3.connect(db_path)
+    conn = open_database()
+    cache = get_response_cache()
     consecutive_failures = 0
     stop_requested = False
 
@@ -617,7 +593,12 @@ def scrape_series(start_id=None, max_consecutive_failures=100, resume=True):
             try:
                 success = False
                 for attempt in range(3):
-                    series_title, season_number, quality, episodes = scrape_series_details(series_url)
+                    details = scrape_series_details(series_url, cache)
+                    if details is NOT_MODIFIED:
+                        logger.info(f"Sin cambios desde la última ejecución: {series_url}")
+                        success = True
+                        break
+                    series_title, season_number, quality, episodes = details
                     if series_title and episodes:
                         episodes_added = insert_data(conn, series_title, season_number, quality, episodes)
                         if episodes_added:
@@ -626,11 +607,13 @@ def scrape_series(start_id=None, max_consecutive_failures=100, resume=True):
                             consecutive_failures = 0
                         else:
                             logger.info(f"No guardado: {series_title} - Temporada {season_number} con calidad {quality}")
+                        if episodes_added is not None:
+                            # Sólo se marca como procesada si la escritura no falló
+                            cache.commit(series_url)
                         success = True
                         break
                     else:
                         logger.warning(f"Intento {attempt + 1} fallido para ID: {current_id}")
-                        time.sleep(1 + attempt)
 
                 if not success:
                     consecutive_failures += 1
@@ -653,8 +636,6 @@ def scrape_series(start_id=None, max_consecutive_failures=100, resume=True):
                 logger.info("Solicitud de parada recibida. Se detendrá antes de continuar con el siguiente ID.")
                 break
 
-            sleep_time = 1 + random.random() * 2
-            time.sleep(sleep_time)
             current_id = next_id
     except KeyboardInterrupt:
         logger.info("Script interrumpido por el usuario")
@@ -675,6 +656,9 @@ def scrape_series(start_id=None, max_consecutive_failures=100, resume=True):
                 f"Proceso completado o interrumpido. Se guardaron {total_saved} archivos de torrent en la base de datos."
             )
         conn.close()
+        close_response_cache()
+        close_page_archive()
+        close_title_indexes()
         clear_stop_request()
 
 
@@ -701,6 +685,11 @@ def main():
         default=10,
         help="Número máximo de fallos consecutivos permitidos",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignorar la caché HTTP y volver a procesar todas las páginas",
+    )
 
     args = parser.parse_args()
 
@@ -709,7 +698,9 @@ def main():
             os.remove(progress_file)
             logger.info("Progreso reiniciado manualmente.")
 
-        initialize_database()
+        if args.no_cache:
+            get_response_cache(enabled=False)
+            logger.info("Caché HTTP desactivada para esta ejecución.")
 
         resume = True
         if args.reset_progress or args.start_page is not None:
@@ -0,0 +1,219 @@
+"""Capa HTTP compartida por los scrapers de Dontorrent.
+
+Incluye la sesión ``requests`` común y un controlador de ritmo AIMD
+(incremento aditivo, decremento multiplicativo) por host: sube el número de
+peticiones por segundo mientras las respuestas son sanas y lo recorta en
+cuanto aparecen 429/5xx o picos de latencia.
+"""
+
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .scraper_utils import get_shutdown_event
+
+logger = logging.getLogger(__name__)
+
+shutdown_event = get_shutdown_event()
+
+# Headers (para evitar ser bloqueado)
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Cache-Control": "max-age=0"
+}
+
+# Códigos que indican saturación del servidor
+THROTTLE_STATUS = (429, 500, 502, 503, 504)
+
+# Parámetros por defecto del controlador AIMD
+DEFAULT_INITIAL_RATE = 1.0  # peticiones por segundo
+DEFAULT_MIN_RATE = 0.2
+DEFAULT_MAX_RATE = 8.0
+DEFAULT_INCREASE_STEP = 0.1  # incremento aditivo por respuesta sana
+DEFAULT_DECREASE_FACTOR = 0.5  # factor multiplicativo ante saturación
+LATENCY_SPIKE_FACTOR = 3.0  # latencia > factor * media se considera pico
+LATENCY_SPIKE_FLOOR = 2.0  # segundos mínimos para considerar un pico
+DECREASE_COOLDOWN = 2.0  # segundos entre dos recortes consecutivos
+LOG_EVERY = 50  # peticiones entre registros del ritmo actual
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+class AdaptiveRateController:
+    """Controlador AIMD del ritmo de peticiones para un host."""
+
+    def __init__(self, host, initial_rate=DEFAULT_INITIAL_RATE, min_rate=DEFAULT_MIN_RATE,
+                 max_rate=DEFAULT_MAX_RATE, increase_step=DEFAULT_INCREASE_STEP,
+                 decrease_factor=DEFAULT_DECREASE_FACTOR):
+        self.host = host
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.avg_latency = None
+        self.requests = 0
+        self.throttled = 0
+        self._next_slot = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def set_max_rate(self, max_rate):
+        """Ajusta el techo de peticiones por segundo (``0``/``None`` = valor por defecto)."""
+        with self._lock:
+            self.max_rate = max_rate if max_rate and max_rate > 0 else DEFAULT_MAX_RATE
+            self.min_rate = min(self.min_rate, self.max_rate)
+            self.rate = min(self.rate, self.max_rate)
+
+    def acquire(self):
+        """Bloquea hasta el siguiente hueco disponible según el ritmo actual."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            shutdown_event.wait(delay)
+
+    def record(self, status, latency, retry_after=None):
+        """Actualiza el ritmo con el resultado de una petición."""
+        with self._lock:
+            self.requests += 1
+            spike = (
+                self.avg_latency is not None
+                and latency > LATENCY_SPIKE_FLOOR
+                and latency > self.avg_latency * LATENCY_SPIKE_FACTOR
+            )
+            if status is None or status in THROTTLE_STATUS or spike:
+                self.throttled += 1
+                self._decrease(status, latency, retry_after)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+                # Media móvil de la latencia sólo con respuestas sanas
+                if self.avg_latency is None:
+                    self.avg_latency = latency
+                else:
+                    self.avg_latency = 0.8 * self.avg_latency + 0.2 * latency
+
+            if self.requests % LOG_EVERY == 0:
+                logger.info(
+                    "Ritmo HTTP %s: %.2f peticiones/s (latencia media %.2fs, %s/%s respuestas limitadas)",
+                    self.host,
+                    self.rate,
+                    self.avg_latency or 0.0,
+                    self.throttled,
+                    self.requests,
+                )
+
+    def _decrease(self, status, latency, retry_after):
+        now = time.monotonic()
+        if retry_after:
+            self._next_slot = max(self._next_slot, now + retry_after)
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        previous = self.rate
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        reason = f"código {status}" if status else "error de conexión"
+        if status and status not in THROTTLE_STATUS:
+            reason = f"pico de latencia {latency:.2f}s"
+        logger.warning(
+            "Ritmo HTTP %s reducido de %.2f a %.2f peticiones/s (%s)",
+            self.host,
+            previous,
+            self.rate,
+            reason,
+        )
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_rate_controller(url):
+    """Devuelve el controlador de ritmo compartido para el host de ``url``."""
+    host = urlparse(url).netloc
+    with _controllers_lock:
+        controller = _controllers.get(host)
+        if controller is None:
+            controller = AdaptiveRateController(host)
+            _controllers[host] = controller
+        return controller
+
+
+def create_session(pool_maxsize=10):
+    """Crea la sesión HTTP común.
+
+    Los reintentos por código de estado los gestiona :func:`fetch` junto al
+    controlador de ritmo; el adaptador sólo reintenta errores de conexión.
+    """
+    session = requests.Session()
+    session.verify = False  # Disable SSL verification for self-signed certificates
+    retries = Retry(total=3, connect=3, read=0, status=0, backoff_factor=0)
+    session.mount('https://', HTTPAdapter(max_retries=retries, pool_maxsize=pool_maxsize))
+    return session
+
+
+def _parse_retry_after(response):
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def fetch(session, url, retries=3, timeout=10, **kwargs):
+    """Realiza un GET respetando el ritmo adaptativo del host.
+
+    Reintenta ante 429/5xx o errores de conexión. Devuelve la última
+    respuesta obtenida o relanza el último error de red.
+    """
+    controller = get_rate_controller(url)
+    kwargs.setdefault("headers", HEADERS)
+    response = None
+    last_error = None
+    for attempt in range(retries):
+        if shutdown_event.is_set():
+            break
+        controller.acquire()
+        started = time.monotonic()
+        try:
+            response = session.get(url, timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            controller.record(None, time.monotonic() - started)
+            last_error = e
+            logger.debug(f"Error de red en {url} (intento {attempt + 1}/{retries}): {e}")
+            continue
+        controller.record(response.status_code, time.monotonic() - started, _parse_retry_after(response))
+        if response.status_code not in THROTTLE_STATUS:
+            return response
+        logger.debug(f"Respuesta {response.status_code} en {url} (intento {attempt + 1}/{retries})")
+
+    if response is None and last_error is not None:
+        raise last_error
+    return response
+
+
+def fetch_cached(session, url, cache, retries=3, timeout=10, **kwargs):
+    """GET condicional contra la caché HTTP.
+
+    Devuelve ``(respuesta, sin_cambios)``. ``sin_cambios`` es ``True`` cuando
+    el servidor responde 304 o el cuerpo coincide con la versión ya procesada.
+    """
+    request_headers = dict(kwargs.pop("headers", HEADERS))
+    if cache is not None:
+        request_headers.update(cache.conditional_headers(url))
+    response = fetch(session, url, retries=retries, timeout=timeout, headers=request_headers, **kwargs)
+    if response is None or cache is None:
+        return response, False
+    return response, cache.is_unchanged(url, response)
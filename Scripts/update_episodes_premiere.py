@@ -1,5 +1,4 @@
 import time
-import re
 import concurrent.futures
 import argparse
 import os
@@ -8,7 +7,6 @@ import json
 import threading
 from datetime import datetime
 from queue import Queue, Empty
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -16,13 +14,19 @@ from selenium.common.exceptions import TimeoutException, StaleElementReferenceEx
 
 # Importar utilidades compartidas
 from .scraper_utils import (
-    setup_logger, create_driver, connect_db, login, setup_database,
+    setup_logger, connect_db, setup_database,
     save_progress, load_progress, clear_cache, find_series_by_title_year,
     season_exists, episode_exists, insert_series, insert_season,
     insert_episode, BASE_URL, DB_PATH, MAX_WORKERS, MAX_RETRIES, PROJECT_ROOT,
-    log_link_insertion, is_url_completed
+    insert_link_rows, is_url_completed, extract_page, harvest_pending_embeds,
+    build_link_data, get_all_episodes_with_infinite_scroll
 )
 from .graceful_shutdown import GracefulShutdown
+from .driver_pool import get_driver_pool, close_driver_pool
+from .parse_pool import close_parse_pool
+from .db_connections import close_db_connections
+from .page_ready import load, wait_for, current_embed_src, log_wait_stats
+from .hdfull_http import fetch_episode_feed
 
 # Configuración específica para este script
 SCRIPT_NAME = "update_episodes_premiere"
@@ -124,8 +128,13 @@ def save_urls_to_json(all_urls, new_urls):
 def get_episode_urls_from_premiere_page(driver):
     logger.info("Obteniendo URLs de episodios de estreno...")
     try:
-        driver.get(NEW_EPISODES_URL)
-        time.sleep(3)  # Esperar a que se cargue la página y el contenido dinámico
+        # Pedir los bloques del scroll infinito directamente al endpoint AJAX
+        episode_urls = fetch_episode_feed("premiere", driver)
+        if episode_urls is not None:
+            logger.info(f"Se encontraron {len(episode_urls)} episodios de estreno")
+            return episode_urls
+
+        load(driver, NEW_EPISODES_URL, "listing")
 
         # Hacer clic en la pestaña "Estrenos" si es necesario
         try:
@@ -133,7 +142,7 @@ def get_episode_urls_from_premiere_page(driver):
                 EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Estrenos')]"))
             )
             premiere_tab.click()
-            time.sleep(2)  # Esperar a que se cargue el contenido
+            wait_for(driver, "listing")
         except Exception as e:
             logger.warning(f"No se pudo hacer clic en la pestaña 'Estrenos': {e}")
             # Continuamos de todos modos, ya que podríamos estar ya en la pestaña correcta
@@ -147,57 +156,10 @@ def get_episode_urls_from_premiere_page(driver):
             logger.error("Timeout esperando el contenedor de episodios")
             return []
 
-        # Obtener todos los episodios con scroll infinito
-        episode_urls = []
-        last_count = 0
-        no_new_results_count = 0
-        max_no_new_results = 5  # Número máximo de intentos sin nuevos resultados antes de parar
-        max_scroll_attempts = 65  # Límite de scroll para evitar bucles infinitos
-
-        # Conjunto para evitar duplicados
-        seen_urls = set()
-
-        scroll_attempt = 0
-        # Bucle para hacer scroll hasta que no haya más episodios
-        while scroll_attempt < max_scroll_attempts:
-            # Obtener los episodios actuales
-            episode_divs = driver.find_elements(By.CSS_SELECTOR, "#episodes-content .span-6.tt.view.show-view")
-
-            # Procesar los episodios visibles actualmente
-            for div in episode_divs:
-                try:
-                    link_tag = div.find_element(By.TAG_NAME, "a")
-                    episode_href = link_tag.get_attribute("href")
-
-                    # Añadir solo si no lo hemos visto antes
-                    if episode_href and episode_href not in seen_urls:
-                        episode_urls.append(episode_href)
-                        seen_urls.add(episode_href)
-                except Exception as e:
-                    logger.warning(f"Error al procesar un div de episodio: {e}")
-
-            # Verificar si se encontraron nuevos episodios
-            if len(episode_urls) == last_count:
-                no_new_results_count += 1
-                if no_new_results_count >= max_no_new_results:  # Si no hay nuevos resultados después de varios intentos, terminar
-                    logger.info(
-                        f"No se encontraron nuevos episodios después de {no_new_results_count} intentos. Terminando scroll.")
-                    break
-            else:
-                no_new_results_count = 0  # Reiniciar contador si se encontraron nuevos episodios
-                last_count = len(episode_urls)
-
-            # Hacer scroll hacia abajo
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            logger.debug(
-                f"Scroll {scroll_attempt + 1}/{max_scroll_attempts}: {len(episode_urls)} episodios encontrados")
-
-            # Esperar a que se carguen más contenidos
-            time.sleep(1)
-            scroll_attempt += 1
-
-        if scroll_attempt >= max_scroll_attempts:
-            logger.info(f"Se alcanzó el límite de {max_scroll_attempts} scrolls, finalizando.")
+        # Hacer scroll hasta que no aparezcan más episodios
+        episode_urls = get_all_episodes_with_infinite_scroll(
+            driver, logger, max_scroll_attempts=65, max_no_new_results=5
+        )
 
         logger.info(f"Se encontraron {len(episode_urls)} episodios de estreno")
         return episode_urls
@@ -225,6 +187,12 @@ def worker2_metadata_extractor(driver, db_path, worker_id=0):
 
             logger.info(f"Worker 2 (ID {worker_id}): Procesando episodio: {episode_url}")
 
+            # Reciclar el driver si ha servido demasiadas páginas o consume demasiada memoria
+            driver = get_driver_pool().checkpoint(driver)
+            if driver is None:
+                logger.error(f"Worker 2 (ID {worker_id}): No se pudo reemplazar el driver reciclado. Finalizando.")
+                break
+
             # Extraer detalles del episodio
             episode_data = extract_episode_details(driver, episode_url, worker_id, db_path)
 
@@ -257,8 +225,7 @@ def extract_episode_details(driver, episode_url, worker_id=0, db_path=None):
 
     try:
         # Navegar a la URL del episodio
-        driver.get(episode_url)
-        time.sleep(1.5)  # Esperar a que se cargue la página
+        load(driver, episode_url, "episode")
 
         # Esperar a que aparezca la información del episodio
         try:
@@ -269,101 +236,26 @@ def extract_episode_details(driver, episode_url, worker_id=0, db_path=None):
             logger.error(f"[Worker {worker_id}] Timeout esperando información del episodio en {episode_url}")
             return None
 
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Extraer información de la serie desde el div summary-title-wrapper
-        series_info = soup.find("div", class_="summary-title-wrapper")
-        if not series_info:
-            logger.error(f"[Worker {worker_id}] No se pudo encontrar información de la serie en {episode_url}")
-            return None
-
-        # Extraer título de la serie
-        series_title_div = series_info.find("div", id="summary-title")
-        if not series_title_div:
+        details = extract_page(driver, "episode")
+        if details["series_title"] is None:
             logger.error(f"[Worker {worker_id}] No se pudo encontrar el título de la serie en {episode_url}")
             return None
-
-        series_title = series_title_div.text.strip()
-
-        # Extraer información del episodio desde el span subtitle
-        subtitle_span = series_info.find("span", class_="subtitle")
-        if not subtitle_span:
-            logger.error(f"[Worker {worker_id}] No se pudo encontrar información del episodio en {episode_url}")
-            return None
-
-        # El formato suele ser "2x05 Episodio 5"
-        episode_info_text = subtitle_span.text.strip()
-        episode_match = re.match(r'(\d+)\s*x\s*(\d+)\s*(.*)', episode_info_text)
-
-        if not episode_match:
-            logger.error(f"[Worker {worker_id}] No se pudo extraer la información del episodio: {episode_info_text}")
+        if details["episode"] is None:
+            logger.error(f"[Worker {worker_id}] No se pudo extraer la información del episodio en {episode_url}")
             return None
 
-        season_number = int(episode_match.group(1))
-        episode_number = int(episode_match.group(2))
-        episode_title = episode_match.group(3).strip()
-
-        if not episode_title:
-            # Intentar obtener el título del episodio de los metadatos
-            meta_title = soup.find("meta", {"itemprop": "name", "content": lambda x: x and x != series_title})
-            if meta_title:
-                episode_title = meta_title["content"].strip()
-            else:
-                episode_title = f"Episodio {episode_number}"
+        series_title = details["series_title"]
+        season_number = details["season"]
+        episode_number = details["episode"]
+        episode_title = details["episode_title"] or f"Episodio {episode_number}"
 
         logger.info(
             f"[Worker {worker_id}] Información extraída: Serie={series_title}, Temporada={season_number}, Episodio={episode_number}, Título={episode_title}")
 
-        # Extraer información adicional de la serie desde show-details
-        show_details = soup.find("div", class_="show-details")
-
-        series_year = None
-        imdb_rating = None
-        genre = None
-        status = None
-        director = None
-        emission_date = None
-
-        if show_details:
-            # Extraer estado
-            status_p = show_details.find("p", string=lambda s: s and "Estado:" in s if s else False)
-            if status_p and status_p.find("a"):
-                status = status_p.find("a").text.strip()
-                logger.debug(f"[Worker {worker_id}] Estado de la serie extraído: {status}")
-
-            # Extraer año
-            year_p = show_details.find("p", string=lambda s: s and "Año:" in s if s else False)
-            if year_p and year_p.find("a"):
-                try:
-                    series_year = int(year_p.find("a").text.strip())
-                    logger.debug(f"[Worker {worker_id}] Año de la serie extraído: {series_year}")
-                except ValueError:
-                    logger.warning(f"[Worker {worker_id}] No se pudo convertir el año a entero")
-
-            # Extraer IMDB rating
-            imdb_p = show_details.find("p", string=lambda s: s and "IMDB Rating:" in s if s else False)
-            if imdb_p and imdb_p.find("a"):
-                rating_text = imdb_p.find("a").text.strip().split()[0]
-                try:
-                    imdb_rating = float(rating_text)
-                    logger.debug(f"[Worker {worker_id}] IMDB Rating extraído: {imdb_rating}")
-                except ValueError:
-                    logger.warning(f"[Worker {worker_id}] No se pudo convertir el rating a float: {rating_text}")
-
-            # Extraer género
-            genre_p = show_details.find("p", string=lambda s: s and "Género:" in s if s else False)
-            if genre_p:
-                genre_tags = genre_p.find_all("a")
-                genre = ", ".join([tag.text.strip() for tag in genre_tags]) if genre_tags else None
-                logger.debug(f"[Worker {worker_id}] Género extraído: {genre}")
-
-            # Extraer fecha de emisión
-            emission_p = show_details.find("p", string=lambda s: s and "Emitido:" in s if s else False)
-            if emission_p:
-                emission_text = emission_p.text.replace("Emitido:", "").strip()
-                emission_date = emission_text
-                logger.debug(f"[Worker {worker_id}] Fecha de emisión extraída: {emission_date}")
+        # Información adicional de la serie desde show-details
+        series_year = details["year"]
+        imdb_rating = details["imdb_rating"]
+        genre = details["genre"]
 
         # Crear una conexión a la base de datos para reutilizarla
         connection = connect_db(db_path)
@@ -484,9 +376,13 @@ def worker3_link_extractor(driver, worker_id=0):
 
             logger.info(f"Worker 3 (ID {worker_id}): Extrayendo enlaces para: {episode_url}")
 
+            driver = get_driver_pool().checkpoint(driver)
+            if driver is None:
+                logger.error(f"Worker 3 (ID {worker_id}): No se pudo reemplazar el driver reciclado. Finalizando.")
+                break
+
             # Navegar a la URL del episodio
-            driver.get(episode_url)
-            time.sleep(2)  # Esperar a que se cargue la página
+            load(driver, episode_url, "episode")
 
             # Extraer enlaces del episodio
             server_links = extract_episode_links(driver, episode_data["episode_id"])
@@ -531,77 +427,52 @@ def extract_episode_links(driver, episode_id):
         embed_selectors = driver.find_elements(By.CLASS_NAME, 'embed-selector')
         logger.debug(f"Número de enlaces encontrados: {len(embed_selectors)}")
 
+        # Idioma y servidor de todos los selectores, extraídos de una vez
+        embeds_info = extract_page(driver, "embeds")["embeds"] if embed_selectors else []
+
+        # Si está activado, un único script hace todos los clics en el navegador
+        harvested_urls, harvested = harvest_pending_embeds(driver, len(embed_selectors))
+
         for i, embed_selector in enumerate(embed_selectors):
             try:
-                # Extraer idioma y servidor antes de hacer clic
-                embed_html = embed_selector.get_attribute('outerHTML')
-                embed_soup = BeautifulSoup(embed_html, "html.parser")
-
-                # Determinar el idioma
-                language = None
-                if "Audio Español" in embed_html:
-                    language = "Audio Español"
-                elif "Subtítulo Español" in embed_html:
-                    language = "Subtítulo Español"
-                elif "Audio Latino" in embed_html:
-                    language = "Audio Latino"
-                elif "Audio Original" in embed_html:
-                    language = "Audio Original"
-                elif "Subtítulo Ingles" in embed_html:
-                    language = "Subtítulo Ingles"
-
-                # Extraer el servidor usando la nueva estructura HTML
+                # Idioma y servidor del selector, ya analizados desde el HTML de la página
+                embed_info = embeds_info[i] if i < len(embeds_info) else {"language": None, "server": None}
+                language = embed_info["language"]
                 server = None
-                provider_tag = embed_soup.find("b", class_="provider")
-                if provider_tag:
-                    server_text = provider_tag.text.strip()
+                if embed_info["server"]:
+                    server_text = embed_info["server"]
                     # Extraer el dominio principal del servidor
                     server = server_text.lower().split('.')[0] if '.' in server_text else server_text.lower()
-                    logger.debug(f"Servidor extraído de la clase provider: {server}")
-                else:
-                    # Método alternativo si no se encuentra la clase provider
-                    if "Servidor:" in embed_html:
-                        server_match = re.search(r'Servidor:([^<]+)', embed_html)
-                        if server_match:
-                            server_text = server_match.group(1).strip()
-                            server = server_text.lower().split('.')[0] if '.' in server_text else server_text.lower()
-                            logger.debug(f"Servidor extraído del texto: {server}")
 
                 logger.debug(f"Selector {i + 1}: Idioma={language}, Servidor={server}")
 
-                # Hacer clic en el selector para mostrar el iframe
-                driver.execute_script("arguments[0].click();", embed_selector)
-                time.sleep(1.5)  # Esperar a que se cargue el iframe
-
-                try:
-                    # Esperar a que aparezca el iframe
-                    iframe = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, ".embed-movie iframe"))
-                    )
-
-                    # Obtener el enlace del iframe
-                    embedded_link = iframe.get_attribute('src')
-                    logger.debug(f"Enlace embebido extraído: {embedded_link}")
-
-                    # Modificar el enlace si es powvideo o streamplay
-                    if embedded_link and server and server in ["powvideo", "streamplay"]:
-                        embedded_link = re.sub(r"embed-([^-]+)-\d+x\d+\.html", r"\1", embedded_link)
-
-                    # Determinar la calidad en función del servidor
-                    quality = '1080p' if server in ['streamtape', 'vidmoly', 'mixdrop'] else 'hdrip'
-
-                    # Añadir enlace a la lista si tenemos todos los datos necesarios
-                    if server and language and embedded_link:
-                        server_links.append({
-                            "episode_id": episode_id,
-                            "server": server,
-                            "language": language,
-                            "link": embedded_link,
-                            "quality": quality
-                        })
-                        logger.debug(f"Enlace añadido: {server} - {language}")
-                except Exception as e:
-                    logger.error(f"Error al obtener el iframe para el selector {i + 1}: {e}")
+                if i in harvested:
+                    # El script del navegador ya hizo clic en este selector
+                    embedded_link = harvested_urls[i]
+                else:
+                    # Hacer clic en el selector y esperar a que cambie el iframe
+                    previous_src = current_embed_src(driver)
+                    driver.execute_script("arguments[0].click();", embed_selector)
+                    wait_for(driver, "embed", arg=previous_src)
+
+                    try:
+                        # Esperar a que aparezca el iframe
+                        iframe = WebDriverWait(driver, 5).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, ".embed-movie iframe"))
+                        )
+
+                        # Obtener el enlace del iframe
+                        embedded_link = iframe.get_attribute('src')
+                    except Exception as e:
+                        logger.error(f"Error al obtener el iframe para el selector {i + 1}: {e}")
+                        continue
+                logger.debug(f"Enlace embebido extraído: {embedded_link}")
+
+                # Añadir enlace a la lista si tenemos todos los datos necesarios
+                link_data = build_link_data(server, language, embedded_link, episode_id=episode_id)
+                if link_data:
+                    server_links.append(link_data)
+                    logger.debug(f"Enlace añadido: {server} - {language}")
             except Exception as e:
                 logger.error(f"Error al procesar el selector de embed {i + 1}: {e}")
 
@@ -681,60 +552,49 @@ def insert_episode_links(episode_id, links, connection=None, db_path=None):
     inserted_count = 0
 
     try:
+        server_ids = {}
+        quality_ids = {}
+        rows = []
         for link in links:
             # Insertar el servidor si no existe
-            cursor.execute('''
-                INSERT OR IGNORE INTO servers (name) VALUES (?)
-            ''', (link["server"],))
-            cursor.execute('''
-                SELECT id FROM servers WHERE name=?
-            ''', (link["server"],))
-            server_row = cursor.fetchone()
-            if not server_row:
-                logger.error(f"Error: No se encontró el servidor {link['server']}")
-                continue
-            server_id = server_row["id"]
+            if link.server not in server_ids:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO servers (name) VALUES (?)
+                ''', (link.server,))
+                cursor.execute('''
+                    SELECT id FROM servers WHERE name=?
+                ''', (link.server,))
+                server_row = cursor.fetchone()
+                if not server_row:
+                    logger.error(f"Error: No se encontró el servidor {link.server}")
+                    continue
+                server_ids[link.server] = server_row["id"]
 
             # Obtener el ID de la calidad
-            cursor.execute('''
-                SELECT quality_id FROM qualities WHERE quality=?
-            ''', (link["quality"],))
-            quality_row = cursor.fetchone()
-
-            if not quality_row:
-                # Si la calidad no existe, insertarla
-                cursor.execute('''
-                    INSERT INTO qualities (quality) VALUES (?)
-                ''', (link["quality"],))
+            if link.quality not in quality_ids:
                 cursor.execute('''
                     SELECT quality_id FROM qualities WHERE quality=?
-                ''', (link["quality"],))
+                ''', (link.quality,))
                 quality_row = cursor.fetchone()
-            quality_id = quality_row["quality_id"]
 
-            # Verificar si el enlace ya existe
-            cursor.execute('''
-                SELECT id FROM links_files_download 
-                WHERE episode_id=? AND server_id=? AND language=? AND link=?
-            ''', (episode_id, server_id, link["language"], link["link"]))
-            link_exists = cursor.fetchone()
-            if not link_exists:
-                # Insertar el enlace en la base de datos
-                cursor.execute('''
-                    INSERT INTO links_files_download (episode_id, server_id, language, link, quality_id, created_at)
-                    VALUES (?, ?, ?, ?, ?, datetime('now'))
-                ''', (episode_id, server_id, link["language"], link["link"], quality_id))
-                log_link_insertion(
-                    logger,
-                    episode_id=episode_id,
-                    server=link["server"],
-                    language=link["language"],
-                )
-                inserted_count += 1
-            else:
-                logger.debug(
-                    f"Enlace ya existe: episode_id={episode_id}, server={link['server']}, language={link['language']}"
-                )
+                if not quality_row:
+                    # Si la calidad no existe, insertarla
+                    cursor.execute('''
+                        INSERT INTO qualities (quality) VALUES (?)
+                    ''', (link.quality,))
+                    cursor.execute('''
+                        SELECT quality_id FROM qualities WHERE quality=?
+                    ''', (link.quality,))
+                    quality_row = cursor.fetchone()
+                quality_ids[link.quality] = quality_row["quality_id"]
+
+            rows.append((
+                None, episode_id, server_ids[link.server], link.language, link.url, quality_ids[link.quality],
+            ))
+
+        # Los enlaces que ya existen los descarta la BD
+        inserted_count = insert_link_rows(cursor, rows)
+        logger.debug(f"Episodio {episode_id}: {inserted_count} enlaces nuevos de {len(rows)}")
 
         connection.commit()
         return inserted_count
@@ -895,7 +755,6 @@ def process_premiere_episodes(db_path=None):
     start_time = datetime.now()
     logger.info(f"Iniciando actualización de episodios de estreno: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     progress_data = {}
-    main_driver = None
     worker2_drivers = []
     worker3_drivers = []
     threads = []
@@ -927,40 +786,36 @@ def process_premiere_episodes(db_path=None):
         # Cargar progreso anterior
         progress_data = load_progress(PROGRESS_FILE, {})
 
-        # Crear un driver principal para el Worker 1
-        main_driver = create_driver()
-
-        # Primero hacer login
-        if not login(main_driver, logger):
+        # Pool compartido: el driver del Worker 1 se reutiliza después para el Worker 2
+        pool = get_driver_pool(size=3)
+        main_driver = pool.acquire()
+        if main_driver is None:
             logger.error("No se pudo iniciar sesión. Abortando procesamiento de episodios de estreno.")
-            main_driver.quit()
             return []
 
         # Worker 1: Obtener URLs de episodios de estreno
         new_urls = worker1_url_extractor(main_driver, progress_data)
+        pool.release(main_driver)
 
         if not new_urls:
             logger.warning("No se encontraron episodios de estreno nuevos. Finalizando.")
-            main_driver.quit()
             return []
 
-        # Crear y configurar drivers para Worker 2 (2 instancias)
+        # Drivers para Worker 2 (2 instancias)
         for i in range(2):
-            driver = create_driver()
-            if login(driver, logger):
+            driver = pool.acquire()
+            if driver is not None:
                 worker2_drivers.append(driver)
             else:
                 logger.error(
                     f"No se pudo iniciar sesión para Worker 2 (instancia {i + 1}). Continuando con menos workers.")
-                driver.quit()
 
-        # Crear y configurar drivers para Worker 3 (1 instancia)
-        driver = create_driver()
-        if login(driver, logger):
+        # Driver para Worker 3 (1 instancia)
+        driver = pool.acquire()
+        if driver is not None:
             worker3_drivers.append(driver)
         else:
             logger.error("No se pudo iniciar sesión para Worker 3. Continuando con menos workers.")
-            driver.quit()
 
         # Iniciar workers en hilos separados
 
@@ -1009,16 +864,10 @@ def process_premiere_episodes(db_path=None):
         logger.debug(traceback.format_exc())
         return []
     finally:
-        if main_driver:
-            try:
-                main_driver.quit()
-            except Exception:
-                pass
-        for driver in worker2_drivers + worker3_drivers:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+        close_driver_pool()
+        close_parse_pool()
+        close_db_connections()
+        log_wait_stats(logger)
         save_progress(PROGRESS_FILE, progress_data)
         log_update_stats(start_time, db_path)
 
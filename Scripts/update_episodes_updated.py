@@ -1,12 +1,10 @@
 import time
-import re
 import concurrent.futures
 import argparse
 import os
 import traceback
 import threading
 from datetime import datetime
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,14 +12,20 @@ from selenium.common.exceptions import TimeoutException
 
 # Importar utilidades compartidas
 from .scraper_utils import (
-    setup_logger, create_driver, connect_db, login, setup_database,
+    setup_logger, connect_db, setup_database,
     save_progress, load_progress, extract_links,
     insert_links_batch, clear_cache, find_series_by_title_year,
     season_exists, episode_exists, insert_series, insert_season,
     insert_episode, BASE_URL, DB_PATH, MAX_WORKERS, MAX_RETRIES, PROJECT_ROOT,
-    is_url_completed, mark_url_completed
+    is_url_completed, mark_url_completed, extract_page, harvest_pending_embeds,
+    build_link_data, get_all_episodes_with_infinite_scroll
 )
 from .graceful_shutdown import GracefulShutdown
+from .driver_pool import get_driver_pool, close_driver_pool
+from .parse_pool import close_parse_pool
+from .db_connections import close_db_connections
+from .page_ready import load, wait_for, current_embed_src, log_wait_stats
+from .hdfull_http import fetch_episode_feed
 
 # Configuración específica para este script
 SCRIPT_NAME = "update_episodes_updated"
@@ -37,39 +41,44 @@ logger = setup_logger(SCRIPT_NAME, LOG_FILE)
 shutdown = GracefulShutdown()
 shutdown_event = shutdown.shutdown_event
 
-# Manejador de drivers por hilo para evitar múltiples inicios de sesión
+# Driver del pool asociado a cada hilo para evitar múltiples inicios de sesión
 _thread_local = threading.local()
-_active_drivers = []
 
 
 def get_logged_in_driver():
-    """Obtiene un driver asociado al hilo actual ya autenticado."""
-    if not hasattr(_thread_local, "driver"):
-        driver = create_driver()
-        if not login(driver, logger):
-            logger.error("No se pudo iniciar sesión en el driver")
-            driver.quit()
-            raise RuntimeError("Login failed")
-        _thread_local.driver = driver
-        _active_drivers.append(driver)
-    return _thread_local.driver
+    """Obtiene del pool un driver autenticado asociado al hilo actual."""
+    pool = get_driver_pool(size=MAX_WORKERS)
+    driver = getattr(_thread_local, "driver", None)
+    if driver is None:
+        driver = pool.acquire()
+    else:
+        # Cada llamada corresponde a un episodio: reciclar el driver si toca
+        driver = pool.checkpoint(driver)
+    if driver is None:
+        logger.error("No se pudo obtener un driver con sesión iniciada")
+        raise RuntimeError("Login failed")
+    _thread_local.driver = driver
+    return driver
 
 
 def close_all_drivers():
-    for driver in _active_drivers:
-        try:
-            driver.quit()
-        except Exception:
-            pass
-    _active_drivers.clear()
+    close_driver_pool()
+    close_parse_pool()
+    close_db_connections()
+    log_wait_stats(logger)
 
 
 # Función para obtener URLs de episodios de la página de actualizados
 def get_episode_urls_from_updated_page(driver):
     logger.info("Obteniendo URLs de episodios actualizados...")
     try:
-        driver.get(UPDATED_EPISODES_URL)
-        time.sleep(3)  # Esperar a que se cargue la página y el contenido dinámico
+        # Pedir los bloques del scroll infinito directamente al endpoint AJAX
+        episode_urls = fetch_episode_feed("updated", driver)
+        if episode_urls is not None:
+            logger.info(f"Se encontraron {len(episode_urls)} episodios actualizados")
+            return episode_urls
+
+        load(driver, UPDATED_EPISODES_URL, "listing")
 
         # Hacer clic en la pestaña "Actualizados" si es necesario
         try:
@@ -77,7 +86,7 @@ def get_episode_urls_from_updated_page(driver):
                 EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Actualizados')]"))
             )
             updated_tab.click()
-            time.sleep(2)  # Esperar a que se cargue el contenido
+            wait_for(driver, "listing")
         except Exception as e:
             logger.warning(f"No se pudo hacer clic en la pestaña 'Actualizados': {e}")
 
@@ -90,57 +99,10 @@ def get_episode_urls_from_updated_page(driver):
             logger.error("Timeout esperando el contenedor de episodios")
             return []
 
-        # Obtener todos los episodios con scroll infinito
-        episode_urls = []
-        last_count = 0
-        no_new_results_count = 0
-        max_no_new_results = 5  # Número máximo de intentos sin nuevos resultados antes de parar
-        max_scroll_attempts = 65  # Límite de scroll para evitar bucles infinitos
-
-        # Conjunto para evitar duplicados
-        seen_urls = set()
-
-        scroll_attempt = 0
-        # Bucle para hacer scroll hasta que no haya más episodios
-        while scroll_attempt < max_scroll_attempts:
-            # Obtener los episodios actuales
-            episode_divs = driver.find_elements(By.CSS_SELECTOR, "#episodes-content .span-6.tt.view.show-view")
-
-            # Procesar los episodios visibles actualmente
-            for div in episode_divs:
-                try:
-                    link_tag = div.find_element(By.TAG_NAME, "a")
-                    episode_href = link_tag.get_attribute("href")
-
-                    # Añadir solo si no lo hemos visto antes
-                    if episode_href and episode_href not in seen_urls:
-                        episode_urls.append(episode_href)
-                        seen_urls.add(episode_href)
-                except Exception as e:
-                    logger.warning(f"Error al procesar un div de episodio: {e}")
-
-            # Verificar si se encontraron nuevos episodios
-            if len(episode_urls) == last_count:
-                no_new_results_count += 1
-                if no_new_results_count >= max_no_new_results:
-                    logger.info(
-                        f"No se encontraron nuevos episodios después de {no_new_results_count} intentos. Terminando scroll.")
-                    break
-            else:
-                no_new_results_count = 0
-                last_count = len(episode_urls)
-
-            # Hacer scroll hacia abajo
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            logger.debug(
-                f"Scroll {scroll_attempt + 1}/{max_scroll_attempts}: {len(episode_urls)} episodios encontrados")
-
-            # Esperar a que se carguen más contenidos
-            time.sleep(1)
-            scroll_attempt += 1
-
-        if scroll_attempt >= max_scroll_attempts:
-            logger.info(f"Se alcanzó el límite de {max_scroll_attempts} scrolls, finalizando.")
+        # Hacer scroll hasta que no aparezcan más episodios
+        episode_urls = get_all_episodes_with_infinite_scroll(
+            driver, logger, max_scroll_attempts=65, max_no_new_results=5
+        )
 
         logger.info(f"Se encontraron {len(episode_urls)} episodios actualizados")
         return episode_urls
@@ -156,8 +118,7 @@ def extract_episode_details(episode_url, worker_id=0, db_path=None):
     driver = get_logged_in_driver()
 
     try:
-        driver.get(episode_url)
-        time.sleep(1.5)  # Reducido para optimizar
+        load(driver, episode_url, "episode")
 
         # Esperar a que aparezca la información del episodio
         try:
@@ -168,85 +129,26 @@ def extract_episode_details(episode_url, worker_id=0, db_path=None):
             logger.error(f"[Worker {worker_id}] Timeout esperando información del episodio en {episode_url}: {e}")
             return None
 
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Extraer información de la serie desde el div summary-title-wrapper
-        series_info = soup.find("div", class_="summary-title-wrapper")
-        if not series_info:
-            logger.error(f"[Worker {worker_id}] No se pudo encontrar información de la serie en {episode_url}")
-            return None
-
-        # Extraer título de la serie
-        series_title_div = series_info.find("div", id="summary-title")
-        if not series_title_div:
+        details = extract_page(driver, "episode")
+        if details["series_title"] is None:
             logger.error(f"[Worker {worker_id}] No se pudo encontrar el título de la serie en {episode_url}")
             return None
-
-        series_title = series_title_div.text.strip()
-
-        # Extraer información del episodio desde el span subtitle
-        subtitle_span = series_info.find("span", class_="subtitle")
-        if not subtitle_span:
-            logger.error(f"[Worker {worker_id}] No se pudo encontrar información del episodio en {episode_url}")
+        if details["episode"] is None:
+            logger.error(f"[Worker {worker_id}] No se pudo extraer la información del episodio en {episode_url}")
             return None
 
-        # El formato suele ser "2x05 Episodio 5"
-        episode_info_text = subtitle_span.text.strip()
-        episode_match = re.match(r'(\d+)\s*x\s*(\d+)\s*(.*)', episode_info_text)
-
-        if not episode_match:
-            logger.error(f"[Worker {worker_id}] No se pudo extraer la información del episodio: {episode_info_text}")
-            return None
-
-        season_number = int(episode_match.group(1))
-        episode_number = int(episode_match.group(2))
-        episode_title = episode_match.group(3).strip()
-
-        if not episode_title:
-            # Intentar obtener el título del episodio de los metadatos
-            meta_title = soup.find("meta", {"itemprop": "name", "content": lambda x: x and x != series_title})
-            if meta_title:
-                episode_title = meta_title["content"].strip()
-            else:
-                episode_title = f"Episodio {episode_number}"
+        series_title = details["series_title"]
+        season_number = details["season"]
+        episode_number = details["episode"]
+        episode_title = details["episode_title"] or f"Episodio {episode_number}"
 
         logger.info(
             f"[Worker {worker_id}] Información extraída: Serie={series_title}, Temporada={season_number}, Episodio={episode_number}, Título={episode_title}")
 
-        # Extraer información adicional de la serie desde show-details
-        show_details = soup.find("div", class_="show-details")
-
-        series_year = None
-        imdb_rating = None
-        genre = None
-
-        if show_details:
-            # Extraer año
-            year_p = show_details.find("p", string=lambda s: s and "Año:" in s if s else False)
-            if year_p and year_p.find("a"):
-                try:
-                    series_year = int(year_p.find("a").text.strip())
-                    logger.debug(f"[Worker {worker_id}] Año de la serie extraído: {series_year}")
-                except ValueError:
-                    logger.warning(f"[Worker {worker_id}] No se pudo convertir el año a entero")
-
-            # Extraer IMDB rating
-            imdb_p = show_details.find("p", string=lambda s: s and "IMDB Rating:" in s if s else False)
-            if imdb_p and imdb_p.find("a"):
-                rating_text = imdb_p.find("a").text.strip().split()[0]
-                try:
-                    imdb_rating = float(rating_text)
-                    logger.debug(f"[Worker {worker_id}] IMDB Rating extraído: {imdb_rating}")
-                except ValueError:
-                    logger.warning(f"[Worker {worker_id}] No se pudo convertir el rating a float: {rating_text}")
-
-            # Extraer género
-            genre_p = show_details.find("p", string=lambda s: s and "Género:" in s if s else False)
-            if genre_p:
-                genre_tags = genre_p.find_all("a")
-                genre = ", ".join([tag.text.strip() for tag in genre_tags]) if genre_tags else None
-                logger.debug(f"[Worker {worker_id}] Género extraído: {genre}")
+        # Información adicional de la serie desde show-details
+        series_year = details["year"]
+        imdb_rating = details["imdb_rating"]
+        genre = details["genre"]
 
         # Crear una conexión a la base de datos para reutilizarla
         connection = connect_db(db_path)
@@ -361,77 +263,52 @@ def extract_episode_links(driver, episode_id):
         embed_selectors = driver.find_elements(By.CLASS_NAME, 'embed-selector')
         logger.debug(f"Número de enlaces encontrados: {len(embed_selectors)}")
 
+        # Idioma y servidor de todos los selectores, extraídos de una vez
+        embeds_info = extract_page(driver, "embeds")["embeds"] if embed_selectors else []
+
+        # Si está activado, un único script hace todos los clics en el navegador
+        harvested_urls, harvested = harvest_pending_embeds(driver, len(embed_selectors))
+
         for i, embed_selector in enumerate(embed_selectors):
             try:
-                # Extraer idioma y servidor antes de hacer clic
-                embed_html = embed_selector.get_attribute('outerHTML')
-                embed_soup = BeautifulSoup(embed_html, "html.parser")
-
-                # Determinar el idioma
-                language = None
-                if "Audio Español" in embed_html:
-                    language = "Audio Español"
-                elif "Subtítulo Español" in embed_html:
-                    language = "Subtítulo Español"
-                elif "Audio Latino" in embed_html:
-                    language = "Audio Latino"
-                elif "Audio Original" in embed_html:
-                    language = "Audio Original"
-                elif "Subtítulo Ingles" in embed_html:
-                    language = "Subtítulo Ingles"
-
-                # Extraer el servidor usando la nueva estructura HTML
+                # Idioma y servidor del selector, ya analizados desde el HTML de la página
+                embed_info = embeds_info[i] if i < len(embeds_info) else {"language": None, "server": None}
+                language = embed_info["language"]
                 server = None
-                provider_tag = embed_soup.find("b", class_="provider")
-                if provider_tag:
-                    server_text = provider_tag.text.strip()
+                if embed_info["server"]:
+                    server_text = embed_info["server"]
                     # Extraer el dominio principal del servidor
                     server = server_text.lower().split('.')[0] if '.' in server_text else server_text.lower()
-                    logger.debug(f"Servidor extraído de la clase provider: {server}")
-                else:
-                    # Método alternativo si no se encuentra la clase provider
-                    if "Servidor:" in embed_html:
-                        server_match = re.search(r'Servidor:([^<]+)', embed_html)
-                        if server_match:
-                            server_text = server_match.group(1).strip()
-                            server = server_text.lower().split('.')[0] if '.' in server_text else server_text.lower()
-                            logger.debug(f"Servidor extraído del texto: {server}")
 
                 logger.debug(f"Selector {i + 1}: Idioma={language}, Servidor={server}")
 
-                # Hacer clic en el selector para mostrar el iframe
-                driver.execute_script("arguments[0].click();", embed_selector)
-                time.sleep(1.5)  # Esperar a que se cargue el iframe
-
-                try:
-                    # Esperar a que aparezca el iframe
-                    iframe = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, ".embed-movie iframe"))
-                    )
-
-                    # Obtener el enlace del iframe
-                    embedded_link = iframe.get_attribute('src')
-                    logger.debug(f"Enlace embebido extraído: {embedded_link}")
-
-                    # Modificar el enlace si es powvideo o streamplay
-                    if embedded_link and server and server in ["powvideo", "streamplay"]:
-                        embedded_link = re.sub(r"embed-([^-]+)-\d+x\d+\.html", r"\1", embedded_link)
-
-                    # Determinar la calidad en función del servidor
-                    quality = '1080p' if server in ['streamtape', 'vidmoly', 'mixdrop'] else 'hdrip'
-
-                    # Añadir enlace a la lista si tenemos todos los datos necesarios
-                    if server and language and embedded_link:
-                        server_links.append({
-                            "episode_id": episode_id,
-                            "server": server,
-                            "language": language,
-                            "link": embedded_link,
-                            "quality": quality
-                        })
-                        logger.debug(f"Enlace añadido: {server} - {language}")
-                except Exception as e:
-                    logger.error(f"Error al obtener el iframe para el selector {i + 1}: {e}")
+                if i in harvested:
+                    # El script del navegador ya hizo clic en este selector
+                    embedded_link = harvested_urls[i]
+                else:
+                    # Hacer clic en el selector y esperar a que cambie el iframe
+                    previous_src = current_embed_src(driver)
+                    driver.execute_script("arguments[0].click();", embed_selector)
+                    wait_for(driver, "embed", arg=previous_src)
+
+                    try:
+                        # Esperar a que aparezca el iframe
+                        iframe = WebDriverWait(driver, 5).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, ".embed-movie iframe"))
+                        )
+
+                        # Obtener el enlace del iframe
+                        embedded_link = iframe.get_attribute('src')
+                    except Exception as e:
+                        logger.error(f"Error al obtener el iframe para el selector {i + 1}: {e}")
+                        continue
+                logger.debug(f"Enlace embebido extraído: {embedded_link}")
+
+                # Añadir enlace a la lista si tenemos todos los datos necesarios
+                link_data = build_link_data(server, language, embedded_link, episode_id=episode_id)
+                if link_data:
+                    server_links.append(link_data)
+                    logger.debug(f"Enlace añadido: {server} - {language}")
             except Exception as e:
                 logger.error(f"Error al procesar el selector de embed {i + 1}: {e}")
 
@@ -642,7 +519,6 @@ def process_updated_episodes(db_path=None):
     logger.info(f"Iniciando actualización de episodios actualizados: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
     progress_data = {}
-    main_driver = None
     try:
         if db_path:
             db_path = os.path.abspath(db_path)
@@ -667,17 +543,17 @@ def process_updated_episodes(db_path=None):
         # Limpiar caché antes de comenzar
         clear_cache()
 
-        # Crear un driver principal para obtener las URLs de los episodios
-        main_driver = create_driver()
-        if not login(main_driver, logger):
+        # Obtener del pool un driver autenticado para leer las URLs de los episodios
+        pool = get_driver_pool(size=MAX_WORKERS)
+        main_driver = pool.acquire()
+        if main_driver is None:
             logger.error("No se pudo iniciar sesión. Abortando procesamiento de episodios actualizados.")
-            main_driver.quit()
             return []
 
         # Obtener URLs de episodios actualizados
         episode_urls = get_episode_urls_from_updated_page(main_driver)
-        main_driver.quit()
-        main_driver = None
+        # Devolverlo al pool para que lo reutilice un worker
+        pool.release(main_driver)
 
         if not episode_urls:
             logger.warning("No se encontraron episodios actualizados. Finalizando.")
@@ -722,11 +598,7 @@ def process_updated_episodes(db_path=None):
         logger.debug(traceback.format_exc())
         return []
     finally:
-        if main_driver:
-            try:
-                main_driver.quit()
-            except Exception:
-                pass
+        close_all_drivers()
         save_progress(PROGRESS_FILE, progress_data)
 
 
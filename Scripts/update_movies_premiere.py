@@ -4,7 +4,7 @@ import traceback
 from datetime import datetime
 
 from .scraper_utils import (
-    setup_logger, create_driver, login, setup_database,
+    setup_logger, setup_database,
     save_progress, load_progress, clear_cache,
     BASE_URL, DB_PATH, PROJECT_ROOT, is_url_completed, mark_url_completed
 )
@@ -12,6 +12,7 @@ from .scraper_utils import (
 # Reutilizamos funciones del script de películas actualizadas
 from . import update_movies_updated as movies_updated
 from .graceful_shutdown import GracefulShutdown
+from .driver_pool import get_driver_pool
 
 SCRIPT_NAME = "update_movies_premiere"
 LOG_FILE = f"{SCRIPT_NAME}.log"
@@ -31,7 +32,6 @@ def process_premiere_movies(db_path=None):
     logger.info(
         f"Iniciando procesamiento de películas de estreno: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     progress_data = {}
-    main_driver = None
     try:
         if db_path:
             db_path = os.path.abspath(db_path)
@@ -53,17 +53,17 @@ def process_premiere_movies(db_path=None):
             return []
         clear_cache()
 
-        main_driver = create_driver()
-        if not login(main_driver, logger):
+        pool = get_driver_pool(size=movies_updated.MAX_WORKERS)
+        main_driver = pool.acquire()
+        if main_driver is None:
             logger.error("No se pudo iniciar sesión. Abortando procesamiento de películas de estreno.")
-            main_driver.quit()
             return []
 
         progress_data = load_progress(PROGRESS_FILE, {})
         completed_urls = set(progress_data.get('completed_urls', []))
         movie_urls = movies_updated.get_movie_urls_from_page(PREMIERE_MOVIES_URL, main_driver)
-        main_driver.quit()
-        main_driver = None
+        # Devolverlo al pool para que lo reutilice un worker
+        pool.release(main_driver)
 
         if not movie_urls:
             logger.warning("No se encontraron películas de estreno. Finalizando.")
@@ -96,11 +96,6 @@ def process_premiere_movies(db_path=None):
         logger.debug(traceback.format_exc())
         return []
     finally:
-        if main_driver:
-            try:
-                main_driver.quit()
-            except Exception:
-                pass
         save_progress(PROGRESS_FILE, progress_data)
         movies_updated.close_all_drivers()
 
@@ -1,12 +1,10 @@
 import time
-import re
 import concurrent.futures
 import argparse
 import os
 import traceback
 import threading
 from datetime import datetime
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,12 +12,19 @@ from selenium.common.exceptions import TimeoutException, StaleElementReferenceEx
 
 # Importar utilidades compartidas
 from .scraper_utils import (
-    setup_logger, create_driver, connect_db, login, setup_database,
+    setup_logger, connect_db, setup_database,
     save_progress, load_progress, clear_cache, movie_exists,
     insert_or_update_movie, BASE_URL, DB_PATH, MAX_WORKERS, MAX_RETRIES, PROJECT_ROOT,
-    insert_links_batch, is_url_completed, mark_url_completed
+    insert_links_batch, is_url_completed, mark_url_completed, extract_page,
+    harvest_pending_embeds, build_link_data
 )
 from .graceful_shutdown import GracefulShutdown
+from .hdfull_http import fetch_listing_page
+from .parsers import MOVIE_LANGUAGES, parse_listing
+from .driver_pool import get_driver_pool, close_driver_pool
+from .parse_pool import close_parse_pool
+from .db_connections import close_db_connections
+from .page_ready import wait_for, current_embed_src, log_wait_stats
 
 # Configuración específica para este script
 SCRIPT_NAME = "update_movies_updated"
@@ -35,32 +40,32 @@ logger = setup_logger(SCRIPT_NAME, LOG_FILE)
 shutdown = GracefulShutdown()
 shutdown_event = shutdown.shutdown_event
 
-# Manejador de drivers por hilo para evitar múltiples inicios de sesión
+# Driver del pool asociado a cada hilo para evitar múltiples inicios de sesión
 _thread_local = threading.local()
-_active_drivers = []
 
 
 def get_logged_in_driver():
-    """Obtiene un driver asociado al hilo actual ya autenticado."""
-    if not hasattr(_thread_local, "driver"):
-        driver = create_driver()
-        if not login(driver, logger):
-            logger.error("No se pudo iniciar sesión en el driver")
-            driver.quit()
-            raise RuntimeError("Login failed")
-        _thread_local.driver = driver
-        _active_drivers.append(driver)
-    return _thread_local.driver
+    """Obtiene del pool un driver autenticado asociado al hilo actual."""
+    pool = get_driver_pool(size=MAX_WORKERS)
+    driver = getattr(_thread_local, "driver", None)
+    if driver is None:
+        driver = pool.acquire()
+    else:
+        # Cada llamada corresponde a una página: reciclar el driver si toca
+        driver = pool.checkpoint(driver)
+    if driver is None:
+        logger.error("No se pudo obtener un driver con sesión iniciada")
+        raise RuntimeError("Login failed")
+    _thread_local.driver = driver
+    return driver
 
 
 def close_all_drivers():
-    """Cierra todos los drivers creados."""
-    for driver in _active_drivers:
-        try:
-            driver.quit()
-        except Exception:
-            pass
-    _active_drivers.clear()
+    """Cierra todos los drivers del pool."""
+    close_driver_pool()
+    close_parse_pool()
+    close_db_connections()
+    log_wait_stats(logger)
 
 
 # Función para obtener URLs de películas de una página
@@ -75,15 +80,11 @@ def load_page(driver, url, retry_login=False):
                 f"Error cargando {url} (intento {attempt}/{MAX_RETRIES}): {e}")
             # En workers podemos recrear el driver si falla
             if retry_login:
-                try:
-                    driver.quit()
-                except Exception:
-                    pass
-                if driver in _active_drivers:
-                    _active_drivers.remove(driver)
-                if hasattr(_thread_local, "driver"):
-                    del _thread_local.driver
-                driver = get_logged_in_driver()
+                driver = get_driver_pool().replace(driver)
+                if driver is None:
+                    _thread_local.driver = None
+                    return False
+                _thread_local.driver = driver
             if attempt == MAX_RETRIES:
                 return False
             time.sleep(5)
@@ -92,31 +93,24 @@ def load_page(driver, url, retry_login=False):
 def get_movie_urls_from_page(page_url, driver):
     logger.info(f"Obteniendo URLs de películas de la página: {page_url}")
     try:
-        if not load_page(driver, page_url):
-            return []
-        time.sleep(2)  # Esperar a que se cargue la página
-
-        # Esperar a que aparezcan las películas
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.span-6.inner-6.tt.view"))
-        )
-
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Buscar todos los divs de las películas
-        movie_divs = soup.find_all("div", class_="span-6 inner-6 tt view")
-        logger.info(f"Encontradas {len(movie_divs)} películas en la página")
+        # /peliculas-actualizadas lo genera el servidor (no es la pestaña #updated de
+        # /peliculas), así que se descarga por HTTP; el driver sólo si la respuesta no sirve
+        page = fetch_listing_page(page_url, driver, lambda doc: bool(parse_listing(doc, BASE_URL)))
+        if page is not None:
+            items = parse_listing(page, BASE_URL)
+        else:
+            if not load_page(driver, page_url):
+                return []
+            wait_for(driver, "listing")
 
-        movie_urls = []
-        for movie_div in movie_divs:
-            link_tag = movie_div.find("a", href=re.compile(r"/pelicula/"))
-            if link_tag:
-                movie_href = link_tag['href']
-                movie_url = BASE_URL + movie_href if not movie_href.startswith('http') else movie_href
-                movie_urls.append(movie_url)
+            # Esperar a que aparezcan las películas
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.span-6.inner-6.tt.view"))
+            )
+            items = extract_page(driver, "listing")
 
-        return movie_urls
+        logger.info(f"Encontradas {len(items)} películas en la página")
+        return [item["url"] for item in items if "/pelicula/" in item["url"]]
     except Exception as e:
         logger.error(f"Error al obtener URLs de películas de la página {page_url}: {e}")
         logger.debug(traceback.format_exc())
@@ -133,62 +127,50 @@ def extract_movie_links(driver, movie_id, logger):
         embed_selectors = driver.find_elements(By.CLASS_NAME, 'embed-selector')
         logger.debug(f"Número de enlaces encontrados: {len(embed_selectors)}")
 
-        for embed_selector in embed_selectors:
+        # Idioma y servidor de todos los selectores, extraídos de una vez
+        embeds_info = extract_page(driver, "embeds")["embeds"] if embed_selectors else []
+
+        # Si está activado, un único script hace todos los clics en el navegador
+        harvested_urls, harvested = harvest_pending_embeds(driver, len(embed_selectors))
+
+        for i, embed_selector in enumerate(embed_selectors):
             language = None
             server = None
-            embedded_link = None
+            embedded_link = harvested_urls[i]
 
             try:
-                # Extraer idioma y servidor antes de hacer clic
-                embed_html = embed_selector.get_attribute('outerHTML')
-                embed_soup = BeautifulSoup(embed_html, "html.parser")
-
-                if "Audio Español" in embed_soup.text:
-                    language = "Audio Español"
-                elif "Subtítulo Español" in embed_soup.text:
-                    language = "Subtítulo Español"
-                elif "Audio Latino" in embed_soup.text:
-                    language = "Audio Latino"
-
-                server_tag = embed_soup.find("b", class_="provider")
-                if server_tag:
-                    server = server_tag.text.strip().lower()
-
-                # Hacer clic en el selector
-                embed_selector.click()
-                time.sleep(2)  # Esperar a que se cargue el contenido
+                if i < len(embeds_info):
+                    if embeds_info[i]["language"] in MOVIE_LANGUAGES:
+                        language = embeds_info[i]["language"]
+                    if embeds_info[i]["server"]:
+                        server = embeds_info[i]["server"].lower()
+
+                # Hacer clic en el selector (si el script del navegador no lo hizo ya) y esperar a que cambie el iframe
+                if i not in harvested:
+                    previous_src = current_embed_src(driver)
+                    embed_selector.click()
+                    wait_for(driver, "embed", arg=previous_src)
             except Exception as e:
                 logger.error(f"Error al hacer clic en el embed-selector: {e}")
                 continue
 
-            try:
-                # Esperar a que aparezca el iframe
-                embed_movie = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, 'embed-movie'))
-                )
-                iframe = embed_movie.find_element(By.TAG_NAME, 'iframe')
-                embedded_link = iframe.get_attribute('src')
-                logger.debug(f"Enlace embebido extraído: {embedded_link}")
-            except Exception as e:
-                logger.error(f"Error al obtener el enlace embebido: {e}")
-                continue
-
-            # Modificar el enlace si es powvideo o streamplay
-            if embedded_link and server in ["powvideo", "streamplay"]:
-                embedded_link = re.sub(r"embed-([^-]+)-\d+x\d+\.html", r"\1", embedded_link)
-
-            # Determinar la calidad en función del servidor
-            quality = '1080p' if server in ['streamtape', 'vidmoly', 'mixdrop'] else 'hdrip'
+            if i not in harvested:
+                try:
+                    # Esperar a que aparezca el iframe
+                    embed_movie = WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.CLASS_NAME, 'embed-movie'))
+                    )
+                    iframe = embed_movie.find_element(By.TAG_NAME, 'iframe')
+                    embedded_link = iframe.get_attribute('src')
+                except Exception as e:
+                    logger.error(f"Error al obtener el enlace embebido: {e}")
+                    continue
+            logger.debug(f"Enlace embebido extraído: {embedded_link}")
 
             # Añadir enlace a la lista
-            if server and language and embedded_link:
-                server_links.append({
-                    "movie_id": movie_id,
-                    "server": server,
-                    "language": language,
-                    "link": embedded_link,
-                    "quality": quality
-                })
+            link_data = build_link_data(server, language, embedded_link, movie_id=movie_id)
+            if link_data:
+                server_links.append(link_data)
 
         return server_links
     except Exception as e:
@@ -209,7 +191,9 @@ def extract_movie_details(movie_url, worker_id=0, db_path=None):
             logger.error(
                 f"[Worker {worker_id}] No se pudo cargar la página de la película: {movie_url}")
             return None
-        time.sleep(1.5)  # Esperar a que se cargue la página
+        # load_page puede haber reemplazado el driver del hilo
+        driver = _thread_local.driver
+        wait_for(driver, "movie")
 
         # Esperar a que aparezca el título
         try:
@@ -220,47 +204,18 @@ def extract_movie_details(movie_url, worker_id=0, db_path=None):
             logger.error(f"[Worker {worker_id}] Timeout esperando el título de la película en {movie_url}")
             return None
 
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
-
-        # Extraer el título de la película
-        title_tag = soup.find("div", id="summary-title")
-        if not title_tag:
+        details = extract_page(driver, "movie")
+        if not details:
             logger.error(f"[Worker {worker_id}] No se pudo encontrar el título de la película en {movie_url}")
             return None
 
-        title = title_tag.text.strip()
-        logger.debug(f"[Worker {worker_id}] Título extraído: {title}")
-
-        # Extraer datos básicos de la película
-        show_details = soup.find("div", class_="show-details")
-        year = None
-        imdb_rating = None
-        genre = None
-
-        if show_details:
-            year_tag = show_details.find("a", href=re.compile(r"/buscar/year/"))
-            if year_tag:
-                try:
-                    year = int(year_tag.text.strip())
-                    logger.debug(f"[Worker {worker_id}] Año extraído: {year}")
-
-                except ValueError:
-                    logger.warning(
-                        f"[Worker {worker_id}] No se pudo convertir el año a entero: {year_tag.text.strip()}")
-
-            imdb_rating_tag = show_details.find("p", itemprop="aggregateRating")
-            if imdb_rating_tag and imdb_rating_tag.find("a"):
-                rating_text = imdb_rating_tag.find("a").text.strip()
-                try:
-                    imdb_rating = float(rating_text)
-                    logger.debug(f"[Worker {worker_id}] IMDB Rating extraído: {imdb_rating}")
-                except ValueError:
-                    logger.warning(f"[Worker {worker_id}] No se pudo convertir el rating a float: {rating_text}")
-
-            genre_tags = show_details.find_all("a", href=re.compile(r"/tags-peliculas"))
-            genre = ", ".join([tag.text.strip() for tag in genre_tags]) if genre_tags else None
-            logger.debug(f"[Worker {worker_id}] Género extraído: {genre}")
+        # Datos básicos de la película
+        title = details["title"]
+        year = details["year"]
+        imdb_rating = details["imdb_rating"]
+        genre = ", ".join(details["genres"]) if details["genres"] else None
+        logger.debug(
+            f"[Worker {worker_id}] Datos extraídos: {title}, año={year}, IMDB={imdb_rating}, género={genre}")
 
         # Crear una conexión a la base de datos para reutilizarla
         connection = connect_db(db_path)
@@ -484,7 +439,6 @@ def process_updated_movies(db_path=None):
     logger.info(f"Iniciando procesamiento de películas actualizadas: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
     progress_data = {}
-    main_driver = None
     try:
         if db_path:
             db_path = os.path.abspath(db_path)
@@ -509,13 +463,11 @@ def process_updated_movies(db_path=None):
         # Limpiar caché antes de comenzar
         clear_cache()
 
-        # Crear un driver principal para obtener las URLs de las películas
-        main_driver = create_driver()
-
-        # Primero hacer login
-        if not login(main_driver, logger):
+        # Obtener del pool un driver autenticado para leer las URLs de las películas
+        pool = get_driver_pool(size=MAX_WORKERS)
+        main_driver = pool.acquire()
+        if main_driver is None:
             logger.error("No se pudo iniciar sesión. Abortando procesamiento de películas actualizadas.")
-            main_driver.quit()
             return []
 
         # Cargar progreso anterior
@@ -524,8 +476,8 @@ def process_updated_movies(db_path=None):
 
         # Obtener URLs de películas de la primera página
         movie_urls = get_movie_urls_from_page(UPDATED_MOVIES_URL, main_driver)
-        main_driver.quit()
-        main_driver = None
+        # Devolverlo al pool para que lo reutilice un worker
+        pool.release(main_driver)
 
         if not movie_urls:
             logger.warning("No se encontraron películas actualizadas. Finalizando.")
@@ -566,11 +518,7 @@ def process_updated_movies(db_path=None):
         logger.debug(traceback.format_exc())
         return []
     finally:
-        if main_driver:
-            try:
-                main_driver.quit()
-            except Exception:
-                pass
+        close_all_drivers()
         save_progress(PROGRESS_FILE, progress_data)
 
 
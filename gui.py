@@ -33,6 +33,14 @@ from PyQt6.QtWidgets import (
 
 from Scripts import scraper_utils
 from Scripts.db_setup import create_direct_db, create_torrent_db
+from Scripts.db_migrations import (
+    DIRECT_MIGRATIONS,
+    TORRENT_MIGRATIONS,
+    migrate_direct_db,
+    migrate_torrent_db,
+    migration_status,
+)
+from Scripts.http_cache import get_response_cache, close_response_cache
 from Scripts.scraper_utils import (
     connect_db,
     execute_sql_script,
@@ -787,6 +795,8 @@ class DatabaseTab(QWidget):
             | Qt.TextInteractionFlag.TextSelectableByKeyboard
         )
         self.torrent_path_label.setToolTip("Ruta actual de la base de datos torrent utilizada por los scrapers.")
+        self.direct_schema_label = QLabel()
+        self.torrent_schema_label = QLabel()
         self.db_logger = setup_logger("db_setup_ui", "db_setup_ui.log")
         self.sql_logger = setup_logger("sql_runner", "sql_runner.log")
         self._build_ui()
@@ -795,6 +805,26 @@ class DatabaseTab(QWidget):
     def refresh_paths(self) -> None:
         self.direct_path_label.setText(scraper_utils.DB_PATH)
         self.torrent_path_label.setText(scraper_utils.TORRENT_DB_PATH)
+        self.refresh_schema_status()
+
+    @staticmethod
+    def _format_schema_status(db_path: str, migrations: list) -> str:
+        try:
+            status = migration_status(db_path, migrations)
+        except Exception as exc:  # pragma: no cover - base ilegible o bloqueada
+            return f"No se pudo leer la versión del esquema: {exc}"
+        if not status["exists"]:
+            return "La base no existe"
+        text = f"Versión {status['version']} de {status['latest']}"
+        if status["pending"]:
+            return f"{text} — pendientes: {'; '.join(status['pending'])}"
+        return f"{text} — al día"
+
+    def refresh_schema_status(self) -> None:
+        self.direct_schema_label.setText(self._format_schema_status(scraper_utils.DB_PATH, DIRECT_MIGRATIONS))
+        self.torrent_schema_label.setText(
+            self._format_schema_status(scraper_utils.TORRENT_DB_PATH, TORRENT_MIGRATIONS)
+        )
 
     def _build_ui(self) -> None:
         main_layout = QVBoxLayout()
@@ -833,6 +863,16 @@ class DatabaseTab(QWidget):
         create_layout.addWidget(btn_create_both)
         create_group.setLayout(create_layout)
 
+        # Estado de las migraciones del esquema
+        schema_group = QGroupBox("Migraciones del esquema")
+        schema_layout = QFormLayout()
+        schema_layout.addRow("Direct:", self.direct_schema_label)
+        schema_layout.addRow("Torrent:", self.torrent_schema_label)
+        btn_migrate = QPushButton("Aplicar migraciones pendientes")
+        btn_migrate.clicked.connect(self.apply_migrations)
+        schema_layout.addRow(btn_migrate)
+        schema_group.setLayout(schema_layout)
+
         # Ejecutar script SQL
         script_group = QGroupBox("Ejecutar script SQL")
         script_layout = QVBoxLayout()
@@ -843,6 +883,7 @@ class DatabaseTab(QWidget):
 
         main_layout.addWidget(paths_group)
         main_layout.addWidget(create_group)
+        main_layout.addWidget(schema_group)
         main_layout.addWidget(script_group)
         main_layout.addStretch(1)
         self.setLayout(main_layout)
@@ -947,6 +988,26 @@ class DatabaseTab(QWidget):
             QMessageBox.warning(self, "Error", "No se pudo crear la base torrent.")
             self.log_callback(f"No se pudo crear la base torrent en {selected_path}.")
 
+    def apply_migrations(self) -> None:
+        errors = []
+        for name, path, migrate_db in (
+            ("directa", scraper_utils.DB_PATH, migrate_direct_db),
+            ("torrent", scraper_utils.TORRENT_DB_PATH, migrate_torrent_db),
+        ):
+            if not os.path.exists(path):
+                continue
+            try:
+                version = migrate_db(path)
+                self.log_callback(f"Base {name} migrada a la versión {version} del esquema.")
+            except Exception as exc:
+                errors.append(f"{name}: {exc}")
+                self.log_callback(f"Error al migrar la base {name}: {exc}")
+        self.refresh_schema_status()
+        if errors:
+            QMessageBox.warning(self, "Error", "No se pudieron aplicar las migraciones:\n" + "\n".join(errors))
+        else:
+            QMessageBox.information(self, "Migraciones aplicadas", "El esquema de las bases está al día.")
+
     def create_both_db(self) -> None:
         self.create_direct_db()
         self.create_torrent_db()
@@ -1005,6 +1066,54 @@ class SettingsTab(QWidget):
         self.cache_checkbox.setChecked(bool(scraper_utils.CACHE_ENABLED))
         self.cache_checkbox.stateChanged.connect(self.update_cache)
 
+        self.http_cache_checkbox = QCheckBox("Usar caché HTTP de páginas torrent (omitir páginas sin cambios)")
+        self.http_cache_checkbox.setChecked(bool(scraper_utils.HTTP_CACHE_ENABLED))
+        self.http_cache_checkbox.stateChanged.connect(self.update_http_cache)
+
+        self.clear_http_cache_button = QPushButton("Vaciar caché HTTP")
+        self.clear_http_cache_button.clicked.connect(self.clear_http_cache)
+
+        self.listing_http_checkbox = QCheckBox("Descargar listados sin navegador (cookies de sesión)")
+        self.listing_http_checkbox.setChecked(bool(scraper_utils.LISTING_HTTP_ENABLED))
+        self.listing_http_checkbox.stateChanged.connect(self.update_listing_http)
+
+        self.lean_browser_checkbox = QCheckBox("Perfil ligero de Chrome (sin imágenes, fuentes ni publicidad)")
+        self.lean_browser_checkbox.setChecked(bool(scraper_utils.LEAN_BROWSER_ENABLED))
+        self.lean_browser_checkbox.stateChanged.connect(self.update_lean_browser)
+
+        self.browser_extraction_checkbox = QCheckBox("Extraer los datos en el navegador (sin descargar el HTML)")
+        self.browser_extraction_checkbox.setChecked(bool(scraper_utils.BROWSER_EXTRACTION_ENABLED))
+        self.browser_extraction_checkbox.stateChanged.connect(self.update_browser_extraction)
+
+        self.embed_harvest_checkbox = QCheckBox("Recoger los enlaces con un único script en el navegador")
+        self.embed_harvest_checkbox.setChecked(bool(scraper_utils.EMBED_HARVEST_ENABLED))
+        self.embed_harvest_checkbox.stateChanged.connect(self.update_embed_harvest)
+
+        self.page_archive_checkbox = QCheckBox("Archivar las páginas descargadas (para re-analizarlas sin conexión)")
+        self.page_archive_checkbox.setChecked(bool(scraper_utils.PAGE_ARCHIVE_ENABLED))
+        self.page_archive_checkbox.stateChanged.connect(self.update_page_archive)
+
+        self.tabs_per_browser_spin = QSpinBox()
+        self.tabs_per_browser_spin.setRange(1, 8)
+        self.tabs_per_browser_spin.setValue(int(scraper_utils.TABS_PER_BROWSER))
+        self.tabs_per_browser_spin.valueChanged.connect(self.update_tabs_per_browser)
+
+        self.parse_processes_spin = QSpinBox()
+        self.parse_processes_spin.setRange(0, 16)
+        self.parse_processes_spin.setValue(int(scraper_utils.PARSE_PROCESSES))
+        self.parse_processes_spin.valueChanged.connect(self.update_parse_processes)
+
+        self.db_writer_batch_spin = QSpinBox()
+        self.db_writer_batch_spin.setRange(1, 1000)
+        self.db_writer_batch_spin.setValue(int(scraper_utils.DB_WRITER_BATCH_SIZE))
+        self.db_writer_batch_spin.valueChanged.connect(self.update_db_writer_batch_size)
+
+        self.db_writer_delay_spin = QSpinBox()
+        self.db_writer_delay_spin.setRange(0, 10000)
+        self.db_writer_delay_spin.setSingleStep(100)
+        self.db_writer_delay_spin.setValue(int(scraper_utils.DB_WRITER_MAX_DELAY_MS))
+        self.db_writer_delay_spin.valueChanged.connect(self.update_db_writer_max_delay)
+
         layout.addRow("Máximo de workers:", self.max_workers_spin)
 
         retries_row = QHBoxLayout()
@@ -1015,12 +1124,38 @@ class SettingsTab(QWidget):
         layout.addRow("Máximo de reintentos:", retries_container)
         layout.addRow(self.cache_checkbox)
 
+        http_cache_row = QHBoxLayout()
+        http_cache_row.addWidget(self.http_cache_checkbox)
+        http_cache_row.addWidget(self.clear_http_cache_button)
+        http_cache_container = QWidget()
+        http_cache_container.setLayout(http_cache_row)
+        layout.addRow(http_cache_container)
+        layout.addRow(self.listing_http_checkbox)
+        layout.addRow(self.lean_browser_checkbox)
+        layout.addRow(self.browser_extraction_checkbox)
+        layout.addRow(self.embed_harvest_checkbox)
+        layout.addRow(self.page_archive_checkbox)
+        layout.addRow("Workers por navegador (pestañas):", self.tabs_per_browser_spin)
+        layout.addRow("Procesos de análisis de HTML (0 = ninguno):", self.parse_processes_spin)
+        layout.addRow("Películas por commit en la BD:", self.db_writer_batch_spin)
+        layout.addRow("Espera máxima del commit (ms):", self.db_writer_delay_spin)
+
         self.setLayout(layout)
 
     def refresh(self) -> None:
         self.max_workers_spin.setValue(int(scraper_utils.MAX_WORKERS))
         self.max_retries_spin.setValue(int(scraper_utils.MAX_RETRIES))
         self.cache_checkbox.setChecked(bool(scraper_utils.CACHE_ENABLED))
+        self.http_cache_checkbox.setChecked(bool(scraper_utils.HTTP_CACHE_ENABLED))
+        self.listing_http_checkbox.setChecked(bool(scraper_utils.LISTING_HTTP_ENABLED))
+        self.lean_browser_checkbox.setChecked(bool(scraper_utils.LEAN_BROWSER_ENABLED))
+        self.browser_extraction_checkbox.setChecked(bool(scraper_utils.BROWSER_EXTRACTION_ENABLED))
+        self.embed_harvest_checkbox.setChecked(bool(scraper_utils.EMBED_HARVEST_ENABLED))
+        self.page_archive_checkbox.setChecked(bool(scraper_utils.PAGE_ARCHIVE_ENABLED))
+        self.tabs_per_browser_spin.setValue(int(scraper_utils.TABS_PER_BROWSER))
+        self.parse_processes_spin.setValue(int(scraper_utils.PARSE_PROCESSES))
+        self.db_writer_batch_spin.setValue(int(scraper_utils.DB_WRITER_BATCH_SIZE))
+        self.db_writer_delay_spin.setValue(int(scraper_utils.DB_WRITER_MAX_DELAY_MS))
 
     def update_max_workers(self, value: int) -> None:
         scraper_utils.set_max_workers(value)
@@ -1036,6 +1171,61 @@ class SettingsTab(QWidget):
         status = "activada" if scraper_utils.CACHE_ENABLED else "desactivada"
         self.log_callback(f"Caché {status}.")
 
+    def update_http_cache(self, state: int) -> None:
+        scraper_utils.set_http_cache_enabled(self.http_cache_checkbox.isChecked())
+        status = "activada" if scraper_utils.HTTP_CACHE_ENABLED else "desactivada"
+        self.log_callback(f"Caché HTTP {status}.")
+
+    def update_listing_http(self, state: int) -> None:
+        scraper_utils.set_listing_http_enabled(self.listing_http_checkbox.isChecked())
+        status = "activada" if scraper_utils.LISTING_HTTP_ENABLED else "desactivada"
+        self.log_callback(f"Descarga de listados por HTTP {status}.")
+
+    def update_lean_browser(self, state: int) -> None:
+        scraper_utils.set_lean_browser_enabled(self.lean_browser_checkbox.isChecked())
+        status = "activado" if scraper_utils.LEAN_BROWSER_ENABLED else "desactivado"
+        self.log_callback(f"Perfil ligero de Chrome {status}.")
+
+    def update_browser_extraction(self, state: int) -> None:
+        scraper_utils.set_browser_extraction_enabled(self.browser_extraction_checkbox.isChecked())
+        status = "activada" if scraper_utils.BROWSER_EXTRACTION_ENABLED else "desactivada"
+        self.log_callback(f"Extracción en el navegador {status}.")
+
+    def update_embed_harvest(self, state: int) -> None:
+        scraper_utils.set_embed_harvest_enabled(self.embed_harvest_checkbox.isChecked())
+        status = "activada" if scraper_utils.EMBED_HARVEST_ENABLED else "desactivada"
+        self.log_callback(f"Recogida de enlaces en el navegador {status}.")
+
+    def update_page_archive(self, state: int) -> None:
+        scraper_utils.set_page_archive_enabled(self.page_archive_checkbox.isChecked())
+        status = "activado" if scraper_utils.PAGE_ARCHIVE_ENABLED else "desactivado"
+        self.log_callback(f"Archivo de páginas {status}.")
+
+    def update_tabs_per_browser(self, value: int) -> None:
+        scraper_utils.set_tabs_per_browser(value)
+        self.log_callback(f"Workers por navegador actualizado a {value}.")
+
+    def update_parse_processes(self, value: int) -> None:
+        scraper_utils.set_parse_processes(value)
+        self.log_callback(f"Procesos de análisis de HTML actualizado a {value}.")
+
+    def update_db_writer_batch_size(self, value: int) -> None:
+        scraper_utils.set_db_writer_batch_size(value)
+        self.log_callback(f"Películas por commit en la BD actualizado a {value}.")
+
+    def update_db_writer_max_delay(self, value: int) -> None:
+        scraper_utils.set_db_writer_max_delay_ms(value)
+        self.log_callback(f"Espera máxima del commit actualizada a {value} ms.")
+
+    def clear_http_cache(self) -> None:
+        try:
+            get_response_cache().clear()
+            close_response_cache()
+        except Exception as exc:
+            QMessageBox.warning(self, "Error", f"No se pudo vaciar la caché HTTP: {exc}")
+            return
+        self.log_callback("Caché HTTP vaciada.")
+
 
 class MainWindow(QMainWindow):
     """Ventana principal de la aplicación."""